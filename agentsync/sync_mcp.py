@@ -14,17 +14,32 @@ Targets:
   - Claude Code: ~/.claude/claude_desktop_config.json
   - Antigravity: ~/.gemini/antigravity/mcp_config.json
 
+servers.json is loaded once per sync and every target is generated in one
+pass. ${VAR} / ${VAR:-default} references are compiled once per load and
+resolved from servers.json "variables" (which may chain), the built-ins
+(PROJECTS_ROOT, TOOLS_ROOT) and then the environment; unresolved variables
+abort the sync with a full list. A sidecar manifest (_configs/mcp/.sync-manifest.json) records the hash
+and stat of each file we wrote, so unchanged targets are skipped without
+reading them; changed targets are written in parallel with atomic replace.
+
 Usage:
   uv run sync_mcp.py           # Sync all tools
   uv run sync_mcp.py claude    # Sync Claude only
   uv run sync_mcp.py --dry-run # Preview without writing
+  uv run sync_mcp.py --watch   # Re-sync whenever _configs/mcp changes
 """
 
 import argparse
+import copy
+import hashlib
 import json
 import os
 import re
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
@@ -43,31 +58,217 @@ TOOL_OUTPUTS = {
     "antigravity": Path.home() / ".gemini" / "antigravity" / "mcp_config.json",
 }
 
+MANIFEST_NAME = ".sync-manifest.json"
+MANIFEST_VERSION = 1
+# --watch polls source mtimes this often (a few stat calls per tick)
+WATCH_INTERVAL = 0.05
+
+
+class SyncError(Exception):
+    """Source config is missing or invalid"""
+
+
+@dataclass
+class Target:
+    """A generated config waiting to be written"""
+    tool: str
+    path: Path
+    content: str
+    servers: list[str]
+
+    @property
+    def digest(self) -> str:
+        return hashlib.sha256(self.content.encode()).hexdigest()
+
+
+# ${VAR} or ${VAR:-default}
+_VAR_PATTERN = re.compile(r"\$\{(\w+)(?::-([^}]*))?\}")
+
+
+class Template:
+    """A string pre-split into literal text and ${VAR} references"""
+
+    __slots__ = ("parts", "names")
+
+    def __init__(self, text: str) -> None:
+        parts: list[str | tuple[str, str | None]] = []
+        pos = 0
+        for match in _VAR_PATTERN.finditer(text):
+            if match.start() > pos:
+                parts.append(text[pos:match.start()])
+            parts.append((match.group(1), match.group(2)))
+            pos = match.end()
+        if pos < len(text):
+            parts.append(text[pos:])
+        self.parts = tuple(parts)
+        self.names = frozenset(part[0] for part in parts if isinstance(part, tuple))
+
+    def render(self, resolver: "VariableResolver", missing: set[str]) -> str:
+        out = []
+        for part in self.parts:
+            if isinstance(part, str):
+                out.append(part)
+                continue
+            name, default = part
+            value = resolver.get(name)
+            if value is None:
+                if default is None:
+                    missing.add(name)
+                    value = f"${{{name}}}"
+                else:
+                    value = default
+            out.append(value)
+        return "".join(out)
+
 
-def expand_variables(value: Any, variables: dict[str, str]) -> Any:
-    """Recursively expand ${VAR} references in strings."""
+def compile_value(value: Any) -> Any:
+    """Replace every string containing ${VAR} with a Template (others are kept as-is)."""
     if isinstance(value, str):
-        # Replace ${VAR} patterns
-        def replace_var(match):
-            var_name = match.group(1)
-            return variables.get(var_name, match.group(0))
-        return re.sub(r'\$\{(\w+)\}', replace_var, value)
-    elif isinstance(value, dict):
-        return {k: expand_variables(v, variables) for k, v in value.items()}
-    elif isinstance(value, list):
-        return [expand_variables(item, variables) for item in value]
+        return Template(value) if "${" in value else value
+    if isinstance(value, dict):
+        return {k: compile_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [compile_value(item) for item in value]
     return value
 
 
+def template_names(compiled: Any) -> frozenset[str]:
+    """Every variable a compiled value refers to."""
+    if isinstance(compiled, Template):
+        return compiled.names
+    if isinstance(compiled, dict):
+        return frozenset().union(*(template_names(v) for v in compiled.values()))
+    if isinstance(compiled, list):
+        return frozenset().union(*(template_names(v) for v in compiled))
+    return frozenset()
+
+
+def render_value(compiled: Any, resolver: "VariableResolver", missing: set[str]) -> Any:
+    if isinstance(compiled, Template):
+        return compiled.render(resolver, missing)
+    if isinstance(compiled, dict):
+        return {k: render_value(v, resolver, missing) for k, v in compiled.items()}
+    if isinstance(compiled, list):
+        return [render_value(v, resolver, missing) for v in compiled]
+    return compiled
+
+
+class VariableResolver:
+    """Resolves variables: servers.json "variables" > built-ins > environment.
+
+    Variable definitions may reference other variables (chained); values are
+    memoized and cycles resolve to None (reported as unresolved).
+    """
+
+    def __init__(self, definitions: dict[str, Template | str], builtins: dict[str, str], environ: dict[str, str]) -> None:
+        self.definitions = definitions
+        self.builtins = builtins
+        self.environ = environ
+        self._values: dict[str, str | None] = {}
+        self._resolving: set[str] = set()
+        self.missing: set[str] = set()
+
+    def get(self, name: str) -> str | None:
+        if name in self._values:
+            return self._values[name]
+        if name in self._resolving:
+            return None
+        definition = self.definitions.get(name)
+        if definition is None:
+            value = self.builtins.get(name, self.environ.get(name))
+        elif isinstance(definition, Template):
+            self._resolving.add(name)
+            missing: set[str] = set()
+            value = definition.render(self, missing)
+            self._resolving.discard(name)
+            if missing:
+                self.missing |= missing
+                value = None
+        else:
+            value = definition
+        self._values[name] = value
+        return value
+
+
+@dataclass
+class CompiledServer:
+    """One servers.json entry, compiled once, with its last expansion cached"""
+    source: dict
+    template: Any
+    names: frozenset[str]
+    cache_key: tuple | None = None
+    expanded: dict | None = None
+    missing: frozenset[str] = frozenset()
+
+
+class ServerCatalog:
+    """Compiled servers.json, kept across syncs so only affected servers rebuild.
+
+    A server is re-expanded only when its own definition changes or one of
+    the variables it references resolves to a different value.
+    """
+
+    def __init__(self) -> None:
+        self.servers: dict[str, CompiledServer] = {}
+        self.definitions: dict[str, Template | str] = {}
+        self.rebuilt: set[str] = set()
+
+    def load(self, servers_config: dict) -> None:
+        servers = {}
+        for server_id, definition in servers_config.get("servers", {}).items():
+            previous = self.servers.get(server_id)
+            if previous is not None and previous.source == definition:
+                servers[server_id] = previous
+                continue
+            # description isn't emitted, so it never needs expanding
+            body = {k: v for k, v in definition.items() if k != "description"}
+            template = compile_value(body)
+            servers[server_id] = CompiledServer(
+                source=copy.deepcopy(definition),
+                template=template,
+                names=template_names(template),
+            )
+        self.servers = servers
+        self.definitions = {
+            name: compile_value(str(value)) for name, value in servers_config.get("variables", {}).items()
+        }
+        self.rebuilt = set()
+
+    def resolver(self, environ: dict[str, str] | None = None) -> VariableResolver:
+        builtins = {"PROJECTS_ROOT": str(PROJECTS_ROOT), "TOOLS_ROOT": str(TOOLS_ROOT)}
+        return VariableResolver(self.definitions, builtins, dict(os.environ if environ is None else environ))
+
+    def dependents(self, variable: str) -> list[str]:
+        """Servers that reference `variable` directly."""
+        return sorted(sid for sid, server in self.servers.items() if variable in server.names)
+
+    def expand(self, server_id: str, resolver: VariableResolver) -> tuple[dict, frozenset[str]]:
+        """Expanded definition plus the variables that could not be resolved."""
+        server = self.servers[server_id]
+        key = tuple(resolver.get(name) for name in sorted(server.names))
+        if server.expanded is None or server.cache_key != key:
+            missing: set[str] = set()
+            server.expanded = render_value(server.template, resolver, missing)
+            server.missing = frozenset(missing)
+            server.cache_key = key
+            self.rebuilt.add(server_id)
+        return server.expanded, server.missing
+
+
+def _load_json(path: Path) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except json.JSONDecodeError as e:
+        raise SyncError(f"{path} is not valid JSON: {e}") from e
+
+
 def load_servers_config() -> dict:
     """Load the master servers.json file."""
     servers_file = CONFIGS_ROOT / "mcp" / "servers.json"
     if not servers_file.exists():
-        print(f"Error: {servers_file} not found", file=sys.stderr)
-        sys.exit(1)
-
-    with open(servers_file) as f:
-        return json.load(f)
+        raise SyncError(f"{servers_file} not found")
+    return _load_json(servers_file)
 
 
 def load_tool_config(tool_name: str) -> dict | None:
@@ -75,19 +276,20 @@ def load_tool_config(tool_name: str) -> dict | None:
     tool_file = CONFIGS_ROOT / "mcp" / "tools" / f"{tool_name}.json"
     if not tool_file.exists():
         return None
-
-    with open(tool_file) as f:
-        return json.load(f)
+    return _load_json(tool_file)
 
 
-def generate_mcp_config(tool_name: str, servers_config: dict, tool_config: dict) -> dict:
-    """Generate the MCP config for a specific tool."""
-    # Build variable map
-    variables = {
-        "PROJECTS_ROOT": str(PROJECTS_ROOT),
-        "TOOLS_ROOT": str(TOOLS_ROOT),
-    }
+def generate_mcp_config(
+    tool_name: str,
+    catalog: ServerCatalog,
+    tool_config: dict,
+    resolver: VariableResolver,
+    unresolved: dict[str, set[str]],
+) -> dict:
+    """Generate the MCP config for a specific tool.
 
+    Unresolved variables are collected into `unresolved` (variable -> servers).
+    """
     # Get enabled servers
     enabled = tool_config.get("enabled", [])
     name_mapping = tool_config.get("nameMapping", {})
@@ -96,25 +298,27 @@ def generate_mcp_config(tool_name: str, servers_config: dict, tool_config: dict)
     mcp_servers = {}
 
     for server_id in enabled:
-        if server_id not in servers_config.get("servers", {}):
+        if server_id not in catalog.servers:
             print(f"Warning: Server '{server_id}' not found in servers.json", file=sys.stderr)
             continue
 
-        server_def = servers_config["servers"][server_id].copy()
+        # The cached expansion is shared between tools; merge into a new dict
+        server_def, missing = catalog.expand(server_id, resolver)
+        server_def = dict(server_def)
 
-        # Remove description (not needed in output)
-        server_def.pop("description", None)
-
-        # Apply tool-specific overrides
+        # Apply tool-specific overrides (expanded the same way)
         if server_id in overrides:
-            for key, value in overrides[server_id].items():
+            override_missing: set[str] = set()
+            expanded = render_value(compile_value(overrides[server_id]), resolver, override_missing)
+            missing = missing | override_missing
+            for key, value in expanded.items():
                 if key == "env" and "env" in server_def:
-                    server_def["env"].update(value)
+                    server_def["env"] = {**server_def["env"], **value}
                 else:
                     server_def[key] = value
 
-        # Expand variables
-        server_def = expand_variables(server_def, variables)
+        for name in missing:
+            unresolved.setdefault(name, set()).add(server_id)
 
         # Apply name mapping
         output_name = name_mapping.get(server_id, server_id)
@@ -123,52 +327,185 @@ def generate_mcp_config(tool_name: str, servers_config: dict, tool_config: dict)
     return {"mcpServers": mcp_servers}
 
 
-def sync_tool(tool_name: str, dry_run: bool = False) -> bool:
-    """Sync MCP config for a specific tool."""
-    print(f"\n{'[DRY RUN] ' if dry_run else ''}Syncing {tool_name}...")
+def format_unresolved(unresolved: dict[str, set[str]]) -> str:
+    lines = [f"  ${{{name}}} (used by {', '.join(sorted(servers))})" for name, servers in sorted(unresolved.items())]
+    return "Unresolved variables (define them in servers.json \"variables\" or the environment):\n" + "\n".join(lines)
 
-    servers_config = load_servers_config()
-    tool_config = load_tool_config(tool_name)
 
-    if not tool_config:
-        print(f"  No config found for {tool_name}, skipping")
-        return True
+def build_targets(tool_names: list[str], catalog: ServerCatalog) -> list[Target]:
+    """Generate every requested tool's config from one compiled servers.json.
 
-    output_path = TOOL_OUTPUTS.get(tool_name)
-    if not output_path:
-        print(f"  Unknown output path for {tool_name}", file=sys.stderr)
+    Raises SyncError listing every unresolved variable at once.
+    """
+    resolver = catalog.resolver()
+    unresolved: dict[str, set[str]] = {}
+    targets = []
+    for tool_name in tool_names:
+        tool_config = load_tool_config(tool_name)
+        if not tool_config:
+            print(f"  {tool_name}: no config found, skipping")
+            continue
+        mcp_config = generate_mcp_config(tool_name, catalog, tool_config, resolver, unresolved)
+        targets.append(Target(
+            tool=tool_name,
+            path=TOOL_OUTPUTS[tool_name],
+            content=json.dumps(mcp_config, indent=2) + "\n",
+            servers=list(mcp_config["mcpServers"]),
+        ))
+    for name in resolver.missing:
+        # Chained variables whose own references are missing
+        unresolved.setdefault(name, set()).add("variables")
+    if unresolved:
+        raise SyncError(format_unresolved(unresolved))
+    return targets
+
+
+def manifest_path() -> Path:
+    return CONFIGS_ROOT / "mcp" / MANIFEST_NAME
+
+
+def load_manifest() -> dict[str, dict]:
+    """Output path -> {sha256, size, mtime_ns} of the last content we wrote."""
+    try:
+        with open(manifest_path()) as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("targets", {})
+
+
+def save_manifest(entries: dict[str, dict]) -> None:
+    write_atomic(manifest_path(), json.dumps({"version": MANIFEST_VERSION, "targets": entries}, indent=2) + "\n")
+
+
+def _stat_entry(path: Path, digest: str) -> dict:
+    stat = path.stat()
+    return {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def is_up_to_date(target: Target, manifest: dict[str, dict]) -> bool:
+    """Compare hashes via the manifest; only read the file if it changed behind our back."""
+    entry = manifest.get(str(target.path))
+    try:
+        stat = target.path.stat()
+    except FileNotFoundError:
         return False
-
-    # Generate config
-    mcp_config = generate_mcp_config(tool_name, servers_config, tool_config)
-
-    # Format output
-    output_json = json.dumps(mcp_config, indent=2)
+    if entry and entry.get("sha256") == target.digest:
+        if entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return True
+    # No manifest entry (first run) or the file was touched externally
+    if stat.st_size != len(target.content.encode()):
+        return False
+    return target.path.read_text() == target.content
+
+
+def write_atomic(path: Path, content: str) -> None:
+    """Write via a temp file in the same directory and os.replace()."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(mode="w", dir=path.parent, prefix=f".{path.name}.", delete=False) as tf:
+        tf.write(content)
+        temp_name = tf.name
+    try:
+        # NamedTemporaryFile creates 0600; keep the target's existing mode
+        os.chmod(temp_name, path.stat().st_mode & 0o777 if path.exists() else 0o644)
+        os.replace(temp_name, path)
+    except OSError:
+        print(f"  Could not replace {path}; temp file left at {temp_name}", file=sys.stderr)
+        raise
+
+
+def sync_tools(tool_names: list[str], dry_run: bool = False, catalog: ServerCatalog | None = None) -> bool:
+    """Sync MCP configs for several tools from a single servers.json load.
+
+    Pass the same `catalog` across calls (as --watch does) to reuse compiled
+    templates and unchanged server expansions.
+    """
+    print(f"\n{'[DRY RUN] ' if dry_run else ''}Syncing {', '.join(tool_names)}...")
+
+    catalog = catalog or ServerCatalog()
+    catalog.load(load_servers_config())
+    targets = build_targets(tool_names, catalog)
+    if catalog.rebuilt:
+        print(f"  Expanded {len(catalog.rebuilt)}/{len(catalog.servers)} servers: {', '.join(sorted(catalog.rebuilt))}")
 
     if dry_run:
-        print(f"  Would write to: {output_path}")
-        print(f"  Content preview:\n{output_json[:500]}...")
+        for target in targets:
+            print(f"  {target.tool}: would write to {target.path}")
+            print(f"  Content preview:\n{target.content[:500]}...")
         return True
 
-    # Ensure parent directory exists
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest()
+    previous = dict(manifest)
+    changed = []
+    for target in targets:
+        if is_up_to_date(target, manifest):
+            print(f"  {target.path} is already up to date")
+            manifest[str(target.path)] = _stat_entry(target.path, target.digest)
+        else:
+            changed.append(target)
 
-    # Check if content changed
-    if output_path.exists():
-        with open(output_path) as f:
-            existing = f.read()
-        if existing == output_json + "\n":
-            print(f"  {output_path} is already up to date")
-            return True
+    success = True
+    if changed:
+        with ThreadPoolExecutor(max_workers=len(changed)) as pool:
+            futures = {pool.submit(write_atomic, t.path, t.content): t for t in changed}
+        for future, target in futures.items():
+            try:
+                future.result()
+            except OSError as e:
+                print(f"  Failed to write {target.path}: {e}", file=sys.stderr)
+                success = False
+                continue
+            manifest[str(target.path)] = _stat_entry(target.path, target.digest)
+            print(f"  Wrote: {target.path}")
+            print(f"  Servers: {', '.join(target.servers)}")
+
+    if manifest != previous:
+        try:
+            save_manifest(manifest)
+        except OSError as e:
+            print(f"  Could not save {manifest_path()}: {e}", file=sys.stderr)
+    return success
+
+
+def sync_tool(tool_name: str, dry_run: bool = False) -> bool:
+    """Sync MCP config for a specific tool."""
+    return sync_tools([tool_name], dry_run=dry_run)
 
-    # Write output
-    with open(output_path, "w") as f:
-        f.write(output_json)
-        f.write("\n")
 
-    print(f"  Wrote: {output_path}")
-    print(f"  Servers: {', '.join(mcp_config['mcpServers'].keys())}")
-    return True
+def source_state() -> dict[Path, tuple[int, int]]:
+    """(mtime_ns, size) of servers.json and every tools/*.json."""
+    mcp_dir = CONFIGS_ROOT / "mcp"
+    state = {}
+    for path in [mcp_dir / "servers.json", *sorted((mcp_dir / "tools").glob("*.json"))]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        state[path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+
+def watch(tool_names: list[str], interval: float = WATCH_INTERVAL, catalog: ServerCatalog | None = None) -> None:
+    """Re-sync whenever a source file changes; runs until interrupted."""
+    print(f"Watching {CONFIGS_ROOT / 'mcp'} (Ctrl-C to stop)")
+    state = source_state()
+    catalog = catalog or ServerCatalog()
+    try:
+        while True:
+            time.sleep(interval)
+            current = source_state()
+            if current == state:
+                continue
+            state = current
+            try:
+                sync_tools(tool_names, catalog=catalog)
+            except (SyncError, OSError) as e:
+                # Half-saved edits are common while watching; wait for the next change
+                print(f"  Sync failed: {e}", file=sys.stderr)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
 
 
 def main():
@@ -176,6 +513,7 @@ def main():
     parser.add_argument("tools", nargs="*", help="Specific tools to sync (default: all)")
     parser.add_argument("--dry-run", action="store_true", help="Preview changes without writing")
     parser.add_argument("--list", action="store_true", help="List available tools")
+    parser.add_argument("--watch", action="store_true", help="Re-sync whenever _configs/mcp changes")
 
     args = parser.parse_args()
 
@@ -194,14 +532,25 @@ def main():
     print(f"Source: {CONFIGS_ROOT / 'mcp'}")
     print(f"Tools: {', '.join(tools_to_sync)}")
 
-    success = True
-    for tool in tools_to_sync:
-        if tool not in TOOL_OUTPUTS:
-            print(f"\nUnknown tool: {tool}", file=sys.stderr)
-            success = False
-            continue
-        if not sync_tool(tool, dry_run=args.dry_run):
+    unknown = [tool for tool in tools_to_sync if tool not in TOOL_OUTPUTS]
+    for tool in unknown:
+        print(f"\nUnknown tool: {tool}", file=sys.stderr)
+    known = [tool for tool in tools_to_sync if tool in TOOL_OUTPUTS]
+
+    success = not unknown
+    catalog = ServerCatalog()
+    try:
+        if known and not sync_tools(known, dry_run=args.dry_run, catalog=catalog):
             success = False
+    except SyncError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        if not args.watch:
+            sys.exit(1)
+        # Watching is how a broken source gets fixed; wait for the next change
+
+    if args.watch and known:
+        watch(known, catalog=catalog)
+        return
 
     print()
     if success:
@@ -0,0 +1,93 @@
+"""
+Benchmark: peak memory of one review round, shared vs. joined prompts.
+
+Runs a real `run_review` round against a 500KB document with N reviewers
+whose provider JSON-encodes the request body the way the SDKs do, then
+holds it for a moment like an in-flight request.
+
+- joined: the provider only implements complete(), so every reviewer gets
+  its own concatenated prompt (the previous behaviour).
+- shared: the provider implements complete_parts(), so every reviewer's
+  request references the one document string.
+
+Each mode runs in a fresh process so peak RSS is not shared. The traced
+peak (tracemalloc) is the per-round figure; process RSS also counts the
+interpreter and imports. Run from the repo root:
+
+    python benchmarks/bench_review_memory.py [reviewers]
+"""
+
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scaffold import review  # noqa: E402
+from scaffold.providers import Provider, text_blocks  # noqa: E402
+from scaffold.review import MAX_FILE_SIZE, ReviewConfig, create_orchestrator  # noqa: E402
+
+
+class JoinedProvider(Provider):
+    async def complete(self, model: str, prompt: str) -> dict:
+        body = json.dumps({"model": model, "messages": [{"role": "user", "content": prompt}]}).encode()
+        await asyncio.sleep(0.2)
+        return {"content": "ok", "cost": 0.0, "tokens": len(body)}
+
+
+class SharedProvider(JoinedProvider):
+    async def complete_parts(self, model: str, parts: tuple) -> dict:
+        body = json.dumps({"model": model, "messages": [{"role": "user", "content": text_blocks(parts)}]}).encode()
+        await asyncio.sleep(0.2)
+        return {"content": "ok", "cost": 0.0, "tokens": len(body)}
+
+
+def run_round(mode: str, reviewers: int) -> None:
+    review.console.quiet = True
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        doc = tmp_path / "PRD.md"
+        doc.write_text(("Requirement line for the review benchmark.\n" * MAX_FILE_SIZE)[:MAX_FILE_SIZE - 1])
+        prompt = tmp_path / "prompt.md"
+        prompt.write_text("Review this document.\n" * 50)
+
+        orchestrator = create_orchestrator()
+        provider = SharedProvider if mode == "shared" else JoinedProvider
+        provider.concurrency = reviewers
+        orchestrator.providers.register("bench", provider)
+        configs = [ReviewConfig(name=f"Reviewer {i}", api="bench", model="m", prompt_path=prompt)
+                   for i in range(reviewers)]
+
+        tracemalloc.start()
+        asyncio.run(orchestrator.run_review(doc, configs, 1, tmp_path / "reviews"))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"peak_traced": peak, "peak_rss_kb": rss}))
+
+
+def main() -> None:
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        run_round(sys.argv[2], int(sys.argv[3]))
+        return
+
+    reviewers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    print(f"{reviewers} reviewers x {MAX_FILE_SIZE // 1024}KB document")
+    baseline = None
+    for mode in ("joined", "shared"):
+        out = subprocess.run([sys.executable, __file__, "--child", mode, str(reviewers)],
+                             capture_output=True, text=True, check=True).stdout
+        stats = json.loads(out.strip().splitlines()[-1])
+        peak_mb = stats["peak_traced"] / 1e6
+        baseline = baseline or peak_mb
+        print(f"{mode:>7}: traced peak {peak_mb:6.2f} MB ({peak_mb / baseline:4.2f}x)  "
+              f"process peak RSS {stats['peak_rss_kb'] / 1024:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
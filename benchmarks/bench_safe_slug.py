@@ -0,0 +1,61 @@
+"""
+Microbenchmark: safe_slugs vs. the previous per-call safe_slug.
+
+The previous version compiled nothing up front and resolved base_path and
+base_path / slug on every call. safe_slugs resolves base_path once per
+batch but still resolves every base_path / slug: an earlier lexical
+containment check (no per-slug resolve) was dropped because it stopped
+following symlinks already at the target, so the per-slug resolve()
+dominates both versions. Measured at 5000 slugs: safe_slugs ~1.6x
+(69.6 -> 44.2 us/slug), safe_slug ~1.1x. Run from the repo root:
+
+    python benchmarks/bench_safe_slug.py [count]
+"""
+
+import re
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scaffold.utils import safe_slug, safe_slugs  # noqa: E402
+
+
+def previous_safe_slug(text: str, base_path: Path | None = None) -> str:
+    slug = text.lower()
+    slug = re.sub(r'[^a-z0-9]+', '_', slug)
+    slug = slug.strip('_')
+    if ".." in slug or slug.startswith("/") or slug.startswith("~"):
+        slug = slug.replace("..", "").replace("/", "").replace("~", "")
+    if base_path:
+        base_path = base_path.resolve()
+        target_path = (base_path / slug).resolve()
+        if not target_path.is_relative_to(base_path):
+            raise ValueError("Security Alert: Path Traversal detected.")
+    return slug[:255]
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    names = [f"Reviewer {i} / ../Model-{i % 7}.v2" for i in range(count)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        assert safe_slugs(names, base) == [previous_safe_slug(n, base) for n in names]
+
+        timings = {
+            "previous safe_slug": lambda: [previous_safe_slug(n, base) for n in names],
+            "safe_slug": lambda: [safe_slug(n, base) for n in names],
+            "safe_slugs": lambda: safe_slugs(names, base),
+        }
+        baseline = None
+        for label, fn in timings.items():
+            best = min(timeit.repeat(fn, number=1, repeat=5))
+            baseline = baseline or best
+            print(f"{label:>20}: {best * 1e6 / count:7.2f} us/slug  ({baseline / best:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,650 @@
-import os
+"""
+Discord Alerts
+
+Alerts are first appended to a local outbox (JSONL, append-only) with a
+dedup key and TTL, then delivered by a background drain loop, so callers
+never block on the network and alerts survive network blips and restarts.
+Alerts due together within a short window are coalesced into a single embed
+message, all messages go over one keep-alive connection, Discord's
+rate-limit headers are honored, and failed deliveries back off.
+
+Uses the DISCORD_WEBHOOK_URL environment variable; alerting is a no-op when
+it is not set.
+"""
+
+import asyncio
+import atexit
+import fcntl
+import http.client
+import itertools
 import json
-import urllib.request
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Iterator
+from urllib.parse import urlsplit
+
+from .utils import save_atomic
+
+logger = logging.getLogger(__name__)
+
+USERNAME = "Scaffolding Watchdog"
+AVATAR_URL = "https://raw.githubusercontent.com/eriksjaastad/project-scaffolding/main/docs/assets/watchdog.png"
+USER_AGENT = "Mozilla/5.0"
+
+# Alerts arriving within this many seconds of the first are sent together
+COALESCE_WINDOW = 2.0
+# Most alerts folded into one embed (the description limit applies too)
+MAX_BATCH = 25
+# Discord's embed description limit
+MAX_DESCRIPTION = 4096
+MAX_ATTEMPTS = 5
+REQUEST_TIMEOUT = 5.0
+
+# Undelivered alerts older than this are dropped rather than sent late
+DEFAULT_TTL = 3600.0
+# Drain-loop backoff after a failed delivery: base * 2**(attempts - 1), capped
+RETRY_BASE = 5.0
+RETRY_MAX = 300.0
+# Rewrite the outbox once this many lines describe finished alerts
+COMPACT_AFTER = 1000
+# How often a process sharing the outbox file looks for other processes' changes
+SHARED_POLL = 1.0
+DEFAULT_OUTBOX_PATH = (
+    Path(os.getenv("XDG_STATE_HOME", Path.home() / ".local" / "state")) / "scaffold" / "alerts-outbox.jsonl"
+)
+
+LEVEL_COLORS = {"info": 0x3498DB, "warning": 0xF1C40F, "error": 0xE74C3C}
+_LEVEL_ORDER = list(LEVEL_COLORS)
+
+
+@dataclass
+class Alert:
+    """An outbox entry awaiting delivery"""
+    message: str
+    level: str = "info"
+    created: float = field(default_factory=time.time)
+    id: str = ""
+    key: str = ""
+    expires: float = 0.0
+    attempts: int = 0
+    next_at: float = 0.0
+    error: str = ""
+
+
+def build_payload(alerts: list[Alert]) -> dict:
+    """Fold a burst of alerts into one webhook message with a single embed."""
+    if len(alerts) == 1:
+        title = None
+        description = alerts[0].message
+    else:
+        title = f"{len(alerts)} alerts"
+        description = "\n".join(f"• {a.message}" for a in alerts)
+    if len(description) > MAX_DESCRIPTION:
+        description = description[:MAX_DESCRIPTION - 1] + "…"
+
+    worst = max((a.level for a in alerts), key=lambda lvl: _LEVEL_ORDER.index(lvl) if lvl in LEVEL_COLORS else 0)
+    embed = {
+        "description": description,
+        "color": LEVEL_COLORS.get(worst, LEVEL_COLORS["info"]),
+        "timestamp": datetime.fromtimestamp(alerts[0].created, timezone.utc).isoformat(),
+    }
+    if title:
+        embed["title"] = title
+    return {"username": USERNAME, "avatar_url": AVATAR_URL, "embeds": [embed]}
+
+
+class WebhookClient:
+    """One keep-alive connection to a webhook that waits out rate limits"""
+
+    def __init__(self, url: str, timeout: float = REQUEST_TIMEOUT) -> None:
+        parts = urlsplit(url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname or ""
+        self.port = parts.port
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.timeout = timeout
+        self.connections_opened = 0
+        self.last_error = ""
+        self._conn: http.client.HTTPConnection | None = None
+        self._blocked_until = 0.0
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            self._conn = cls(self.host, self.port, timeout=self.timeout)
+            self.connections_opened += 1
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _note_rate_limit(self, response: http.client.HTTPResponse, body: bytes) -> None:
+        """Track Discord's bucket headers so the next request waits if needed."""
+        now = time.monotonic()
+        if response.status == 429:
+            retry_after = response.getheader("Retry-After")
+            try:
+                retry_after = json.loads(body).get("retry_after", retry_after)
+            except (ValueError, AttributeError):
+                pass
+            self._blocked_until = now + float(retry_after or 1.0)
+        elif response.getheader("X-RateLimit-Remaining") == "0":
+            self._blocked_until = now + float(response.getheader("X-RateLimit-Reset-After") or 1.0)
+
+    def post(self, payload: dict) -> bool:
+        """POST JSON, retrying rate limits, server errors and dropped connections."""
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json", "User-Agent": USER_AGENT}
+        for attempt in range(MAX_ATTEMPTS):
+            wait = self._blocked_until - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                conn = self._connection()
+                conn.request("POST", self.path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                # A stale keep-alive connection fails once; reconnect straight away
+                self.close()
+                self.last_error = str(e)
+                logger.warning(f"Discord webhook request failed: {e}")
+                if attempt:
+                    time.sleep(min(2 ** attempt, 30))
+                continue
+
+            self._note_rate_limit(response, data)
+            if response.will_close:
+                self.close()
+            if response.status in (200, 204):
+                self.last_error = ""
+                return True
+            self.last_error = f"HTTP {response.status}"
+            if response.status == 429:
+                continue
+            if response.status >= 500:
+                time.sleep(min(2 ** attempt, 30))
+                continue
+            logger.warning(f"Discord webhook returned status {response.status}")
+            return False
+        return False
+
+
+class Outbox:
+    """Append-only JSONL log of alerts; pending state is rebuilt by replay.
+
+    Each line is an `add`, `retry` or `done` record. Enqueueing is a dict
+    lookup plus one buffered line write (no fsync), cheap enough for hot
+    paths. An alert whose dedup key is already pending is not added again.
+
+    A file-backed outbox may be shared by several processes (campaign
+    workers, hooks, the CLI). Every read and write holds an flock on
+    `<outbox>.lock`. Before acting, each process first applies the lines other
+    processes appended. Only the process holding `<outbox>.drain` delivers and
+    compacts, so each alert is sent once.
+    """
+
+    def __init__(self, path: Path | None = None, ttl: float = DEFAULT_TTL) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.pending: dict[str, Alert] = {}
+        self._by_key: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._file: IO[bytes] | None = None
+        self._lock_fd: int | None = None
+        self._drain_fd: int | None = None
+        # How far into which file (st_dev, st_ino) this process has replayed
+        self._inode: tuple[int, int] | None = None
+        self._offset = 0
+        self._torn_tail = False
+        self._finished_lines = 0
+        self._ids = itertools.count()
+        self._id_prefix = f"{time.time_ns():x}-{os.getpid():x}"
+        if path is not None:
+            with self._locked():
+                self._refresh()
+
+    @property
+    def shared(self) -> bool:
+        return self.path is not None
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """The thread lock, plus the cross-process flock for a file-backed outbox"""
+        with self._lock:
+            if self.path is None:
+                yield
+                return
+            if self._lock_fd is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._lock_fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        """Apply lines appended since the last look, by any process (lock held)"""
+        assert self.path is not None
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return
+        if (stat.st_dev, stat.st_ino) != self._inode or stat.st_size < self._offset:
+            # First look, or the draining process compacted the file: start over
+            self.pending.clear()
+            self._by_key.clear()
+            self._finished_lines = 0
+            self._offset = 0
+            self._inode = (stat.st_dev, stat.st_ino)
+        if stat.st_size == self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        complete = data.rfind(b"\n") + 1
+        # Writers hold the lock, so an unterminated tail is a torn write from a crash
+        self._torn_tail = complete < len(data)
+        self._offset += len(data)
+        for line in data[:complete].decode("utf-8", errors="replace").splitlines():
+            self._apply(line)
+
+    def _apply(self, line: str) -> None:
+        try:
+            record = json.loads(line)
+            op = record.pop("op")
+        except (ValueError, KeyError, AttributeError):
+            # A torn line from a crash mid-write
+            return
+        if op == "add":
+            alert = Alert(**record)
+            self.pending[alert.id] = alert
+            self._by_key[alert.key] = alert.id
+        elif op == "retry" and record.get("id") in self.pending:
+            alert = self.pending[record["id"]]
+            alert.attempts = record.get("attempts", alert.attempts + 1)
+            alert.next_at = record.get("next_at", 0.0)
+            alert.error = record.get("error", "")
+            self._finished_lines += 1
+        elif op == "done":
+            alert = self.pending.pop(record.get("id"), None)
+            if alert is not None and self._by_key.get(alert.key) == alert.id:
+                del self._by_key[alert.key]
+            self._finished_lines += 2
+
+    def _append(self, record: dict) -> None:
+        """Write one record (lock held, after _refresh) and mark it as already applied"""
+        if self.path is None:
+            return
+        if self._file is not None:
+            stat = os.fstat(self._file.fileno())
+            if (stat.st_dev, stat.st_ino) != self._inode:
+                # Compacted by the draining process since we opened it
+                self._file.close()
+                self._file = None
+        if self._file is None:
+            self._file = open(self.path, "ab")
+            stat = os.fstat(self._file.fileno())
+            if (stat.st_dev, stat.st_ino) != self._inode:
+                self._inode, self._offset = (stat.st_dev, stat.st_ino), stat.st_size
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        if self._torn_tail:
+            line = "\n" + line
+            self._torn_tail = False
+        self._file.write(line.encode("utf-8"))
+        self._file.flush()
+        self._offset = self._file.tell()
+
+    def refresh(self) -> None:
+        """Pick up alerts added or finished by other processes"""
+        if self.path is not None:
+            with self._locked():
+                self._refresh()
+
+    def claim_drain(self) -> bool:
+        """Become the one process that delivers from this outbox (non-blocking).
+
+        In-memory outboxes are always drained by their owner.
+        """
+        if self.path is None or self._drain_fd is not None:
+            return True
+        fd = os.open(f"{self.path}.drain", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._drain_fd = fd
+        return True
+
+    def add(self, message: str, level: str = "info", key: str | None = None, ttl: float | None = None) -> tuple[Alert, bool]:
+        """Record an alert; returns (alert, False) if one with the same key is already pending."""
+        key = key or f"{level}:{message}"
+        now = time.time()
+        with self._locked():
+            if self.path is not None:
+                self._refresh()
+            existing = self.pending.get(self._by_key.get(key, ""))
+            if existing is not None and existing.expires > now:
+                return existing, False
+            alert = Alert(
+                message=message,
+                level=level,
+                created=now,
+                id=f"{self._id_prefix}-{next(self._ids):x}",
+                key=key,
+                expires=now + (self.ttl if ttl is None else ttl),
+            )
+            self._append({"op": "add", **asdict(alert)})
+            self.pending[alert.id] = alert
+            self._by_key[key] = alert.id
+        return alert, True
+
+    def due(self, limit: int = MAX_BATCH, ignore_backoff: bool = False) -> list[Alert]:
+        """Oldest live alerts whose backoff has elapsed."""
+        now = time.time()
+        with self._locked():
+            if self.path is not None:
+                self._refresh()
+            ready = [a for a in self.pending.values() if a.expires > now and (ignore_backoff or a.next_at <= now)]
+        return sorted(ready, key=lambda a: a.created)[:limit]
+
+    def seconds_until_due(self) -> float | None:
+        """None if nothing is pending, else how long until the next alert may be sent."""
+        with self._locked():
+            if self.path is not None:
+                self._refresh()
+            if not self.pending:
+                return None
+            next_at = min(min(a.next_at, a.expires) for a in self.pending.values())
+        return max(0.0, next_at - time.time())
+
+    def expire(self) -> list[Alert]:
+        """Drop (and return) alerts past their TTL."""
+        now = time.time()
+        with self._locked():
+            if self.path is not None:
+                self._refresh()
+            expired = [a for a in self.pending.values() if a.expires <= now]
+        self.mark_done([a.id for a in expired], reason="expired")
+        return expired
+
+    def mark_done(self, ids: list[str], reason: str = "delivered") -> None:
+        with self._locked():
+            if self.path is not None:
+                self._refresh()
+            for alert_id in ids:
+                alert = self.pending.pop(alert_id, None)
+                if alert is None:
+                    continue
+                if self._by_key.get(alert.key) == alert_id:
+                    del self._by_key[alert.key]
+                self._append({"op": "done", "id": alert_id, "reason": reason})
+                self._finished_lines += 2
+        self._maybe_compact()
+
+    def mark_failed(self, ids: list[str], error: str) -> None:
+        now = time.time()
+        with self._locked():
+            if self.path is not None:
+                self._refresh()
+            for alert_id in ids:
+                alert = self.pending.get(alert_id)
+                if alert is None:
+                    continue
+                alert.attempts += 1
+                alert.next_at = now + min(RETRY_BASE * 2 ** (alert.attempts - 1), RETRY_MAX)
+                alert.error = error
+                self._append({
+                    "op": "retry", "id": alert_id, "attempts": alert.attempts,
+                    "next_at": alert.next_at, "error": error,
+                })
+                self._finished_lines += 1
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        """Rewrite the log with only pending alerts once finished records dominate.
+
+        Only the draining process compacts. Writers hold the lock and reopen
+        the file when its inode changes, so nothing is appended to the old one.
+        """
+        if self.path is None or self._finished_lines < COMPACT_AFTER or not self.claim_drain():
+            return
+        with self._locked():
+            self._refresh()
+            content = "".join(
+                json.dumps({"op": "add", **asdict(a)}, separators=(",", ":")) + "\n"
+                for a in sorted(self.pending.values(), key=lambda a: a.created)
+            )
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            save_atomic(self.path, content)
+            stat = self.path.stat()
+            self._inode, self._offset = (stat.st_dev, stat.st_ino), stat.st_size
+            self._torn_tail = False
+            self._finished_lines = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            for fd in (self._drain_fd, self._lock_fd):
+                if fd is not None:
+                    os.close(fd)  # also releases its flock
+            self._drain_fd = self._lock_fd = None
+
+
+class AlertDispatcher:
+    """Background drain loop that delivers outbox alerts in coalesced batches"""
+
+    def __init__(
+        self,
+        webhook_url: str,
+        window: float = COALESCE_WINDOW,
+        client: WebhookClient | None = None,
+        outbox: Outbox | None = None,
+    ) -> None:
+        self.window = window
+        self.client = client or WebhookClient(webhook_url)
+        # In-memory unless a path-backed outbox is passed (get_dispatcher does)
+        self.outbox = outbox or Outbox()
+        self._futures: dict[str, Future] = {}
+        self._expires: dict[str, float] = {}
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stop = False
+        self._flush_requested = False
+        self._flush_generation = 0
+
+    def start(self) -> None:
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop = False
+                self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+                self._thread.start()
+
+    def send(self, message: str, level: str = "info", key: str | None = None) -> Future:
+        """Record an alert in the outbox and return immediately.
+
+        The future resolves to True when delivered, False if it expires first.
+        Duplicates of a pending alert share its future.
+        """
+        alert, _ = self.outbox.add(message, level, key)
+        with self._cond:
+            future = self._futures.setdefault(alert.id, Future())
+            self._expires[alert.id] = alert.expires
+            self._cond.notify_all()
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        return future
+
+    async def asend(self, message: str, level: str = "info", key: str | None = None) -> bool:
+        """Await delivery without blocking the event loop."""
+        return await asyncio.wrap_future(self.send(message, level, key))
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Attempt everything pending now, ignoring the window and backoff.
+
+        Returns False on timeout; alerts that failed again stay in the outbox.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        with self._cond:
+            generation = self._flush_generation
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._flush_generation > generation, timeout)
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        self.flush(timeout)
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.client.close()
+        self.outbox.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stop and not self._flush_requested:
+                    delay = self.outbox.seconds_until_due()
+                    if delay is not None and delay <= 0 and self.outbox.claim_drain():
+                        break
+                    if self.outbox.shared:
+                        # Other processes add alerts too, and the one draining may exit
+                        self._resolve_finished()
+                        delay = SHARED_POLL if delay is None or delay <= 0 else min(delay, SHARED_POLL)
+                    self._cond.wait(delay)
+                if self._stop:
+                    return
+                # Let the rest of a burst arrive before sending
+                if not self._flush_requested and self.window:
+                    self._cond.wait_for(lambda: self._flush_requested or self._stop, self.window)
+                flushing = self._flush_requested
+
+            self.drain_once(ignore_backoff=flushing)
+            if self.outbox.shared:
+                self._resolve_finished()
+
+            if flushing:
+                with self._cond:
+                    self._flush_requested = False
+                    self._flush_generation += 1
+                    self._cond.notify_all()
+
+    def drain_once(self, ignore_backoff: bool = False) -> int:
+        """Deliver due alerts batch by batch until one fails; returns how many were sent.
+
+        Sends nothing while another process is draining a shared outbox.
+        """
+        if not self.outbox.claim_drain():
+            return 0
+        for alert in self.outbox.expire():
+            self._resolve(alert.id, False)
+
+        sent = 0
+        while batch := self.outbox.due(ignore_backoff=ignore_backoff):
+            try:
+                delivered = self.client.post(build_payload(batch))
+            except Exception as e:  # the drain loop must survive anything
+                self.client.last_error = str(e)
+                delivered = False
+            ids = [a.id for a in batch]
+            if not delivered:
+                logger.warning(f"Failed to send Discord alert: {self.client.last_error}")
+                self.outbox.mark_failed(ids, self.client.last_error or "delivery failed")
+                break
+            self.outbox.mark_done(ids)
+            for alert_id in ids:
+                self._resolve(alert_id, True)
+            sent += len(ids)
+        return sent
+
+    def _resolve_finished(self) -> None:
+        """Resolve futures of alerts another process delivered or expired"""
+        now = time.time()
+        with self._cond:
+            finished = [alert_id for alert_id in self._futures if alert_id not in self.outbox.pending]
+        for alert_id in finished:
+            self._resolve(alert_id, self._expires.get(alert_id, 0.0) > now)
+
+    def _resolve(self, alert_id: str, delivered: bool) -> None:
+        with self._cond:
+            future = self._futures.pop(alert_id, None)
+            self._expires.pop(alert_id, None)
+        if future is not None and not future.done():
+            future.set_result(delivered)
+
+
+_default: AlertDispatcher | None = None
+_default_url: str | None = None
+_default_lock = threading.Lock()
+
+
+def get_dispatcher() -> AlertDispatcher | None:
+    """The process-wide dispatcher for DISCORD_WEBHOOK_URL (None if unset)."""
+    global _default, _default_url
+    webhook_url = os.environ.get("DISCORD_WEBHOOK_URL")
+    if not webhook_url:
+        return None
+    with _default_lock:
+        if _default is None or _default_url != webhook_url:
+            if _default is not None:
+                _default.close()
+            _default = AlertDispatcher(webhook_url, outbox=Outbox(DEFAULT_OUTBOX_PATH))
+            _default_url = webhook_url
+            atexit.register(_default.close)
+            # Deliver anything left over from earlier runs
+            if _default.outbox.pending:
+                _default.start()
+        return _default
+
+
+def alert(message: str, level: str = "info", key: str | None = None) -> None:
+    """Record an alert in the outbox without blocking (no-op when no webhook is configured)."""
+    dispatcher = get_dispatcher()
+    if dispatcher is not None:
+        dispatcher.send(message, level, key)
+
+
+async def alert_async(message: str, level: str = "info") -> bool:
+    """Await delivery of an alert without blocking the event loop."""
+    dispatcher = get_dispatcher()
+    if dispatcher is None:
+        return True
+    return await dispatcher.asend(message, level)
+
 
 def send_discord_alert(message: str) -> bool:
     """
-    Send a notification to Discord via webhook.
+    Send a notification to Discord via webhook, waiting for delivery.
     Uses DISCORD_WEBHOOK_URL environment variable.
-    
+
+    Prefer alert() / alert_async(), which don't block the caller.
+
     Returns:
-        bool: True if successful or skipped, False if it failed.
+        bool: True if successful or skipped, False if it failed (the alert
+        stays in the outbox and is retried).
     """
-    webhook_url = os.environ.get("DISCORD_WEBHOOK_URL")
-    
-    if not webhook_url:
+    dispatcher = get_dispatcher()
+    if dispatcher is None:
         # Fail gracefully if not set - we don't want to crash the tool
-        # because a webhook is missing, but we log it to stderr.
+        # because a webhook is missing.
         return True
-
-    # Prepare the payload
-    # We use a simple format, but could be expanded to use embeds
-    payload = {
-        "content": message,
-        "username": "Scaffolding Watchdog",
-        "avatar_url": "https://raw.githubusercontent.com/eriksjaastad/project-scaffolding/main/docs/assets/watchdog.png"
-    }
-    
-    try:
-        data = json.dumps(payload).encode('utf-8')
-        req = urllib.request.Request(
-            webhook_url, 
-            data=data, 
-            headers={'Content-Type': 'application/json', 'User-Agent': 'Mozilla/5.0'}
-        )
-        
-        with urllib.request.urlopen(req, timeout=5) as response:
-            if response.getcode() in [200, 204]:
-                return True
-            else:
-                print(f"Warning: Discord webhook returned status {response.getcode()}")
-                return False
-                
-    except Exception as e:
-        print(f"Warning: Failed to send Discord alert: {e}")
-        return False
+    future = dispatcher.send(message)
+    dispatcher.flush()
+    return future.done() and future.result()
@@ -0,0 +1,255 @@
+"""
+Round Artifact Writer
+
+Publishes a review round's files all at once. Each file is written into a
+hidden staging directory next to the round (same filesystem) from a thread
+pool. The staging directory is fsynced once and then swapped with the round
+directory in a single atomic exchange (renameat2 RENAME_EXCHANGE on Linux,
+renamex_np RENAME_SWAP on macOS). Readers see the previous round or the
+complete new one, never a half-written mix, and a crash leaves one of them.
+
+Where the exchange is unavailable (other platforms, filesystems without
+support) the swap falls back to two renames: the old round is moved aside
+to `.round_N.previous-*`, then the staging directory takes its place. For
+that moment the round directory is missing; a crash in between leaves the
+old round under the `.previous-*` name, and the next commit moves it back.
+
+If the round directory already exists, files this batch doesn't rewrite are
+hard-linked (or copied) into the staging directory so nothing is lost. The
+old round is sent to the trash after the swap, falling back to removal if
+the trash is unavailable, and leftovers of crashed runs are swept on the
+next commit so reruns under --watch don't accumulate hidden directories.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import shutil
+import sys
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from types import TracebackType
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 8
+# Staging directories untouched this long belong to a crashed writer
+STALE_STAGING_SECONDS = 3600
+
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2  # renameat2(2), Linux
+_RENAME_SWAP = 2  # renamex_np(2), macOS
+# errnos meaning "this kernel/filesystem can't exchange", not a real failure
+_NO_EXCHANGE = {errno.ENOSYS, errno.EINVAL, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EXDEV}
+
+
+def _fsync_dir(path: Path) -> None:
+    """Persist a directory's entries (renames, new files); no-op where unsupported."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_file(path: Path, content: str) -> None:
+    with open(path, "w") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+@lru_cache(maxsize=1)
+def _exchange_call() -> Optional[Callable[[bytes, bytes], int]]:
+    """libc's atomic two-path swap, or None where the platform has none."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    except OSError:
+        return None
+    if sys.platform.startswith("linux") and hasattr(libc, "renameat2"):
+        renameat2 = libc.renameat2
+
+        def call(a: bytes, b: bytes) -> int:
+            return renameat2(_AT_FDCWD, a, _AT_FDCWD, b, _RENAME_EXCHANGE)
+        return call
+    if sys.platform == "darwin" and hasattr(libc, "renamex_np"):
+        renamex_np = libc.renamex_np
+
+        def call(a: bytes, b: bytes) -> int:
+            return renamex_np(a, b, _RENAME_SWAP)
+        return call
+    return None
+
+
+def _exchange(a: Path, b: Path) -> bool:
+    """Atomically swap two existing paths. False if unsupported here."""
+    call = _exchange_call()
+    if call is None:
+        return False
+    if call(os.fsencode(a), os.fsencode(b)) == 0:
+        return True
+    err = ctypes.get_errno()
+    if err in _NO_EXCHANGE:
+        return False
+    raise OSError(err, os.strerror(err), str(a), None, str(b))
+
+
+def _discard(path: Path) -> None:
+    """Trash one of our hidden staging/previous directories.
+
+    They are scratch copies of a round, so when the trash is unavailable they
+    are removed outright rather than left to pile up next to the round.
+    """
+    try:
+        from send2trash import send2trash
+        send2trash(str(path))
+        return
+    except Exception as e:
+        logger.warning(f"Failed to trash {path}, removing it: {e}")
+    shutil.rmtree(path, ignore_errors=True)  # audit: allow[unsafe-delete] - rmtree only when the trash fails
+
+
+class RoundWriter:
+    """Collects a round's files and publishes them with one directory rename.
+
+    Usage:
+        with RoundWriter(round_dir) as writer:
+            writer.add("CODE_REVIEW_X.md", content)
+        # published on a clean exit, staging trashed on an exception
+    """
+
+    def __init__(self, round_dir: Path, max_workers: int = DEFAULT_WORKERS) -> None:
+        self.round_dir = round_dir
+        self.max_workers = max_workers
+        self.staging: Optional[Path] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pending: dict[str, Future] = {}
+
+    def add(self, name: str, content: str) -> Path:
+        """Queue one file; returns where it will live once published.
+
+        Raises ValueError for names that aren't a single plain path component.
+        """
+        if not name or name in (".", "..") or os.sep in name or (os.altsep and os.altsep in name):
+            raise ValueError(f"Security Alert: Path Traversal detected in artifact name: {name!r}")
+        if self.staging is None:
+            self.round_dir.parent.mkdir(parents=True, exist_ok=True)
+            self.staging = self.round_dir.parent / f".{self.round_dir.name}.staging-{uuid.uuid4().hex[:8]}"
+            self.staging.mkdir()
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="round-writer")
+        assert self._pool is not None
+        self._pending[name] = self._pool.submit(_write_file, self.staging / name, content)
+        return self.round_dir / name
+
+    def _wait(self) -> None:
+        if self._pool is None:
+            return
+        try:
+            for future in self._pending.values():
+                future.result()
+        finally:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _carry_over(self) -> None:
+        """Keep files from an existing round that this batch doesn't replace."""
+        assert self.staging is not None
+        for entry in os.scandir(self.round_dir):
+            if entry.name in self._pending or not entry.is_file(follow_symlinks=False):
+                continue
+            target = self.staging / entry.name
+            try:
+                os.link(entry.path, target)
+            except OSError:
+                shutil.copy2(entry.path, target)
+
+    def _sweep(self) -> None:
+        """Clean up after crashed runs before publishing.
+
+        A `.previous-*` directory with no round next to it is a round whose
+        two-rename swap was interrupted: move the newest one back. Any other
+        `.previous-*` leftovers, and staging directories nobody has touched
+        for STALE_STAGING_SECONDS, are discarded.
+        """
+        parent, name = self.round_dir.parent, self.round_dir.name
+        if not parent.is_dir():
+            return
+        previous = sorted(parent.glob(f".{name}.previous-*"), key=lambda p: p.stat().st_mtime)
+        if previous and not self.round_dir.exists():
+            orphan = previous.pop()
+            logger.warning(f"Restoring {self.round_dir} from interrupted publish {orphan.name}")
+            os.replace(orphan, self.round_dir)
+        cutoff = time.time() - STALE_STAGING_SECONDS
+        stale = [p for p in parent.glob(f".{name}.staging-*") if p != self.staging and p.stat().st_mtime < cutoff]
+        for path in previous + stale:
+            _discard(path)
+
+    def commit(self) -> Path:
+        """Wait for every write, then swap the staging directory into place."""
+        self._wait()
+        self._sweep()
+        if self.staging is None:
+            self.round_dir.mkdir(parents=True, exist_ok=True)
+            return self.round_dir
+
+        previous = None
+        if self.round_dir.is_dir():
+            self._carry_over()
+            previous = self.round_dir.parent / f".{self.round_dir.name}.previous-{uuid.uuid4().hex[:8]}"
+        _fsync_dir(self.staging)
+
+        if previous is not None and _exchange(self.staging, self.round_dir):
+            # The old round now sits at the staging path
+            os.replace(self.staging, previous)
+        else:
+            if previous is not None:
+                os.replace(self.round_dir, previous)
+            try:
+                os.replace(self.staging, self.round_dir)
+            except OSError:
+                if previous is not None:
+                    os.replace(previous, self.round_dir)
+                raise
+        _fsync_dir(self.round_dir.parent)
+        self.staging = None
+        self._pending.clear()
+
+        if previous is not None:
+            _discard(previous)
+        return self.round_dir
+
+    def abort(self) -> None:
+        """Drop everything queued; the published round is left untouched."""
+        try:
+            self._wait()
+        except Exception:
+            pass
+        if self.staging is not None and self.staging.exists():
+            _discard(self.staging)
+        self.staging = None
+        self._pending.clear()
+
+    def __enter__(self) -> "RoundWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
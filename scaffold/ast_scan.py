@@ -0,0 +1,344 @@
+"""
+AST Safety Scanner
+
+Finds unsafe deletions in Python source by resolving calls against the
+module's imports instead of grepping text, so comments, docstrings and
+pattern definitions never match while aliased imports still do
+(`import shutil as sh` then `sh.rmtree`, or `from os import remove as rm`).
+`from shutil import *` makes a bare `rmtree(...)` resolve the same way.
+Shell calls (os.system, subprocess.*) are flagged when their command runs
+rm with both recursive and force flags. Commands are resolved statically
+through literals, f-strings, `+`, `%` and `.format()` (unknown parts become
+placeholders); when a command can't be resolved at all, the recursive-delete regex
+is applied to the call's source (and to the source bound to a command
+variable), so nothing the regex scan would catch is lost. Credentials are
+flagged when a name ending in api_key/secret/password is bound to a string
+literal.
+
+Findings are cached by file content hash (plus scanner version), so files
+that haven't changed are never re-parsed, across runs and across projects.
+"""
+
+import ast
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .safety import HARDCODED_CREDENTIAL, RM_RF, UNSAFE_DELETE, SafetyFinding
+from .utils import save_atomic
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever detection logic changes so cached findings are recomputed
+SCANNER_VERSION = 2
+# Oldest cache entries are dropped beyond this many file hashes
+MAX_CACHE_ENTRIES = 50000
+DEFAULT_CACHE_PATH = Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "scaffold" / "ast-scan.json"
+
+DELETE_CALLS = frozenset({"shutil.rmtree", "os.remove", "os.unlink"})
+SHELL_CALLS = frozenset({
+    "os.system", "os.popen",
+    "subprocess.run", "subprocess.call", "subprocess.check_call", "subprocess.check_output",
+    "subprocess.Popen", "subprocess.getoutput", "subprocess.getstatusoutput",
+    "asyncio.create_subprocess_exec", "asyncio.create_subprocess_shell",
+})
+# Same names as the HARDCODED_CREDENTIAL regex: the binding must end in one of these
+_CREDENTIAL_NAME = re.compile(r"(?:api_key|secret|password)$", re.IGNORECASE)
+_SHELL_SEPARATORS = re.compile(r"[;&|\n()`]+")
+# printf-style and str.format() fields; their values are unknown statically
+_PERCENT_FIELD = re.compile(r"%(?:\([^)]*\))?[-#0 +]*(?:\d+|\*)?(?:\.(?:\d+|\*))?[a-zA-Z%]")
+_FORMAT_FIELD = re.compile(r"\{[^{}]*\}")
+_RM_RF_TEXT = re.compile(RM_RF.pattern)
+PLACEHOLDER = "ARG"
+
+# Rule ids this scanner decides for .py files (regex results for them are superseded)
+AST_RULE_IDS = frozenset({UNSAFE_DELETE.rule_id, RM_RF.rule_id, HARDCODED_CREDENTIAL.rule_id})
+_MESSAGES = {rule.rule_id: rule.message for rule in (UNSAFE_DELETE, RM_RF, HARDCODED_CREDENTIAL)}
+
+
+def is_recursive_force_rm(tokens: list[str]) -> bool:
+    """True if a command's tokens invoke rm with both recursive and force flags."""
+    for start, token in enumerate(tokens):
+        if token.rsplit("/", 1)[-1] != "rm":
+            continue
+        recursive = force = False
+        for flag in tokens[start + 1:]:
+            if flag == "--":
+                break
+            if flag == "--recursive":
+                recursive = True
+            elif flag == "--force":
+                force = True
+            elif flag.startswith("-") and not flag.startswith("--"):
+                recursive = recursive or "r" in flag or "R" in flag
+                force = force or "f" in flag
+        if recursive and force:
+            return True
+    return False
+
+
+def _command_is_rm_rf(command: str | list[str]) -> bool:
+    if isinstance(command, list):
+        return is_recursive_force_rm(command)
+    return any(is_recursive_force_rm(part.split()) for part in _SHELL_SEPARATORS.split(command))
+
+
+class _Visitor(ast.NodeVisitor):
+    """Single pass over a module collecting import aliases and unsafe calls"""
+
+    def __init__(self, source: str = "") -> None:
+        self.source = source
+        # local name -> fully qualified name ("sh" -> "shutil", "nuke" -> "shutil.rmtree")
+        self.aliases: dict[str, str] = {}
+        # modules pulled in with `from module import *`
+        self.star_modules: list[str] = []
+        # simple `name = <constant command>` bindings, for subprocess.run(cmd)
+        self.constants: dict[str, str | list[str]] = {}
+        # `name = <expression we can't resolve>` bindings, for the regex fallback
+        self.opaque: dict[str, list[ast.expr]] = {}
+        self.hits: list[tuple[str, int]] = []
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            if alias.asname:
+                self.aliases[alias.asname] = alias.name
+            else:
+                root = alias.name.split(".", 1)[0]
+                self.aliases[root] = root
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        if node.module and not node.level:
+            for alias in node.names:
+                if alias.name == "*":
+                    self.star_modules.append(node.module)
+                else:
+                    self.aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        value = self._command(node.value)
+        for target in node.targets:
+            name = _target_name(target)
+            if name is None:
+                continue
+            if isinstance(target, ast.Name):
+                if value is not None:
+                    self.constants[name] = value
+                else:
+                    self.opaque.setdefault(name, []).append(node.value)
+            self._check_credential(name, node.value, node.lineno)
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        name = _target_name(node.target)
+        if name is not None and node.value is not None:
+            self._check_credential(name, node.value, node.lineno)
+        self.generic_visit(node)
+
+    def visit_Dict(self, node: ast.Dict) -> None:
+        for key, value in zip(node.keys, node.values):
+            if isinstance(key, ast.Constant) and isinstance(key.value, str):
+                self._check_credential(key.value, value, key.lineno)
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        name = self.qualified_name(node.func)
+        if name in DELETE_CALLS:
+            self.hits.append((UNSAFE_DELETE.rule_id, node.lineno))
+        elif name in SHELL_CALLS:
+            if name == "asyncio.create_subprocess_exec":
+                command = self._command(ast.List(elts=list(node.args)))
+            elif node.args:
+                command = self._command(node.args[0])
+            else:
+                command = None
+            if command is not None:
+                if _command_is_rm_rf(command):
+                    self.hits.append((RM_RF.rule_id, node.lineno))
+            else:
+                self._check_unresolved(node)
+        for keyword in node.keywords:
+            if keyword.arg:
+                self._check_credential(keyword.arg, keyword.value, keyword.value.lineno)
+        self.generic_visit(node)
+
+    def qualified_name(self, node: ast.expr) -> str | None:
+        """Resolve `sh.rmtree` / `nuke` to `shutil.rmtree` via the import aliases."""
+        parts: list[str] = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            return None
+        if node.id in self.aliases:
+            parts.append(self.aliases[node.id])
+        elif not parts:
+            # A bare name may come from `from module import *`
+            for module in self.star_modules:
+                if f"{module}.{node.id}" in DELETE_CALLS | SHELL_CALLS:
+                    return f"{module}.{node.id}"
+            return None
+        else:
+            return None
+        return ".".join(reversed(parts))
+
+    def _command(self, node: ast.expr) -> str | list[str] | None:
+        """Best-effort static value of a shell command argument."""
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return node.value
+        if isinstance(node, ast.JoinedStr):
+            return "".join(
+                v.value if isinstance(v, ast.Constant) and isinstance(v.value, str) else "ARG"
+                for v in node.values
+            )
+        if isinstance(node, (ast.List, ast.Tuple)):
+            return [
+                e.value if isinstance(e, ast.Constant) and isinstance(e.value, str) else "ARG"
+                for e in node.elts
+            ]
+        if isinstance(node, ast.Name):
+            return self.constants.get(node.id)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            left, right = self._command(node.left), self._command(node.right)
+            if left is None and right is None:
+                return None
+            if isinstance(left, list) or isinstance(right, list):
+                return (left if isinstance(left, list) else [PLACEHOLDER]) + (
+                    right if isinstance(right, list) else [PLACEHOLDER]
+                )
+            return (PLACEHOLDER if left is None else left) + (PLACEHOLDER if right is None else right)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mod):
+            template = self._command(node.left)
+            return _PERCENT_FIELD.sub(PLACEHOLDER, template) if isinstance(template, str) else None
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "format":
+            template = self._command(node.func.value)
+            return _FORMAT_FIELD.sub(PLACEHOLDER, template) if isinstance(template, str) else None
+        return None
+
+    def _check_unresolved(self, node: ast.Call) -> None:
+        """Regex fallback for a shell call whose command can't be resolved statically.
+
+        Looks at the call's own source and at whatever was bound to a command
+        variable it passes, reporting the line the text is on.
+        """
+        sources: list[ast.expr] = [node]
+        if node.args and isinstance(node.args[0], ast.Name):
+            sources.extend(self.opaque.get(node.args[0].id, []))
+        for expr in sources:
+            segment = ast.get_source_segment(self.source, expr)
+            match = _RM_RF_TEXT.search(segment or "")
+            if match:
+                self.hits.append((RM_RF.rule_id, expr.lineno + segment.count("\n", 0, match.start())))
+
+    def _check_credential(self, name: str, value: ast.expr, line: int) -> None:
+        if (
+            _CREDENTIAL_NAME.search(name)
+            and isinstance(value, ast.Constant)
+            and isinstance(value.value, str)
+            and len(value.value) >= 8
+            and not value.value.isupper()  # ENV_VAR_NAME style placeholders
+        ):
+            self.hits.append((HARDCODED_CREDENTIAL.rule_id, line))
+
+
+def _target_name(target: ast.expr) -> str | None:
+    if isinstance(target, ast.Name):
+        return target.id
+    if isinstance(target, ast.Attribute):
+        return target.attr
+    return None
+
+
+def scan_source(source: str) -> list[tuple[str, int]] | None:
+    """(rule_id, line) hits for a module, or None if it doesn't parse."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+    visitor = _Visitor(source)
+    visitor.visit(tree)
+    return sorted(set(visitor.hits), key=lambda hit: (hit[1], hit[0]))
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def to_findings(hits: list[tuple[str, int]], source: str, path: str) -> list[SafetyFinding]:
+    lines = source.splitlines()
+    return [
+        SafetyFinding(
+            rule_id=rule_id,
+            path=path,
+            line=line,
+            text=lines[line - 1].strip()[:200] if 0 < line <= len(lines) else "",
+            message=_MESSAGES[rule_id],
+        )
+        for rule_id, line in hits
+    ]
+
+
+@dataclass
+class AstCache:
+    """Content-hash -> AST hits, persisted as JSON (None = file didn't parse)"""
+    path: Path | None = None
+    entries: dict[str, list[tuple[str, int]] | None] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_CACHE_PATH) -> "AstCache":
+        cache = cls(path=path)
+        try:
+            data = json.loads(path.read_text())
+        except FileNotFoundError:
+            return cache
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Ignoring unreadable AST scan cache {path}: {e}")
+            return cache
+        if data.get("version") == SCANNER_VERSION:
+            cache.entries = {
+                digest: None if hits is None else [(rule_id, line) for rule_id, line in hits]
+                for digest, hits in data.get("entries", {}).items()
+            }
+        return cache
+
+    def update(self, entries: dict[str, list[tuple[str, int]] | None]) -> None:
+        for digest, hits in entries.items():
+            self.entries.pop(digest, None)
+            self.entries[digest] = hits
+        while len(self.entries) > MAX_CACHE_ENTRIES:
+            self.entries.pop(next(iter(self.entries)))
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        try:
+            save_atomic(self.path, json.dumps({"version": SCANNER_VERSION, "entries": self.entries}))
+        except OSError as e:
+            logger.warning(f"Could not save AST scan cache {self.path}: {e}")
+
+
+def scan_file_cached(
+    data: bytes,
+    path: str,
+    cache: dict[str, list[tuple[str, int]] | None],
+    new_entries: dict[str, list[tuple[str, int]] | None],
+) -> list[SafetyFinding] | None:
+    """AST findings for one file's bytes, consulting and filling the hash cache.
+
+    Returns None when the file doesn't parse (callers fall back to regexes).
+    """
+    digest = content_hash(data)
+    source = data.decode("utf-8", errors="replace")
+    if digest in cache:
+        hits = cache[digest]
+    elif digest in new_entries:
+        hits = new_entries[digest]
+    else:
+        hits = scan_source(source)
+        new_entries[digest] = hits
+    if hits is None:
+        return None
+    return to_findings(hits, source, path)
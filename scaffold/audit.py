@@ -0,0 +1,248 @@
+"""
+Repository Safety Audit
+
+Walks one or more trees once, honoring the scan_config.yaml skip rules, and
+checks every file against all safety rule families (deletion patterns, API
+key shapes, silent exception handling) on a pool of worker processes.
+Python files get the AST scanner for deletion rules (precise, alias-aware,
+cached by content hash); the regex rules cover everything else.
+Findings can be rendered as text, JSON or SARIF 2.1.0.
+
+A reviewed line is exempted with an inline comment naming the rules it
+may break, e.g. a test fixture that must contain the pattern it tests:
+
+    literal = "..."  # audit: allow[rm-rf, unsafe-delete]
+"""
+
+import fnmatch
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+from .ast_scan import AST_RULE_IDS, AstCache, scan_file_cached
+from .constants import SKIP_DIRS, SKIP_FILES, SKIP_PATTERNS
+from .safety import RULE_FAMILIES, SafetyFinding, SafetyMatcher, SafetyRule, unsuppressed
+
+logger = logging.getLogger(__name__)
+
+# Files larger than this are almost always generated or vendored
+MAX_FILE_SIZE = 2 * 1024 * 1024
+# Files per worker task; large enough to amortize process IPC
+CHUNK_SIZE = 64
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+
+@dataclass
+class SkipRules:
+    """Directory/file filters from scan_config.yaml plus ad-hoc excludes"""
+    dirs: frozenset[str] = SKIP_DIRS
+    files: frozenset[str] = SKIP_FILES
+    patterns: tuple[str, ...] = SKIP_PATTERNS
+    excludes: tuple[str, ...] = ()
+
+    @classmethod
+    def from_config(cls, config: dict, excludes: tuple[str, ...] = ()) -> "SkipRules":
+        return cls(
+            dirs=frozenset(config.get("skip_dirs", [])),
+            files=frozenset(config.get("skip_files", [])),
+            patterns=tuple(config.get("skip_patterns", [])),
+            excludes=excludes,
+        )
+
+    def skip_file(self, name: str, rel_path: str) -> bool:
+        if name in self.files:
+            return True
+        if any(fnmatch.fnmatch(name, p) for p in self.patterns):
+            return True
+        return any(fnmatch.fnmatch(rel_path, p) for p in self.excludes)
+
+
+@dataclass
+class AuditReport:
+    """All findings from one audit run"""
+    rules: tuple[SafetyRule, ...]
+    findings: list[SafetyFinding] = field(default_factory=list)
+    files_scanned: int = 0
+
+    @property
+    def blocking(self) -> bool:
+        return any(f.blocking for f in self.findings)
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "files_scanned": self.files_scanned,
+            "findings": [asdict(f) for f in self.findings],
+        }, indent=2)
+
+    def to_sarif(self) -> str:
+        levels = {rule.rule_id: rule.level for rule in self.rules}
+        return json.dumps({
+            "$schema": SARIF_SCHEMA,
+            "version": "2.1.0",
+            "runs": [{
+                "tool": {
+                    "driver": {
+                        "name": "scaffold-audit",
+                        "rules": [
+                            {
+                                "id": rule.rule_id,
+                                "shortDescription": {"text": rule.message},
+                                "defaultConfiguration": {"level": rule.level},
+                            }
+                            for rule in self.rules
+                        ],
+                    }
+                },
+                "results": [
+                    {
+                        "ruleId": f.rule_id,
+                        "level": levels.get(f.rule_id, "error") if f.blocking else "warning",
+                        "message": {"text": f.message},
+                        "locations": [{
+                            "physicalLocation": {
+                                "artifactLocation": {"uri": f.path},
+                                "region": {"startLine": f.line, "snippet": {"text": f.text}},
+                            }
+                        }],
+                    }
+                    for f in self.findings
+                ],
+            }],
+        }, indent=2)
+
+
+def rules_for(families: tuple[str, ...] | None = None) -> tuple[SafetyRule, ...]:
+    """Flatten the selected rule families (all by default)."""
+    selected = families or tuple(RULE_FAMILIES)
+    unknown = [f for f in selected if f not in RULE_FAMILIES]
+    if unknown:
+        raise ValueError(f"Unknown rule families: {', '.join(unknown)}")
+    return tuple(rule for family in selected for rule in RULE_FAMILIES[family])
+
+
+def iter_files(root: Path, skip: SkipRules, extensions: tuple[str, ...]) -> Iterator[Path]:
+    """Walk `root` once, pruning skipped directories before descending into them."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in skip.dirs)
+        base = Path(dirpath)
+        for name in sorted(filenames):
+            if not name.endswith(extensions):
+                continue
+            path = base / name
+            if skip.skip_file(name, path.relative_to(root).as_posix()):
+                continue
+            yield path
+
+
+_worker_matcher: SafetyMatcher | None = None
+_worker_ast_rules: frozenset[str] = frozenset()
+_worker_ast_cache: dict[str, list[tuple[str, int]] | None] | None = None
+
+
+def _init_worker(
+    rules: tuple[SafetyRule, ...],
+    ast_cache: dict[str, list[tuple[str, int]] | None] | None = None,
+) -> None:
+    """Compile the regexes once per worker; `ast_cache` (None = AST scanning off) is a read-only snapshot."""
+    global _worker_matcher, _worker_ast_rules, _worker_ast_cache
+    _worker_matcher = SafetyMatcher(rules=rules)
+    _worker_ast_rules = frozenset(rule.rule_id for rule in rules) & AST_RULE_IDS
+    _worker_ast_cache = ast_cache
+
+
+def _scan_chunk(
+    chunk: list[tuple[str, str]],
+) -> tuple[list[SafetyFinding], dict[str, list[tuple[str, int]] | None]]:
+    """Worker entry point: scan (absolute path, display path) pairs.
+
+    Returns the findings plus AST cache entries computed for files not already cached.
+    """
+    assert _worker_matcher is not None
+    findings = []
+    new_entries: dict[str, list[tuple[str, int]] | None] = {}
+    for path, display in chunk:
+        try:
+            if os.path.getsize(path) > MAX_FILE_SIZE:
+                logger.info(f"Skipping oversized file {display}")
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            logger.warning(f"Could not read {display}: {e}")
+            continue
+        text = data.decode("utf-8", errors="replace")
+        file_findings = _worker_matcher.scan_text(text, display)
+
+        if _worker_ast_cache is not None and _worker_ast_rules and path.endswith(".py"):
+            ast_findings = scan_file_cached(data, display, _worker_ast_cache, new_entries)
+            # Files that don't parse keep their regex findings
+            if ast_findings is not None:
+                file_findings = [f for f in file_findings if f.rule_id not in AST_RULE_IDS]
+                file_findings.extend(unsuppressed(
+                    [f for f in ast_findings if f.rule_id in _worker_ast_rules], text
+                ))
+                file_findings.sort(key=lambda f: f.line)
+        findings.extend(file_findings)
+    return findings, new_entries
+
+
+def _display_path(path: Path) -> str:
+    try:
+        return path.relative_to(Path.cwd()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def run_audit(
+    roots: list[Path],
+    skip: SkipRules | None = None,
+    families: tuple[str, ...] | None = None,
+    workers: int | None = None,
+    ast_cache: AstCache | None = None,
+    use_ast: bool = True,
+) -> AuditReport:
+    """Audit every file under `roots` against the selected rule families.
+
+    New AST results are added to `ast_cache` (the caller decides when to save it).
+    """
+    skip = skip or SkipRules()
+    rules = rules_for(families)
+    extensions = tuple(sorted({ext for rule in rules for ext in rule.extensions}))
+    report = AuditReport(rules=rules)
+
+    chunks: list[list[tuple[str, str]]] = [[]]
+    for root in roots:
+        root = root.resolve()
+        for path in iter_files(root, skip, extensions):
+            if len(chunks[-1]) >= CHUNK_SIZE:
+                chunks.append([])
+            chunks[-1].append((str(path), _display_path(path)))
+            report.files_scanned += 1
+
+    cache = (ast_cache or AstCache()) if use_ast else None
+    snapshot = dict(cache.entries) if cache is not None else None
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(chunks) <= 1:
+        _init_worker(rules, snapshot)
+        _collect(report, map(_scan_chunk, chunks), cache)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rules, snapshot)) as pool:
+            _collect(report, pool.map(_scan_chunk, chunks), cache)
+
+    return report
+
+
+def _collect(
+    report: AuditReport,
+    results: Iterator[tuple[list[SafetyFinding], dict[str, list[tuple[str, int]] | None]]],
+    ast_cache: AstCache | None,
+) -> None:
+    for findings, new_entries in results:
+        report.findings.extend(findings)
+        if ast_cache is not None and new_entries:
+            ast_cache.update(new_entries)
@@ -0,0 +1,450 @@
+"""
+Batch Reviews
+
+Non-urgent bulk reviews go through the providers' batch APIs (OpenAI Batch,
+Anthropic Message Batches). That means half price, no per-minute rate
+limits, and results within 24 hours. Every (document x reviewer) job for a
+provider goes out in one submission. Reviewers on other APIs run
+interactively while the batches are processed.
+
+Progress is saved to `<output_dir>/.batch_round_<N>.json` after every step:
+job ids, submitted batch ids and finished results. If the process exits
+while polling, re-running the same command resumes the submitted batches
+instead of paying for them twice. Jobs whose submission failed are reported
+as errors for the round but saved as pending, and the state is kept, so a
+re-run submits just those.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
+
+from rich.console import Console
+
+from .alerts import alert
+from .artifacts import RoundWriter
+from .review import (
+    SYSTEM_PROMPT,
+    ReviewConfig,
+    ReviewResult,
+    ReviewSummary,
+    prompt_variables,
+    queue_round_results,
+    read_document,
+    render_prompt,
+    rules_prompt_for,
+)
+from .prompt_registry import PROMPTS
+from .providers import PromptParts
+from .review_rules import RuleEngine, format_findings_report
+from .utils import safe_slugs, save_atomic
+
+if TYPE_CHECKING:
+    from .review import ReviewOrchestrator
+
+logger = logging.getLogger(__name__)
+console = Console()
+
+BATCH_APIS = ("openai", "anthropic")
+# Well under both providers' per-batch request limits
+MAX_BATCH_REQUESTS = 10_000
+OPENAI_TERMINAL = {"completed", "failed", "expired", "cancelled"}
+STATE_VERSION = 1
+
+
+@dataclass
+class BatchJob:
+    """One (document, reviewer) pair and where it is in its batch"""
+    id: str
+    document: str
+    reviewer: str
+    api: str
+    model: str
+    status: str = "pending"  # pending | submitted | done | error
+    batch_id: Optional[str] = None
+    content: str = ""
+    tokens: int = 0
+    error: Optional[str] = None
+    submitted_at: float = 0.0
+    finished_at: float = 0.0
+    prompt_version: str = ""
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "error")
+
+
+def job_id(round_number: int, document: Path, reviewer: str) -> str:
+    """Stable across runs, and valid as both providers' custom_id"""
+    digest = hashlib.sha256(f"{document.resolve()}\0{reviewer}".encode()).hexdigest()[:24]
+    return f"r{round_number}-{digest}"
+
+
+class BatchReview:
+    """Submits, polls and collects one batch review round"""
+
+    def __init__(
+        self,
+        orchestrator: "ReviewOrchestrator",
+        documents: List[Path],
+        configs: List[ReviewConfig],
+        round_number: int,
+        output_dir: Path,
+        rules: Optional[RuleEngine] = None,
+        poll_interval: float = 60.0
+    ) -> None:
+        self.orchestrator = orchestrator
+        self.documents = documents
+        self.configs = configs
+        self.round_number = round_number
+        self.output_dir = output_dir
+        self.rules = rules
+        self.poll_interval = poll_interval
+        self.state_path = output_dir / f".batch_round_{round_number}.json"
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        # Jobs whose submission failed this run; saved as pending
+        self.unsubmitted: Set[str] = set()
+        self._contents: Dict[Path, str] = {}
+        self._findings: Dict[Path, List[Any]] = {}
+        self._round_dirs = self._plan_round_dirs()
+
+        self.jobs: Dict[str, BatchJob] = {}
+        for document in documents:
+            for config in configs:
+                job = BatchJob(
+                    id=job_id(round_number, document, config.name),
+                    document=str(document),
+                    reviewer=config.name,
+                    api=config.api,
+                    model=config.model,
+                )
+                self.jobs[job.id] = job
+        self._load()
+
+    def _plan_round_dirs(self) -> Dict[Path, Path]:
+        if len(self.documents) == 1:
+            return {self.documents[0]: self.output_dir / f"round_{self.round_number}"}
+        root = Path(os.path.commonpath([d.resolve().parent for d in self.documents]))
+        names = safe_slugs(str(d.resolve().relative_to(root)) for d in self.documents)
+        seen: Dict[str, int] = {}
+        dirs = {}
+        for document, name in zip(self.documents, names):
+            seen[name] = seen.get(name, 0) + 1
+            if seen[name] > 1:
+                name = f"{name}_{seen[name]}"
+            dirs[document] = self.output_dir / (name or "document") / f"round_{self.round_number}"
+        return dirs
+
+    def round_dir(self, document: Path) -> Path:
+        return self._round_dirs[document]
+
+    # --- state -----------------------------------------------------------
+
+    def _load(self) -> None:
+        try:
+            state = json.loads(self.state_path.read_text())
+        except FileNotFoundError:
+            return
+        except json.JSONDecodeError as e:
+            logger.warning(f"Ignoring unreadable batch state {self.state_path}: {e}")
+            return
+        if state.get("version") != STATE_VERSION or state.get("retired"):
+            return
+        resumed = 0
+        for saved in state.get("jobs", []):
+            if saved.get("id") in self.jobs:
+                self.jobs[saved["id"]] = BatchJob(**saved)
+                resumed += 1
+        self.batches = state.get("batches", {})
+        if resumed:
+            console.print(f"[dim]Resuming {resumed} job(s) from {self.state_path}[/dim]")
+
+    def _save(self) -> None:
+        save_atomic(self.state_path, json.dumps({
+            "version": STATE_VERSION,
+            "round": self.round_number,
+            "batches": self.batches,
+            "jobs": [
+                asdict(BatchJob(j.id, j.document, j.reviewer, j.api, j.model) if j.id in self.unsubmitted else j)
+                for j in self.jobs.values()
+            ],
+        }, indent=2))
+
+    # --- prompts ---------------------------------------------------------
+
+    def _prompt(self, job: BatchJob) -> PromptParts:
+        document = Path(job.document)
+        if document not in self._contents:
+            self._contents[document] = read_document(document)
+            self._findings[document] = (
+                self.rules.scan(self._contents[document], document) if self.rules else []
+            )
+        config = next(c for c in self.configs if c.name == job.reviewer)
+        rules_prompt = rules_prompt_for(self.rules, self._findings[document], document, config)
+        template = PROMPTS.template(config.prompt_path)
+        job.prompt_version = template.version
+        return render_prompt(template, self._contents[document], rules_prompt, prompt_variables(document))
+
+    def _finish(self, job: BatchJob, content: str = "", tokens: int = 0, error: Optional[str] = None) -> None:
+        job.status = "error" if error else "done"
+        job.content = content
+        job.tokens = tokens
+        job.error = error
+        job.finished_at = time.time()
+
+    # --- submission ------------------------------------------------------
+
+    async def submit(self) -> None:
+        """Submit every pending batchable job; already-submitted ones are left alone."""
+        for api in BATCH_APIS:
+            pending = [j for j in self.jobs.values() if j.api == api and j.status == "pending"]
+            for start in range(0, len(pending), MAX_BATCH_REQUESTS):
+                chunk = pending[start:start + MAX_BATCH_REQUESTS]
+                try:
+                    if api == "openai":
+                        batch_id = await self._submit_openai(chunk)
+                    else:
+                        batch_id = await self._submit_anthropic(chunk)
+                except Exception as e:
+                    for job in chunk:
+                        self._finish(job, error=f"batch submission failed: {e}")
+                        self.unsubmitted.add(job.id)
+                    self._save()
+                    continue
+                now = time.time()
+                for job in chunk:
+                    job.status = "submitted"
+                    job.batch_id = batch_id
+                    job.submitted_at = now
+                self.batches[batch_id] = {"api": api, "status": "submitted", "jobs": len(chunk)}
+                self._save()
+                console.print(f"Submitted {len(chunk)} {api} review(s) as batch {batch_id}")
+
+    async def _submit_openai(self, jobs: List[BatchJob]) -> str:
+        client = self.orchestrator.openai_client
+        if not client:
+            raise ValueError("OpenAI client not initialized")
+        lines = [
+            json.dumps({
+                "custom_id": job.id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": job.model,
+                    "messages": [
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": str(self._prompt(job))},
+                    ],
+                    "temperature": 0.7,
+                },
+            })
+            for job in jobs
+        ]
+        upload = await client.files.create(
+            file=(f"reviews_round_{self.round_number}.jsonl", ("\n".join(lines) + "\n").encode()),
+            purpose="batch",
+        )
+        batch = await client.batches.create(
+            input_file_id=upload.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    async def _submit_anthropic(self, jobs: List[BatchJob]) -> str:
+        client = self.orchestrator.anthropic_client
+        if not client:
+            raise ValueError("Anthropic client not initialized")
+        batch = await client.messages.batches.create(requests=[
+            {
+                "custom_id": job.id,
+                "params": {
+                    "model": job.model,
+                    "max_tokens": 4096,
+                    "messages": [{"role": "user", "content": str(self._prompt(job))}],
+                },
+            }
+            for job in jobs
+        ])
+        return batch.id
+
+    # --- interactive reviewers --------------------------------------------
+
+    async def run_interactive(self) -> None:
+        """Reviewers without a batch API run the usual way, once."""
+        jobs = [j for j in self.jobs.values() if j.api not in BATCH_APIS and not j.finished]
+        if not jobs:
+            return
+
+        async def run_one(job: BatchJob) -> None:
+            config = next(c for c in self.configs if c.name == job.reviewer)
+            job.submitted_at = time.time()
+            try:
+                result = await self.orchestrator._call_api(config, self._prompt(job))
+            except Exception as e:
+                self._finish(job, error=str(e))
+            else:
+                self._finish(job, content=result["content"], tokens=result["tokens"])
+
+        await asyncio.gather(*(run_one(j) for j in jobs))
+        self._save()
+
+    # --- polling -----------------------------------------------------------
+
+    async def poll_once(self) -> bool:
+        """Check every open batch once; True when no job is left waiting."""
+        for batch_id, info in self.batches.items():
+            if info["status"] == "collected":
+                continue
+            try:
+                if info["api"] == "openai":
+                    status = await self._collect_openai(batch_id)
+                else:
+                    status = await self._collect_anthropic(batch_id)
+            except Exception as e:
+                logger.warning(f"Polling batch {batch_id} failed, will retry: {e}")
+                continue
+            if status is None:
+                continue
+            for job in self.jobs.values():
+                if job.batch_id == batch_id and not job.finished:
+                    self._finish(job, error=f"no result in batch ({status})")
+            info["status"] = "collected"
+            self._save()
+        return all(j.finished for j in self.jobs.values())
+
+    async def _collect_openai(self, batch_id: str) -> Optional[str]:
+        client = self.orchestrator.openai_client
+        if not client:
+            raise ValueError("OpenAI client not initialized")
+        batch = await client.batches.retrieve(batch_id)
+        if batch.status not in OPENAI_TERMINAL:
+            return None
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            text = (await client.files.content(file_id)).text
+            for line in text.splitlines():
+                if line.strip():
+                    self._apply_openai_line(json.loads(line))
+        return batch.status
+
+    def _apply_openai_line(self, entry: Dict[str, Any]) -> None:
+        job = self.jobs.get(entry.get("custom_id", ""))
+        if job is None:
+            return
+        response = entry.get("response") or {}
+        body = response.get("body") or {}
+        if response.get("status_code") == 200:
+            self._finish(
+                job,
+                content=body["choices"][0]["message"]["content"],
+                tokens=body.get("usage", {}).get("total_tokens", 0),
+            )
+        else:
+            error = entry.get("error") or body.get("error") or f"HTTP {response.get('status_code')}"
+            self._finish(job, error=json.dumps(error) if isinstance(error, dict) else str(error))
+
+    async def _collect_anthropic(self, batch_id: str) -> Optional[str]:
+        client = self.orchestrator.anthropic_client
+        if not client:
+            raise ValueError("Anthropic client not initialized")
+        batch = await client.messages.batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return None
+        async for entry in await client.messages.batches.results(batch_id):
+            job = self.jobs.get(entry.custom_id)
+            if job is None:
+                continue
+            result = entry.result
+            if result.type == "succeeded":
+                message = result.message
+                self._finish(
+                    job,
+                    content="".join(block.text for block in message.content if block.type == "text"),
+                    tokens=message.usage.input_tokens + message.usage.output_tokens,
+                )
+            else:
+                error = getattr(result, "error", None)
+                self._finish(job, error=f"{result.type}: {error}" if error else result.type)
+        return batch.processing_status
+
+    # --- results -----------------------------------------------------------
+
+    def write_rounds(self) -> List[ReviewSummary]:
+        """Publish one round directory per document from the finished jobs"""
+        summaries = []
+        for document in self.documents:
+            review_results = []
+            for config in self.configs:
+                job = self.jobs[job_id(self.round_number, document, config.name)]
+                if job.error:
+                    alert(f"Batch review round {self.round_number}: {config.name} failed on {document}: {job.error}", level="error")
+                review_results.append(ReviewResult(
+                    reviewer_name=config.name,
+                    api=config.api,
+                    model=config.model,
+                    content=job.content,
+                    cost=0.0,
+                    tokens_used=job.tokens,
+                    duration_seconds=max(0.0, job.finished_at - job.submitted_at),
+                    timestamp=datetime.fromtimestamp(job.finished_at or time.time(), UTC).isoformat(),
+                    error=job.error,
+                    prompt_version=job.prompt_version
+                ))
+
+            findings = self._findings.get(document)
+            if findings is None and self.rules:
+                findings = self.rules.scan(read_document(document), document)
+            with RoundWriter(self.round_dir(document)) as writer:
+                if self.rules:
+                    writer.add("RULE_FINDINGS.md", format_findings_report(findings or [], document))
+                summaries.append(queue_round_results(
+                    writer, document, self.round_number, review_results, len(findings or [])
+                ))
+        return summaries
+
+    async def run(self) -> List[ReviewSummary]:
+        """Submit (or resume), wait for every job, then write the rounds."""
+        await self.submit()
+        await self.run_interactive()
+        while not await self.poll_once():
+            waiting = sum(1 for j in self.jobs.values() if not j.finished)
+            console.print(f"[dim]{waiting} batch review(s) still processing; next check in {self.poll_interval:.0f}s[/dim]")
+            await asyncio.sleep(self.poll_interval)
+
+        summaries = self.write_rounds()
+        if self.unsubmitted:
+            console.print(
+                f"[yellow]{len(self.unsubmitted)} review(s) could not be submitted; "
+                f"re-run the same round to retry them[/yellow]"
+            )
+        else:
+            self._retire_state()
+        return summaries
+
+    def _retire_state(self) -> None:
+        """Trash the state so a later run of the same round starts fresh.
+
+        If it can't be trashed it is overwritten with a retired marker, which
+        _load ignores, so finished batches are never resumed into a new run.
+        """
+        try:
+            from send2trash import send2trash
+            send2trash(str(self.state_path))
+            return
+        except Exception as e:
+            logger.warning(f"Failed to trash batch state {self.state_path}, marking it retired: {e}")
+        try:
+            save_atomic(self.state_path, json.dumps({
+                "version": STATE_VERSION, "round": self.round_number, "retired": True,
+            }))
+        except OSError as e:
+            logger.warning(f"Failed to retire batch state {self.state_path}: {e}")
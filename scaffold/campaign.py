@@ -0,0 +1,491 @@
+"""
+Review Campaigns
+
+`scaffold campaign` reviews every active project under PROJECTS_ROOT in one
+run, for example nightly:
+
+- Projects in ignore_projects are skipped. Reviewable files are found with
+  the scan_config.yaml skip rules and scan_extensions: markdown for document
+  campaigns, source languages for code campaigns.
+- Documents are sharded in chunks across worker processes. Each chunk runs
+  in its own event loop and orchestrator. All workers draw API calls from
+  one shared requests-per-minute budget.
+- Every finished document is appended to checkpoint.jsonl. Re-running the
+  same campaign skips documents that already passed and haven't changed
+  since.
+- Zero push footprint: projects are only read. All output goes under one
+  results directory, which may not be inside any project (protected or not).
+
+With `--queue URL` nothing is reviewed locally. Each (document, reviewer)
+prompt is rendered and put on a shared work queue (see work_queue.py).
+`scaffold worker` processes on any number of machines then drain it, and
+this process publishes each document's round as its jobs finish.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from . import events
+from .audit import SkipRules, iter_files
+from .artifacts import RoundWriter
+from .prompt_registry import PROMPTS
+from .review import (
+    MAX_FILE_SIZE,
+    ReviewConfig,
+    ReviewResult,
+    create_orchestrator,
+    prompt_variables,
+    queue_round_results,
+    read_document,
+    render_prompt,
+    rules_prompt_for,
+)
+from .review_rules import RuleEngine, find_review_md, format_findings_report
+from .utils import safe_slug, save_atomic
+from .work_queue import JobQueue, QueueJob, open_queue, queue_job_id
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULTS_DIR = Path(os.getenv("XDG_STATE_HOME", Path.home() / ".local" / "state")) / "scaffold" / "campaigns"
+CHECKPOINT_NAME = "checkpoint.jsonl"
+SUMMARY_NAME = "campaign_summary.json"
+# Documents per worker task; each task gets a fresh event loop and clients
+CHUNK_SIZE = 8
+DEFAULT_RATE_LIMIT = 60  # API requests per minute, across all workers
+QUEUE_POLL_INTERVAL = 5.0  # seconds between queue checks while workers review
+
+# scan_extensions languages reviewed by each campaign type
+CAMPAIGN_LANGUAGES = {
+    "document": frozenset({"markdown"}),
+    "code": frozenset({"python", "typescript", "javascript", "go", "shell", "sql", "swift"}),
+}
+
+
+@dataclass(frozen=True)
+class CampaignTarget:
+    """One document to review"""
+    project: str
+    path: str  # absolute
+    rel_path: str  # relative to the project
+    sha256: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.project}/{self.rel_path}"
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def active_projects(projects_root: Path, config: Dict[str, Any], only: Optional[Sequence[str]] = None) -> List[Path]:
+    """Project directories under `projects_root`, minus ignore_projects and hidden ones"""
+    ignored = set(config.get("ignore_projects", []))
+    return [
+        p for p in sorted(projects_root.iterdir())
+        if p.is_dir() and not p.name.startswith(".") and p.name not in ignored
+        and (not only or p.name in only)
+    ]
+
+
+def find_targets(
+    projects_root: Path,
+    config: Dict[str, Any],
+    review_type: str = "document",
+    only: Optional[Sequence[str]] = None
+) -> Iterator[CampaignTarget]:
+    """Reviewable files per active project, honoring the scan_config.yaml skip rules"""
+    languages = CAMPAIGN_LANGUAGES[review_type]
+    extensions = tuple(sorted(
+        ext for ext, language in config.get("scan_extensions", {}).items()
+        if language in languages and ext.startswith(".")
+    ))
+    skip = SkipRules.from_config(config)
+    for project in active_projects(projects_root, config, only):
+        for path in iter_files(project, skip, extensions):
+            try:
+                if path.stat().st_size > MAX_FILE_SIZE:
+                    logger.info(f"Skipping oversized {path}")
+                    continue
+                sha256 = _file_hash(path)
+            except OSError as e:
+                logger.warning(f"Could not read {path}: {e}")
+                continue
+            yield CampaignTarget(project.name, str(path), path.relative_to(project).as_posix(), sha256)
+
+
+def check_zero_footprint(results_dir: Path, projects_root: Path) -> None:
+    """Refuse a results directory inside any project: campaigns only read projects"""
+    results = results_dir.resolve()
+    root = projects_root.resolve()
+    if results.is_relative_to(root) and results != root:
+        project = results.relative_to(root).parts[0]
+        raise ValueError(
+            f"Results directory {results_dir} is inside project '{project}'; "
+            "campaigns must not write into projects (zero push footprint)"
+        )
+
+
+class SharedRateLimit:
+    """Requests-per-minute budget shared by every worker process.
+
+    Each call reserves the next free slot in a shared timestamp and sleeps
+    until it. Shared with workers by passing it to the pool's initializer.
+    """
+
+    def __init__(self, per_minute: float) -> None:
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = multiprocessing.Value("d", 0.0)
+
+    def reserve(self) -> float:
+        """Seconds to wait before the caller's request may go out"""
+        if not self.interval:
+            return 0.0
+        with self._next.get_lock():
+            now = time.time()
+            slot = max(now, self._next.value)
+            self._next.value = slot + self.interval
+        return slot - now
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class _Discard(events.EventSink):
+    """Workers render nothing; the parent reports progress"""
+
+    def emit(self, event: str, **fields: Any) -> None:
+        pass
+
+
+@dataclass
+class _WorkerSetup:
+    keys: Dict[str, Optional[str]]
+    configs: List[ReviewConfig]
+    results_dir: str
+    round_number: int
+    providers: Dict[str, str]  # name -> "module:attr" overrides
+
+
+_setup: Optional[_WorkerSetup] = None
+_limit: Optional[SharedRateLimit] = None
+
+
+def _init_worker(setup: _WorkerSetup, limit: Optional[SharedRateLimit]) -> None:
+    global _setup, _limit
+    _setup, _limit = setup, limit
+
+
+def _distinct_slug(text: str) -> str:
+    """safe_slug plus a short hash of `text`: a/b.md, a_b.md and a-b.md all slug
+    to a_b_md, but must not share a results directory"""
+    return f"{safe_slug(text)[:200]}_{hashlib.sha256(text.encode()).hexdigest()[:8]}"
+
+
+def output_dir_for(results_dir: Path, target: CampaignTarget) -> Path:
+    return results_dir / _distinct_slug(target.project) / _distinct_slug(target.rel_path)
+
+
+def _append_checkpoint(results_dir: Path, record: Dict[str, Any]) -> None:
+    # One O_APPEND write per record, so concurrent workers never interleave lines
+    line = (json.dumps(record) + "\n").encode()
+    fd = os.open(results_dir / CHECKPOINT_NAME, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def _find_rules(path: Path, cache: Dict[Path, Optional[RuleEngine]]) -> Optional[RuleEngine]:
+    rules_path = find_review_md(path)
+    if rules_path not in cache:
+        cache[rules_path] = RuleEngine.from_file(rules_path) if rules_path else None
+    return cache[rules_path]
+
+
+async def _review_targets(targets: List[CampaignTarget]) -> List[Dict[str, Any]]:
+    assert _setup is not None
+    orchestrator = create_orchestrator(**_setup.keys)
+    for name, target in _setup.providers.items():
+        orchestrator.providers.register(name, target)
+    orchestrator.events = _Discard()
+    orchestrator.rate_limiter = _limit
+    results_dir = Path(_setup.results_dir)
+    rules_cache: Dict[Path, Optional[RuleEngine]] = {}
+
+    records = []
+    for target in targets:
+        path = Path(target.path)
+        record: Dict[str, Any] = {**asdict(target), "round": _setup.round_number, "finished_at": 0.0}
+        try:
+            summary = await orchestrator.run_review(
+                path, _setup.configs, _setup.round_number, output_dir_for(results_dir, target),
+                rules=_find_rules(path, rules_cache)
+            )
+            failed = [r.reviewer_name for r in summary.results if r.error]
+            record.update(
+                status="failed" if failed and len(failed) == len(summary.results) else "done",
+                failed_reviewers=failed,
+                cost=summary.total_cost,
+                tokens=sum(r.tokens_used for r in summary.results),
+            )
+        except Exception as e:
+            logger.warning(f"Campaign review of {target.key} failed: {e}")
+            record.update(status="failed", error=str(e), failed_reviewers=[], cost=0.0, tokens=0)
+        record["finished_at"] = time.time()
+        _append_checkpoint(results_dir, record)
+        records.append(record)
+    return records
+
+
+def _review_chunk(targets: List[CampaignTarget]) -> List[Dict[str, Any]]:
+    """Worker entry point: review a chunk of documents in one event loop"""
+    return asyncio.run(_review_targets(targets))
+
+
+@dataclass
+class _QueuedTarget:
+    """A document whose reviewer jobs are out on the work queue"""
+    target: CampaignTarget
+    job_ids: List[str]  # one per reviewer config
+    findings: int = 0
+    findings_report: Optional[str] = None
+    prompt_versions: List[str] = field(default_factory=list)
+
+
+def _enqueue_target(
+    queue: JobQueue,
+    name: str,
+    target: CampaignTarget,
+    configs: List[ReviewConfig],
+    round_number: int,
+    rules_cache: Dict[Path, Optional[RuleEngine]]
+) -> _QueuedTarget:
+    """Render one prompt per reviewer (rules applied here) and enqueue them"""
+    path = Path(target.path)
+    document = read_document(path)
+    rules = _find_rules(path, rules_cache)
+    findings = rules.scan(document, path) if rules else []
+    variables = prompt_variables(path)
+    queued = _QueuedTarget(
+        target, [], len(findings), format_findings_report(findings, path) if rules else None
+    )
+    jobs = []
+    for config in configs:
+        template = PROMPTS.template(config.prompt_path)
+        prompt = str(render_prompt(template, document, rules_prompt_for(rules, findings, path, config), variables))
+        job_id = queue_job_id(name, round_number, target.key, config.name, prompt)
+        jobs.append(QueueJob(
+            id=job_id, campaign=name, document=target.key, reviewer=config.name, api=config.api,
+            model=config.model, round=round_number, prompt=prompt, prompt_version=template.version
+        ))
+        queued.job_ids.append(job_id)
+        queued.prompt_versions.append(template.version)
+    queue.enqueue(jobs)
+    return queued
+
+
+def _publish_queued(
+    results_dir: Path,
+    queued: _QueuedTarget,
+    jobs: List[QueueJob],
+    configs: List[ReviewConfig],
+    round_number: int
+) -> Dict[str, Any]:
+    """Write a document's round from its finished jobs and checkpoint it"""
+    target = queued.target
+    results = [
+        ReviewResult(
+            reviewer_name=config.name,
+            api=config.api,
+            model=config.model,
+            content=job.result.get("content", ""),
+            cost=job.result.get("cost", 0.0),
+            tokens_used=job.result.get("tokens", 0),
+            duration_seconds=job.result.get("duration", 0.0),
+            timestamp=datetime.now(UTC).isoformat(),
+            error=None if job.status == "done" else (job.error or "failed"),
+            prompt_version=version
+        )
+        for config, job, version in zip(configs, jobs, queued.prompt_versions)
+    ]
+    round_dir = output_dir_for(results_dir, target) / f"round_{round_number}"
+    with RoundWriter(round_dir) as writer:
+        if queued.findings_report is not None:
+            writer.add("RULE_FINDINGS.md", queued.findings_report)
+        summary = queue_round_results(writer, Path(target.path), round_number, results, queued.findings)
+    failed = [r.reviewer_name for r in results if r.error]
+    record: Dict[str, Any] = {
+        **asdict(target),
+        "round": round_number,
+        "status": "failed" if failed and len(failed) == len(results) else "done",
+        "failed_reviewers": failed,
+        "cost": summary.total_cost,
+        "tokens": sum(r.tokens_used for r in results),
+        "workers": sorted({job.result["worker"] for job in jobs if "worker" in job.result}),
+        "finished_at": time.time(),
+    }
+    _append_checkpoint(results_dir, record)
+    return record
+
+
+def _run_queued(
+    queue: JobQueue,
+    name: str,
+    targets: List[CampaignTarget],
+    configs: List[ReviewConfig],
+    results_dir: Path,
+    round_number: int,
+    poll_interval: float
+) -> Iterator[Dict[str, Any]]:
+    """Enqueue every target, then yield checkpoint records as documents finish"""
+    rules_cache: Dict[Path, Optional[RuleEngine]] = {}
+    outstanding: Dict[str, _QueuedTarget] = {}
+    for target in targets:
+        try:
+            outstanding[target.key] = _enqueue_target(queue, name, target, configs, round_number, rules_cache)
+        except Exception as e:
+            logger.warning(f"Could not enqueue {target.key}: {e}")
+            record = {
+                **asdict(target), "round": round_number, "status": "failed", "error": str(e),
+                "failed_reviewers": [], "cost": 0.0, "tokens": 0, "finished_at": time.time(),
+            }
+            _append_checkpoint(results_dir, record)
+            yield record
+
+    while outstanding:
+        by_id = {job.id: job for job in queue.jobs(i for q in outstanding.values() for i in q.job_ids)}
+        for key, queued in list(outstanding.items()):
+            jobs = [by_id.get(job_id) for job_id in queued.job_ids]
+            if all(job is not None and job.finished for job in jobs):
+                del outstanding[key]
+                yield _publish_queued(results_dir, queued, jobs, configs, round_number)
+        if outstanding:
+            time.sleep(poll_interval)
+
+
+def load_checkpoint(results_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """Latest record per document key"""
+    done: Dict[str, Dict[str, Any]] = {}
+    try:
+        with open(results_dir / CHECKPOINT_NAME) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from an interrupted run
+                done[record["project"] + "/" + record["rel_path"]] = record
+    except FileNotFoundError:
+        pass
+    return done
+
+
+@dataclass
+class CampaignSummary:
+    name: str
+    results_dir: Path
+    projects: int
+    documents: int
+    skipped: int
+    reviewed: int
+    failed: int
+    total_cost: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "results_dir": str(self.results_dir)}
+
+
+def run_campaign(
+    name: str,
+    configs: List[ReviewConfig],
+    review_type: str = "document",
+    projects_root: Optional[Path] = None,
+    results_root: Path = DEFAULT_RESULTS_DIR,
+    config: Optional[Dict[str, Any]] = None,
+    only: Optional[Sequence[str]] = None,
+    round_number: int = 1,
+    workers: Optional[int] = None,
+    rate_limit: float = DEFAULT_RATE_LIMIT,
+    keys: Optional[Dict[str, Optional[str]]] = None,
+    providers: Optional[Dict[str, str]] = None,
+    on_record: Optional[Callable[[Dict[str, Any]], None]] = None,
+    queue_url: Optional[str] = None,
+    poll_interval: float = QUEUE_POLL_INTERVAL
+) -> CampaignSummary:
+    """Review every target across worker processes (or, with `queue_url`,
+    across `scaffold worker` machines); resumable by `name`"""
+    from .constants import PROJECTS_ROOT, load_scan_config
+
+    projects_root = projects_root or PROJECTS_ROOT
+    config = config if config is not None else load_scan_config()
+    results_dir = results_root / safe_slug(name)
+    check_zero_footprint(results_dir, projects_root)
+    results_dir.mkdir(parents=True, exist_ok=True)
+
+    targets = list(find_targets(projects_root, config, review_type, only))
+    previous = load_checkpoint(results_dir)
+    pending = [
+        t for t in targets
+        if not (
+            (record := previous.get(t.key))
+            and record["status"] == "done"
+            and record["sha256"] == t.sha256
+            and record["round"] == round_number
+        )
+    ]
+    chunks = [pending[i:i + CHUNK_SIZE] for i in range(0, len(pending), CHUNK_SIZE)]
+
+    setup = _WorkerSetup(keys or {}, configs, str(results_dir), round_number, providers or {})
+    limit = SharedRateLimit(rate_limit)
+    records: List[Dict[str, Any]] = []
+    workers = max(1, min(workers or os.cpu_count() or 1, len(chunks)))
+    if queue_url:
+        queue = open_queue(queue_url)
+        for record in _run_queued(queue, name, pending, configs, results_dir, round_number, poll_interval):
+            records.append(record)
+            if on_record:
+                on_record(record)
+    elif workers == 1:
+        _init_worker(setup, limit)
+        for chunk in chunks:
+            for record in _review_chunk(chunk):
+                records.append(record)
+                if on_record:
+                    on_record(record)
+    elif chunks:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(setup, limit)) as pool:
+            futures = [pool.submit(_review_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                for record in future.result():
+                    records.append(record)
+                    if on_record:
+                        on_record(record)
+
+    summary = CampaignSummary(
+        name=name,
+        results_dir=results_dir,
+        projects=len({t.project for t in targets}),
+        documents=len(targets),
+        skipped=len(targets) - len(pending),
+        reviewed=sum(1 for r in records if r["status"] == "done"),
+        failed=sum(1 for r in records if r["status"] != "done"),
+        total_cost=sum(r.get("cost", 0.0) for r in records),
+    )
+    save_atomic(results_dir / SUMMARY_NAME, json.dumps(summary.to_dict(), indent=2))
+    return summary
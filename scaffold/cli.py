@@ -5,7 +5,7 @@ CLI for Project Scaffolding automation system
 import asyncio
 import sys
 from pathlib import Path
-from typing import List, Optional
+from typing import IO, TYPE_CHECKING, List, Optional
 
 if sys.version_info >= (3, 11):
     import tomllib
@@ -16,6 +16,8 @@ import click
 from dotenv import load_dotenv
 from rich.console import Console
 
+if TYPE_CHECKING:
+    from scaffold.review_rules import RuleEngine
 
 
 def get_version() -> str:
@@ -105,6 +107,50 @@ def cli() -> None:
     default="http://localhost:11434",
     help="Ollama host URL (default: http://localhost:11434)"
 )
+@click.option(
+    "--rules",
+    "rules_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="REVIEW.md rules file (defaults to the nearest REVIEW.md above the input)"
+)
+@click.option(
+    "--batch",
+    is_flag=True,
+    help="Use the OpenAI/Anthropic batch APIs (cheaper, up to 24h); --input may be a directory"
+)
+@click.option(
+    "--poll-interval",
+    type=float,
+    default=60.0,
+    show_default=True,
+    help="Seconds between batch status checks (with --batch)"
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Re-review on every save, sending only edited sections after a full review (Ctrl-C to stop)"
+)
+@click.option(
+    "--debounce",
+    type=float,
+    default=1.5,
+    show_default=True,
+    help="Seconds of no saves before a watch round starts (with --watch)"
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["rich", "ndjson"]),
+    default="rich",
+    show_default=True,
+    help="ndjson: stream machine-readable events to stdout instead of rendering progress"
+)
+@click.option(
+    "--profile-memory",
+    is_flag=True,
+    help="Trace allocations per phase and reviewer; writes memory_profile_round_N.json to the output directory"
+)
 def review(
     review_type: str,
     input_path: Path,
@@ -116,15 +162,55 @@ def review(
     deepseek_key: Optional[str],
     ollama_model: str,
     ollama_host: str,
+    rules_path: Optional[Path],
+    batch: bool,
+    poll_interval: float,
+    watch: bool,
+    debounce: float,
+    output_format: str,
+    profile_memory: bool,
 ) -> None:
     """Run multi-AI review on a document or code.
 
+    With --batch, every (document x reviewer) job goes to the providers'
+    batch APIs and the command waits for the results. If it is interrupted,
+    re-run the same command to resume without resubmitting.
+
+    With --watch, a new round starts each time saves to --input settle.
+    The first round, and any round after the headings change, reviews the
+    whole document; later rounds send only the sections edited since. An
+    edit mid-round cancels it.
+
+    With --format ndjson, stdout carries only JSON events (job_queued,
+    first_token, chunk, retry, completed, failed, ...) for CI and editors.
+
+    With --profile-memory, tracemalloc reports memory at each phase of the
+    round (load, dispatch, gather, save), the peak while each reviewer ran
+    and the top allocation sites. Expect the round to run slower.
+
     Example:
         scaffold review --type document --input docs/PRD.md
         scaffold review --type code --input src/main.py --round 2
+        scaffold review --type document --input docs/ --batch
+        scaffold review --type document --input docs/PRD.md --watch
+        scaffold review --type code --input src/main.py --format ndjson
+        scaffold review --type document --input docs/PRD.md --profile-memory
     """
+    from scaffold import review as review_module
     from scaffold.review import create_orchestrator
 
+    if watch and (batch or not input_path.is_file()):
+        raise click.UsageError("--watch needs a single --input file and can't be combined with --batch")
+    headless = output_format == "ndjson"
+    if headless and (batch or watch):
+        raise click.UsageError("--format ndjson can't be combined with --batch or --watch")
+    if profile_memory and (batch or watch):
+        raise click.UsageError("--profile-memory profiles a single round and can't be combined with --batch or --watch")
+    if headless:
+        # stdout is reserved for events
+        console.quiet = True
+        review_module.console.quiet = True
+
     # Set output directory based on review type
     if output_dir is None:
         if review_type == "document":
@@ -159,23 +245,53 @@ def review(
     console.print(f"  Output: {output_dir}")
     console.print(f"  Reviewers: {len(configs)}\n")
 
+    rules = _load_rules(rules_path, input_path)
+
     # Run reviews
-    orchestrator = create_orchestrator(configs, ollama_host)
+    orchestrator = create_orchestrator(
+        openai_key=openai_key,
+        anthropic_key=anthropic_key,
+        google_key=google_key,
+        deepseek_key=deepseek_key,
+        ollama_host=ollama_host
+    )
+    if headless:
+        from scaffold.events import NDJSONSink
+        orchestrator.events = NDJSONSink(sys.stdout)
+    if profile_memory:
+        from scaffold.memory_profile import MemoryProfiler
+        orchestrator.memory_profiler = MemoryProfiler()
 
-    try:
-        content = input_path.read_text()
-        results = asyncio.run(orchestrator.run_reviews(content, round_number))
+    if batch:
+        documents = _batch_documents(input_path, output_dir)
+        console.print(f"  Batch mode: {len(documents)} document(s) x {len(configs)} reviewer(s)\n")
+        summaries = asyncio.run(
+            orchestrator.run_batch_review(
+                documents, configs, round_number, output_dir, rules=rules, poll_interval=poll_interval
+            )
+        )
+        failed = sum(1 for s in summaries for r in s.results if r.error)
+        console.print(f"[bold]Batch review complete:[/bold] {len(summaries)} document(s), {failed} failed review(s)")
+        return
 
-        # Save results
-        for result in results:
-            safe_name = result.reviewer_name.lower().replace(" ", "_")
-            output_file = output_dir / f"round_{round_number}_{safe_name}.md"
-            output_file.write_text(result.content)
-            console.print(f"  [green]✓[/green] {result.reviewer_name} → {output_file}")
+    if watch:
+        from scaffold.watch import ReviewWatcher
 
-        # Calculate cost estimate
-        total_tokens = sum(r.tokens_used for r in results if r.tokens_used)
-        estimated_cost = total_tokens * 0.00001  # Rough estimate
+        watcher = ReviewWatcher(
+            orchestrator, input_path, configs, output_dir,
+            first_round=round_number, rules=rules, debounce=debounce
+        )
+        try:
+            asyncio.run(watcher.run())
+        except KeyboardInterrupt:
+            console.print(f"\n[bold]Stopped watching.[/bold] Last round: {watcher.round_number - 1}")
+        return
+
+    try:
+        summary = asyncio.run(
+            orchestrator.run_review(input_path, configs, round_number, output_dir, rules=rules)
+        )
+        estimated_cost = summary.total_cost
 
         # Summary
         next_round = round_number + 1
@@ -196,6 +312,32 @@ def review(
         raise
 
 
+def _batch_documents(input_path: Path, output_dir: Path) -> List[Path]:
+    """The input file, or every non-hidden file under an input directory
+    (earlier review output excluded)."""
+    if input_path.is_file():
+        return [input_path]
+    output_root = output_dir.resolve()
+    return sorted(
+        p for p in input_path.rglob("*")
+        if p.is_file()
+        and not any(part.startswith(".") for part in p.relative_to(input_path).parts)
+        and not p.resolve().is_relative_to(output_root)
+    )
+
+
+def _load_rules(rules_path: Optional[Path], input_path: Path) -> Optional["RuleEngine"]:
+    """Load REVIEW.md rules from an explicit path or the nearest REVIEW.md."""
+    from scaffold.review_rules import RuleEngine, find_review_md
+
+    rules_path = rules_path or find_review_md(input_path)
+    if rules_path is None:
+        return None
+    engine = RuleEngine.from_file(rules_path)
+    console.print(f"  Rules: {rules_path} ({len(engine)} rules)")
+    return engine
+
+
 def _load_review_configs(
     prompt_dir: Path,
     openai_key: Optional[str],
@@ -205,6 +347,7 @@ def _load_review_configs(
     ollama_model: str
 ) -> List:
     """Load review configurations from prompt directory"""
+    from scaffold.prompt_registry import PROMPTS
     from scaffold.review import ReviewConfig
     configs = []
 
@@ -216,7 +359,7 @@ def _load_review_configs(
         "quality": ("deepseek", "deepseek-chat", "Code Quality Reviewer"),
     }
 
-    for prompt_file in sorted(prompt_dir.glob("*.md")):
+    for prompt_file in PROMPTS.prompt_files(prompt_dir):
         name_parts = prompt_file.stem.split("_")
         prefix = name_parts[0]
 
@@ -247,8 +390,833 @@ def _load_review_configs(
             prompt_path=prompt_file
         ))
 
+    # Compiled once here; reviewers, documents and rounds share them
+    PROMPTS.preload(config.prompt_path for config in configs)
     return configs
 
 
+@cli.command("review-rules")
+@click.option(
+    "--input",
+    "input_paths",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    multiple=True,
+    required=True,
+    help="File to check (repeatable)"
+)
+@click.option(
+    "--rules",
+    "rules_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="REVIEW.md rules file (defaults to the nearest REVIEW.md above the first input)"
+)
+@click.option(
+    "--json",
+    "as_json",
+    is_flag=True,
+    help="Emit findings as JSON"
+)
+def review_rules(input_paths: tuple[Path, ...], rules_path: Optional[Path], as_json: bool) -> None:
+    """Apply REVIEW.md rules deterministically (no AI calls).
+
+    Exits with status 1 when any error-severity rule fires.
+
+    Example:
+        scaffold review-rules --input docs/PRD.md --input src/app.py
+    """
+    import json
+    from dataclasses import asdict
+
+    from rich.markup import escape
+
+    from scaffold.review_rules import RuleEngine, find_review_md
+
+    rules_path = rules_path or find_review_md(input_paths[0])
+    if rules_path is None:
+        console.print("[yellow]No REVIEW.md found; nothing to check.[/yellow]")
+        return
+
+    engine = RuleEngine.from_file(rules_path)
+    report = {}
+    has_errors = False
+    for path in input_paths:
+        findings = engine.scan(path.read_text(errors="replace"), path)
+        report[str(path)] = findings
+        has_errors = has_errors or any(f.severity == "error" for f in findings)
+
+    if as_json:
+        click.echo(json.dumps({p: [asdict(f) for f in fs] for p, fs in report.items()}, indent=2))
+    else:
+        for path, findings in report.items():
+            for f in findings:
+                color = {"error": "red", "warning": "yellow"}.get(f.severity, "cyan")
+                console.print(f"{path}:{f.line}: [{color}]{f.severity}[/{color}] {escape(f'[{f.rule_id}]')} {escape(f.text)}")
+        total = sum(len(fs) for fs in report.values())
+        console.print(f"\n{total} finding(s) from {len(engine)} rules in {rules_path}")
+
+    if has_errors:
+        sys.exit(1)
+
+
+@cli.command("hook-scan")
+@click.option(
+    "--range",
+    "commit_range",
+    default=None,
+    help="Scan `git diff <RANGE>` instead of the staged changes"
+)
+@click.option(
+    "--diff-file",
+    type=click.File("r"),
+    default=None,
+    help="Scan a unified diff from a file ('-' for stdin)"
+)
+@click.option(
+    "--warn",
+    "warn_rules",
+    multiple=True,
+    help="Report this rule id as a warning instead of blocking (repeatable)"
+)
+@click.option(
+    "--json",
+    "as_json",
+    is_flag=True,
+    help="Emit findings as JSON"
+)
+def hook_scan(commit_range: Optional[str], diff_file: Optional[IO[str]], warn_rules: tuple[str, ...], as_json: bool) -> None:
+    """Scan added diff lines for dangerous deletions and hardcoded credentials.
+
+    Streams the diff once and applies every rule in a single pass; Python
+    files read from git are re-checked with the AST scanner. Exits 1 when a
+    blocking rule fires, 0 otherwise, 2 if the diff could not be read.
+
+    Example:
+        scaffold hook-scan                       # staged changes (pre-commit)
+        scaffold hook-scan --range A..B --warn rm-rf  # pushed commits (pre-push)
+    """
+    import json
+    from dataclasses import asdict
+
+    from rich.markup import escape
+
+    from scaffold.ast_scan import AstCache
+    from scaffold.hook_scan import (
+        exit_code, git_diff_command, refine_python_findings, scan_git_diff, scan_stream,
+    )
+    from scaffold.safety import SafetyMatcher
+
+    matcher = SafetyMatcher(warn_only=frozenset(warn_rules))
+    try:
+        if diff_file is not None:
+            findings = scan_stream(diff_file, matcher)
+        else:
+            added: dict[str, set[int]] = {}
+            findings = scan_git_diff(git_diff_command(commit_range=commit_range), matcher, added)
+            ast_cache = AstCache.load()
+            findings = refine_python_findings(findings, added, matcher, commit_range, ast_cache)
+            ast_cache.save()
+    except (OSError, RuntimeError) as e:
+        click.echo(f"hook-scan: could not read diff: {e}", err=True)
+        sys.exit(2)
+
+    if as_json:
+        click.echo(json.dumps([asdict(f) for f in findings], indent=2))
+    else:
+        for f in findings:
+            label = "[red]BLOCK[/red]" if f.blocking else "[yellow]WARN[/yellow]"
+            console.print(f"{label} {escape(f.path)}:{f.line} {escape(f'[{f.rule_id}]')} {escape(f.message)}")
+            console.print(f"    {escape(f.text)}")
+
+    sys.exit(exit_code(findings))
+
+
+@cli.command("hook-check")
+@click.argument("files", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Re-check every file even if its content already passed"
+)
+def hook_check(files: tuple[str, ...], no_cache: bool) -> None:
+    """Run Ruff and Pyright concurrently on staged Python files.
+
+    Stops at the first failing check. Files whose exact content already
+    passed are skipped (cache lives in the git directory); for Pyright only
+    while the local modules they import are unchanged too. Exits 1 on failure.
+
+    Example:
+        scaffold hook-check              # staged .py files (pre-commit)
+        scaffold hook-check src/app.py
+    """
+    from rich.markup import escape
+
+    from scaffold.hook_checks import (
+        CACHE_FILE, DEFAULT_TOOLS, CheckCache, git_dir, run_checks, staged_python_files, tools_fingerprint,
+    )
+
+    paths = list(files) or staged_python_files()
+    if not paths:
+        console.print("No Python files staged — skipping Ruff and Pyright.")
+        return
+
+    cache = CheckCache(git_dir() / CACHE_FILE, tools_fingerprint(list(DEFAULT_TOOLS), Path.cwd()))
+    if no_cache:
+        cache.passed = {}
+
+    results = asyncio.run(run_checks(paths, cache))
+    if not no_cache:
+        cache.save()
+
+    failed = False
+    for result in results:
+        if result.skipped:
+            console.print(f"{result.tool}: [yellow]skipped[/yellow] ({escape(result.report)})")
+        elif result.passed:
+            detail = "" if result.files_checked else " (all files cached)"
+            console.print(f"{result.tool}: [green]passed[/green]{detail}")
+        else:
+            failed = True
+            console.print(f"{result.tool}: [red]failed[/red]")
+            console.print(escape(result.report))
+
+    if failed:
+        sys.exit(1)
+
+
+@cli.command()
+@click.argument(
+    "paths",
+    nargs=-1,
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+)
+@click.option(
+    "--all-projects",
+    is_flag=True,
+    help="Audit every project under PROJECTS_ROOT (skips ignore_projects)"
+)
+@click.option(
+    "--family",
+    "families",
+    type=click.Choice(["deletion", "secrets", "exceptions"]),
+    multiple=True,
+    help="Rule family to run (repeatable, default: all)"
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["text", "json", "sarif"]),
+    default="text",
+    show_default=True,
+    help="Report format"
+)
+@click.option(
+    "--output",
+    "output_file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write the report to a file instead of stdout"
+)
+@click.option(
+    "--exclude",
+    "excludes",
+    multiple=True,
+    help="Glob (relative to each root) to exclude, in addition to scan_config.yaml (repeatable)"
+)
+@click.option(
+    "--config",
+    "config_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="scan_config.yaml to use for skip rules"
+)
+@click.option(
+    "--workers",
+    type=int,
+    default=None,
+    help="Worker processes (default: CPU count)"
+)
+@click.option(
+    "--no-ast",
+    is_flag=True,
+    help="Use the regex deletion rules for .py files instead of the AST scanner"
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Re-parse every .py file instead of reusing cached AST results"
+)
+def audit(
+    paths: tuple[Path, ...],
+    all_projects: bool,
+    families: tuple[str, ...],
+    output_format: str,
+    output_file: Optional[Path],
+    excludes: tuple[str, ...],
+    config_path: Optional[Path],
+    workers: Optional[int],
+    no_ast: bool,
+    no_cache: bool,
+) -> None:
+    """Audit whole trees for unsafe deletions, leaked keys and silent excepts.
+
+    Walks each tree once (honoring scan_config.yaml skip rules) and checks
+    every file against all rule families in parallel. Python files are
+    parsed, so deletions are matched by resolved call (aliases included)
+    rather than text; parse results are cached by content hash. Exits 1
+    when a blocking (error-level) finding is reported.
+
+    Example:
+        scaffold audit .
+        scaffold audit --all-projects --format sarif --output audit.sarif
+    """
+    from rich.markup import escape
+
+    from scaffold.ast_scan import AstCache
+    from scaffold.audit import SkipRules, run_audit
+    from scaffold.constants import IGNORE_PROJECTS, PROJECTS_ROOT, load_scan_config
+
+    roots = list(paths)
+    if all_projects:
+        roots.extend(
+            p for p in sorted(PROJECTS_ROOT.iterdir())
+            if p.is_dir() and not p.name.startswith(".") and p.name not in IGNORE_PROJECTS
+        )
+    if not roots:
+        roots = [Path.cwd()]
+
+    skip = SkipRules.from_config(load_scan_config(config_path), excludes) if config_path else SkipRules(excludes=excludes)
+    ast_cache = AstCache() if no_cache else AstCache.load()
+    report = run_audit(
+        roots, skip=skip, families=families or None, workers=workers, ast_cache=ast_cache, use_ast=not no_ast,
+    )
+    if not no_ast and not no_cache:
+        ast_cache.save()
+
+    if output_format == "text":
+        lines = [
+            f"{'ERROR' if f.blocking else 'WARN'} {f.path}:{f.line} [{f.rule_id}] {f.message}"
+            for f in report.findings
+        ]
+        lines.append(f"{report.files_scanned} files scanned, {len(report.findings)} finding(s)")
+        rendered = "\n".join(lines)
+    elif output_format == "json":
+        rendered = report.to_json()
+    else:
+        rendered = report.to_sarif()
+
+    if output_file:
+        output_file.write_text(rendered + "\n")
+        console.print(f"Report written to {escape(str(output_file))}")
+    else:
+        click.echo(rendered)
+
+    if report.blocking:
+        sys.exit(1)
+
+
+@cli.group()
+def alerts() -> None:
+    """Inspect and drain the Discord alert outbox."""
+    pass
+
+
+@alerts.command("status")
+@click.option(
+    "--outbox",
+    "outbox_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Outbox file (default: ~/.local/state/scaffold/alerts-outbox.jsonl)"
+)
+def alerts_status(outbox_path: Optional[Path]) -> None:
+    """Show alerts waiting in the outbox.
+
+    Example:
+        scaffold alerts status
+    """
+    import time
+
+    from rich.markup import escape
+    from rich.table import Table
+
+    from scaffold.alerts import DEFAULT_OUTBOX_PATH, Outbox
+
+    path = outbox_path or DEFAULT_OUTBOX_PATH
+    outbox = Outbox(path)
+    pending = sorted(outbox.pending.values(), key=lambda a: a.created)
+    console.print(f"Outbox: {escape(str(path))}")
+    if not pending:
+        console.print("[green]No pending alerts[/green]")
+        return
+
+    now = time.time()
+    table = Table(title=f"{len(pending)} pending alert(s)")
+    table.add_column("Age", justify="right")
+    table.add_column("Level")
+    table.add_column("Attempts", justify="right")
+    table.add_column("Next try", justify="right")
+    table.add_column("Expires in", justify="right")
+    table.add_column("Last error")
+    table.add_column("Message")
+    for a in pending:
+        table.add_row(
+            f"{now - a.created:.0f}s",
+            a.level,
+            str(a.attempts),
+            f"{max(0.0, a.next_at - now):.0f}s",
+            f"{a.expires - now:.0f}s",
+            escape(a.error),
+            escape(a.message[:60]),
+        )
+    console.print(table)
+
+
+@alerts.command("flush")
+@click.option(
+    "--outbox",
+    "outbox_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Outbox file (default: ~/.local/state/scaffold/alerts-outbox.jsonl)"
+)
+def alerts_flush(outbox_path: Optional[Path]) -> None:
+    """Deliver every pending alert now, ignoring retry backoff.
+
+    Exits 1 if alerts remain undelivered.
+
+    Example:
+        scaffold alerts flush
+    """
+    import os
+
+    from scaffold.alerts import DEFAULT_OUTBOX_PATH, AlertDispatcher, Outbox
+
+    webhook_url = os.environ.get("DISCORD_WEBHOOK_URL")
+    if not webhook_url:
+        console.print("[red]DISCORD_WEBHOOK_URL is not set[/red]")
+        sys.exit(1)
+
+    dispatcher = AlertDispatcher(webhook_url, window=0, outbox=Outbox(outbox_path or DEFAULT_OUTBOX_PATH))
+    draining = dispatcher.outbox.claim_drain()
+    sent = dispatcher.drain_once(ignore_backoff=True)
+    remaining = len(dispatcher.outbox.pending)
+    dispatcher.close()
+
+    if not draining:
+        console.print("[yellow]Another scaffold process is delivering from this outbox[/yellow]")
+    console.print(f"Delivered {sent} alert(s), {remaining} pending")
+    if remaining:
+        sys.exit(1)
+
+
+@cli.command("search-stats")
+@click.option(
+    "--log-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="grepai log directory (default: $PROJECTS_ROOT/_tools/grepai-logs)"
+)
+@click.option(
+    "--top",
+    type=int,
+    default=10,
+    show_default=True,
+    help="How many top and zero-result queries to list"
+)
+@click.option(
+    "--json",
+    "as_json",
+    is_flag=True,
+    help="Print the stats as JSON"
+)
+@click.option(
+    "--no-compact",
+    is_flag=True,
+    help="Don't fold rotated log files into the SQLite store first"
+)
+def search_stats(log_dir: Optional[Path], top: int, as_json: bool, no_compact: bool) -> None:
+    """Report top queries, zero-result queries and per-project rates.
+
+    Streams the grepai search log (live, rotated and compacted) without
+    loading it into memory. Top queries are the ones worth pre-warming.
+
+    Example:
+        scaffold search-stats --top 20
+    """
+    import json
+
+    from rich.markup import escape
+    from rich.table import Table
+
+    from scaffold.grepai import flush_log, log_dir as default_log_dir
+    from scaffold.search_log import SearchStats, compact, iter_records
+
+    flush_log()
+    directory = log_dir or default_log_dir()
+    if not directory.is_dir():
+        console.print(f"[yellow]No search log at {escape(str(directory))}[/yellow]")
+        return
+    if not no_compact:
+        compact(directory)
+
+    data = SearchStats.from_records(iter_records(directory)).to_dict(top)
+    if as_json:
+        click.echo(json.dumps(data, indent=2))
+        return
+
+    console.print(f"{data['total']} searches, {data['distinct_queries']} distinct queries")
+    for title, rows in (("Top queries", data["top_queries"]), ("Zero-result queries", data["zero_result_queries"])):
+        table = Table(title=title)
+        table.add_column("Count", justify="right")
+        table.add_column("Query")
+        for query, count in rows:
+            table.add_row(str(count), escape(query))
+        console.print(table)
+
+    table = Table(title="Projects")
+    table.add_column("Project")
+    table.add_column("Queries", justify="right")
+    table.add_column("Per day", justify="right")
+    table.add_column("Cached", justify="right")
+    table.add_column("Zero results", justify="right")
+    for name, p in data["projects"].items():
+        table.add_row(escape(name), str(p["queries"]), f"{p['per_day']:.1f}", str(p["cached"]), str(p["zero_results"]))
+    console.print(table)
+
+
+@cli.command()
+@click.option(
+    "--type",
+    "review_type",
+    type=click.Choice(["document", "code"]),
+    default="document",
+    show_default=True,
+    help="Review markdown documents or source code"
+)
+@click.option(
+    "--name",
+    default=None,
+    help="Campaign name; re-running a name resumes it (default: today's date)"
+)
+@click.option(
+    "--project",
+    "only",
+    multiple=True,
+    help="Only review this project (repeatable, default: every active project)"
+)
+@click.option(
+    "--projects-root",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=None,
+    help="Projects directory (default: $PROJECTS_ROOT)"
+)
+@click.option(
+    "--results",
+    "results_root",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Central results directory (default: ~/.local/state/scaffold/campaigns)"
+)
+@click.option(
+    "--config",
+    "config_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="scan_config.yaml to use for ignore_projects and skip rules"
+)
+@click.option("--round", "round_number", type=int, default=1, show_default=True, help="Review round number")
+@click.option("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+@click.option(
+    "--rate-limit",
+    type=float,
+    default=60.0,
+    show_default=True,
+    help="API requests per minute, shared by all workers (0 = unlimited)"
+)
+@click.option(
+    "--queue",
+    "queue_url",
+    envvar="SCAFFOLDING_QUEUE",
+    default=None,
+    help="Work queue URL (e.g. sqlite:////mnt/shared/queue.db); reviews run on `scaffold worker` machines"
+)
+@click.option(
+    "--poll-interval",
+    type=float,
+    default=5.0,
+    show_default=True,
+    help="Seconds between queue checks (with --queue)"
+)
+@click.option("--dry-run", is_flag=True, help="List what would be reviewed and exit")
+@click.option("--openai-key", envvar="SCAFFOLDING_OPENAI_KEY", help="OpenAI API key")
+@click.option("--anthropic-key", envvar="SCAFFOLDING_ANTHROPIC_KEY", help="Anthropic API key")
+@click.option("--google-key", envvar="SCAFFOLDING_GOOGLE_KEY", help="Google AI API key")
+@click.option("--deepseek-key", envvar="SCAFFOLDING_DEEPSEEK_KEY", help="DeepSeek API key")
+@click.option("--ollama-model", envvar="SCAFFOLDING_OLLAMA_MODEL", default="llama3.2", help="Ollama model for local reviews")
+@click.option("--ollama-host", envvar="SCAFFOLDING_OLLAMA_HOST", default="http://localhost:11434", help="Ollama host URL")
+def campaign(
+    review_type: str,
+    name: Optional[str],
+    only: tuple[str, ...],
+    projects_root: Optional[Path],
+    results_root: Optional[Path],
+    config_path: Optional[Path],
+    round_number: int,
+    workers: Optional[int],
+    rate_limit: float,
+    queue_url: Optional[str],
+    poll_interval: float,
+    dry_run: bool,
+    openai_key: Optional[str],
+    anthropic_key: Optional[str],
+    google_key: Optional[str],
+    deepseek_key: Optional[str],
+    ollama_model: str,
+    ollama_host: str,
+) -> None:
+    """Review every active project under PROJECTS_ROOT (e.g. nightly).
+
+    Skips ignore_projects and scan_config.yaml skip rules, shards documents
+    across worker processes under one shared rate limit, and checkpoints
+    each finished document so an interrupted campaign resumes where it
+    stopped. Projects are only read: every output goes to the results
+    directory.
+
+    With --queue, prompts are put on a shared work queue instead and
+    `scaffold worker` processes on other machines review them.
+
+    Example:
+        scaffold campaign --type document
+        scaffold campaign --type code --project my-app --workers 4 --rate-limit 30
+        scaffold campaign --queue sqlite:////mnt/shared/reviews/queue.db
+    """
+    from datetime import date
+
+    from rich.markup import escape
+
+    from scaffold.campaign import DEFAULT_RESULTS_DIR, find_targets, run_campaign
+    from scaffold.constants import PROJECTS_ROOT, load_scan_config
+
+    projects_root = projects_root or PROJECTS_ROOT
+    if not projects_root.is_dir():
+        raise click.UsageError(f"Projects root {projects_root} does not exist (set PROJECTS_ROOT)")
+    config = load_scan_config(config_path)
+    name = name or date.today().isoformat()
+
+    if dry_run:
+        targets = list(find_targets(projects_root, config, review_type, only))
+        for target in targets:
+            click.echo(target.key)
+        console.print(f"{len(targets)} document(s) in {len({t.project for t in targets})} project(s)")
+        return
+
+    prompt_dir = Path(__file__).parent / "prompts" / review_type
+    if not prompt_dir.exists():
+        console.print(f"[yellow]Skipping campaign: no prompts found for review type '{review_type}'[/yellow]")
+        return
+    configs = _load_review_configs(prompt_dir, openai_key, anthropic_key, google_key, deepseek_key, ollama_model)
+    if not configs:
+        console.print("[red]Error: No review configurations could be loaded (missing API keys?)[/red]")
+        return
+
+    def report(record: dict) -> None:
+        mark = "[green]done[/green]" if record["status"] == "done" else "[red]failed[/red]"
+        console.print(f"  {mark} {escape(record['project'])}/{escape(record['rel_path'])}")
+
+    try:
+        summary = run_campaign(
+            name,
+            configs,
+            review_type=review_type,
+            projects_root=projects_root,
+            results_root=results_root or DEFAULT_RESULTS_DIR,
+            config=config,
+            only=only,
+            round_number=round_number,
+            workers=workers,
+            rate_limit=rate_limit,
+            keys={
+                "openai_key": openai_key,
+                "anthropic_key": anthropic_key,
+                "google_key": google_key,
+                "deepseek_key": deepseek_key,
+                "ollama_host": ollama_host,
+            },
+            on_record=report,
+            queue_url=queue_url,
+            poll_interval=poll_interval,
+        )
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+    console.print(
+        f"\n[bold]Campaign {escape(name)}:[/bold] {summary.reviewed} reviewed, {summary.failed} failed, "
+        f"{summary.skipped} unchanged since the last run ({summary.documents} documents, {summary.projects} projects)"
+    )
+    console.print(f"  Results: {escape(str(summary.results_dir))}")
+    if summary.failed:
+        from scaffold.alerts import alert
+        alert(f"Review campaign {name}: {summary.failed} document(s) failed", level="warning")
+        sys.exit(1)
+
+
+@cli.command()
+@click.option(
+    "--queue",
+    "queue_url",
+    envvar="SCAFFOLDING_QUEUE",
+    required=True,
+    help="Work queue URL shared with `scaffold campaign --queue` (e.g. sqlite:////mnt/shared/queue.db)"
+)
+@click.option("--worker-id", default=None, help="Name recorded on leased jobs (default: hostname-pid)")
+@click.option("--concurrency", type=int, default=1, show_default=True, help="Jobs reviewed at once")
+@click.option(
+    "--lease",
+    "lease_seconds",
+    type=float,
+    default=120.0,
+    show_default=True,
+    help="Seconds a job stays leased without a heartbeat before another worker may take it"
+)
+@click.option("--poll-interval", type=float, default=2.0, show_default=True, help="Seconds between checks of an empty queue")
+@click.option(
+    "--exit-when-idle",
+    type=float,
+    default=None,
+    help="Exit once the queue has been empty this many seconds (default: run until Ctrl-C)"
+)
+@click.option("--openai-key", envvar="SCAFFOLDING_OPENAI_KEY", help="OpenAI API key")
+@click.option("--anthropic-key", envvar="SCAFFOLDING_ANTHROPIC_KEY", help="Anthropic API key")
+@click.option("--google-key", envvar="SCAFFOLDING_GOOGLE_KEY", help="Google AI API key")
+@click.option("--deepseek-key", envvar="SCAFFOLDING_DEEPSEEK_KEY", help="DeepSeek API key")
+@click.option("--ollama-host", envvar="SCAFFOLDING_OLLAMA_HOST", default="http://localhost:11434", help="Ollama host URL")
+def worker(
+    queue_url: str,
+    worker_id: Optional[str],
+    concurrency: int,
+    lease_seconds: float,
+    poll_interval: float,
+    exit_when_idle: Optional[float],
+    openai_key: Optional[str],
+    anthropic_key: Optional[str],
+    google_key: Optional[str],
+    deepseek_key: Optional[str],
+    ollama_host: str,
+) -> None:
+    """Review jobs from a shared work queue (distributed campaigns).
+
+    Leases one job per concurrency slot, heartbeats while the provider
+    call runs, and posts the result. If this worker dies, its leases
+    expire and other workers pick the jobs up.
+
+    Example:
+        scaffold worker --queue sqlite:////mnt/shared/reviews/queue.db --concurrency 2
+    """
+    from scaffold.work_queue import default_worker_id, open_queue, run_worker
+
+    try:
+        queue = open_queue(queue_url)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    worker_id = worker_id or default_worker_id()
+    console.print(f"[bold]Worker {worker_id}[/bold] on {queue_url} (Ctrl-C to stop)")
+    try:
+        done = asyncio.run(run_worker(
+            queue,
+            worker_id,
+            keys={
+                "openai_key": openai_key,
+                "anthropic_key": anthropic_key,
+                "google_key": google_key,
+                "deepseek_key": deepseek_key,
+                "ollama_host": ollama_host,
+            },
+            lease_seconds=lease_seconds,
+            concurrency=concurrency,
+            poll_interval=poll_interval,
+            exit_when_idle=exit_when_idle,
+        ))
+    except KeyboardInterrupt:
+        console.print("[yellow]Stopped; leased jobs were handed back[/yellow]")
+        return
+    console.print(f"Queue idle; reviewed {done} job(s)")
+
+
+@cli.command("mine-rules")
+@click.argument(
+    "repos",
+    nargs=-1,
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+)
+@click.option(
+    "--output",
+    "output_dir",
+    type=click.Path(path_type=Path),
+    default=Path("docs/mined_rules"),
+    show_default=True,
+    help="Where candidate rules and checkpoints are written"
+)
+@click.option(
+    "--min-support",
+    type=int,
+    default=3,
+    show_default=True,
+    help="Minimum number of commits a pattern must appear in"
+)
+@click.option(
+    "--workers",
+    type=int,
+    default=None,
+    help="Worker processes (default: one per repository, up to CPU count)"
+)
+@click.option(
+    "--full",
+    is_flag=True,
+    help="Ignore checkpoints and re-mine the whole history"
+)
+def mine_rules(
+    repos: tuple[Path, ...],
+    output_dir: Path,
+    min_support: int,
+    workers: Optional[int],
+    full: bool,
+) -> None:
+    """Mine git history for recurring fix patterns and write candidate REVIEW.md rules.
+
+    Runs are incremental: each repository's last processed commit is
+    checkpointed in the output directory.
+
+    Example:
+        scaffold mine-rules . ../other-project --min-support 5
+    """
+    from scaffold.mine_rules import mine_repositories
+
+    if not repos:
+        repos = (Path.cwd(),)
+
+    summaries = mine_repositories(
+        list(repos),
+        output_dir,
+        min_support=min_support,
+        full=full,
+        workers=workers,
+    )
+
+    failed = False
+    for summary in summaries:
+        if "error" in summary:
+            failed = True
+            console.print(f"  [red]✗[/red] {summary['repo']}: {summary['error']}")
+            continue
+        console.print(
+            f"  [green]✓[/green] {summary['repo']}: {summary['new_commits']} new commits, "
+            f"{summary['rules']} candidate rules → {summary['rules_file']}"
+        )
+
+    if failed:
+        sys.exit(1)
+
+
 if __name__ == "__main__":
     cli()
@@ -11,20 +11,31 @@ import yaml
 # Load config from shared YAML file
 PROJECTS_ROOT = Path(os.getenv("PROJECTS_ROOT", Path.home() / "projects"))
 CONFIG_PATH = PROJECTS_ROOT / "project-scaffolding" / "config" / "scan_config.yaml"
+# Copy shipped with this checkout, used when PROJECTS_ROOT has no scaffolding project (e.g. CI)
+BUNDLED_CONFIG_PATH = Path(__file__).resolve().parent.parent / "config" / "scan_config.yaml"
 
 
-def _load_config() -> dict:
+def load_scan_config(path: Path | None = None) -> dict:
     """Load scan configuration from YAML file."""
-    if CONFIG_PATH.exists():
-        with open(CONFIG_PATH) as f:
-            return yaml.safe_load(f)
+    for candidate in ([path] if path else [CONFIG_PATH, BUNDLED_CONFIG_PATH]):
+        if candidate.exists():
+            with open(candidate) as f:
+                return yaml.safe_load(f) or {}
     return {}
 
 
-_config = _load_config()
+_config = load_scan_config()
 
 # Projects that should NEVER be modified by scaffolding or automated cleanup
 # Combines ignore_projects (don't scan at all) and protected_projects (read-only)
 PROTECTED_PROJECTS = set(_config.get("ignore_projects", [])) | set(
     _config.get("protected_projects", [])
 )
+
+# Projects that are never scanned at all
+IGNORE_PROJECTS = frozenset(_config.get("ignore_projects", []))
+
+# Directory names, file names and filename globs that scanners skip
+SKIP_DIRS = frozenset(_config.get("skip_dirs", []))
+SKIP_FILES = frozenset(_config.get("skip_files", []))
+SKIP_PATTERNS = tuple(_config.get("skip_patterns", []))
@@ -0,0 +1,79 @@
+"""
+Review Events
+
+Machine-readable progress for `scaffold review --format ndjson`. Each event
+is one JSON object per line on stdout:
+
+    {"event": "completed", "ts": 1760000000.123, "round": 1, "reviewer": "Security Reviewer", ...}
+
+Events:
+- round_started, round_completed: once per round
+- job_queued: a reviewer is scheduled
+- first_token: the reviewer's first output arrived
+- chunk: reviewer output ("content")
+- retry: the provider is retrying ("kind", "attempt", "delay", "error")
+- completed / failed: the reviewer finished
+- memory_profile: with --profile-memory, where the round's profile was written
+
+None of the built-in providers stream yet, so each sends first_token and a
+single chunk when its response arrives. A streaming provider can emit more
+chunks itself with `emit("chunk", content=...)`.
+
+Job fields (round, reviewer, api, model) are bound per reviewer task with a
+ContextVar. That lets code deep in a provider call `emit()` without passing
+a sink around. When no sink is bound, `emit()` is a single lookup and
+returns straight away.
+"""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple
+
+
+class EventSink:
+    """Receives review events; subclasses decide where they go"""
+
+    def emit(self, event: str, **fields: Any) -> None:
+        raise NotImplementedError
+
+
+class NDJSONSink(EventSink):
+    """One compact JSON object per line, flushed per event"""
+
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields: Any) -> None:
+        line = json.dumps({"event": event, "ts": round(time.time(), 3), **fields}, separators=(",", ":"), default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+_bound: ContextVar[Optional[Tuple[EventSink, Dict[str, Any]]]] = ContextVar("scaffold_review_events", default=None)
+
+
+@contextmanager
+def bound(sink: Optional[EventSink], **fields: Any) -> Iterator[None]:
+    """Send emit() calls in this context to `sink`, tagged with `fields`"""
+    if sink is None:
+        yield
+        return
+    token = _bound.set((sink, fields))
+    try:
+        yield
+    finally:
+        _bound.reset(token)
+
+
+def emit(event: str, **fields: Any) -> None:
+    """Emit to the sink bound for the current reviewer, if any"""
+    current = _bound.get()
+    if current is not None:
+        sink, base = current
+        sink.emit(event, **base, **fields)
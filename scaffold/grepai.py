@@ -0,0 +1,470 @@
+"""
+grepai Search
+
+In-process access to `grepai search` for agents and scripts. Results are
+kept in an LRU+TTL cache keyed on (project root, query, limit), many queries can
+run concurrently from asyncio, and every query is logged to
+`$PROJECTS_ROOT/_tools/grepai-logs/ai_search_log.jsonl` through a buffered
+writer that appends in batches. The log is rotated by size; see
+scaffold.search_log for compaction and `scaffold search-stats`.
+
+A search runs in its project's root: the directory `project` names (a path,
+or a name under PROJECTS_ROOT), else the current directory. Queries go to a
+long-lived `grepai mcp-serve` worker started in that root (index loaded
+once, batches pipelined over stdio JSON-RPC). If the worker
+can't start or misbehaves, it is disabled for the process and every query
+falls back to one `grepai search` subprocess. Set SCAFFOLD_GREPAI_WORKER=off
+to always use subprocesses.
+
+`scaffold.utils.grepai_search` is the stable entry point and delegates here.
+"""
+
+import asyncio
+import atexit
+import itertools
+import json
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
+
+from .search_log import LOG_NAME, rotate_if_needed
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TIMEOUT = 30
+CACHE_SIZE = 512
+CACHE_TTL = 300.0
+# Log entries are appended once this many are buffered or the oldest is this old
+LOG_BATCH_SIZE = 50
+LOG_FLUSH_INTERVAL = 2.0
+DEFAULT_CONCURRENCY = 4
+WORKER_ENV = "SCAFFOLD_GREPAI_WORKER"
+WORKER_COMMAND = ("grepai", "mcp-serve")
+WORKER_START_TIMEOUT = 10.0
+MCP_PROTOCOL_VERSION = "2024-11-05"
+
+CacheKey = tuple[str, str, int]
+
+
+class ResultCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds"""
+
+    def __init__(self, maxsize: int = CACHE_SIZE, ttl: float = CACHE_TTL) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[CacheKey, tuple[float, list[dict]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> list[dict] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: CacheKey, results: list[dict]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def projects_root() -> Path:
+    return Path(os.environ.get("PROJECTS_ROOT", Path.home() / "projects"))
+
+
+def log_dir() -> Path:
+    return projects_root() / "_tools" / "grepai-logs"
+
+
+def resolve_project(project: str | None = None) -> tuple[str, str]:
+    """(root directory the search runs in, project name for the log).
+
+    `project` may be a directory path or a project name under PROJECTS_ROOT.
+    Anything else, and None, searches the current directory; a name that
+    matches no directory still labels the log entries.
+    """
+    return _resolve_project(project, os.getcwd(), projects_root())
+
+
+@lru_cache(maxsize=256)
+def _resolve_project(project: str | None, cwd: str, projects: Path) -> tuple[str, str]:
+    # Cached so a cache hit stays a dict lookup, not a realpath() per query
+    if project is not None:
+        for candidate in (Path(cwd, Path(project).expanduser()), projects / project):
+            if candidate.is_dir():
+                root = candidate.resolve()
+                return str(root), project if os.sep not in project else root.name
+    root = Path(cwd).resolve()
+    return str(root), project if project is not None else root.name
+
+
+class SearchLog:
+    """Buffers search log entries and appends them to the JSONL log in batches.
+
+    Never raises: logging must not break the search itself.
+    """
+
+    def __init__(self, batch_size: int = LOG_BATCH_SIZE, flush_interval: float = LOG_FLUSH_INTERVAL) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: list[str] = []
+        self._oldest = 0.0
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def record(self, project: str, query: str, results: list[dict], cached: bool = False) -> None:
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "project": project,
+            "query": query,
+            "results": [r.get("file") for r in results if isinstance(r, dict)],
+        }
+        if cached:
+            entry["cached"] = True
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            if not self._buffer:
+                self._oldest = time.monotonic()
+            self._buffer.append(line)
+            due = len(self._buffer) >= self.batch_size or time.monotonic() - self._oldest >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        if not lines:
+            return
+        try:
+            directory = log_dir()
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / LOG_NAME
+            rotate_if_needed(path)
+            with open(path, "a") as f:
+                f.write("".join(lines))
+        except OSError as e:
+            logger.debug(f"Could not write grepai search log: {e}")
+
+
+class WorkerError(Exception):
+    """The grepai worker failed; callers fall back to subprocesses"""
+
+
+class GrepaiWorker:
+    """A long-lived `grepai mcp-serve` process answering search tool calls over stdio"""
+
+    def __init__(self, cwd: str, command: tuple[str, ...] = WORKER_COMMAND, timeout: float = SEARCH_TIMEOUT) -> None:
+        self.cwd = cwd
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._inbox: queue.Queue[dict | None] = queue.Queue()
+        try:
+            self.proc = subprocess.Popen(
+                command,
+                cwd=cwd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                bufsize=1,
+            )
+        except OSError as e:
+            raise WorkerError(f"could not start {' '.join(command)}: {e}") from e
+        threading.Thread(target=self._read, name="grepai-worker-reader", daemon=True).start()
+        try:
+            self._call_many([("initialize", {
+                "protocolVersion": MCP_PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": {"name": "scaffold", "version": "1"},
+            })], timeout=WORKER_START_TIMEOUT)
+            self._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        except WorkerError:
+            self.close()
+            raise
+
+    def _read(self) -> None:
+        assert self.proc.stdout is not None
+        for line in self.proc.stdout:
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # stray log output
+            if isinstance(message, dict) and "id" in message:
+                self._inbox.put(message)
+        self._inbox.put(None)
+
+    def _send(self, message: dict) -> None:
+        assert self.proc.stdin is not None
+        try:
+            self.proc.stdin.write(json.dumps(message) + "\n")
+            self.proc.stdin.flush()
+        except (OSError, ValueError) as e:
+            raise WorkerError(f"worker stdin closed: {e}") from e
+
+    def _call_many(self, calls: list[tuple[str, dict]], timeout: float | None = None) -> list[dict]:
+        """Send every request before reading any response (pipelined)."""
+        with self._lock:
+            ids = []
+            for method, params in calls:
+                request_id = next(self._ids)
+                ids.append(request_id)
+                self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+
+            waiting = set(ids)
+            responses: dict[int, dict] = {}
+            deadline = time.monotonic() + (timeout or self.timeout)
+            while waiting:
+                try:
+                    message = self._inbox.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    raise WorkerError("worker timed out") from None
+                if message is None:
+                    raise WorkerError("worker exited")
+                if message["id"] in waiting:
+                    waiting.discard(message["id"])
+                    responses[message["id"]] = message
+        for response in responses.values():
+            if "error" in response:
+                raise WorkerError(f"worker error: {response['error']}")
+        return [responses[i]["result"] for i in ids]
+
+    def query_many(self, queries: list[str], limit: int) -> list[list[dict]]:
+        results = self._call_many([
+            ("tools/call", {"name": "grepai_search", "arguments": {"query": q, "limit": limit}})
+            for q in queries
+        ])
+        return [_parse_tool_result(r) for r in results]
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def close(self) -> None:
+        if self.proc.poll() is None:
+            if self.proc.stdin is not None:
+                self.proc.stdin.close()
+            try:
+                self.proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+
+
+def _parse_tool_result(result: dict) -> list[dict]:
+    if result.get("isError"):
+        raise WorkerError("grepai_search tool reported an error")
+    text = "".join(c.get("text", "") for c in result.get("content", []) if c.get("type") == "text")
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise WorkerError(f"unexpected grepai_search output: {text[:100]!r}") from e
+    return data.get("results", []) if isinstance(data, dict) else data
+
+
+_workers: dict[str, GrepaiWorker] = {}
+# Directories whose worker failed; they use subprocesses for the rest of the process
+_worker_disabled: set[str] = set()
+_workers_lock = threading.Lock()
+
+
+def _get_worker(cwd: str) -> GrepaiWorker | None:
+    """The live worker for project root `cwd`, started on first use."""
+    if os.environ.get(WORKER_ENV, "mcp").lower() in ("off", "0", "false", "no"):
+        return None
+    with _workers_lock:
+        if cwd in _worker_disabled:
+            return None
+        worker = _workers.get(cwd)
+        if worker is not None and worker.alive():
+            return worker
+        if shutil.which(WORKER_COMMAND[0]) is None:
+            return None
+        try:
+            worker = GrepaiWorker(cwd)
+        except WorkerError as e:
+            logger.info(f"grepai worker unavailable, using subprocesses: {e}")
+            _worker_disabled.add(cwd)
+            return None
+        _workers[cwd] = worker
+        return worker
+
+
+def _disable_worker(worker: GrepaiWorker, error: WorkerError) -> None:
+    logger.info(f"grepai worker failed, falling back to subprocesses: {error}")
+    with _workers_lock:
+        _worker_disabled.add(worker.cwd)
+        _workers.pop(worker.cwd, None)
+    worker.close()
+
+
+def close_workers() -> None:
+    with _workers_lock:
+        workers = list(_workers.values())
+        _workers.clear()
+    for worker in workers:
+        worker.close()
+
+
+atexit.register(close_workers)
+
+_cache = ResultCache()
+_log = SearchLog()
+
+
+def _command(query: str, limit: int) -> list[str]:
+    return ["grepai", "search", query, "--json", "--limit", str(limit)]
+
+
+def _parse(stdout: str) -> list[dict]:
+    try:
+        return json.loads(stdout).get("results", [])
+    except (json.JSONDecodeError, AttributeError):
+        return []
+
+
+def _run_subprocess(query: str, limit: int, root: str) -> list[dict]:
+    result = subprocess.run(
+        _command(query, limit), cwd=root, capture_output=True, text=True, timeout=SEARCH_TIMEOUT
+    )
+    return _parse(result.stdout)
+
+
+def _run_uncached(queries: list[str], limit: int, root: str) -> list[list[dict]]:
+    """Worker first (one pipelined batch), subprocess per query as the fallback."""
+    worker = _get_worker(root)
+    if worker is not None:
+        try:
+            return worker.query_many(queries, limit)
+        except WorkerError as e:
+            _disable_worker(worker, e)
+    return [_run_subprocess(q, limit, root) for q in queries]
+
+
+def search_batch(queries: Iterable[str], project: str | None = None, limit: int = 10) -> list[list[dict]]:
+    """Run many queries through one worker round trip; results in query order.
+
+    Cached result lists are shared between callers; don't mutate them.
+    """
+    root, project = resolve_project(project)
+    ordered = list(queries)
+    found: dict[str, list[dict]] = {}
+    misses = []
+    for query in dict.fromkeys(ordered):
+        results = _cache.get((root, query, limit))
+        if results is None:
+            misses.append(query)
+        else:
+            found[query] = results
+            _log.record(project, query, results, cached=True)
+
+    if misses:
+        for query, results in zip(misses, _run_uncached(misses, limit, root)):
+            _cache.put((root, query, limit), results)
+            _log.record(project, query, results)
+            found[query] = results
+    return [found[q] for q in ordered]
+
+
+def search(query: str, project: str | None = None, limit: int = 10, use_cache: bool = True) -> list[dict]:
+    """Run (or recall) one grepai query and log it.
+
+    Cached result lists are shared between callers; don't mutate them.
+    """
+    root, project = resolve_project(project)
+    key = (root, query, limit)
+
+    results = _cache.get(key) if use_cache else None
+    if results is not None:
+        _log.record(project, query, results, cached=True)
+        return results
+
+    results = _run_uncached([query], limit, root)[0]
+    _cache.put(key, results)
+    _log.record(project, query, results)
+    return results
+
+
+async def search_many(
+    queries: Iterable[str],
+    project: str | None = None,
+    limit: int = 10,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> list[list[dict]]:
+    """Run many queries at once without blocking the event loop.
+
+    With a worker, all cache misses go out as one pipelined batch; otherwise
+    at most `concurrency` grepai processes run at a time. Results come back
+    in query order; duplicates and cache hits don't spawn processes.
+    """
+    root, name = resolve_project(project)
+    ordered = list(queries)
+    # Starting a worker blocks until its index is loaded; keep that off the loop
+    if await asyncio.to_thread(_get_worker, root) is not None:
+        return await asyncio.to_thread(search_batch, ordered, project, limit)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    in_flight: dict[str, asyncio.Task] = {}
+
+    async def run(query: str) -> list[dict]:
+        key = (root, query, limit)
+        results = _cache.get(key)
+        if results is not None:
+            _log.record(name, query, results, cached=True)
+            return results
+        async with semaphore:
+            proc = await asyncio.create_subprocess_exec(
+                *_command(query, limit),
+                cwd=root,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            try:
+                stdout, _ = await asyncio.wait_for(proc.communicate(), SEARCH_TIMEOUT)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise
+        results = _parse(stdout.decode(errors="replace"))
+        _cache.put(key, results)
+        _log.record(name, query, results)
+        return results
+
+    for query in ordered:
+        if query not in in_flight:
+            in_flight[query] = asyncio.ensure_future(run(query))
+    return list(await asyncio.gather(*(in_flight[q] for q in ordered)))
+
+
+async def search_async(query: str, project: str | None = None, limit: int = 10) -> list[dict]:
+    """Single-query asyncio variant of search()."""
+    return (await search_many([query], project, limit))[0]
+
+
+def cache_clear() -> None:
+    _cache.clear()
+
+
+def flush_log() -> None:
+    _log.flush()
@@ -0,0 +1,327 @@
+"""
+Pre-commit Lint/Type Check Runner
+
+Runs Ruff and Pyright concurrently on the staged Python files and stops the
+commit on the first real failure (the other check is killed immediately).
+
+Results are cached per file content hash in the git directory, keyed on a
+fingerprint of the tool binaries and project config, so files that already
+passed are never re-checked until they change. Pyright's verdict on a file
+also depends on what it imports, so its entries are keyed on the file plus
+every local module it imports, directly or through other local modules:
+editing one of those re-checks the file, while unrelated edits and commits
+leave its entry valid.
+"""
+
+import ast
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from .utils import save_atomic
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = "scaffold-hook-cache.json"
+CACHE_VERSION = 2
+# Per-tool cap on remembered passing hashes (oldest dropped first)
+MAX_CACHED_HASHES = 5000
+# Files whose content changes tool behavior; any change invalidates the cache
+CONFIG_FILES = ("pyproject.toml", "ruff.toml", ".ruff.toml", "pyrightconfig.json", "setup.cfg")
+
+
+@dataclass
+class CheckResult:
+    """Outcome of one tool run"""
+    tool: str
+    passed: bool
+    report: str = ""
+    files_checked: list[str] = field(default_factory=list)
+    skipped: bool = False
+
+
+@dataclass
+class HookTool:
+    """A check to run over Python files"""
+    name: str
+    executable: str
+    build_command: Callable[[str, list[str]], list[str]]
+    evaluate: Callable[[int, str, str], tuple[bool, str]]
+    # Verdicts depend on other files (imports), not just the file checked
+    cross_file: bool = False
+
+
+def _ruff_command(executable: str, files: list[str]) -> list[str]:
+    return [executable, "check", *files]
+
+
+def _ruff_evaluate(returncode: int, stdout: str, stderr: str) -> tuple[bool, str]:
+    return returncode == 0, (stdout + stderr).strip()
+
+
+def _pyright_command(executable: str, files: list[str]) -> list[str]:
+    return [executable, "--pythonversion", "3.11", "--outputjson", *files]
+
+
+def _pyright_evaluate(returncode: int, stdout: str, stderr: str) -> tuple[bool, str]:
+    """Only type errors block; warnings and information are ignored (matches IDE behavior)."""
+    try:
+        data = json.loads(stdout)
+    except json.JSONDecodeError:
+        return returncode == 0, (stdout + stderr).strip()
+
+    errors = [d for d in data.get("generalDiagnostics", []) if d.get("severity") == "error"]
+    lines = []
+    for d in errors:
+        start = d.get("range", {}).get("start", {})
+        lines.append(
+            f"{d.get('file', '?')}:{start.get('line', 0) + 1}:{start.get('character', 0) + 1} "
+            f"- error: {d.get('message', '').strip()}"
+        )
+    return not errors, "\n".join(lines)
+
+
+DEFAULT_TOOLS: tuple[HookTool, ...] = (
+    HookTool("ruff", "ruff", _ruff_command, _ruff_evaluate),
+    HookTool("pyright", "pyright", _pyright_command, _pyright_evaluate, cross_file=True),
+)
+
+
+def staged_python_files() -> list[str]:
+    """Staged (added/copied/modified) .py files, relative to the repo root."""
+    result = subprocess.run(
+        ["git", "diff", "--cached", "--name-only", "--diff-filter=ACM", "-z"],
+        capture_output=True,
+        text=True,
+        timeout=30,
+        check=True,
+    )
+    return [p for p in result.stdout.split("\0") if p.endswith(".py")]
+
+
+def file_hash(path: str) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _module_files(base: Path, dotted: str) -> list[Path]:
+    """Local files `dotted` can load under `base`: the module and its packages' __init__"""
+    parts = dotted.split(".") if dotted else []
+    packages = [base.joinpath(*parts[:i]) for i in range(1, len(parts) + 1)] or [base]
+    candidates = [package / init for package in packages for init in ("__init__.py", "__init__.pyi")]
+    if parts:
+        candidates += [packages[-1].with_name(f"{parts[-1]}.py"), packages[-1].with_name(f"{parts[-1]}.pyi")]
+    return [candidate for candidate in candidates if candidate.is_file()]
+
+
+def imported_files(path: Path, source: bytes, roots: tuple[Path, ...]) -> set[Path]:
+    """Local files that `path` imports, resolved against `roots` (relative imports against its package)"""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return set()
+    modules: list[tuple[Path, str]] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.extend((base, alias.name) for alias in node.names for base in roots)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                package = path.parent
+                for _ in range(node.level - 1):
+                    package = package.parent
+                bases: tuple[Path, ...] = (package,)
+            else:
+                bases = roots
+            module = node.module or ""
+            for base in bases:
+                modules.append((base, module))
+                # `from package import name` may name a submodule
+                modules.extend((base, f"{module}.{alias.name}") for alias in node.names if alias.name != "*")
+    files: set[Path] = set()
+    for base, dotted in modules:
+        files.update(_module_files(base, dotted))
+    files.discard(path)
+    return files
+
+
+def dependency_keys(files: list[str], root: Path) -> dict[str, str]:
+    """Per file: a hash of its content and of every local module it imports, transitively.
+
+    Absolute imports resolve against `root`, `root/src` and the file's own
+    directory; anything that doesn't resolve to a local file (stdlib,
+    installed packages) is left to the tool fingerprint.
+    """
+    root = root.absolute()
+    search = tuple(base for base in (root, root / "src") if base.is_dir())
+    graph: dict[Path, tuple[bytes, set[Path]]] = {}
+
+    def node(path: Path) -> tuple[bytes, set[Path]]:
+        if path not in graph:
+            try:
+                source = path.read_bytes()
+            except OSError:
+                graph[path] = (b"missing", set())
+            else:
+                roots = (*search, path.parent)
+                graph[path] = (hashlib.sha256(source).digest(), imported_files(path, source, roots))
+        return graph[path]
+
+    keys = {}
+    for name in files:
+        start = root / name
+        closure = {start}
+        stack = [start]
+        while stack:
+            for dependency in node(stack.pop())[1]:
+                if dependency not in closure:
+                    closure.add(dependency)
+                    stack.append(dependency)
+        digest = hashlib.sha256()
+        for path in sorted(closure):
+            digest.update(os.path.relpath(path, root).encode() + b"\0")
+            digest.update(node(path)[0])
+        keys[name] = digest.hexdigest()
+    return keys
+
+
+def tools_fingerprint(tools: list[HookTool], root: Path) -> str:
+    """Cheap fingerprint of tool binaries (path + mtime) and project config contents."""
+    digest = hashlib.sha256()
+    for tool in tools:
+        resolved = shutil.which(tool.executable)
+        digest.update(f"{tool.name}={resolved}".encode())
+        if resolved:
+            digest.update(str(os.stat(resolved).st_mtime_ns).encode())
+    for name in CONFIG_FILES:
+        config = root / name
+        if config.exists():
+            digest.update(name.encode())
+            digest.update(config.read_bytes())
+    return digest.hexdigest()
+
+
+class CheckCache:
+    """Passing-file hashes per tool, stored in the git directory"""
+
+    def __init__(self, path: Path, fingerprint: str) -> None:
+        self.path = path
+        self.fingerprint = fingerprint
+        self.passed: dict[str, dict[str, None]] = {}
+        try:
+            data = json.loads(path.read_text())
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Ignoring unreadable hook cache {path}: {e}")
+            return
+        if data.get("version") == CACHE_VERSION and data.get("fingerprint") == fingerprint:
+            self.passed = {tool: dict.fromkeys(hashes) for tool, hashes in data.get("passed", {}).items()}
+
+    def is_passing(self, tool: str, digest: str) -> bool:
+        return digest in self.passed.get(tool, {})
+
+    def record(self, tool: str, digests: list[str]) -> None:
+        entries = self.passed.setdefault(tool, {})
+        for digest in digests:
+            entries.pop(digest, None)
+            entries[digest] = None
+        while len(entries) > MAX_CACHED_HASHES:
+            entries.pop(next(iter(entries)))
+
+    def save(self) -> None:
+        data = {
+            "version": CACHE_VERSION,
+            "fingerprint": self.fingerprint,
+            "passed": {tool: list(hashes) for tool, hashes in self.passed.items()},
+        }
+        try:
+            save_atomic(self.path, json.dumps(data))
+        except OSError as e:
+            logger.warning(f"Could not save hook cache {self.path}: {e}")
+
+
+async def _run_tool(tool: HookTool, executable: str, files: list[str]) -> CheckResult:
+    proc = await asyncio.create_subprocess_exec(
+        *tool.build_command(executable, files),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await proc.communicate()
+    except asyncio.CancelledError:
+        # Another check already failed; don't leave this one running
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    passed, report = tool.evaluate(
+        proc.returncode or 0,
+        stdout.decode(errors="replace"),
+        stderr.decode(errors="replace"),
+    )
+    return CheckResult(tool=tool.name, passed=passed, report=report, files_checked=files)
+
+
+async def run_checks(
+    files: list[str],
+    cache: CheckCache,
+    tools: tuple[HookTool, ...] = DEFAULT_TOOLS,
+    root: Optional[Path] = None,
+) -> list[CheckResult]:
+    """Run every tool concurrently on the files it hasn't already passed.
+
+    Cross-file tools are cached on dependency_keys, resolving imports from
+    `root` (the current directory by default). Returns as soon as any tool
+    fails, cancelling (and killing) the rest.
+    """
+    digests = {path: file_hash(path) for path in files}
+    dependencies = digests
+    if any(tool.cross_file for tool in tools):
+        dependencies = await asyncio.to_thread(dependency_keys, files, root or Path.cwd())
+    keys = {tool.name: dependencies if tool.cross_file else digests for tool in tools}
+    results: list[CheckResult] = []
+    tasks: dict[asyncio.Task, HookTool] = {}
+
+    for tool in tools:
+        executable = shutil.which(tool.executable)
+        if executable is None:
+            results.append(CheckResult(tool=tool.name, passed=True, skipped=True,
+                                       report=f"{tool.executable} not found on PATH"))
+            continue
+        pending = [p for p in files if not cache.is_passing(tool.name, keys[tool.name][p])]
+        if not pending:
+            results.append(CheckResult(tool=tool.name, passed=True, report="all files cached"))
+            continue
+        tasks[asyncio.create_task(_run_tool(tool, executable, pending))] = tool
+
+    waiting = set(tasks)
+    while waiting:
+        done, waiting = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            result = task.result()
+            results.append(result)
+            if result.passed:
+                cache.record(result.tool, [keys[result.tool][p] for p in result.files_checked])
+            else:
+                for other in waiting:
+                    other.cancel()
+                await asyncio.gather(*waiting, return_exceptions=True)
+                return results
+    return results
+
+
+def git_dir() -> Path:
+    result = subprocess.run(
+        ["git", "rev-parse", "--git-dir"],
+        capture_output=True,
+        text=True,
+        timeout=10,
+        check=True,
+    )
+    return Path(result.stdout.strip())
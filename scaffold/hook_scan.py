@@ -0,0 +1,170 @@
+"""
+Staged Diff Safety Scanner
+
+Streams a unified diff once (from `git diff --cached`, a commit range, or a
+file/stdin) and applies every safety rule to each added line in a single pass.
+Used by the pre-commit and pre-push hook templates and the safety-check CI job.
+
+For Python files read from git, deletion and credential findings are then
+re-decided by the AST scanner on the full post-change file, so strings and
+comments stop matching and aliased imports start to.
+
+Exit codes match the hooks: 0 = clean (or warnings only), 1 = blocked.
+"""
+
+import logging
+import re
+import subprocess
+from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+from .ast_scan import AST_RULE_IDS, AstCache, scan_file_cached
+from .safety import SafetyFinding, SafetyMatcher, unsuppressed
+
+logger = logging.getLogger(__name__)
+
+_NEW_HUNK = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@")
+
+EXIT_CLEAN = 0
+EXIT_BLOCKED = 1
+
+
+def scan_diff(
+    lines: Iterable[str],
+    matcher: SafetyMatcher,
+    added: dict[str, set[int]] | None = None,
+) -> Iterator[SafetyFinding]:
+    """Yield findings for added lines of a unified diff, tracking file and new-side line numbers.
+
+    If `added` is given, every added line number is recorded in it per path.
+    """
+    path = "?"
+    line_number = 0
+    in_hunk = False
+
+    for raw in lines:
+        line = raw.rstrip("\n")
+        if line.startswith("diff --git "):
+            in_hunk = False
+            continue
+        if not in_hunk:
+            if line.startswith("+++ "):
+                target = line[4:]
+                path = target.removeprefix("b/") if target != "/dev/null" else "?"
+            elif line.startswith("@@"):
+                match = _NEW_HUNK.match(line)
+                if match:
+                    line_number = int(match.group(1))
+                    in_hunk = True
+            continue
+
+        if line.startswith("@@"):
+            match = _NEW_HUNK.match(line)
+            if match:
+                line_number = int(match.group(1))
+            continue
+        if line.startswith("+"):
+            if added is not None:
+                added.setdefault(path, set()).add(line_number)
+            yield from matcher.scan_line(line[1:], path, line_number)
+            line_number += 1
+        elif line.startswith(" "):
+            line_number += 1
+        elif not line.startswith(("-", "\\")):
+            # Anything else (e.g. the next file's header) ends the hunk
+            in_hunk = False
+
+
+def git_diff_command(cached: bool = True, commit_range: str | None = None) -> list[str]:
+    """Build the git diff invocation for staged changes or a commit range."""
+    cmd = ["git", "diff", "--no-color", "--no-ext-diff", "--unified=0"]
+    if commit_range:
+        cmd.append(commit_range)
+    elif cached:
+        cmd.extend(["--cached", "--diff-filter=ACM"])
+    return cmd
+
+
+def scan_git_diff(
+    cmd: list[str],
+    matcher: SafetyMatcher,
+    added: dict[str, set[int]] | None = None,
+) -> list[SafetyFinding]:
+    """Run git diff and scan its output as it streams."""
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    ) as proc:
+        assert proc.stdout is not None
+        findings = list(scan_diff(proc.stdout, matcher, added))
+        returncode = proc.wait()
+
+    if returncode != 0:
+        raise RuntimeError(f"{' '.join(cmd)} exited with status {returncode}")
+    return findings
+
+
+def post_change_source(path: str, commit_range: str | None = None) -> bytes | None:
+    """The new-side content of `path`: the staged blob, the range's end commit, or the working tree."""
+    if commit_range is None:
+        spec = f":{path}"
+    elif ".." in commit_range:
+        spec = f"{commit_range.rsplit('..', 1)[1].lstrip('.') or 'HEAD'}:{path}"
+    else:
+        try:
+            return Path(path).read_bytes()
+        except OSError:
+            return None
+    result = subprocess.run(["git", "show", spec], capture_output=True, timeout=30)
+    return result.stdout if result.returncode == 0 else None
+
+
+def refine_python_findings(
+    findings: list[SafetyFinding],
+    added: dict[str, set[int]],
+    matcher: SafetyMatcher,
+    commit_range: str | None = None,
+    cache: AstCache | None = None,
+) -> list[SafetyFinding]:
+    """Replace regex deletion/credential findings in .py files with AST findings on added lines.
+
+    AST findings honor `# audit: allow[...]` like regex ones. Files that
+    can't be read or don't parse keep their regex findings.
+    """
+    cache = cache or AstCache()
+    enabled = {rule.rule_id for rule in matcher.rules} & AST_RULE_IDS
+    replaced: dict[str, list[SafetyFinding]] = {}
+    for path, lines in added.items():
+        if not path.endswith(".py"):
+            continue
+        data = post_change_source(path, commit_range)
+        if data is None:
+            continue
+        new_entries: dict[str, list[tuple[str, int]] | None] = {}
+        ast_findings = scan_file_cached(data, path, cache.entries, new_entries)
+        cache.update(new_entries)
+        if ast_findings is None:
+            continue
+        replaced[path] = unsuppressed(
+            [f for f in ast_findings if f.line in lines and f.rule_id in enabled], data.decode(errors="replace")
+        )
+        for f in replaced[path]:
+            f.blocking = f.rule_id not in matcher.warn_only
+
+    refined = [f for f in findings if not (f.path in replaced and f.rule_id in AST_RULE_IDS)]
+    for path_findings in replaced.values():
+        refined.extend(path_findings)
+    return refined
+
+
+def scan_stream(stream: IO[str], matcher: SafetyMatcher) -> list[SafetyFinding]:
+    """Scan a diff from an already-open stream (file or stdin)."""
+    return list(scan_diff(stream, matcher))
+
+
+def exit_code(findings: list[SafetyFinding]) -> int:
+    return EXIT_BLOCKED if any(f.blocking for f in findings) else EXIT_CLEAN
@@ -0,0 +1,245 @@
+"""
+Memory Profiling
+
+`scaffold review --profile-memory` traces allocations through one review
+round with tracemalloc, so an RSS spike can be pinned on response buffering,
+SDK objects or Rich rendering:
+
+- A snapshot is taken at the start and at each phase boundary of
+  run_review: load (document read, prompts compiled), dispatch (rules scanned,
+  reviewer prompts queued), gather (every reviewer answered) and save (round
+  published).
+- Allocations are attributed to the innermost non-stdlib frame, grouped by
+  package (openai, anthropic, httpx, rich, scaffold, ...) and by source line.
+- Each reviewer's peak is the highest traced memory while it was in flight.
+  Reviewers run concurrently, so the peaks of overlapping reviewers include
+  each other's allocations.
+
+The report goes to the console, and memory_profile_round_N.json is written
+next to the round. Sites and packages are keyed without machine-specific
+paths (site-packages/openai/_base_client.py:1012), so files from two
+releases can be diffed directly.
+"""
+
+import contextlib
+import json
+import os
+import platform
+import sysconfig
+import time
+import tracemalloc
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from rich.console import Console
+from rich.markup import escape
+from rich.table import Table
+
+from .utils import save_atomic
+
+PROFILE_VERSION = 1
+TRACE_FRAMES = 8
+TOP_SITES = 15
+
+_PACKAGE_DIR = str(Path(__file__).resolve().parent)
+_SITE_DIRS = tuple({sysconfig.get_paths()["purelib"], sysconfig.get_paths()["platlib"]})
+_STDLIB_DIR = sysconfig.get_paths()["stdlib"]
+# Our own bookkeeping isn't part of the round
+_IGNORED = (tracemalloc.__file__, __file__)
+
+
+@lru_cache(maxsize=4096)
+def site_name(filename: str) -> str:
+    """A source file without machine-specific path prefixes"""
+    for base in _SITE_DIRS:
+        if filename.startswith(base + os.sep):
+            return "site-packages/" + Path(filename[len(base) + 1:]).as_posix()
+    if filename.startswith(_PACKAGE_DIR + os.sep):
+        return "scaffold/" + Path(filename[len(_PACKAGE_DIR) + 1:]).as_posix()
+    if filename.startswith(_STDLIB_DIR + os.sep):
+        return "stdlib/" + Path(filename[len(_STDLIB_DIR) + 1:]).as_posix()
+    return Path(filename).name
+
+
+def package_of(site: str) -> str:
+    """Top-level package of a site: openai, rich, scaffold, stdlib, ..."""
+    root, _, rest = site.partition("/")
+    if root == "site-packages":
+        return rest.split("/", 1)[0].removesuffix(".py")
+    if root in ("scaffold", "stdlib"):
+        return root
+    return "other"
+
+
+def _owner(traceback: tracemalloc.Traceback) -> Optional[str]:
+    """The innermost frame outside the stdlib, or the innermost frame if all are stdlib.
+    None for the profiler's own allocations.
+
+    json.loads under an SDK call is the SDK's allocation, not the stdlib's.
+    """
+    frames = [(frame.filename, frame.lineno) for frame in reversed(traceback)]  # most recent first
+    if not frames or any(filename in _IGNORED for filename, _ in frames):
+        return None
+    for filename, lineno in frames:
+        site = site_name(filename)
+        if not site.startswith("stdlib/"):
+            return f"{site}:{lineno}"
+    return f"{site_name(frames[0][0])}:{frames[0][1]}"
+
+
+@dataclass
+class PhaseMark:
+    phase: str
+    elapsed: float  # seconds since the profile started
+    current: int  # traced bytes at the boundary
+    peak: int  # highest traced bytes since the previous boundary
+    sites: Dict[str, int] = field(default_factory=dict)  # owner site -> bytes live at the boundary
+
+
+class MemoryProfiler:
+    """tracemalloc snapshots at a review round's phase boundaries, plus per-reviewer peaks"""
+
+    def __init__(self, frames: int = TRACE_FRAMES, top: int = TOP_SITES) -> None:
+        self.frames = frames
+        self.top = top
+        self.marks: List[PhaseMark] = []
+        self.reviewers: Dict[str, int] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._started = 0.0
+        self._owns_tracing = False
+        self._phase_peak = 0
+
+    # --- sampling ----------------------------------------------------------
+
+    def _sample(self) -> Tuple[int, int]:
+        """(current, peak since the last sample); credits the peak to reviewers in flight"""
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self._phase_peak = max(self._phase_peak, peak)
+        for name in self._in_flight:
+            self._in_flight[name] = max(self._in_flight[name], peak)
+        return current, peak
+
+    def _sites(self) -> Dict[str, int]:
+        sites: Dict[str, int] = defaultdict(int)
+        for trace in tracemalloc.take_snapshot().traces:
+            owner = _owner(trace.traceback)
+            if owner is not None:
+                sites[owner] += trace.size
+        return dict(sites)
+
+    def start(self) -> None:
+        self.marks, self.reviewers, self._in_flight, self._phase_peak = [], {}, {}, 0
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracing = True
+        self._started = time.monotonic()
+        self.mark("start")
+
+    def mark(self, phase: str) -> None:
+        """Snapshot at a phase boundary"""
+        current, _ = self._sample()
+        peak, self._phase_peak = self._phase_peak, 0
+        self.marks.append(PhaseMark(phase, time.monotonic() - self._started, current, peak, self._sites()))
+
+    @contextlib.contextmanager
+    def track(self, reviewer: str) -> Iterator[None]:
+        """Attribute peaks to `reviewer` while the block runs"""
+        self._sample()
+        self._in_flight[reviewer] = 0
+        try:
+            yield
+        finally:
+            self._sample()
+            self.reviewers[reviewer] = max(self.reviewers.get(reviewer, 0), self._in_flight.pop(reviewer))
+
+    def stop(self) -> None:
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    # --- results -----------------------------------------------------------
+
+    def to_dict(self, **context: Any) -> Dict[str, Any]:
+        """Phases, per-reviewer peaks and per-phase diffs by site and package"""
+        diffs = []
+        for before, after in zip(self.marks, self.marks[1:]):
+            delta = {
+                site: after.sites.get(site, 0) - before.sites.get(site, 0)
+                for site in before.sites.keys() | after.sites.keys()
+            }
+            packages: Dict[str, int] = defaultdict(int)
+            for site, size in delta.items():
+                packages[package_of(site)] += size
+            top = sorted((item for item in delta.items() if item[1]), key=lambda item: -abs(item[1]))
+            diffs.append({
+                "from": before.phase,
+                "to": after.phase,
+                "packages": dict(sorted(packages.items(), key=lambda item: -abs(item[1]))),
+                "top_sites": [{"site": site, "size_diff": size} for site, size in top[:self.top]],
+            })
+        return {
+            "version": PROFILE_VERSION,
+            "python": platform.python_version(),
+            **context,
+            "peak": max((m.peak for m in self.marks), default=0),
+            "phases": [
+                {"phase": m.phase, "elapsed": round(m.elapsed, 3), "current": m.current, "peak": m.peak}
+                for m in self.marks
+            ],
+            "reviewers": {name: {"peak": peak} for name, peak in self.reviewers.items()},
+            "diffs": diffs,
+        }
+
+    def write(self, path: Path, **context: Any) -> Dict[str, Any]:
+        profile = self.to_dict(**context)
+        save_atomic(path, json.dumps(profile, indent=2))
+        return profile
+
+
+def _size(n: float) -> str:
+    for unit in ("B", "KiB"):
+        if abs(n) < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} MiB"
+
+
+def display_profile(profile: Dict[str, Any], path: Path, console: Console) -> None:
+    """Phase, reviewer and top-site tables for one round's profile"""
+    phases = Table(title=f"Memory by phase (peak {_size(profile['peak'])})")
+    phases.add_column("Phase")
+    phases.add_column("Elapsed", justify="right")
+    phases.add_column("Traced", justify="right")
+    phases.add_column("Peak", justify="right")
+    phases.add_column("Largest packages (change)")
+    for phase, diff in zip(profile["phases"][1:], profile["diffs"]):
+        packages = ", ".join(f"{escape(name)} {_size(size)}" for name, size in list(diff["packages"].items())[:3])
+        phases.add_row(
+            phase["phase"], f"{phase['elapsed']:.2f}s", _size(phase["current"]), _size(phase["peak"]), packages
+        )
+    console.print(phases)
+
+    if profile["reviewers"]:
+        reviewers = Table(title="Peak while each reviewer was in flight")
+        reviewers.add_column("Reviewer", style="cyan")
+        reviewers.add_column("Peak", justify="right")
+        for name, stats in profile["reviewers"].items():
+            reviewers.add_row(escape(name), _size(stats["peak"]))
+        console.print(reviewers)
+
+    # Sites that grew over the whole round, summed across phases
+    totals: Dict[str, int] = defaultdict(int)
+    for diff in profile["diffs"]:
+        for entry in diff["top_sites"]:
+            totals[entry["site"]] += entry["size_diff"]
+    sites = Table(title="Top allocation sites")
+    sites.add_column("Site")
+    sites.add_column("Change", justify="right")
+    for site, size in sorted(totals.items(), key=lambda item: -abs(item[1]))[:10]:
+        sites.add_row(escape(site), _size(size))
+    console.print(sites)
+    console.print(f"Memory profile: {escape(str(path))}")
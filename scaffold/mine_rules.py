@@ -0,0 +1,445 @@
+"""
+Git History Rule Miner
+
+Streams `git log -p` output one commit at a time, tokenizes the diff hunks of
+fix and revert commits, and counts recurring patterns. Patterns that recur
+often enough are written out as candidate REVIEW.md rules.
+
+Memory stays bounded regardless of history length: only the current commit is
+held in memory and the pattern counters are pruned once they grow past a cap.
+A checkpoint (last processed commit + counters) makes later runs incremental.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import subprocess
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import IO, Iterator
+
+from .utils import safe_slug, save_atomic
+
+logger = logging.getLogger(__name__)
+
+# ASCII record/unit separators keep the commit header unambiguous in the stream
+_RECORD_SEP = "\x1e"
+_UNIT_SEP = "\x1f"
+_LOG_FORMAT = f"--format={_RECORD_SEP}%H{_UNIT_SEP}%s"
+
+_FIX_SUBJECT = re.compile(r"\b(fix(e[sd])?|bug|hotfix|patch(ed)?|correct(ed)?|repair(ed)?)\b", re.IGNORECASE)
+_REVERT_SUBJECT = re.compile(r'^Revert\s+"', re.IGNORECASE)
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,(\d+))? \+\d+(?:,(\d+))? @@ ?(.*)$")
+_TOKEN = re.compile(r"""("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|[A-Za-z_][A-Za-z0-9_]*|\d+(?:\.\d+)?|\S)""")
+
+# Hunks larger than this are refactors, not fix patterns
+MAX_HUNK_LINES = 3
+# Cap on distinct patterns tracked per repository before pruning
+MAX_TRACKED_PATTERNS = 50_000
+CHECKPOINT_VERSION = 1
+
+
+@dataclass
+class Hunk:
+    """A single diff hunk (zero context lines)"""
+    path: str
+    context: str
+    removed: list[str] = field(default_factory=list)
+    added: list[str] = field(default_factory=list)
+
+
+@dataclass
+class Commit:
+    """A commit and its hunks, parsed from the log stream"""
+    sha: str
+    subject: str
+    hunks: list[Hunk] = field(default_factory=list)
+
+    @property
+    def is_revert(self) -> bool:
+        return bool(_REVERT_SUBJECT.match(self.subject))
+
+    @property
+    def is_fix(self) -> bool:
+        return bool(_FIX_SUBJECT.search(self.subject))
+
+
+@dataclass
+class MiningState:
+    """Counters persisted between runs for incremental mining"""
+    last_commit: str | None = None
+    commits_seen: int = 0
+    fix_patterns: Counter = field(default_factory=Counter)
+    pattern_examples: dict[str, str] = field(default_factory=dict)
+    pattern_globs: dict[str, str] = field(default_factory=dict)
+    hotspots: Counter = field(default_factory=Counter)
+    reverted_files: Counter = field(default_factory=Counter)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": CHECKPOINT_VERSION,
+            "last_commit": self.last_commit,
+            "commits_seen": self.commits_seen,
+            "fix_patterns": dict(self.fix_patterns),
+            "pattern_examples": self.pattern_examples,
+            "pattern_globs": self.pattern_globs,
+            "hotspots": dict(self.hotspots),
+            "reverted_files": dict(self.reverted_files),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MiningState":
+        if data.get("version") != CHECKPOINT_VERSION:
+            return cls()
+        return cls(
+            last_commit=data.get("last_commit"),
+            commits_seen=data.get("commits_seen", 0),
+            fix_patterns=Counter(data.get("fix_patterns", {})),
+            pattern_examples=data.get("pattern_examples", {}),
+            pattern_globs=data.get("pattern_globs", {}),
+            hotspots=Counter(data.get("hotspots", {})),
+            reverted_files=Counter(data.get("reverted_files", {})),
+        )
+
+
+@dataclass
+class CandidateRule:
+    """A rule suggestion derived from history"""
+    rule_id: str
+    description: str
+    support: int
+    pattern: str | None = None
+    glob: str | None = None
+    severity: str = "warning"
+
+    def to_markdown(self) -> str:
+        lines = [f"### {self.rule_id}"]
+        if self.pattern:
+            lines.append(f"- **pattern:** `{self.pattern}`")
+        if self.glob:
+            lines.append(f"- **glob:** `{self.glob}`")
+        lines.append(f"- **severity:** {self.severity}")
+        lines.append(f"- **support:** {self.support}")
+        lines.append("")
+        lines.append(self.description)
+        return "\n".join(lines)
+
+
+def parse_log_stream(stream: IO[str]) -> Iterator[Commit]:
+    """Parse `git log -p --unified=0` output, yielding one commit at a time.
+
+    Hunk bodies are consumed by the line counts in their `@@` header, so a
+    removed "-- x" or added "++ y" line is never mistaken for a file header.
+    """
+    commit: Commit | None = None
+    hunk: Hunk | None = None
+    path: str | None = None
+    old_left = new_left = 0
+
+    for raw in stream:
+        line = raw.rstrip("\n")
+        if line.startswith(_RECORD_SEP):
+            if commit is not None:
+                yield commit
+            sha, _, subject = line[1:].partition(_UNIT_SEP)
+            commit = Commit(sha=sha, subject=subject)
+            hunk = None
+            path = None
+            old_left = new_left = 0
+            continue
+        if commit is None:
+            continue
+        if old_left or new_left:
+            if line.startswith("-"):
+                old_left -= 1
+                if hunk is not None:
+                    hunk.removed.append(line[1:])
+                continue
+            if line.startswith("+"):
+                new_left -= 1
+                if hunk is not None:
+                    hunk.added.append(line[1:])
+                continue
+            if line.startswith(" "):
+                old_left -= 1
+                new_left -= 1
+                continue
+            if line.startswith("\\"):
+                continue
+            # Shorter than its header said; treat the line as a header
+            old_left = new_left = 0
+        if line.startswith("diff --git "):
+            hunk = None
+            path = None
+        elif line.startswith("--- "):
+            source = line[4:]
+            path = None if source == "/dev/null" else source.removeprefix("a/")
+        elif line.startswith("+++ "):
+            # Deleted files keep the path from the --- side
+            target = line[4:]
+            if target != "/dev/null":
+                path = target.removeprefix("b/")
+        elif line.startswith("@@"):
+            match = _HUNK_HEADER.match(line)
+            if match:
+                old_left, new_left = (int(n) if n is not None else 1 for n in match.group(1, 2))
+            if match and path:
+                hunk = Hunk(path=path, context=match.group(3).strip())
+                commit.hunks.append(hunk)
+            else:
+                hunk = None
+
+    if commit is not None:
+        yield commit
+
+
+def tokenize(line: str) -> list[str]:
+    """Split a source line into normalized tokens (literals collapse to STR/NUM)."""
+    tokens = []
+    for token in _TOKEN.findall(line):
+        if token[0] in "\"'":
+            tokens.append("STR")
+        elif token[0].isdigit():
+            tokens.append("NUM")
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def tokens_to_pattern(tokens: list[str]) -> str:
+    """Build a whitespace-tolerant regex matching a normalized token sequence."""
+    parts = []
+    for token in tokens:
+        if token == "STR":
+            parts.append(r"""(?:"[^"]*"|'[^']*')""")
+        elif token == "NUM":
+            parts.append(r"\d+(?:\.\d+)?")
+        else:
+            parts.append(re.escape(token))
+    return r"\s*".join(parts)
+
+
+def _glob_for(path: str) -> str:
+    suffix = Path(path).suffix
+    return f"*{suffix}" if suffix else Path(path).name
+
+
+def update_state(state: MiningState, commit: Commit) -> None:
+    """Fold a single commit into the running counters."""
+    state.commits_seen += 1
+    state.last_commit = commit.sha
+
+    if commit.is_revert:
+        for path in {h.path for h in commit.hunks}:
+            state.reverted_files[path] += 1
+        return
+
+    if not commit.is_fix:
+        return
+
+    seen_patterns = set()
+    for hunk in commit.hunks:
+        state.hotspots[f"{hunk.path}::{hunk.context}"] += 1
+
+        if not hunk.removed or len(hunk.removed) > MAX_HUNK_LINES or len(hunk.added) > MAX_HUNK_LINES:
+            continue
+        removed_tokens = [t for line in hunk.removed for t in tokenize(line)]
+        if len(removed_tokens) < 2:
+            continue
+        key = " ".join(removed_tokens)
+        # Count each pattern once per commit so one sweeping fix doesn't dominate
+        if key in seen_patterns:
+            continue
+        seen_patterns.add(key)
+        state.fix_patterns[key] += 1
+        state.pattern_examples.setdefault(key, hunk.removed[0].strip()[:200])
+        state.pattern_globs.setdefault(key, _glob_for(hunk.path))
+
+    if len(state.fix_patterns) > MAX_TRACKED_PATTERNS:
+        _prune(state)
+
+
+def _prune(state: MiningState) -> None:
+    """Drop the least frequent half of the tracked patterns."""
+    keep = dict(state.fix_patterns.most_common(MAX_TRACKED_PATTERNS // 2))
+    state.fix_patterns = Counter(keep)
+    state.pattern_examples = {k: v for k, v in state.pattern_examples.items() if k in keep}
+    state.pattern_globs = {k: v for k, v in state.pattern_globs.items() if k in keep}
+    if len(state.hotspots) > MAX_TRACKED_PATTERNS:
+        state.hotspots = Counter(dict(state.hotspots.most_common(MAX_TRACKED_PATTERNS // 2)))
+
+
+def candidate_rules(state: MiningState, min_support: int = 3) -> list[CandidateRule]:
+    """Turn counters into candidate rules, most frequent first."""
+    rules = []
+
+    for key, count in state.fix_patterns.most_common():
+        if count < min_support:
+            break
+        tokens = key.split(" ")
+        example = state.pattern_examples.get(key, key)
+        rules.append(CandidateRule(
+            rule_id=f"mined-fix-{safe_slug(key)[:40] or 'pattern'}",
+            description=f"Code like `{example}` was changed by {count} separate fix commits. "
+                        "Check whether this usage is still correct.",
+            support=count,
+            pattern=tokens_to_pattern(tokens),
+            glob=state.pattern_globs.get(key),
+        ))
+
+    for key, count in state.hotspots.most_common():
+        if count < min_support:
+            break
+        path, _, context = key.partition("::")
+        where = f"`{context}` in `{path}`" if context else f"`{path}`"
+        rules.append(CandidateRule(
+            rule_id=f"mined-hotspot-{safe_slug(key)[:40]}",
+            description=f"{where} has been touched by {count} fix commits. Review changes here with extra care.",
+            support=count,
+            glob=path,
+            severity="info",
+        ))
+
+    for path, count in state.reverted_files.most_common():
+        if count < min_support:
+            break
+        rules.append(CandidateRule(
+            rule_id=f"mined-revert-{safe_slug(path)[:40]}",
+            description=f"`{path}` has been involved in {count} reverted commits. Ask for tests covering the change.",
+            support=count,
+            glob=path,
+            severity="info",
+        ))
+
+    return rules
+
+
+def _repo_slug(repo: Path, output_dir: Path) -> str:
+    """Repo name plus a hash of its resolved path, so a/app and b/app don't share files"""
+    resolved = repo.resolve()
+    digest = hashlib.sha256(str(resolved).encode()).hexdigest()[:8]
+    return safe_slug(f"{resolved.name}_{digest}", base_path=output_dir)
+
+
+def load_checkpoint(path: Path) -> MiningState:
+    """Load a saved mining state, or start fresh if missing/corrupt."""
+    if not path.exists():
+        return MiningState()
+    try:
+        return MiningState.from_dict(json.loads(path.read_text()))
+    except (json.JSONDecodeError, OSError) as e:
+        logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+        return MiningState()
+
+
+def _is_ancestor(repo: Path, sha: str) -> bool:
+    result = subprocess.run(
+        ["git", "-C", str(repo), "merge-base", "--is-ancestor", sha, "HEAD"],
+        capture_output=True,
+        timeout=30,
+        check=False,
+    )
+    return result.returncode == 0
+
+
+def mine_repository(
+    repo: Path,
+    output_dir: Path,
+    min_support: int = 3,
+    full: bool = False,
+) -> dict:
+    """Mine one repository incrementally and write its candidate rules.
+
+    Returns a small summary dict (picklable, so it can cross process boundaries).
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    repo_slug = _repo_slug(repo, output_dir)
+    checkpoint = output_dir / f"{repo_slug}.checkpoint.json"
+    state = MiningState() if full else load_checkpoint(checkpoint)
+
+    if state.last_commit and not _is_ancestor(repo, state.last_commit):
+        logger.warning(f"Checkpoint {state.last_commit[:12]} is not in {repo} history; re-mining from scratch")
+        state = MiningState()
+
+    cmd = ["git", "-C", str(repo), "log", "--reverse", "--no-merges", "--no-color",
+           "-p", "--unified=0", _LOG_FORMAT]
+    if state.last_commit:
+        cmd.append(f"{state.last_commit}..HEAD")
+
+    new_commits = 0
+    # stderr goes to a file: a pipe nobody reads until stdout ends can fill up and deadlock git
+    with tempfile.TemporaryFile() as stderr_file, subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=stderr_file,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    ) as proc:
+        assert proc.stdout is not None
+        for commit in parse_log_stream(proc.stdout):
+            update_state(state, commit)
+            new_commits += 1
+        returncode = proc.wait()
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode("utf-8", errors="replace")
+
+    if returncode != 0:
+        raise RuntimeError(f"git log failed for {repo}: {stderr.strip()}")
+
+    rules = candidate_rules(state, min_support=min_support)
+    rules_file = output_dir / f"{repo_slug}.REVIEW.candidates.md"
+    header = (
+        f"# Candidate review rules: {repo.resolve().name}\n\n"
+        f"Mined from {state.commits_seen} commits on {datetime.now(UTC).date().isoformat()}. "
+        "Curate before copying into REVIEW.md.\n\n## Rules\n"
+    )
+    save_atomic(rules_file, header + "\n\n".join(r.to_markdown() for r in rules) + "\n")
+    save_atomic(checkpoint, json.dumps(state.to_dict()))
+
+    return {
+        "repo": str(repo),
+        "new_commits": new_commits,
+        "commits_seen": state.commits_seen,
+        "rules": len(rules),
+        "rules_file": str(rules_file),
+    }
+
+
+def mine_repositories(
+    repos: list[Path],
+    output_dir: Path,
+    min_support: int = 3,
+    full: bool = False,
+    workers: int | None = None,
+) -> list[dict]:
+    """Mine several repositories, one per worker process.
+
+    A repository that fails gets {"repo", "error"} instead of a summary.
+    """
+    workers = workers or min(len(repos), os.cpu_count() or 1)
+    summaries = []
+    if workers <= 1 or len(repos) <= 1:
+        for repo in repos:
+            try:
+                summaries.append(mine_repository(repo, output_dir, min_support, full))
+            except Exception as e:
+                logger.error(f"Mining failed for {repo}: {e}")
+                summaries.append({"repo": str(repo), "error": str(e)})
+        return summaries
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(mine_repository, r, output_dir, min_support, full): r for r in repos}
+        for future, repo in futures.items():
+            try:
+                summaries.append(future.result())
+            except Exception as e:
+                logger.error(f"Mining failed for {repo}: {e}")
+                summaries.append({"repo": str(repo), "error": str(e)})
+    return summaries
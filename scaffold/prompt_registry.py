@@ -0,0 +1,142 @@
+"""
+Prompt Registry
+
+Reviewer prompt files are compiled once into `PromptTemplate`s and shared by
+every reviewer, document and round that uses them. Templates are cached by
+content hash. That hash is the prompt's version, and it is recorded on every
+ReviewResult so cached and stored results can be traced to the exact prompt
+that produced them.
+
+Templates may use {{PROJECT_NAME}}, {{RULES}} and {{LANGUAGE}}. A prompt
+without {{RULES}} gets the REVIEW.md rules appended, as before.
+
+Each lookup is a stat(). A file is only read again when its mtime or size
+changes, so an edited prompt is picked up without a restart. Long-running
+modes (watch, daemons) call `refresh()` between rounds to reload every
+changed prompt at once and find out which ones changed.
+"""
+
+import hashlib
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+VARIABLES = ("PROJECT_NAME", "RULES", "LANGUAGE")
+_VARIABLE = re.compile(r"\{\{([A-Z][A-Z0-9_]*)\}\}")
+
+
+def prompt_version(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:12]
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A prompt split once into literal text and {{VARIABLE}} slots"""
+    text: str
+    version: str
+    literals: Tuple[str, ...]
+    names: Tuple[str, ...]
+
+    @classmethod
+    def compile(cls, text: str) -> "PromptTemplate":
+        pieces = _VARIABLE.split(text)
+        return cls(text, prompt_version(text), tuple(pieces[0::2]), tuple(pieces[1::2]))
+
+    def uses(self, name: str) -> bool:
+        return name in self.names
+
+    def render(self, values: Mapping[str, str]) -> str:
+        """Fill the slots; unknown {{NAMES}} are left as written"""
+        if not self.names:
+            return self.text
+        out = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            if name in values:
+                out.append(values[name])
+            elif name in VARIABLES:
+                out.append("")
+            else:
+                out.append(f"{{{{{name}}}}}")
+            out.append(literal)
+        return "".join(out)
+
+
+class PromptRegistry:
+    """Compiled prompt templates, cached by content hash until their file changes"""
+
+    def __init__(self) -> None:
+        self._files: Dict[Path, Tuple[int, int, str]] = {}  # path -> (mtime_ns, size, version)
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._listings: Dict[Tuple[Path, str], Tuple[int, List[Path]]] = {}
+        self._lock = threading.Lock()
+
+    def template(self, path: Path) -> PromptTemplate:
+        stat = path.stat()
+        with self._lock:
+            cached = self._files.get(path)
+            if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                return self._templates[cached[2]]
+        text = path.read_text()
+        version = prompt_version(text)
+        with self._lock:
+            template = self._templates.get(version)
+            if template is None:
+                template = self._templates[version] = PromptTemplate.compile(text)
+            self._files[path] = (stat.st_mtime_ns, stat.st_size, version)
+        return template
+
+    def get(self, path: Path) -> str:
+        return self.template(path).text
+
+    def version(self, path: Path) -> str:
+        return self.template(path).version
+
+    def preload(self, paths: Iterable[Path]) -> None:
+        """Compile prompts up front; a missing one fails its reviewer later, not here"""
+        for path in paths:
+            try:
+                self.template(path)
+            except OSError:
+                continue
+
+    def prompt_files(self, directory: Path, pattern: str = "*.md") -> List[Path]:
+        """Sorted prompt files in `directory`, re-globbed only when it changes"""
+        mtime = directory.stat().st_mtime_ns
+        key = (directory, pattern)
+        with self._lock:
+            cached = self._listings.get(key)
+        if cached and cached[0] == mtime:
+            return list(cached[1])
+        files = sorted(directory.glob(pattern))
+        with self._lock:
+            self._listings[key] = (mtime, files)
+        return list(files)
+
+    def refresh(self) -> List[Path]:
+        """Reload every known prompt that changed on disk; returns the changed paths"""
+        with self._lock:
+            known = dict(self._files)
+        changed = []
+        for path, (mtime, size, version) in known.items():
+            try:
+                stat = path.stat()
+            except OSError:
+                with self._lock:
+                    self._files.pop(path, None)
+                changed.append(path)
+                continue
+            if (stat.st_mtime_ns, stat.st_size) != (mtime, size) and self.template(path).version != version:
+                changed.append(path)
+        return changed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._files.clear()
+            self._templates.clear()
+            self._listings.clear()
+
+
+# Shared by the CLI, review and batch_review
+PROMPTS = PromptRegistry()
@@ -0,0 +1,541 @@
+"""
+Review Providers
+
+Each reviewer backend ("openai", "anthropic", "deepseek", "ollama", ...) is a
+`Provider` subclass. It declares its own concurrency limit, per-call timeout
+and retry policy, and implements `complete(model, prompt)`. Reviews pass
+`PromptParts` so the document is shared, not copied, across reviewers;
+providers that accept multi-block messages override `complete_parts`.
+
+Failures are classified before anything is retried:
+- fatal: config errors, 4xx. Raised at once.
+- rate limited: 429. Retried after Retry-After or a backoff.
+- retryable: timeouts, connection errors, 5xx. Retried with backoff.
+Retryable failures also feed a per-provider circuit breaker. After
+`failure_threshold` in a row, every call to that provider fails fast until
+`reset_timeout` passes; then one half-open probe decides whether it closes.
+
+Providers are looked up by name in a `ProviderRegistry`. The built-in ones,
+and any third-party ones registered under the `scaffold.providers` entry
+point group, are referenced as "module:attr" strings. They are only imported
+on first use. Provider SDKs (openai, anthropic) are imported when a client
+is first created, so an Ollama-only run never loads them.
+
+Third-party provider, in its own package's pyproject.toml:
+
+    [project.entry-points."scaffold.providers"]
+    mistral = "my_package.review:MistralProvider"
+"""
+
+import asyncio
+import importlib
+import logging
+import os
+import subprocess
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from importlib.metadata import EntryPoint, entry_points
+from typing import Any, Dict, List, Optional, Union
+
+from . import events
+
+try:
+    from api_trust_tracker import track
+except ImportError:
+    track = lambda resp, *a, **kw: resp
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "scaffold.providers"
+SYSTEM_PROMPT = "You are a thorough, critical reviewer."
+
+BUILTIN_PROVIDERS = {
+    "openai": "scaffold.providers:OpenAIProvider",
+    "anthropic": "scaffold.providers:AnthropicProvider",
+    "deepseek": "scaffold.providers:DeepSeekProvider",
+    "ollama": "scaffold.providers:OllamaProvider",
+    "google": "scaffold.providers:GoogleProvider",
+}
+
+
+@dataclass
+class ProviderSettings:
+    """Credentials and hosts handed to every provider"""
+    openai_key: Optional[str] = None
+    anthropic_key: Optional[str] = None
+    google_key: Optional[str] = None
+    deepseek_key: Optional[str] = None
+    ollama_host: Optional[str] = None
+
+
+class PromptParts(tuple):
+    """A prompt as ordered text pieces, e.g. (instructions, document).
+
+    Reviewers share the document piece instead of each building its own
+    concatenated copy. Providers that can send several text blocks pass the
+    pieces through as-is; str() joins them for those that can't.
+    """
+
+    def __str__(self) -> str:
+        return "".join(self)
+
+
+Prompt = Union[str, PromptParts]
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = 3
+    min_wait: float = 2.0
+    max_wait: float = 10.0
+    rate_limit_attempts: int = 5
+    max_rate_limit_wait: float = 60.0
+
+    def backoff(self, attempt: int) -> float:
+        return min(self.max_wait, max(self.min_wait, 2.0 ** attempt))
+
+
+RETRYABLE = "retryable"
+FATAL = "fatal"
+RATE_LIMITED = "rate_limited"
+
+# Raised for problems with the request or local setup; retrying can't help
+_FATAL_TYPES = (ValueError, TypeError, KeyError, AttributeError, NotImplementedError, FileNotFoundError, PermissionError)
+_RETRYABLE_STATUS = {408, 409, 425}
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def classify_error(exc: BaseException) -> str:
+    """Sort an exception into RETRYABLE, FATAL or RATE_LIMITED.
+
+    Works on the openai/anthropic SDK errors by duck typing (status_code,
+    class names), so no SDK has to be imported to classify.
+    """
+    if isinstance(exc, CircuitOpenError):
+        return FATAL
+    status = _status_code(exc)
+    name = type(exc).__name__
+    if status == 429 or "RateLimit" in name:
+        return RATE_LIMITED
+    if status is not None:
+        return RETRYABLE if status >= 500 or status in _RETRYABLE_STATUS else FATAL
+    if isinstance(exc, (TimeoutError, ConnectionError)) or "Timeout" in name or "Connection" in name:
+        return RETRYABLE
+    if isinstance(exc, _FATAL_TYPES):
+        return FATAL
+    return RETRYABLE
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds from a Retry-After header, when the error carries one"""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitOpenError(RuntimeError):
+    """The provider's circuit breaker is open; the call was not attempted"""
+
+
+class CircuitBreaker:
+    """closed -> (failure_threshold consecutive failures) -> open
+    -> (reset_timeout) -> half-open: one probe; success closes, failure reopens"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def describe(self) -> str:
+        state = self.state
+        if state == self.OPEN:
+            remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+            return f"circuit open, retry in {remaining:.0f}s"
+        if state == self.HALF_OPEN:
+            return "circuit half-open"
+        return ""
+
+    def before_call(self) -> bool:
+        """Fail fast while open; returns True when this call is the half-open probe"""
+        state = self.state
+        if state == self.OPEN or (state == self.HALF_OPEN and self._probing):
+            raise CircuitOpenError(
+                f"{self.name} circuit open after {self.failures} consecutive failures; failing fast"
+            )
+        if state == self.HALF_OPEN:
+            self._probing = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """The probe ended without a verdict (cancelled); let the next call probe"""
+        self._probing = False
+
+    def record_success(self) -> None:
+        if self._state != self.CLOSED:
+            logger.info(f"{self.name} circuit closed")
+        self.failures = 0
+        self._state = self.CLOSED
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                logger.warning(f"{self.name} circuit opened after {self.failures} consecutive failures")
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class Provider:
+    """Base class for review backends"""
+
+    name = ""
+    concurrency = 4
+    timeout = 300.0
+    retry = RetryPolicy()
+    failure_threshold = 5
+    reset_timeout = 30.0
+
+    def __init__(self, settings: ProviderSettings) -> None:
+        self.settings = settings
+        self.breaker = CircuitBreaker(self.name or type(self).__name__, self.failure_threshold, self.reset_timeout)
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+    def classify(self, exc: BaseException) -> str:
+        """Override for provider-specific errors; see classify_error"""
+        return classify_error(exc)
+
+    async def complete(self, model: str, prompt: str) -> Dict[str, Any]:
+        """Return {"content": str, "cost": float, "tokens": int}"""
+        raise NotImplementedError
+
+    async def complete_parts(self, model: str, parts: PromptParts) -> Dict[str, Any]:
+        """complete() for a multi-part prompt; override to avoid joining the parts"""
+        return await self.complete(model, str(parts))
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return semaphore
+
+    async def call(self, model: str, prompt: Prompt, rate_limiter: Any = None) -> Dict[str, Any]:
+        """complete() under this provider's concurrency, timeout, retry policy and breaker.
+
+        `rate_limiter` (anything with an async acquire()) is awaited before
+        every attempt, retries included.
+        """
+        failures = 0
+        rate_limited = 0
+        last_error: Optional[Exception] = None
+        async with self._semaphore():
+            while True:
+                try:
+                    probe = self.breaker.before_call()
+                except CircuitOpenError:
+                    # This call's own failures tripped the breaker; report the real cause
+                    if last_error is not None:
+                        raise last_error
+                    raise
+                try:
+                    if rate_limiter is not None:
+                        await rate_limiter.acquire()
+                except BaseException:
+                    if probe:
+                        self.breaker.release_probe()
+                    raise
+                try:
+                    if isinstance(prompt, PromptParts):
+                        attempt = self.complete_parts(model, prompt)
+                    else:
+                        attempt = self.complete(model, prompt)
+                    result = await asyncio.wait_for(attempt, self.timeout)
+                except Exception as e:
+                    last_error = e
+                    kind = self.classify(e)
+                    if kind == RETRYABLE:
+                        self.breaker.record_failure()
+                        failures += 1
+                        if failures >= self.retry.attempts:
+                            raise
+                        delay = self.retry.backoff(failures)
+                    else:
+                        # The provider answered (4xx/429) or the fault is ours: it isn't down
+                        self.breaker.record_success()
+                        if kind == FATAL:
+                            raise
+                        rate_limited += 1
+                        if rate_limited >= self.retry.rate_limit_attempts:
+                            raise
+                        delay = retry_after(e)
+                        if delay is None:
+                            delay = self.retry.backoff(rate_limited + 1)
+                        delay = min(delay, self.retry.max_rate_limit_wait)
+                    logger.warning(f"{self.name}: {kind} error ({type(e).__name__}: {e}); retrying in {delay:.1f}s")
+                    events.emit("retry", kind=kind, attempt=failures + rate_limited, delay=round(delay, 3),
+                                error=f"{type(e).__name__}: {e}")
+                    await asyncio.sleep(delay)
+                except BaseException:
+                    # Cancelled mid-attempt: no verdict on the provider, so don't hold the probe
+                    if probe:
+                        self.breaker.release_probe()
+                    raise
+                else:
+                    self.breaker.record_success()
+                    return result
+
+
+def text_blocks(parts: PromptParts) -> List[Dict[str, str]]:
+    """Message content blocks that reference the parts rather than copy them"""
+    return [{"type": "text", "text": part} for part in parts if part]
+
+
+class _ClientProvider(Provider):
+    """A provider backed by a lazily created SDK client"""
+
+    def __init__(self, settings: ProviderSettings) -> None:
+        super().__init__(settings)
+        self._client: Any = None
+
+    def make_client(self) -> Any:
+        raise NotImplementedError
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            self._client = self.make_client()
+        return self._client
+
+    @client.setter
+    def client(self, value: Any) -> None:
+        self._client = value
+
+
+class OpenAIProvider(_ClientProvider):
+    name = "openai"
+    concurrency = 8
+
+    def make_client(self) -> Any:
+        if not self.settings.openai_key:
+            return None
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(api_key=self.settings.openai_key)
+
+    async def complete(self, model: str, prompt: str) -> Dict[str, Any]:
+        return await self._create(model, prompt)
+
+    async def complete_parts(self, model: str, parts: PromptParts) -> Dict[str, Any]:
+        return await self._create(model, text_blocks(parts))
+
+    async def _create(self, model: str, content: Union[str, List[Dict[str, str]]]) -> Dict[str, Any]:
+        if not self.client:
+            raise ValueError("OpenAI client not initialized")
+
+        response = await self.client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": content}
+            ],
+            temperature=0.7
+        )
+        track(response, "openai", project="project-scaffolding", caller="review.openai")
+
+        return {
+            "content": response.choices[0].message.content,
+            "cost": 0.0,
+            "tokens": response.usage.total_tokens
+        }
+
+
+class DeepSeekProvider(_ClientProvider):
+    name = "deepseek"
+    concurrency = 8
+
+    def make_client(self) -> Any:
+        if not self.settings.deepseek_key:
+            return None
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(api_key=self.settings.deepseek_key, base_url="https://api.deepseek.com/v1")
+
+    async def complete(self, model: str, prompt: str) -> Dict[str, Any]:
+        if not self.client:
+            raise ValueError("DeepSeek client not initialized")
+
+        response = await self.client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.0
+        )
+        track(response, "openai", project="project-scaffolding", caller="review.deepseek")
+
+        return {
+            "content": response.choices[0].message.content,
+            "cost": 0.0,
+            "tokens": response.usage.total_tokens
+        }
+
+
+class AnthropicProvider(_ClientProvider):
+    name = "anthropic"
+    concurrency = 4
+
+    def make_client(self) -> Any:
+        if not self.settings.anthropic_key:
+            return None
+        from anthropic import AsyncAnthropic
+        return AsyncAnthropic(api_key=self.settings.anthropic_key)
+
+    async def complete(self, model: str, prompt: str) -> Dict[str, Any]:
+        return await self._create(model, prompt)
+
+    async def complete_parts(self, model: str, parts: PromptParts) -> Dict[str, Any]:
+        return await self._create(model, text_blocks(parts))
+
+    async def _create(self, model: str, content: Union[str, List[Dict[str, str]]]) -> Dict[str, Any]:
+        if not self.client:
+            raise ValueError("Anthropic client not initialized")
+
+        response = await self.client.messages.create(
+            model=model,
+            max_tokens=4096,
+            messages=[
+                {"role": "user", "content": content}
+            ]
+        )
+        track(response, "anthropic", project="project-scaffolding", caller="review.anthropic")
+
+        return {
+            "content": response.content[0].text,
+            "cost": 0.0,
+            "tokens": response.usage.input_tokens + response.usage.output_tokens
+        }
+
+
+class OllamaProvider(Provider):
+    """Local review through the Ollama CLI"""
+
+    name = "ollama"
+    concurrency = 1  # one local model run at a time
+    timeout = 310.0  # the CLI's own 300s timeout fires first
+    retry = RetryPolicy(attempts=1)
+
+    async def complete(self, model: str, prompt: str) -> Dict[str, Any]:
+        return await asyncio.to_thread(self._run, model, prompt)
+
+    def _run(self, model: str, prompt: str) -> Dict[str, Any]:
+        try:
+            env = os.environ.copy()
+            if self.settings.ollama_host:
+                env["OLLAMA_HOST"] = self.settings.ollama_host
+
+            # Industrial Hardening: subprocess with timeout and check
+            result = subprocess.run(
+                ["ollama", "run", model],
+                input=prompt,
+                capture_output=True,
+                text=True,
+                timeout=300,  # Local models can be slow
+                check=True,
+                env=env
+            )
+
+            return {
+                "content": result.stdout.strip(),
+                "cost": 0.0,  # Local usage is free
+                "tokens": 0   # Hard to estimate tokens without extra dependencies
+            }
+        except subprocess.TimeoutExpired:
+            raise TimeoutError(f"Ollama timed out after 300 seconds for model {model}")
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Ollama execution failed: {e.stderr}")
+        except Exception as e:
+            raise RuntimeError(f"Unexpected error calling Ollama: {e}")
+
+
+class GoogleProvider(Provider):
+    """Google AI (stub for now)"""
+
+    name = "google"
+    retry = RetryPolicy(attempts=1)
+
+    async def complete(self, model: str, prompt: str) -> Dict[str, Any]:
+        # TODO: Implement Google AI if needed
+        raise NotImplementedError("Google AI not yet implemented")
+
+
+ProviderTarget = Union[str, EntryPoint, type, Provider]
+
+
+@lru_cache(maxsize=1)
+def _entry_points() -> Dict[str, EntryPoint]:
+    return {ep.name: ep for ep in entry_points(group=ENTRY_POINT_GROUP)}
+
+
+def _load(target: Union[str, EntryPoint]) -> Any:
+    if isinstance(target, EntryPoint):
+        return target.load()
+    module_name, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class ProviderRegistry:
+    """Name -> provider, imported and instantiated on first use"""
+
+    def __init__(self, settings: Optional[ProviderSettings] = None) -> None:
+        self.settings = settings or ProviderSettings()
+        self._targets: Dict[str, ProviderTarget] = dict(BUILTIN_PROVIDERS)
+        self._providers: Dict[str, Provider] = {}
+
+    def register(self, name: str, target: ProviderTarget) -> None:
+        """Add or replace a provider: a class, an instance, or "module:attr"."""
+        self._targets[name] = target
+        self._providers.pop(name, None)
+
+    def get(self, name: str) -> Provider:
+        provider = self._providers.get(name)
+        if provider is not None:
+            return provider
+
+        target = self._targets.get(name) or _entry_points().get(name)
+        if target is None:
+            raise ValueError(f"Unknown API: {name}")
+        if isinstance(target, (str, EntryPoint)):
+            target = _load(target)
+        provider = target if isinstance(target, Provider) else target(self.settings)
+        self._providers[name] = provider
+        return provider
+
+    def loaded(self) -> list[str]:
+        return sorted(self._providers)
@@ -6,36 +6,25 @@ tracks costs, and collects responses.
 """
 
 import asyncio
+import contextlib
 import json
 import logging
-import os
-import re
-import subprocess
-import tempfile
 from dataclasses import dataclass
 from datetime import datetime, UTC
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Union
 
-from .utils import safe_slug
-from anthropic import AsyncAnthropic
-from openai import AsyncOpenAI, APIError, APIConnectionError, RateLimitError
-from send2trash import send2trash
-
-try:
-    from api_trust_tracker import track
-except ImportError:
-    track = lambda resp, *a, **kw: resp
+from . import events
+from .alerts import alert
+from .memory_profile import MemoryProfiler, display_profile
+from .review_rules import RuleEngine, format_findings_report, format_rules_prompt
+from .artifacts import RoundWriter
+from .prompt_registry import PROMPTS, PromptTemplate
+from .providers import SYSTEM_PROMPT, PromptParts, ProviderRegistry, ProviderSettings
+from .utils import read_text_mapped, safe_slug, safe_slugs, save_atomic
 from rich.console import Console
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-    before_sleep_log
-)
 
 # Setup logging for retry attempts
 logger = logging.getLogger(__name__)
@@ -44,25 +33,16 @@ logging.basicConfig(level=logging.INFO)
 console = Console()
 
 
-def save_atomic(path: Path, content: str) -> None:
-    """Atomic write using temp file and rename"""
-    temp_dir = path.parent
-    temp_dir.mkdir(parents=True, exist_ok=True)
-    
-    with tempfile.NamedTemporaryFile(mode='w', dir=temp_dir, delete=False) as tf:
-        tf.write(content)
-        temp_name = tf.name
-    
-    try:
-        os.replace(temp_name, path)
-    except Exception as e:
-        logger.error(f"Atomic write failed for {path}: {e}")
-        if os.path.exists(temp_name):
-            try:
-                send2trash(temp_name)
-            except Exception as cleanup_err:
-                logger.warning(f"Failed to trash temp file {temp_name}: {cleanup_err}")
-        raise
+def __getattr__(name: str) -> Any:
+    # The provider SDKs load lazily (see scaffold.providers); these names stay
+    # importable from here for existing callers and patches.
+    if name == "AsyncOpenAI":
+        from openai import AsyncOpenAI
+        return AsyncOpenAI
+    if name == "AsyncAnthropic":
+        from anthropic import AsyncAnthropic
+        return AsyncAnthropic
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @dataclass
@@ -86,6 +66,7 @@ class ReviewResult:
     duration_seconds: float
     timestamp: str
     error: Optional[str] = None
+    prompt_version: str = ""  # content hash of the prompt template used
 
 
 @dataclass
@@ -97,6 +78,7 @@ class ReviewSummary:
     total_cost: float
     total_duration: float
     timestamp: str
+    rule_findings: int = 0
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -110,16 +92,138 @@ class ReviewSummary:
                     "cost": r.cost,
                     "tokens": r.tokens_used,
                     "duration": r.duration_seconds,
-                    "error": r.error
+                    "error": r.error,
+                    "prompt_version": r.prompt_version
                 }
                 for r in self.results
             ],
             "total_cost": self.total_cost,
             "total_duration": self.total_duration,
+            "rule_findings": self.rule_findings,
             "timestamp": self.timestamp
         }
 
 
+MAX_FILE_SIZE = 500 * 1024  # 500KB
+
+
+# Filled into {{LANGUAGE}}
+LANGUAGES = {
+    ".py": "Python", ".js": "JavaScript", ".ts": "TypeScript", ".tsx": "TypeScript",
+    ".go": "Go", ".rs": "Rust", ".java": "Java", ".rb": "Ruby", ".sh": "Shell",
+    ".sql": "SQL", ".html": "HTML", ".css": "CSS", ".md": "Markdown",
+    ".yaml": "YAML", ".yml": "YAML", ".json": "JSON", ".toml": "TOML",
+}
+
+
+def prompt_variables(document_path: Path) -> Dict[str, str]:
+    """{{PROJECT_NAME}} (the enclosing git root) and {{LANGUAGE}} for a document"""
+    current = document_path.resolve().parent
+    project = current
+    for directory in (current, *current.parents):
+        if (directory / ".git").exists():
+            project = directory
+            break
+    return {
+        "PROJECT_NAME": project.name,
+        "LANGUAGE": LANGUAGES.get(document_path.suffix.lower(), document_path.suffix.lstrip(".") or "text"),
+    }
+
+
+def render_prompt(
+    template: PromptTemplate,
+    document: str,
+    rules_prompt: str = "",
+    variables: Optional[Mapping[str, str]] = None
+) -> PromptParts:
+    """Reviewer prompt + REVIEW.md rules, then the document itself (shared, not copied)"""
+    prompt_content = template.render({**(variables or {}), "RULES": rules_prompt})
+    if rules_prompt and not template.uses("RULES"):
+        prompt_content = f"{prompt_content}\n\n{rules_prompt}"
+    return PromptParts((f"{prompt_content}\n\n---\n\nDocument to review:\n\n", document))
+
+
+def build_prompt_parts(
+    document: str,
+    config: ReviewConfig,
+    rules_prompt: str = "",
+    variables: Optional[Mapping[str, str]] = None
+) -> PromptParts:
+    return render_prompt(PROMPTS.template(config.prompt_path), document, rules_prompt, variables)
+
+
+def build_prompt(
+    document: str,
+    config: ReviewConfig,
+    rules_prompt: str = "",
+    variables: Optional[Mapping[str, str]] = None
+) -> str:
+    """Reviewer prompt + REVIEW.md rules + the document"""
+    return str(build_prompt_parts(document, config, rules_prompt, variables))
+
+
+def safe_prompt_version(config: ReviewConfig) -> str:
+    """The reviewer's prompt version, or "" if the prompt can't be read"""
+    try:
+        return PROMPTS.version(config.prompt_path)
+    except OSError:
+        return ""
+
+
+def read_document(document_path: Path) -> str:
+    """Read a document with size limit (Industrial Hardening H4/S2)"""
+    if document_path.stat().st_size > MAX_FILE_SIZE:
+        raise ValueError(
+            f"Document {document_path.name} is too large ({document_path.stat().st_size / 1024:.1f}KB). "
+            f"Max size allowed is {MAX_FILE_SIZE / 1024:.1f}KB to protect context window limits."
+        )
+    return read_text_mapped(document_path)
+
+
+def rules_prompt_for(
+    rules: Optional[RuleEngine],
+    findings: List[Any],
+    document_path: Path,
+    config: ReviewConfig
+) -> str:
+    """The REVIEW.md rules relevant to one reviewer, formatted for its prompt"""
+    if not rules:
+        return ""
+    relevant = rules.relevant_rules(findings, document_path, config.name)
+    return format_rules_prompt(relevant, findings)
+
+
+def queue_round_results(
+    writer: RoundWriter,
+    document_path: Path,
+    round_number: int,
+    review_results: List[ReviewResult],
+    rule_findings: int = 0
+) -> ReviewSummary:
+    """Queue reviewer outputs and COST_SUMMARY.json on a round writer"""
+    succeeded = [r for r in review_results if not r.error]
+    # Standardize filename: CODE_REVIEW_{safe_slug}.md
+    slug_names = safe_slugs((r.reviewer_name for r in succeeded), base_path=writer.round_dir)
+    for result, slug_name in zip(succeeded, slug_names):
+        # Security: Ensure path stays within round_dir (H4); the writer rejects anything else
+        try:
+            writer.add(f"CODE_REVIEW_{slug_name.upper()}.md", result.content)
+        except ValueError:
+            logger.error(f"Security Alert: Path traversal detected in reviewer name: {result.reviewer_name}")
+
+    summary = ReviewSummary(
+        round_number=round_number,
+        document_path=document_path,
+        results=review_results,
+        total_cost=sum(r.cost for r in review_results),
+        total_duration=max((r.duration_seconds for r in review_results), default=0.0),
+        timestamp=datetime.now(UTC).isoformat(),
+        rule_findings=rule_findings
+    )
+    writer.add("COST_SUMMARY.json", json.dumps(summary.to_dict(), indent=2))
+    return summary
+
+
 class ReviewOrchestrator:
     """Orchestrates multi-AI reviews"""
     
@@ -131,21 +235,58 @@ class ReviewOrchestrator:
         deepseek_key: Optional[str] = None,
         ollama_host: Optional[str] = None
     ) -> None:
-        self.openai_client = AsyncOpenAI(api_key=openai_key) if openai_key else None
-        self.anthropic_client = AsyncAnthropic(api_key=anthropic_key) if anthropic_key else None
         self.google_key = google_key  # Will implement Google AI if needed
-        self.deepseek_client = AsyncOpenAI(
-            api_key=deepseek_key,
-            base_url="https://api.deepseek.com/v1"
-        ) if deepseek_key else None
         self.ollama_host = ollama_host
+        self.providers = ProviderRegistry(ProviderSettings(
+            openai_key=openai_key,
+            anthropic_key=anthropic_key,
+            google_key=google_key,
+            deepseek_key=deepseek_key,
+            ollama_host=ollama_host
+        ))
+        # Set for --format ndjson: events go here and nothing is rendered with Rich
+        self.events: Optional[events.EventSink] = None
+        # Optional budget shared with other processes (see scaffold.campaign)
+        self.rate_limiter: Any = None
+        # Set for --profile-memory (see scaffold.memory_profile)
+        self.memory_profiler: Optional[MemoryProfiler] = None
+
+    @property
+    def headless(self) -> bool:
+        return self.events is not None
+
+    # SDK clients live on their providers and are created on first access
+    @property
+    def openai_client(self) -> Any:
+        return self.providers.get("openai").client
+
+    @openai_client.setter
+    def openai_client(self, client: Any) -> None:
+        self.providers.get("openai").client = client
+
+    @property
+    def anthropic_client(self) -> Any:
+        return self.providers.get("anthropic").client
+
+    @anthropic_client.setter
+    def anthropic_client(self, client: Any) -> None:
+        self.providers.get("anthropic").client = client
+
+    @property
+    def deepseek_client(self) -> Any:
+        return self.providers.get("deepseek").client
+
+    @deepseek_client.setter
+    def deepseek_client(self, client: Any) -> None:
+        self.providers.get("deepseek").client = client
         
     async def run_review(
         self,
         document_path: Path,
         configs: List[ReviewConfig],
         round_number: int,
-        output_dir: Path
+        output_dir: Path,
+        rules: Optional[RuleEngine] = None
     ) -> ReviewSummary:
         """
         Run reviews with multiple AI models in parallel
@@ -155,57 +296,130 @@ class ReviewOrchestrator:
             configs: List of reviewer configurations
             round_number: Which review round this is
             output_dir: Where to save results
+            rules: Optional REVIEW.md rules, applied before any AI reviewer runs
             
         Returns:
             ReviewSummary with all results and costs
         """
-        # Read document with size limit (Industrial Hardening H4/S2)
-        MAX_FILE_SIZE = 500 * 1024  # 500KB
-        if document_path.stat().st_size > MAX_FILE_SIZE:
-            raise ValueError(
-                f"Document {document_path.name} is too large ({document_path.stat().st_size / 1024:.1f}KB). "
-                f"Max size allowed is {MAX_FILE_SIZE / 1024:.1f}KB to protect context window limits."
+        profiler = self.memory_profiler
+        if profiler:
+            profiler.start()
+        try:
+            # Loaded once; every reviewer's prompt references this one string
+            document_content = read_document(document_path)
+            PROMPTS.preload(config.prompt_path for config in configs)
+            self._mark_phase("load")
+
+            # The whole round is staged and published in one rename at the end
+            round_dir = output_dir / f"round_{round_number}"
+            if self.events:
+                self.events.emit(
+                    "round_started", round=round_number, document=str(document_path), reviewers=len(configs)
+                )
+            with RoundWriter(round_dir) as writer:
+                summary = await self._run_round(
+                    document_path, document_content, configs, round_number, writer, rules
+                )
+            self._mark_phase("save")
+            if profiler:
+                profile_path = output_dir / f"memory_profile_round_{round_number}.json"
+                profile = profiler.write(profile_path, document=str(document_path), round=round_number)
+        finally:
+            if profiler:
+                profiler.stop()
+
+        # Display results
+        if self.events:
+            self.events.emit(
+                "round_completed",
+                round=round_number,
+                document=str(document_path),
+                output=str(round_dir),
+                failed=sum(1 for r in summary.results if r.error),
+                total_cost=summary.total_cost,
+                total_duration=summary.total_duration
             )
+        else:
+            self._display_summary(summary, round_dir)
+        if profiler:
+            if self.events:
+                self.events.emit("memory_profile", round=round_number, path=str(profile_path), peak=profile["peak"])
+            else:
+                display_profile(profile, profile_path, console)
+
+        return summary
+
+    def _mark_phase(self, phase: str) -> None:
+        if self.memory_profiler:
+            self.memory_profiler.mark(phase)
+
+    async def _run_round(
+        self,
+        document_path: Path,
+        document_content: str,
+        configs: List[ReviewConfig],
+        round_number: int,
+        writer: RoundWriter,
+        rules: Optional[RuleEngine]
+    ) -> ReviewSummary:
+        """Run every reviewer and queue the round's files on `writer`"""
+        # Deterministic REVIEW.md checks run first so reviewers don't spend tokens on them
+        findings = rules.scan(document_content, document_path) if rules else []
+        if rules:
+            writer.add("RULE_FINDINGS.md", format_findings_report(findings, document_path))
         
-        document_content = document_path.read_text()
-        
-        # Create output directory
-        round_dir = output_dir / f"round_{round_number}"
-        round_dir.mkdir(parents=True, exist_ok=True)
-        
-        console.print(f"\n[bold cyan]Running Review Round {round_number}[/bold cyan]")
-        console.print(f"Document: {document_path}")
-        console.print(f"Reviewers: {len(configs)}\n")
+        if not self.headless:
+            console.print(f"\n[bold cyan]Running Review Round {round_number}[/bold cyan]")
+            console.print(f"Document: {document_path}")
+            console.print(f"Reviewers: {len(configs)}\n")
         
-        # Run reviews in parallel with progress tracking
-        with Progress(
+        # Run reviews in parallel with progress tracking (not rendered at all when headless)
+        progress = Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
-            console=console
-        ) as progress:
+            console=console,
+            disable=self.headless
+        )
+        with contextlib.nullcontext(progress) if self.headless else progress:
             tasks = []
+            labels = []
+            variables = prompt_variables(document_path)
             for config in configs:
-                task_id = progress.add_task(
-                    f"[cyan]{config.name} ({config.model})",
-                    total=None
-                )
+                label = f"[cyan]{config.name} ({config.model})"
+                task_id = progress.add_task(label, total=None)
+                labels.append((task_id, config, label))
+                if self.events:
+                    self.events.emit("job_queued", **self._job_fields(round_number, config))
+                rules_prompt = rules_prompt_for(rules, findings, document_path, config)
                 tasks.append(
                     self._run_single_review(
                         document_content,
                         config,
                         progress,
-                        task_id
+                        task_id,
+                        rules_prompt,
+                        variables,
+                        round_number
                     )
                 )
             
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            self._mark_phase("dispatch")
+            watcher = asyncio.create_task(self._show_breaker_states(progress, labels))
+            try:
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+            finally:
+                watcher.cancel()
+            self._mark_phase("gather")
         
         # Handle any exceptions
         review_results = []
         for i, result in enumerate(results):
             if isinstance(result, Exception):
                 config = configs[i]
-                console.print(f"[red]Error in {config.name}: {str(result)}[/red]")
+                if not self.headless:
+                    console.print(f"[red]Error in {config.name}: {str(result)}[/red]")
+                # Queued for the background dispatcher; never blocks the round
+                alert(f"Review round {round_number}: {config.name} failed: {result}", level="error")
                 review_results.append(ReviewResult(
                     reviewer_name=config.name,
                     api=config.api,
@@ -215,74 +429,60 @@ class ReviewOrchestrator:
                     tokens_used=0,
                     duration_seconds=0.0,
                     timestamp=datetime.now(UTC).isoformat(),
-                    error=str(result)
+                    error=str(result),
+                    prompt_version=safe_prompt_version(config)
                 ))
             else:
                 review_results.append(result)
         
-        # Save results
-        for result in review_results:
-            if not result.error:
-                # Standardize filename: CODE_REVIEW_{safe_slug}.md
-                slug_name = safe_slug(result.reviewer_name, base_path=round_dir)
-                output_file = (round_dir / f"CODE_REVIEW_{slug_name.upper()}.md").resolve()
-                
-                # Security: Ensure path stays within round_dir (H4)
-                if not output_file.is_relative_to(round_dir.resolve()):
-                    logger.error(f"Security Alert: Path traversal detected in reviewer name: {result.reviewer_name}")
-                    continue
-                    
-                save_atomic(output_file, result.content)
-        
-        # Create summary
-        summary = ReviewSummary(
-            round_number=round_number,
-            document_path=document_path,
-            results=review_results,
-            total_cost=sum(r.cost for r in review_results),
-            total_duration=max(r.duration_seconds for r in review_results),
-            timestamp=datetime.now(UTC).isoformat()
-        )
-        
-        # Save cost summary atomically
-        cost_file = round_dir / "COST_SUMMARY.json"
-        save_atomic(cost_file, json.dumps(summary.to_dict(), indent=2))
-        
-        # Display results
-        self._display_summary(summary, round_dir)
-        
-        return summary
-    
+        return queue_round_results(writer, document_path, round_number, review_results, len(findings))
+
+    async def _show_breaker_states(self, progress: Progress, labels: List[tuple]) -> None:
+        """Keep each reviewer's progress line showing its provider's circuit state"""
+        while True:
+            for task_id, config, label in labels:
+                try:
+                    note = self.providers.get(config.api).breaker.describe()
+                except ValueError:
+                    note = ""
+                progress.update(task_id, description=f"{label} [red]({note})[/red]" if note else label)
+            await asyncio.sleep(0.25)
+
     async def _run_single_review(
         self,
         document: str,
         config: ReviewConfig,
         progress: Progress,
-        task_id: Any
+        task_id: Any,
+        rules_prompt: str = "",
+        variables: Optional[Mapping[str, str]] = None,
+        round_number: int = 0
     ) -> ReviewResult:
         """Run a single review"""
         start_time = asyncio.get_event_loop().time()
         
-        # Load prompt
-        prompt_content = config.prompt_path.read_text()
-        full_prompt = f"{prompt_content}\n\n---\n\nDocument to review:\n\n{document}"
-        
-        # Call appropriate API
-        if config.api == "openai":
-            result = await self._call_openai(config.model, full_prompt)
-        elif config.api == "anthropic":
-            result = await self._call_anthropic(config.model, full_prompt)
-        elif config.api == "google":
-            result = await self._call_google(config.model, full_prompt)
-        elif config.api == "deepseek":
-            result = await self._call_deepseek(config.model, full_prompt)
-        elif config.api == "ollama":
-            result = await self._call_ollama(config.model, full_prompt)
-        else:
-            raise ValueError(f"Unknown API: {config.api}")
+        tracked = self.memory_profiler.track(config.name) if self.memory_profiler else contextlib.nullcontext()
+        with tracked, events.bound(self.events, **self._job_fields(round_number, config)):
+            try:
+                template = PROMPTS.template(config.prompt_path)
+                prompt = render_prompt(template, document, rules_prompt, variables)
+                result = await self._call_api(config, prompt)
+            except Exception as e:
+                events.emit("failed", error=str(e), duration=asyncio.get_event_loop().time() - start_time)
+                raise
         
-        end_time = asyncio.get_event_loop().time()
-        duration = end_time - start_time
+            end_time = asyncio.get_event_loop().time()
+            duration = end_time - start_time
+            if result["content"]:
+                events.emit("first_token", latency=duration)
+                events.emit("chunk", content=result["content"])
+            events.emit(
+                "completed",
+                tokens=result["tokens"],
+                cost=result["cost"],
+                duration=duration,
+                prompt_version=template.version
+            )
         
         progress.update(task_id, completed=True)
         
@@ -294,133 +494,39 @@ class ReviewOrchestrator:
             cost=result["cost"],
             tokens_used=result["tokens"],
             duration_seconds=duration,
-            timestamp=datetime.now(UTC).isoformat()
+            timestamp=datetime.now(UTC).isoformat(),
+            prompt_version=template.version
         )
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((APIError, APIConnectionError, RateLimitError, asyncio.TimeoutError)),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-        reraise=True
-    )
-    async def _call_openai(self, model: str, prompt: str) -> Dict[str, Any]:
-        """Call OpenAI API"""
-        if not self.openai_client:
-            raise ValueError("OpenAI client not initialized")
-        
-        response = await self.openai_client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are a thorough, critical reviewer."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
-        )
-        track(response, "openai", project="project-scaffolding", caller="review.openai")
+    @staticmethod
+    def _job_fields(round_number: int, config: ReviewConfig) -> Dict[str, Any]:
+        return {"round": round_number, "reviewer": config.name, "api": config.api, "model": config.model}
 
-        tokens = response.usage.total_tokens
+    async def _call_api(self, config: ReviewConfig, full_prompt: Union[str, PromptParts]) -> Dict[str, Any]:
+        """Call the reviewer's provider under its concurrency, timeout and retry policy"""
+        return await self.providers.get(config.api).call(config.model, full_prompt, self.rate_limiter)
 
-        return {
-            "content": response.choices[0].message.content,
-            "cost": 0.0,
-            "tokens": tokens
-        }
-    
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((Exception,)),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-        reraise=True
-    )
-    async def _call_anthropic(self, model: str, prompt: str) -> Dict[str, Any]:
-        """Call Anthropic API"""
-        if not self.anthropic_client:
-            raise ValueError("Anthropic client not initialized")
-        
-        response = await self.anthropic_client.messages.create(
-            model=model,
-            max_tokens=4096,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        track(response, "anthropic", project="project-scaffolding", caller="review.anthropic")
-
-        input_tokens = response.usage.input_tokens
-        output_tokens = response.usage.output_tokens
-
-        return {
-            "content": response.content[0].text,
-            "cost": 0.0,
-            "tokens": input_tokens + output_tokens
-        }
-    
-    async def _call_google(self, model: str, prompt: str) -> Dict[str, Any]:
-        """Call Google AI API (stub for now)"""
-        # TODO: Implement Google AI if needed
-        raise NotImplementedError("Google AI not yet implemented")
-    
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((Exception,)),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-        reraise=True
-    )
-    async def _call_deepseek(self, model: str, prompt: str) -> Dict[str, Any]:
-        """Call DeepSeek API"""
-        if not self.deepseek_client:
-            raise ValueError("DeepSeek client not initialized")
-        
-        response = await self.deepseek_client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are a thorough, critical reviewer."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.0
-        )
-        track(response, "openai", project="project-scaffolding", caller="review.deepseek")
+    async def run_batch_review(
+        self,
+        documents: List[Path],
+        configs: List[ReviewConfig],
+        round_number: int,
+        output_dir: Path,
+        rules: Optional[RuleEngine] = None,
+        poll_interval: float = 60.0
+    ) -> List[ReviewSummary]:
+        """Review many documents through the providers' batch APIs.
 
-        total_tokens = response.usage.total_tokens
+        Resumable: re-running with the same arguments picks up the batches
+        submitted before. See scaffold.batch_review.
+        """
+        from .batch_review import BatchReview
 
-        return {
-            "content": response.choices[0].message.content,
-            "cost": 0.0,
-            "tokens": total_tokens
-        }
-    
-    async def _call_ollama(self, model: str, prompt: str) -> Dict[str, Any]:
-        """Call Ollama CLI for local review"""
-        try:
-            env = os.environ.copy()
-            if self.ollama_host:
-                env["OLLAMA_HOST"] = self.ollama_host
-                
-            # Industrial Hardening: subprocess with timeout and check
-            result = subprocess.run(
-                ["ollama", "run", model],
-                input=prompt,
-                capture_output=True,
-                text=True,
-                timeout=300,  # Local models can be slow
-                check=True,
-                env=env
-            )
-            
-            return {
-                "content": result.stdout.strip(),
-                "cost": 0.0,  # Local usage is free
-                "tokens": 0   # Hard to estimate tokens without extra dependencies
-            }
-        except subprocess.TimeoutExpired:
-            raise TimeoutError(f"Ollama timed out after 300 seconds for model {model}")
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Ollama execution failed: {e.stderr}")
-        except Exception as e:
-            raise RuntimeError(f"Unexpected error calling Ollama: {e}")
+        batch = BatchReview(self, documents, configs, round_number, output_dir, rules, poll_interval)
+        summaries = await batch.run()
+        for summary in summaries:
+            self._display_summary(summary, batch.round_dir(summary.document_path))
+        return summaries
 
     def _display_summary(self, summary: ReviewSummary, output_dir: Path) -> None:
         """Display review summary in terminal"""
@@ -463,6 +569,10 @@ class ReviewOrchestrator:
         )
         
         console.print(table)
+        for name in self.providers.loaded():
+            note = self.providers.get(name).breaker.describe()
+            if note:
+                console.print(f"[red]{name}: {note}[/red]")
         console.print(f"\n[dim]Reviews saved to: {output_dir}[/dim]\n")
 
 
@@ -0,0 +1,416 @@
+"""
+REVIEW.md Rule Engine
+
+Applies a project's REVIEW.md rules deterministically before any AI reviewer
+runs, so cheap findings never cost tokens. Only the rules relevant to a
+document (and reviewer) are injected into that reviewer's prompt.
+
+REVIEW.md format - one `###` section per rule, fields as bullets, free text
+after the bullets is the rule description:
+
+    ### no-eval
+    - **pattern:** `\\beval\\(`
+    - **glob:** `*.py`
+    - **severity:** error
+    - **reviewers:** security
+
+    Never eval untrusted input.
+
+Fields: `pattern` (regex, matched per line), `literal` (plain substring),
+`glob` (file filter), `severity` (info/warning/error), `reviewers`
+(comma-separated reviewer name keywords). Rules without pattern/literal are
+guidance rules and are always injected for matching files.
+
+All pattern rules are matched in a single pass: each rule contributes a
+required literal, the literals are merged into one trie-shaped regex (an
+Aho-Corasick style automaton executed by the `re` engine), and a rule's full
+regex only runs on lines where its literal was seen.
+"""
+
+import fnmatch
+import logging
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover - Python < 3.11
+    import sre_parse  # type: ignore[no-redef]
+
+logger = logging.getLogger(__name__)
+
+REVIEW_MD = "REVIEW.md"
+SEVERITIES = ("info", "warning", "error")
+# Cap findings per rule so a noisy rule can't flood the prompt or the report
+MAX_FINDINGS_PER_RULE = 50
+
+_RULE_HEADING = re.compile(r"^###\s+(?P<id>\S.*?)\s*$")
+_RULE_FIELD = re.compile(r"^[-*]\s+\*\*(?P<key>[a-z_]+):\*\*\s*(?P<value>.*?)\s*$")
+_MIN_LITERAL = 2
+_WHITESPACE = re.compile(r"\s")
+
+
+@dataclass
+class ReviewRule:
+    """A single REVIEW.md rule"""
+    rule_id: str
+    description: str = ""
+    pattern: str | None = None
+    literal: str | None = None
+    glob: str | None = None
+    severity: str = "warning"
+    reviewers: tuple[str, ...] = ()
+
+    @property
+    def is_guidance(self) -> bool:
+        return self.pattern is None and self.literal is None
+
+    def applies_to_reviewer(self, reviewer_name: str) -> bool:
+        if not self.reviewers:
+            return True
+        name = reviewer_name.lower()
+        return any(r in name for r in self.reviewers)
+
+
+@dataclass
+class RuleFinding:
+    """A deterministic match of a rule against a document line"""
+    rule_id: str
+    severity: str
+    line: int
+    text: str
+
+
+@dataclass
+class _Candidate:
+    rule_index: int
+    verify: re.Pattern | None
+
+
+def _strip_code(value: str) -> str:
+    if len(value) >= 2 and value.startswith("`") and value.endswith("`"):
+        return value[1:-1]
+    return value
+
+
+def parse_review_md(text: str) -> list[ReviewRule]:
+    """Parse REVIEW.md content into rules. Sections without a `###` heading are ignored."""
+    rules: list[ReviewRule] = []
+    current: ReviewRule | None = None
+    description: list[str] = []
+
+    def finish() -> None:
+        if current is not None:
+            current.description = "\n".join(description).strip()
+            rules.append(current)
+
+    for line in text.splitlines():
+        heading = _RULE_HEADING.match(line)
+        if heading:
+            finish()
+            current = ReviewRule(rule_id=heading.group("id"))
+            description = []
+            continue
+        if current is None:
+            continue
+        if line.startswith("#"):
+            # A higher-level heading ends the rule section
+            finish()
+            current = None
+            continue
+        field_match = _RULE_FIELD.match(line)
+        if field_match and not description:
+            key = field_match.group("key")
+            value = _strip_code(field_match.group("value"))
+            if key == "pattern":
+                current.pattern = value
+            elif key == "literal":
+                current.literal = value
+            elif key == "glob":
+                current.glob = value
+            elif key == "severity":
+                current.severity = value.lower() if value.lower() in SEVERITIES else "warning"
+            elif key == "reviewers":
+                current.reviewers = tuple(r.strip().lower() for r in value.split(",") if r.strip())
+            continue
+        if description or line.strip():
+            description.append(line)
+
+    finish()
+    return rules
+
+
+def required_literal(pattern: str) -> str | None:
+    """Return a literal substring every match of `pattern` must contain, if one exists."""
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return None
+    if parsed.state.flags & re.IGNORECASE:
+        return None
+
+    best = ""
+    run: list[str] = []
+
+    def flush() -> None:
+        nonlocal best
+        if len(run) > len(best):
+            best = "".join(run)
+        run.clear()
+
+    def walk(items: list) -> None:
+        for op, arg in items:
+            if op is sre_parse.LITERAL:
+                run.append(chr(arg))
+            elif op is sre_parse.SUBPATTERN and not arg[1] & re.IGNORECASE:
+                # A plain group is still mandatory; descend into it
+                walk(list(arg[-1]))
+            elif op in (sre_parse.AT,):
+                continue
+            else:
+                flush()
+        flush()
+
+    walk(list(parsed))
+    return best if len(best) >= _MIN_LITERAL else None
+
+
+def _trie_regex(literals: list[str]) -> str:
+    """Build a prefix-merged alternation so the regex engine never backtracks across siblings."""
+    trie: dict = {}
+    for literal in literals:
+        node = trie
+        for ch in literal:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node: dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch != ""]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return "(?:" + body + ")?"
+        return body
+
+    return emit(trie)
+
+
+def _anchor(literal: str) -> str:
+    """Prefer the longest whitespace-free piece of a literal so it can use the token index."""
+    longest = max(literal.split(), key=len, default="")
+    return longest if len(longest) >= _MIN_LITERAL else literal
+
+
+def _overlapping_matcher(literals: list[str]) -> re.Pattern | None:
+    if not literals:
+        return None
+    return re.compile(f"(?=({_trie_regex(literals)}))")
+
+
+def _compile_glob(glob: str) -> re.Pattern:
+    translated = fnmatch.translate(glob)
+    if "/" in glob:
+        # Anchor path globs on a directory boundary, matching from the right
+        return re.compile(r"(?s:(?:.*/)?)" + translated)
+    return re.compile(translated)
+
+
+class RuleEngine:
+    """Compiled matcher for a set of REVIEW.md rules"""
+
+    def __init__(self, rules: list[ReviewRule]) -> None:
+        self.rules = rules
+        self._globs: dict[str, re.Pattern] = {}
+        self._literal_candidates: dict[str, list[_Candidate]] = {}
+        self._fallback: list[tuple[int, re.Pattern]] = []
+
+        for index, rule in enumerate(rules):
+            if rule.glob and rule.glob not in self._globs:
+                self._globs[rule.glob] = _compile_glob(rule.glob)
+            if rule.literal:
+                anchor = _anchor(rule.literal)
+                verify = None if anchor == rule.literal else re.compile(re.escape(rule.literal))
+                self._literal_candidates.setdefault(anchor, []).append(_Candidate(index, verify))
+            elif rule.pattern:
+                try:
+                    compiled = re.compile(rule.pattern, re.MULTILINE)
+                except re.error as e:
+                    logger.warning(f"Skipping REVIEW.md rule {rule.rule_id}: invalid pattern ({e})")
+                    continue
+                literal = required_literal(rule.pattern)
+                if literal:
+                    self._literal_candidates.setdefault(_anchor(literal), []).append(_Candidate(index, compiled))
+                else:
+                    self._fallback.append((index, compiled))
+
+        literals = list(self._literal_candidates)
+        known = set(literals)
+        # Literals that are prefixes of a longer hit must fire too (overlapping matches)
+        self._prefix_literals: dict[str, list[str]] = {
+            lit: [lit[:i] for i in range(1, len(lit) + 1) if lit[:i] in known]
+            for lit in literals
+        }
+        token_literals = [lit for lit in literals if not _WHITESPACE.search(lit)]
+        spaced_literals = [lit for lit in literals if _WHITESPACE.search(lit)]
+        self._token_matcher = _overlapping_matcher(token_literals)
+        self._spaced_matcher = _overlapping_matcher(spaced_literals)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "RuleEngine":
+        return cls(parse_review_md(path.read_text()))
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def _applicable(self, path: Path | None) -> list[bool]:
+        if path is None:
+            return [True] * len(self.rules)
+        posix = path.as_posix()
+        name = path.name
+        glob_hits = {
+            glob: bool(compiled.match(posix if "/" in glob else name))
+            for glob, compiled in self._globs.items()
+        }
+        return [not rule.glob or glob_hits[rule.glob] for rule in self.rules]
+
+    def scan(self, text: str, path: Path | None = None) -> list[RuleFinding]:
+        """Run every applicable pattern rule over `text` in one pass."""
+        applicable = self._applicable(path)
+        hits: dict[int, set[int]] = {}
+        counts: dict[int, int] = {}
+
+        def record(rule_index: int, line_start: int) -> None:
+            if counts.get(rule_index, 0) >= MAX_FINDINGS_PER_RULE:
+                return
+            lines = hits.setdefault(rule_index, set())
+            if line_start not in lines:
+                lines.add(line_start)
+                counts[rule_index] = counts.get(rule_index, 0) + 1
+
+        def check_line(literal: str, line_start: int, line_end: int) -> None:
+            for candidate in self._literal_candidates[literal]:
+                if not applicable[candidate.rule_index]:
+                    continue
+                if candidate.verify is None or candidate.verify.search(text, line_start, line_end):
+                    record(candidate.rule_index, line_start)
+
+        def line_bounds(pos: int) -> tuple[int, int]:
+            line_end = text.find("\n", pos)
+            return text.rfind("\n", 0, pos) + 1, len(text) if line_end == -1 else line_end
+
+        if self._token_matcher is not None:
+            # Literals without whitespace can only occur inside one whitespace-delimited
+            # token, so matching against the (much smaller) set of distinct tokens tells
+            # us which literals are present at all.
+            distinct = "\n".join(set(text.split()))
+            present: set[str] = set()
+            for match in self._token_matcher.finditer(distinct):
+                present.update(self._prefix_literals[match.group(1)])
+            for literal in present:
+                pos = text.find(literal)
+                while pos != -1:
+                    line_start, line_end = line_bounds(pos)
+                    check_line(literal, line_start, line_end)
+                    pos = text.find(literal, line_end)
+
+        if self._spaced_matcher is not None:
+            checked: set[tuple[str, int]] = set()
+            for match in self._spaced_matcher.finditer(text):
+                line_start, line_end = line_bounds(match.start())
+                for literal in self._prefix_literals[match.group(1)]:
+                    if (literal, line_start) not in checked:
+                        checked.add((literal, line_start))
+                        check_line(literal, line_start, line_end)
+
+        for rule_index, compiled in self._fallback:
+            if not applicable[rule_index]:
+                continue
+            for match in compiled.finditer(text):
+                record(rule_index, text.rfind("\n", 0, match.start()) + 1)
+                if counts.get(rule_index, 0) >= MAX_FINDINGS_PER_RULE:
+                    break
+
+        # Resolve line numbers with one forward sweep over the sorted offsets
+        located = sorted((start, idx) for idx, starts in hits.items() for start in starts)
+        findings = []
+        line_number, cursor = 1, 0
+        for start, rule_index in located:
+            line_number += text.count("\n", cursor, start)
+            cursor = start
+            end = text.find("\n", start)
+            rule = self.rules[rule_index]
+            findings.append(RuleFinding(
+                rule_id=rule.rule_id,
+                severity=rule.severity,
+                line=line_number,
+                text=text[start:end if end != -1 else len(text)].strip()[:200],
+            ))
+        return findings
+
+    def relevant_rules(
+        self,
+        findings: list[RuleFinding],
+        path: Path | None = None,
+        reviewer_name: str | None = None,
+    ) -> list[ReviewRule]:
+        """Rules worth showing a reviewer: guidance rules for this file plus rules that fired."""
+        applicable = self._applicable(path)
+        fired = {f.rule_id for f in findings}
+        selected = []
+        for rule, ok in zip(self.rules, applicable):
+            if not ok:
+                continue
+            if reviewer_name is not None and not rule.applies_to_reviewer(reviewer_name):
+                continue
+            if rule.is_guidance or rule.rule_id in fired:
+                selected.append(rule)
+        return selected
+
+
+def find_review_md(start: Path) -> Path | None:
+    """Locate the nearest REVIEW.md walking up from `start`, stopping at the git root."""
+    current = start.resolve()
+    if current.is_file():
+        current = current.parent
+    for directory in (current, *current.parents):
+        candidate = directory / REVIEW_MD
+        if candidate.is_file():
+            return candidate
+        if (directory / ".git").exists():
+            break
+    return None
+
+
+def format_rules_prompt(rules: list[ReviewRule], findings: list[RuleFinding]) -> str:
+    """Render the rules section injected into a reviewer prompt."""
+    if not rules:
+        return ""
+    rule_ids = {r.rule_id for r in rules}
+    lines = ["## Project review rules (REVIEW.md)", ""]
+    for rule in rules:
+        summary = rule.description.splitlines()[0] if rule.description else ""
+        lines.append(f"- **{rule.rule_id}** ({rule.severity}): {summary}".rstrip(": "))
+
+    relevant = [f for f in findings if f.rule_id in rule_ids]
+    if relevant:
+        lines.extend([
+            "",
+            "The following were already flagged by deterministic checks. "
+            "Do not repeat them; focus on issues automation cannot find.",
+            "",
+        ])
+        lines.extend(f"- line {f.line}: [{f.rule_id}] `{f.text}`" for f in relevant)
+    return "\n".join(lines)
+
+
+def format_findings_report(findings: list[RuleFinding], document: Path) -> str:
+    """Render findings as a standalone Markdown report."""
+    lines = [f"# REVIEW.md findings: {document.name}", ""]
+    if not findings:
+        lines.append("No rule violations found.")
+    for f in findings:
+        lines.append(f"- **{f.severity}** line {f.line} [{f.rule_id}]: `{f.text}`")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,187 @@
+"""
+Safety Rules
+
+Shared definitions of the dangerous-pattern checks enforced by the git hook
+templates and CI: recursive shell deletes, unsafe Python deletion calls,
+hardcoded credentials, API key shapes and silent exception handling. All
+rules are compiled into one alternation that rejects clean lines in a
+single pass; a line that matches is then checked rule by rule, so one
+rule's match can't hide another's on the same text. A reviewed line (e.g. a test fixture
+containing the pattern it tests) opts out of named rules with an inline
+`# audit: allow[rule-id, ...]` comment.
+"""
+
+import re
+from dataclasses import dataclass, field, replace
+
+
+@dataclass(frozen=True)
+class SafetyRule:
+    """A single line-oriented safety check"""
+    rule_id: str
+    pattern: str
+    message: str
+    # Lines matching this are documentation/pattern definitions, not real usage
+    allow: str | None = None
+    extensions: tuple[str, ...] = ()
+    # "error" findings block, "warning" findings are reported only
+    level: str = "error"
+
+
+@dataclass
+class SafetyFinding:
+    """A rule match at a file location"""
+    rule_id: str
+    path: str
+    line: int
+    text: str
+    message: str
+    blocking: bool = True
+
+
+# Inline suppression comment: `# audit: allow[rm-rf, unsafe-delete]`
+SUPPRESSION = re.compile(r"#\s*audit:\s*allow\[([\w\s,-]+)\]")
+
+
+def suppressed_rules(line: str) -> frozenset[str]:
+    """Rule ids exempted by an `# audit: allow[...]` comment on `line`."""
+    match = SUPPRESSION.search(line)
+    if match is None:
+        return frozenset()
+    return frozenset(rule_id.strip() for rule_id in match.group(1).split(",") if rule_id.strip())
+
+
+def unsuppressed(findings: list[SafetyFinding], text: str) -> list[SafetyFinding]:
+    """Drop findings whose line in `text` suppresses their rule.
+
+    For findings made without scan_line (e.g. the AST scanner); scan_line
+    already honors suppressions.
+    """
+    if "audit:" not in text:
+        return findings
+    lines = text.splitlines()
+    return [
+        f for f in findings
+        if not (0 < f.line <= len(lines) and f.rule_id in suppressed_rules(lines[f.line - 1]))
+    ]
+
+
+_DELETE_CALLS = r"rmtree|os\.remove|os\.unlink"
+
+RM_RF = SafetyRule(
+    rule_id="rm-rf",
+    pattern=r"\brm\s+-rf\b",
+    message="Found 'rm -rf'. Use send2trash or document a reviewed exception.",  # audit: allow[rm-rf]
+)
+
+UNSAFE_DELETE = SafetyRule(
+    rule_id="unsafe-delete",
+    pattern=rf"\b(?:{_DELETE_CALLS})\s*\(",
+    message="Unsafe deletion call (rmtree/os.remove/os.unlink). Use send2trash instead.",
+    allow=rf"""# .*(?:{_DELETE_CALLS})|".*(?:{_DELETE_CALLS})|'.*(?:{_DELETE_CALLS})|`.*(?:{_DELETE_CALLS})|dangerous.*patterns""",
+)
+
+HARDCODED_CREDENTIAL = SafetyRule(
+    rule_id="hardcoded-credential",
+    pattern=r"""(?:api_key|secret|password)\s*=\s*["'][^"']{8,}""",
+    message="Possible hardcoded credential. Use environment variables or .env files instead.",
+)
+
+DIFF_RULES: tuple[SafetyRule, ...] = (RM_RF, UNSAFE_DELETE, HARDCODED_CREDENTIAL)
+
+# Whole-tree audit families (scaffold audit); extensions mirror the old CI greps
+_CODE_AND_SHELL = (".py", ".sh", ".bash", ".zsh")
+_SOURCE = (".py", ".js", ".ts")
+
+OPENAI_KEY = SafetyRule(
+    rule_id="openai-key",
+    pattern=r"\bsk-(?!ant-)[A-Za-z0-9_-]{20,}",
+    message="Potential OpenAI API key.",
+    extensions=_SOURCE,
+)
+
+ANTHROPIC_KEY = SafetyRule(
+    rule_id="anthropic-key",
+    pattern=r"\bsk-ant-[A-Za-z0-9_-]{20,}",
+    message="Potential Anthropic API key.",
+    extensions=_SOURCE,
+)
+
+AWS_ACCESS_KEY = SafetyRule(
+    rule_id="aws-access-key",
+    pattern=r"\bAKIA[0-9A-Z]{16}\b",
+    message="Potential AWS access key.",
+    extensions=_SOURCE,
+)
+
+BARE_EXCEPT = SafetyRule(
+    rule_id="bare-except",
+    pattern=r"\bexcept:[ \t]*$",
+    message="Bare 'except:' - catch specific exceptions.",
+    extensions=(".py",),
+    level="warning",
+)
+
+EXCEPT_PASS = SafetyRule(
+    rule_id="except-pass",
+    pattern=r"\bexcept\b.*:[ \t]*pass[ \t]*$",
+    message="'except: pass' silently swallows errors - log or re-raise.",
+    extensions=(".py",),
+    level="warning",
+)
+
+RULE_FAMILIES: dict[str, tuple[SafetyRule, ...]] = {
+    "deletion": (
+        replace(RM_RF, extensions=_CODE_AND_SHELL),
+        replace(UNSAFE_DELETE, extensions=_CODE_AND_SHELL),
+    ),
+    "secrets": (OPENAI_KEY, ANTHROPIC_KEY, AWS_ACCESS_KEY),
+    "exceptions": (BARE_EXCEPT, EXCEPT_PASS),
+}
+
+
+@dataclass
+class SafetyMatcher:
+    """All rules compiled into one multi-pattern prefilter, plus each rule on its own"""
+    rules: tuple[SafetyRule, ...] = DIFF_RULES
+    warn_only: frozenset[str] = field(default_factory=frozenset)
+
+    def __post_init__(self) -> None:
+        self._combined = re.compile(
+            "|".join(f"(?P<r{i}>{rule.pattern})" for i, rule in enumerate(self.rules)),
+            re.MULTILINE,
+        )
+        self._patterns = [re.compile(rule.pattern) for rule in self.rules]
+        self._allow = [re.compile(rule.allow) if rule.allow else None for rule in self.rules]
+
+    def scan_line(self, text: str, path: str, line: int) -> list[SafetyFinding]:
+        """Return findings for one line, at most one per rule."""
+        if not self._combined.search(text):
+            return []
+        findings = []
+        suppressed = suppressed_rules(text)
+        for rule, pattern, allow in zip(self.rules, self._patterns, self._allow):
+            if rule.extensions and not path.endswith(rule.extensions):
+                continue
+            if rule.rule_id in suppressed or not pattern.search(text):
+                continue
+            if allow is not None and allow.search(text):
+                continue
+            findings.append(SafetyFinding(
+                rule_id=rule.rule_id,
+                path=path,
+                line=line,
+                text=text.strip()[:200],
+                message=rule.message,
+                blocking=rule.level == "error" and rule.rule_id not in self.warn_only,
+            ))
+        return findings
+
+    def scan_text(self, text: str, path: str) -> list[SafetyFinding]:
+        """Scan a whole file; the combined regex rejects clean files without a line loop."""
+        if not self._combined.search(text):
+            return []
+        findings = []
+        for number, line in enumerate(text.splitlines(), start=1):
+            findings.extend(self.scan_line(line, path, number))
+        return findings
@@ -0,0 +1,235 @@
+"""
+grepai Search Log Analytics
+
+`ai_search_log.jsonl` is rotated once it passes ROTATE_BYTES. Rotated files
+are compacted into `ai_search_log.sqlite3` and then trashed. `SearchStats`
+streams the SQLite store, any rotated files and the live log one record at
+a time. Memory grows with the number of distinct queries and projects, not
+with the size of the log.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+LOG_NAME = "ai_search_log.jsonl"
+STORE_NAME = "ai_search_log.sqlite3"
+ROTATED_GLOB = "ai_search_log.*.jsonl"
+ROTATE_BYTES = 10 * 1024 * 1024
+INSERT_BATCH = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS searches (
+    ts TEXT NOT NULL,
+    project TEXT NOT NULL,
+    query TEXT NOT NULL,
+    result_count INTEGER NOT NULL,
+    results TEXT NOT NULL,
+    cached INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS searches_project_ts ON searches (project, ts);
+CREATE TABLE IF NOT EXISTS imported (name TEXT PRIMARY KEY, rows INTEGER NOT NULL);
+"""
+
+
+@dataclass
+class SearchRecord:
+    ts: str
+    project: str
+    query: str
+    results: list[str]
+    cached: bool = False
+
+
+def rotate_if_needed(log_path: Path, max_bytes: int = ROTATE_BYTES) -> Path | None:
+    """Move the live log aside once it is too big; returns the rotated path."""
+    try:
+        if log_path.stat().st_size < max_bytes:
+            return None
+    except FileNotFoundError:
+        return None
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    rotated = log_path.with_name(f"{log_path.stem}.{stamp}{log_path.suffix}")
+    os.replace(log_path, rotated)
+    return rotated
+
+
+def iter_jsonl(path: Path) -> Iterator[SearchRecord]:
+    """Stream records from one log file, skipping torn or malformed lines."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                yield SearchRecord(
+                    ts=str(entry.get("ts", "")),
+                    project=str(entry["project"]),
+                    query=str(entry["query"]),
+                    results=list(entry.get("results") or []),
+                    cached=bool(entry.get("cached", False)),
+                )
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+                continue
+
+
+def connect(store_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(store_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def rotated_files(directory: Path) -> list[Path]:
+    return sorted(directory.glob(ROTATED_GLOB))
+
+
+def compact(directory: Path) -> int:
+    """Import rotated log files into the SQLite store and trash them.
+
+    A file is imported in one transaction and remembered by name, so a file
+    that can't be trashed is never imported twice. Returns rows added.
+    """
+    files = rotated_files(directory)
+    if not files:
+        return 0
+
+    added = 0
+    conn = connect(directory / STORE_NAME)
+    try:
+        for path in files:
+            if conn.execute("SELECT 1 FROM imported WHERE name = ?", (path.name,)).fetchone() is None:
+                added += _import_file(conn, path)
+            _trash(path)
+    finally:
+        conn.close()
+    return added
+
+
+def _import_file(conn: sqlite3.Connection, path: Path) -> int:
+    rows = 0
+    batch = []
+    with conn:
+        for record in iter_jsonl(path):
+            batch.append((
+                record.ts, record.project, record.query,
+                len(record.results), json.dumps(record.results), int(record.cached),
+            ))
+            if len(batch) >= INSERT_BATCH:
+                conn.executemany("INSERT INTO searches VALUES (?, ?, ?, ?, ?, ?)", batch)
+                rows += len(batch)
+                batch.clear()
+        conn.executemany("INSERT INTO searches VALUES (?, ?, ?, ?, ?, ?)", batch)
+        rows += len(batch)
+        conn.execute("INSERT INTO imported VALUES (?, ?)", (path.name, rows))
+    return rows
+
+
+def _trash(path: Path) -> None:
+    try:
+        from send2trash import send2trash
+        send2trash(str(path))
+    except Exception as e:
+        logger.warning(f"Failed to trash compacted log {path}: {e}")
+
+
+def iter_records(directory: Path) -> Iterator[SearchRecord]:
+    """Everything logged so far: the store, un-compacted rotations, the live log."""
+    store = directory / STORE_NAME
+    imported: set[str] = set()
+    if store.exists():
+        conn = connect(store)
+        try:
+            imported = {row[0] for row in conn.execute("SELECT name FROM imported")}
+            rows = conn.execute("SELECT ts, project, query, results, cached FROM searches")
+            for ts, project, query, results, cached in rows:
+                yield SearchRecord(ts, project, query, json.loads(results), bool(cached))
+        finally:
+            conn.close()
+
+    for path in rotated_files(directory):
+        if path.name not in imported:
+            yield from iter_jsonl(path)
+    live = directory / LOG_NAME
+    if live.exists():
+        yield from iter_jsonl(live)
+
+
+def _parse_ts(ts: str) -> datetime | None:
+    try:
+        return datetime.fromisoformat(ts)
+    except ValueError:
+        return None
+
+
+@dataclass
+class ProjectStats:
+    queries: int = 0
+    cached: int = 0
+    zero_results: int = 0
+    first: datetime | None = None
+    last: datetime | None = None
+
+    def per_day(self) -> float:
+        """Query rate over the logged span (at least one day)."""
+        if self.first is None or self.last is None:
+            return float(self.queries)
+        days = max((self.last - self.first).total_seconds() / 86400, 1.0)
+        return self.queries / days
+
+
+@dataclass
+class SearchStats:
+    total: int = 0
+    queries: Counter = field(default_factory=Counter)
+    zero_results: Counter = field(default_factory=Counter)
+    projects: dict[str, ProjectStats] = field(default_factory=dict)
+
+    def add(self, record: SearchRecord) -> None:
+        self.total += 1
+        self.queries[record.query] += 1
+        project = self.projects.get(record.project)
+        if project is None:
+            project = self.projects[record.project] = ProjectStats()
+        project.queries += 1
+        project.cached += record.cached
+        if not record.results:
+            self.zero_results[record.query] += 1
+            project.zero_results += 1
+        ts = _parse_ts(record.ts)
+        if ts is not None:
+            if project.first is None or ts < project.first:
+                project.first = ts
+            if project.last is None or ts > project.last:
+                project.last = ts
+
+    @classmethod
+    def from_records(cls, records: Iterator[SearchRecord]) -> "SearchStats":
+        stats = cls()
+        for record in records:
+            stats.add(record)
+        return stats
+
+    def to_dict(self, top: int = 10) -> dict:
+        return {
+            "total": self.total,
+            "distinct_queries": len(self.queries),
+            "top_queries": self.queries.most_common(top),
+            "zero_result_queries": self.zero_results.most_common(top),
+            "projects": {
+                name: {
+                    "queries": p.queries,
+                    "cached": p.cached,
+                    "zero_results": p.zero_results,
+                    "per_day": round(p.per_day(), 2),
+                    "first": p.first.isoformat() if p.first else None,
+                    "last": p.last.isoformat() if p.last else None,
+                }
+                for name, p in sorted(self.projects.items(), key=lambda item: -item[1].queries)
+            },
+        }
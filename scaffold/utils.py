@@ -1,32 +1,101 @@
+import mmap
+import os
 import re
 import logging
+import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
 logger = logging.getLogger(__name__)
 
-def safe_slug(text: str, base_path: Optional[Path] = None) -> str:
-    """Sanitizes string for use in filenames and prevents path traversal.
+# Compiled once; safe_slug runs for every reviewer, rule and scanned name
+_NON_SLUG_CHARS = re.compile(r'[^a-z0-9]+')
+MAX_SLUG_LENGTH = 255
 
-    If base_path is provided, the resolved target path must stay within that base.
-    """
+# Documents this size or larger are read through mmap
+MMAP_THRESHOLD = 64 * 1024
+
+
+def _slugify(text: str) -> str:
     # Lowercase and replace non-alphanumeric with underscores
-    slug = text.lower()
-    slug = re.sub(r'[^a-z0-9]+', '_', slug)
-    slug = slug.strip('_')
-    
+    slug = _NON_SLUG_CHARS.sub('_', text.lower()).strip('_')
+
     # Industrial Hardening: Prevent directory traversal attempts
     if ".." in slug or slug.startswith("/") or slug.startswith("~"):
         logger.warning(f"Potential path traversal attempt in slug: {text}")
         slug = slug.replace("..", "").replace("/", "").replace("~", "")
+    return slug
 
+
+def _check_contained(base_path: Path, slug: str) -> None:
+    """`base_path` must already be resolved. Resolving base/slug catches a
+    symlink at that name that leads outside the base."""
+    if not (base_path / slug).resolve().is_relative_to(base_path):
+        raise ValueError("Security Alert: Path Traversal detected.")
+
+
+def safe_slug(text: str, base_path: Optional[Path] = None) -> str:
+    """Sanitizes string for use in filenames and prevents path traversal.
+
+    If base_path is provided, the resolved target path must stay within that base.
+    """
+    slug = _slugify(text)[:MAX_SLUG_LENGTH]
     if base_path:
-        base_path = base_path.resolve()
-        target_path = (base_path / slug).resolve()
-        if not target_path.is_relative_to(base_path):
-            raise ValueError("Security Alert: Path Traversal detected.")
+        _check_contained(base_path.resolve(), slug)
+    return slug
+
+
+def safe_slugs(texts: Iterable[str], base_path: Optional[Path] = None) -> list[str]:
+    """Batch safe_slug: same slugs and the same containment guarantee, with
+    base_path resolved once for the whole batch.
+
+    Raises ValueError if base_path is given and any slug would escape it.
+    """
+    base = base_path.resolve() if base_path else None
+    slugs = []
+    for text in texts:
+        slug = _slugify(text)[:MAX_SLUG_LENGTH]
+        if base is not None:
+            _check_contained(base, slug)
+        slugs.append(slug)
+    return slugs
+
+
+def read_text_mapped(path: Path, threshold: int = MMAP_THRESHOLD) -> str:
+    """Path.read_text(), but files of `threshold` bytes or more are decoded
+    straight from an mmap instead of through an intermediate bytes copy."""
+    size = path.stat().st_size
+    if size < threshold or size == 0:
+        return path.read_text()
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with memoryview(mapped) as view:
+            text = str(view, "utf-8")
+    # Match read_text's universal newlines
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
 
-    return slug[:255]
+
+def save_atomic(path: Path, content: str) -> None:
+    """Atomic write using temp file and rename"""
+    temp_dir = path.parent
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    
+    with tempfile.NamedTemporaryFile(mode='w', dir=temp_dir, delete=False) as tf:
+        tf.write(content)
+        temp_name = tf.name
+    
+    try:
+        os.replace(temp_name, path)
+    except Exception as e:
+        logger.error(f"Atomic write failed for {path}: {e}")
+        if os.path.exists(temp_name):
+            try:
+                from send2trash import send2trash
+                send2trash(temp_name)
+            except Exception as cleanup_err:
+                logger.warning(f"Failed to trash temp file {temp_name}: {cleanup_err}")
+        raise
 
 
 def grepai_search(query: str, project: str | None = None, limit: int = 10) -> list[dict]:
@@ -34,44 +103,10 @@ def grepai_search(query: str, project: str | None = None, limit: int = 10) -> li
 
     Use this instead of calling grepai directly from Python scripts.
     Never raises — logging failures are silently swallowed.
+
+    Repeat queries are served from an in-process LRU+TTL cache and log
+    writes are batched; see scaffold.grepai (also for the async variant).
     """
-    import json
-    import os
-    import subprocess
-    from datetime import datetime, timezone
-
-    if project is None:
-        project = Path.cwd().name
-
-    result = subprocess.run(
-        ["grepai", "search", query, "--json", "--limit", str(limit)],
-        capture_output=True,
-        text=True,
-        timeout=30,
-    )
-
-    results = []
-    try:
-        results = json.loads(result.stdout).get("results", [])
-    except (json.JSONDecodeError, AttributeError):
-        pass
+    from .grepai import search
 
-    try:
-        log_dir = (
-            Path(os.environ.get("PROJECTS_ROOT", Path.home() / "projects"))
-            / "_tools"
-            / "grepai-logs"
-        )
-        log_dir.mkdir(parents=True, exist_ok=True)
-        entry = {
-            "ts": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-            "project": project,
-            "query": query,
-            "results": [r["file"] for r in results],
-        }
-        with open(log_dir / "ai_search_log.jsonl", "a") as f:
-            f.write(json.dumps(entry) + "\n")
-    except Exception:
-        pass  # Never let logging break the actual search
-
-    return results
+    return search(query, project, limit)
@@ -0,0 +1,389 @@
+"""
+Watch Mode
+
+`scaffold review --watch` keeps reviewing a document while it is being
+edited:
+
+- The input is polled by (mtime, size). A save starts nothing immediately:
+  the round is dispatched once saves have stopped for `debounce` seconds.
+- A save during a round makes it stale. The round is cancelled at once;
+  reviews already finished stay cached.
+- The first round, and any round after a structural change (the document's
+  heading sequence differs from the last full review's), reviews the whole
+  document, so reviewers see how the sections fit together.
+- Other rounds are incremental: Markdown documents are split at their
+  headings, and only the sections edited since the last full review are
+  sent, each on its own. Reviews whose reviewer, model and rendered prompt
+  (template, REVIEW.md rules, variables and text) are unchanged are served
+  from the section cache.
+
+Every completed round is published like a normal round (RoundWriter), with
+one CODE_REVIEW file per reviewer: the full review, followed on incremental
+rounds by a part per edited section.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from rich.console import Console
+from rich.markup import escape
+
+from .artifacts import RoundWriter
+from .prompt_registry import PROMPTS
+from .providers import PromptParts
+from .review import (
+    ReviewConfig,
+    ReviewResult,
+    ReviewSummary,
+    prompt_variables,
+    queue_round_results,
+    read_document,
+    render_prompt,
+    rules_prompt_for,
+)
+from .review_rules import RuleEngine, format_findings_report
+from .utils import save_atomic
+
+if TYPE_CHECKING:
+    from .review import ReviewOrchestrator
+
+logger = logging.getLogger(__name__)
+console = Console()
+
+DEBOUNCE_SECONDS = 1.5
+POLL_INTERVAL = 0.2
+CACHE_VERSION = 2
+# Oldest cached section reviews are dropped beyond this many
+MAX_CACHE_ENTRIES = 5000
+DEFAULT_CACHE_PATH = Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "scaffold" / "review-sections.json"
+
+_HEADING = re.compile(r"^#{1,6}\s")
+_FENCE = re.compile(r"^(```|~~~)")
+MARKDOWN_SUFFIXES = (".md", ".markdown")
+
+
+@dataclass(frozen=True)
+class Section:
+    title: str
+    text: str
+
+    @property
+    def digest(self) -> str:
+        return hashlib.sha256(self.text.encode()).hexdigest()
+
+
+def split_sections(text: str, suffix: str = ".md") -> List[Section]:
+    """Markdown splits at headings outside code fences; anything else is one section"""
+    if suffix.lower() not in MARKDOWN_SUFFIXES:
+        return [Section("(document)", text)]
+    sections: List[Section] = []
+    title, lines, fenced = "(preamble)", [], False
+    for line in text.splitlines(keepends=True):
+        if _FENCE.match(line):
+            fenced = not fenced
+        elif not fenced and _HEADING.match(line):
+            if "".join(lines).strip():
+                sections.append(Section(title, "".join(lines)))
+            title, lines = line.strip().lstrip("#").strip(), []
+        lines.append(line)
+    if "".join(lines).strip():
+        sections.append(Section(title, "".join(lines)))
+    return sections or [Section("(document)", text)]
+
+
+@dataclass(frozen=True)
+class FullReview:
+    """A reviewer's last whole-document review and the sections it covered"""
+    titles: Tuple[str, ...]
+    digests: Tuple[str, ...]
+    result: Dict[str, Any]
+    round_number: int
+
+
+@dataclass
+class SectionCache:
+    """(reviewer, model, rendered prompt) -> review, persisted as JSON.
+
+    The rendered prompt covers the template, the REVIEW.md rules and
+    findings, the prompt variables and the section text, so a change to
+    any of them misses the cache.
+    """
+    path: Optional[Path] = None
+    entries: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @staticmethod
+    def key(config: ReviewConfig, prompt: PromptParts) -> str:
+        digest = hashlib.sha256("\0".join((config.name, config.api, config.model)).encode())
+        for part in prompt:
+            digest.update(b"\0")
+            digest.update(part.encode())
+        return digest.hexdigest()
+
+    @classmethod
+    def load(cls, path: Optional[Path] = DEFAULT_CACHE_PATH) -> "SectionCache":
+        cache = cls(path=path)
+        if path is None:
+            return cache
+        try:
+            data = json.loads(path.read_text())
+        except FileNotFoundError:
+            return cache
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Ignoring unreadable section cache {path}: {e}")
+            return cache
+        if data.get("version") == CACHE_VERSION:
+            cache.entries = data.get("entries", {})
+        return cache
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(key)
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        self.entries.pop(key, None)
+        self.entries[key] = {"content": result["content"], "cost": result["cost"], "tokens": result["tokens"]}
+        while len(self.entries) > MAX_CACHE_ENTRIES:
+            self.entries.pop(next(iter(self.entries)))
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        try:
+            save_atomic(self.path, json.dumps({"version": CACHE_VERSION, "entries": self.entries}))
+        except OSError as e:
+            logger.warning(f"Could not save section cache {self.path}: {e}")
+
+
+def file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None  # mid-save by an editor that replaces the file
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class ReviewWatcher:
+    """Re-review a document on every (debounced) save, section by section"""
+
+    def __init__(
+        self,
+        orchestrator: "ReviewOrchestrator",
+        document_path: Path,
+        configs: List[ReviewConfig],
+        output_dir: Path,
+        first_round: int = 1,
+        rules: Optional[RuleEngine] = None,
+        cache: Optional[SectionCache] = None,
+        debounce: float = DEBOUNCE_SECONDS,
+        poll_interval: float = POLL_INTERVAL
+    ) -> None:
+        self.orchestrator = orchestrator
+        self.document_path = document_path
+        self.configs = configs
+        self.output_dir = output_dir
+        self.round_number = first_round
+        self.rules = rules
+        self.cache = cache if cache is not None else SectionCache.load()
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.last_stats: Dict[str, int] = {}
+        # Per reviewer; incremental rounds review the sections edited since
+        self.full_reviews: Dict[str, FullReview] = {}
+
+    # --- change detection --------------------------------------------------
+
+    async def _changed(self, since: Optional[Tuple[int, int]]) -> Optional[Tuple[int, int]]:
+        """Wait for the document's signature to move away from `since`"""
+        while True:
+            signature = file_signature(self.document_path)
+            if signature != since:
+                return signature
+            await asyncio.sleep(self.poll_interval)
+
+    async def _settled(self, signature: Optional[Tuple[int, int]]) -> Tuple[int, int]:
+        """Wait until the document exists and hasn't changed for `debounce` seconds"""
+        quiet_since = asyncio.get_running_loop().time()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            current = file_signature(self.document_path)
+            now = asyncio.get_running_loop().time()
+            if current != signature:
+                signature, quiet_since = current, now
+            elif signature is not None and now - quiet_since >= self.debounce:
+                return signature
+
+    # --- one round ---------------------------------------------------------
+
+    async def review_once(self) -> ReviewSummary:
+        """Review the whole document, or only its edited sections, and publish the round"""
+        document = read_document(self.document_path)
+        sections = split_sections(document, self.document_path.suffix)
+        findings = self.rules.scan(document, self.document_path) if self.rules else []
+        variables = prompt_variables(self.document_path)
+        self.last_stats = {"sections": len(sections), "cached": 0, "sent": 0, "full": 0}
+        full_reviews: Dict[str, FullReview] = {}
+
+        results = await asyncio.gather(*(
+            self._review_document(config, document, sections, findings, variables, full_reviews)
+            for config in self.configs
+        ))
+
+        round_dir = self.output_dir / f"round_{self.round_number}"
+        with RoundWriter(round_dir) as writer:
+            if self.rules:
+                writer.add("RULE_FINDINGS.md", format_findings_report(findings, self.document_path))
+            summary = queue_round_results(writer, self.document_path, self.round_number, results, len(findings))
+        # Only a published round becomes the baseline for incremental ones
+        self.full_reviews.update(full_reviews)
+        self.cache.save()
+        return summary
+
+    async def _review_document(
+        self,
+        config: ReviewConfig,
+        document: str,
+        sections: List[Section],
+        findings: List[Any],
+        variables: Dict[str, str],
+        full_reviews: Dict[str, FullReview]
+    ) -> ReviewResult:
+        start = asyncio.get_running_loop().time()
+        try:
+            template = PROMPTS.template(config.prompt_path)
+        except OSError as e:
+            return self._result(config, "", [], start, error=str(e))
+        rules_prompt = rules_prompt_for(self.rules, findings, self.document_path, config)
+
+        async def review(section: Section) -> Dict[str, Any]:
+            prompt = render_prompt(template, section.text, rules_prompt, variables)
+            key = SectionCache.key(config, prompt)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.last_stats["cached"] += 1
+                return cached
+            self.last_stats["sent"] += 1
+            result = await self.orchestrator._call_api(config, prompt)
+            # Cached as soon as it lands, so a cancelled round keeps its progress
+            self.cache.put(key, result)
+            return result
+
+        titles = tuple(s.title for s in sections)
+        baseline = self.full_reviews.get(config.name)
+        if baseline is None or baseline.titles != titles or len(sections) == 1:
+            # First round, a structural change, or nothing to split: review the document as a whole
+            self.last_stats["full"] += 1
+            try:
+                result = await review(Section("(document)", document))
+            except Exception as e:
+                return self._result(config, template.version, [], start, error=str(e))
+            full_reviews[config.name] = FullReview(
+                titles, tuple(s.digest for s in sections), result, self.round_number
+            )
+            return self._result(config, template.version, [(None, result)], start)
+
+        edited = [s for s, digest in zip(sections, baseline.digests) if s.digest != digest]
+        outcomes = await asyncio.gather(*(review(s) for s in edited), return_exceptions=True)
+        for outcome in outcomes:
+            if isinstance(outcome, asyncio.CancelledError):
+                raise outcome
+        parts: List[Tuple[Optional[str], Dict[str, Any]]] = [
+            (f"Full document (round {baseline.round_number})", baseline.result)
+        ]
+        parts.extend(
+            (f"Section: {section.title} (edited)", outcome) for section, outcome in zip(edited, outcomes)
+            if not isinstance(outcome, BaseException)
+        )
+        errors = sorted({str(o) for o in outcomes if isinstance(o, BaseException)})
+        return self._result(config, template.version, parts, start, error="; ".join(errors) or None)
+
+    def _result(
+        self,
+        config: ReviewConfig,
+        prompt_version: str,
+        parts: List[Tuple[Optional[str], Dict[str, Any]]],
+        start: float,
+        error: Optional[str] = None
+    ) -> ReviewResult:
+        """One reviewer's file: a lone untitled part as is, otherwise a heading per part"""
+        if len(parts) == 1 and parts[0][0] is None:
+            content = parts[0][1]["content"]
+        else:
+            content = "\n\n".join(f"## {heading}\n\n{r['content']}" for heading, r in parts)
+        return ReviewResult(
+            reviewer_name=config.name,
+            api=config.api,
+            model=config.model,
+            content=content,
+            cost=sum(r["cost"] for _, r in parts),
+            tokens_used=sum(r["tokens"] for _, r in parts),
+            duration_seconds=asyncio.get_running_loop().time() - start,
+            timestamp=datetime.now(UTC).isoformat(),
+            error=error,
+            prompt_version=prompt_version
+        )
+
+    # --- the loop ----------------------------------------------------------
+
+    async def run(self, max_rounds: Optional[int] = None) -> List[ReviewSummary]:
+        """Review now, then after every settled change. Runs until cancelled
+        (Ctrl-C) or `max_rounds` rounds have been published."""
+        summaries: List[ReviewSummary] = []
+        signature = file_signature(self.document_path)
+        console.print(f"[bold]Watching {escape(str(self.document_path))}[/bold] (Ctrl-C to stop)")
+        while True:
+            round_task = asyncio.create_task(self.review_once())
+            change = asyncio.create_task(self._changed(signature))
+            try:
+                done, _ = await asyncio.wait({round_task, change}, return_when=asyncio.FIRST_COMPLETED)
+            except BaseException:
+                round_task.cancel()
+                change.cancel()
+                self.cache.save()
+                raise
+
+            if round_task in done:
+                try:
+                    summary = round_task.result()
+                except Exception as e:
+                    console.print(f"[red]Round {self.round_number} failed: {escape(str(e))}[/red]")
+                else:
+                    summaries.append(summary)
+                    self._report(summary)
+                    self.round_number += 1
+                    if max_rounds is not None and len(summaries) >= max_rounds:
+                        change.cancel()
+                        return summaries
+                signature = await change
+            else:
+                # Edited mid-round: those reviews are stale
+                round_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await round_task
+                self.cache.save()
+                console.print(f"[yellow]Document changed; cancelled round {self.round_number}[/yellow]")
+                signature = change.result()
+
+            signature = await self._settled(signature)
+            changed_prompts = PROMPTS.refresh()
+            if changed_prompts:
+                console.print(f"[dim]Reloaded {len(changed_prompts)} changed prompt(s)[/dim]")
+
+    def _report(self, summary: ReviewSummary) -> None:
+        stats = self.last_stats
+        failed = sum(1 for r in summary.results if r.error)
+        scope = "full document" if stats["full"] else "edited sections"
+        if 0 < stats["full"] < len(self.configs):
+            scope = "full document for some reviewers"
+        console.print(
+            f"Round {summary.round_number} ({scope}): {stats['sent']} review(s) sent, "
+            f"{stats['cached']} from cache, {failed} failed reviewer(s) "
+            f"-> {escape(str(self.output_dir / f'round_{summary.round_number}'))}"
+        )
@@ -0,0 +1,403 @@
+"""
+Review Work Queue
+
+Spreads (document, reviewer) jobs over several machines. A scheduler
+(`scaffold campaign --queue URL`) enqueues fully rendered prompts. Any
+number of `scaffold worker --queue URL` processes, on any box that can reach
+the queue, then each:
+
+- lease one job at a time (per concurrency slot),
+- heartbeat while the provider call runs, which extends the lease,
+- post the result, or fail the job so it is retried up to MAX_ATTEMPTS.
+
+If a worker dies, its lease expires and the job is re-queued for someone
+else. Jobs carry the whole prompt, so workers need no access to the
+documents or the prompt files, only to a provider. This suits CPU-only boxes
+running a local Ollama model.
+
+Backends implement `JobQueue` and are opened by URL scheme:
+
+    sqlite:////mnt/shared/reviews/queue.db   (built in)
+
+Other backends register under the `scaffold.queues` entry point group,
+"scheme = module:Class", where the class has `from_url(url)`.
+
+The SQLite backend keeps the default rollback journal rather than WAL,
+because WAL needs shared memory and does not work on network filesystems.
+Every operation is one short BEGIN IMMEDIATE transaction on a fresh
+connection.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import importlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from importlib.metadata import EntryPoint, entry_points
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "scaffold.queues"
+BUILTIN_QUEUES = {
+    "sqlite": "scaffold.work_queue:SQLiteQueue",
+}
+DEFAULT_LEASE_SECONDS = 120.0
+MAX_ATTEMPTS = 3
+
+QUEUED, LEASED, DONE, FAILED = "queued", "leased", "done", "failed"
+
+
+@dataclass
+class QueueJob:
+    """One (document, reviewer) review, with everything a worker needs"""
+    id: str
+    campaign: str
+    document: str
+    reviewer: str
+    api: str
+    model: str
+    round: int
+    prompt: str
+    prompt_version: str = ""
+    status: str = QUEUED
+    worker: Optional[str] = None
+    lease_expires: float = 0.0
+    attempts: int = 0
+    result: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+
+def queue_job_id(campaign: str, round_number: int, document: str, reviewer: str, prompt: str) -> str:
+    """Changes whenever the rendered prompt does, so edited documents are new jobs"""
+    digest = hashlib.sha256("\0".join((campaign, str(round_number), document, reviewer, prompt)).encode())
+    return digest.hexdigest()[:32]
+
+
+class JobQueue:
+    """Backend interface; every method must be safe to call from many processes and hosts"""
+
+    def enqueue(self, jobs: Iterable[QueueJob]) -> int:
+        """Add jobs; ids already present are kept (finished results are reused)
+        unless they failed, which re-queues them. Returns how many were new."""
+        raise NotImplementedError
+
+    def lease(self, worker: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[QueueJob]:
+        """Claim the oldest queued job (re-queueing expired leases first), or None"""
+        raise NotImplementedError
+
+    def heartbeat(self, job_id: str, worker: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """Extend a lease; False means it was lost and the worker should stop"""
+        raise NotImplementedError
+
+    def complete(self, job_id: str, worker: str, result: Dict[str, Any]) -> bool:
+        raise NotImplementedError
+
+    def fail(self, job_id: str, worker: str, error: str, retry: bool = True) -> bool:
+        """Re-queue (if `retry` and attempts remain) or fail the job"""
+        raise NotImplementedError
+
+    def release(self, job_id: str, worker: str) -> bool:
+        """Hand a leased job back untouched (worker shutting down)"""
+        raise NotImplementedError
+
+    def jobs(self, ids: Iterable[str]) -> List[QueueJob]:
+        raise NotImplementedError
+
+    def counts(self, campaign: Optional[str] = None) -> Dict[str, int]:
+        raise NotImplementedError
+
+
+class SQLiteQueue(JobQueue):
+    """A JobQueue in one SQLite file, e.g. on a shared disk"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            campaign TEXT NOT NULL,
+            document TEXT NOT NULL,
+            reviewer TEXT NOT NULL,
+            api TEXT NOT NULL,
+            model TEXT NOT NULL,
+            round INTEGER NOT NULL,
+            prompt TEXT NOT NULL,
+            prompt_version TEXT NOT NULL DEFAULT '',
+            status TEXT NOT NULL DEFAULT 'queued',
+            worker TEXT,
+            lease_expires REAL NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            result TEXT,
+            error TEXT,
+            enqueued_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, enqueued_at);
+    """
+    COLUMNS = (
+        "id", "campaign", "document", "reviewer", "api", "model", "round", "prompt", "prompt_version",
+        "status", "worker", "lease_expires", "attempts", "result", "error",
+    )
+
+    def __init__(self, path: Path, max_attempts: int = MAX_ATTEMPTS, busy_timeout: float = 30.0) -> None:
+        self.path = path
+        self.max_attempts = max_attempts
+        self.busy_timeout = busy_timeout
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.path, timeout=self.busy_timeout)
+        try:
+            db.executescript(self.SCHEMA)  # commits on its own
+        finally:
+            db.close()
+
+    @classmethod
+    def from_url(cls, url: str) -> "SQLiteQueue":
+        return cls(Path(url.partition("://")[2]))
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+        finally:
+            db.close()
+
+    def _row(self, row: tuple) -> QueueJob:
+        values = dict(zip(self.COLUMNS, row))
+        values["result"] = json.loads(values["result"]) if values["result"] else {}
+        return QueueJob(**values)
+
+    def enqueue(self, jobs: Iterable[QueueJob]) -> int:
+        jobs = list(jobs)
+        now = time.time()
+        with self._transaction() as db:
+            before = db.total_changes
+            db.executemany(
+                "INSERT OR IGNORE INTO jobs (id, campaign, document, reviewer, api, model, round, prompt,"
+                " prompt_version, enqueued_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (j.id, j.campaign, j.document, j.reviewer, j.api, j.model, j.round, j.prompt,
+                     j.prompt_version, now, now)
+                    for j in jobs
+                ],
+            )
+            added = db.total_changes - before
+            db.executemany(
+                "UPDATE jobs SET status = 'queued', attempts = 0, error = NULL, updated_at = ?"
+                " WHERE id = ? AND status = 'failed'",
+                [(now, j.id) for j in jobs],
+            )
+            return added
+
+    def _requeue_expired(self, db: sqlite3.Connection, now: float) -> None:
+        db.execute(
+            "UPDATE jobs SET status = 'failed', error = 'lease expired ' || attempts || ' time(s)',"
+            " worker = NULL, updated_at = ? WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+            (now, now, self.max_attempts),
+        )
+        db.execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, updated_at = ?"
+            " WHERE status = 'leased' AND lease_expires < ?",
+            (now, now),
+        )
+
+    def lease(self, worker: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[QueueJob]:
+        now = time.time()
+        with self._transaction() as db:
+            self._requeue_expired(db, now)
+            row = db.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY enqueued_at, id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1,"
+                " updated_at = ? WHERE id = ?",
+                (worker, now + lease_seconds, now, row[0]),
+            )
+            columns = ", ".join(self.COLUMNS)
+            return self._row(db.execute(f"SELECT {columns} FROM jobs WHERE id = ?", row).fetchone())
+
+    def _update_leased(self, job_id: str, worker: str, assignments: str, values: tuple) -> bool:
+        with self._transaction() as db:
+            cursor = db.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (*values, time.time(), job_id, worker),
+            )
+            return cursor.rowcount == 1
+
+    def heartbeat(self, job_id: str, worker: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        return self._update_leased(job_id, worker, "lease_expires = ?", (time.time() + lease_seconds,))
+
+    def complete(self, job_id: str, worker: str, result: Dict[str, Any]) -> bool:
+        return self._update_leased(job_id, worker, "status = 'done', result = ?, error = NULL", (json.dumps(result),))
+
+    def fail(self, job_id: str, worker: str, error: str, retry: bool = True) -> bool:
+        status = "CASE WHEN ? AND attempts < ? THEN 'queued' ELSE 'failed' END"
+        return self._update_leased(
+            job_id, worker, f"status = {status}, worker = NULL, error = ?", (retry, self.max_attempts, error)
+        )
+
+    def release(self, job_id: str, worker: str) -> bool:
+        return self._update_leased(
+            job_id, worker, "status = 'queued', worker = NULL, attempts = MAX(attempts - 1, 0)", ()
+        )
+
+    def jobs(self, ids: Iterable[str]) -> List[QueueJob]:
+        ids = list(ids)
+        columns = ", ".join(self.COLUMNS)
+        found: List[QueueJob] = []
+        with self._transaction() as db:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                marks = ", ".join("?" * len(chunk))
+                rows = db.execute(f"SELECT {columns} FROM jobs WHERE id IN ({marks})", chunk).fetchall()
+                found.extend(self._row(row) for row in rows)
+        return found
+
+    def counts(self, campaign: Optional[str] = None) -> Dict[str, int]:
+        where, values = ("WHERE campaign = ?", (campaign,)) if campaign else ("", ())
+        with self._transaction() as db:
+            rows = db.execute(f"SELECT status, COUNT(*) FROM jobs {where} GROUP BY status", values).fetchall()
+        return {status: count for status, count in rows}
+
+
+@lru_cache(maxsize=1)
+def _entry_points() -> Dict[str, EntryPoint]:
+    return {ep.name: ep for ep in entry_points(group=ENTRY_POINT_GROUP)}
+
+
+def open_queue(url: str) -> JobQueue:
+    """Open a queue backend by URL scheme ("sqlite:///path/queue.db")"""
+    scheme, sep, _ = url.partition("://")
+    if not sep:
+        raise ValueError(f"Queue URL needs a scheme, e.g. sqlite:///path/queue.db: {url}")
+    target = BUILTIN_QUEUES.get(scheme) or _entry_points().get(scheme)
+    if target is None:
+        raise ValueError(f"Unknown queue backend: {scheme}")
+    if isinstance(target, EntryPoint):
+        cls = target.load()
+    else:
+        module_name, _, attr = target.partition(":")
+        cls = getattr(importlib.import_module(module_name), attr)
+    return cls.from_url(url)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+async def _heartbeat(queue: JobQueue, job: QueueJob, worker: str, lease_seconds: float, task: asyncio.Task) -> None:
+    """Extend the lease every third of its length; cancel `task` once the lease is lost.
+
+    A failed heartbeat (queue briefly unreachable, database locked) is logged and
+    retried on the next beat; the lease only lapses if every beat until then fails.
+    """
+    while True:
+        await asyncio.sleep(lease_seconds / 3)
+        try:
+            kept = await asyncio.to_thread(queue.heartbeat, job.id, worker, lease_seconds)
+        except Exception as e:
+            logger.warning(f"Heartbeat for {job.id} failed, retrying: {type(e).__name__}: {e}")
+            continue
+        if not kept:
+            logger.warning(f"Lost the lease on {job.id}; abandoning it")
+            task.cancel()
+            return
+
+
+async def run_worker(
+    queue: JobQueue,
+    worker: Optional[str] = None,
+    keys: Optional[Dict[str, Optional[str]]] = None,
+    providers: Optional[Dict[str, str]] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    concurrency: int = 1,
+    poll_interval: float = 2.0,
+    exit_when_idle: Optional[float] = None
+) -> int:
+    """Lease, review and post jobs until cancelled (or idle for `exit_when_idle`
+    seconds). Returns the number of jobs completed."""
+    from .providers import FATAL
+    from .review import create_orchestrator
+
+    worker = worker or default_worker_id()
+    orchestrator = create_orchestrator(**(keys or {}))
+    for name, target in (providers or {}).items():
+        orchestrator.providers.register(name, target)
+    done = 0
+    idle_since = time.monotonic()
+    slots = asyncio.Semaphore(concurrency)
+    running: set = set()
+
+    async def process(job: QueueJob) -> None:
+        nonlocal done, idle_since
+        provider_task = None
+        try:
+            provider = orchestrator.providers.get(job.api)
+            provider_task = asyncio.create_task(provider.call(job.model, job.prompt))
+            beat = asyncio.create_task(_heartbeat(queue, job, worker, lease_seconds, provider_task))
+            start = time.monotonic()
+            try:
+                result = await provider_task
+            finally:
+                beat.cancel()
+            posted = await asyncio.to_thread(queue.complete, job.id, worker, {
+                "content": result["content"],
+                "cost": result["cost"],
+                "tokens": result["tokens"],
+                "duration": time.monotonic() - start,
+                "worker": worker,
+            })
+            if posted:
+                done += 1
+            else:
+                logger.warning(f"Lost {job.id} to another worker before posting; result discarded")
+        except asyncio.CancelledError:
+            if provider_task is not None and provider_task.cancelled() and not asyncio.current_task().cancelling():
+                return  # lost the lease; someone else has the job now
+            await asyncio.to_thread(queue.release, job.id, worker)
+            raise
+        except Exception as e:
+            kind = provider.classify(e) if provider_task is not None else FATAL
+            logger.warning(f"{job.reviewer} on {job.document} failed ({kind}): {e}")
+            await asyncio.to_thread(queue.fail, job.id, worker, f"{type(e).__name__}: {e}", kind != FATAL)
+        finally:
+            idle_since = time.monotonic()
+            slots.release()
+
+    try:
+        while True:
+            await slots.acquire()
+            job = await asyncio.to_thread(queue.lease, worker, lease_seconds)
+            if job is None:
+                slots.release()
+                if exit_when_idle is not None and not running and time.monotonic() - idle_since >= exit_when_idle:
+                    return done
+                await asyncio.sleep(poll_interval)
+                continue
+            task = asyncio.create_task(process(job))
+            running.add(task)
+            task.add_done_callback(running.discard)
+    finally:
+        for task in list(running):
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
@@ -0,0 +1,303 @@
+"""Tests for the background Discord alert dispatcher, against a local stand-in webhook."""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scaffold import alerts
+from scaffold.alerts import AlertDispatcher, Outbox, WebhookClient, build_payload
+
+
+class FakeWebhook(BaseHTTPRequestHandler):
+    """Records POSTed payloads; replies from the server's `responses` script."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self) -> None:
+        length = int(self.headers["Content-Length"])
+        self.server.payloads.append(json.loads(self.rfile.read(length)))
+        status, headers, body = self.server.responses.pop(0) if self.server.responses else (204, {}, b"")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def webhook():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeWebhook)
+    server.payloads = []
+    server.responses = []
+    server.connections = 0
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/api/webhooks/1/token"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_send_does_not_block_and_bursts_are_coalesced(webhook):
+    dispatcher = AlertDispatcher(webhook.url, window=0.2)
+
+    start = time.perf_counter()
+    futures = [dispatcher.send(f"alert {i}", level="error" if i == 3 else "info") for i in range(5)]
+    assert time.perf_counter() - start < 0.05
+
+    assert all(f.result(timeout=5) for f in futures)
+    assert len(webhook.payloads) == 1
+    embed = webhook.payloads[0]["embeds"][0]
+    assert embed["title"] == "5 alerts"
+    assert "• alert 4" in embed["description"]
+    assert embed["color"] == alerts.LEVEL_COLORS["error"]
+    dispatcher.close()
+
+
+def test_connection_is_reused_across_messages(webhook):
+    dispatcher = AlertDispatcher(webhook.url, window=0)
+    for i in range(3):
+        assert dispatcher.send(f"alert {i}").result(timeout=5)
+    dispatcher.close()
+
+    assert len(webhook.payloads) == 3
+    assert webhook.connections == 1
+    assert dispatcher.client.connections_opened == 1
+
+
+def test_rate_limit_is_respected(webhook):
+    webhook.responses = [
+        (429, {"Content-Type": "application/json"}, b'{"retry_after": 0.3}'),
+        (204, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "0.3"}, b""),
+    ]
+    client = WebhookClient(webhook.url)
+
+    start = time.perf_counter()
+    assert client.post({"content": "a"})
+    assert client.post({"content": "b"})
+    elapsed = time.perf_counter() - start
+    client.close()
+
+    # One wait for the 429, one for the exhausted bucket
+    assert elapsed >= 0.55
+    assert [p["content"] for p in webhook.payloads] == ["a", "a", "b"]
+
+
+def test_client_errors_are_not_retried(webhook):
+    webhook.responses = [(400, {}, b"bad")]
+    client = WebhookClient(webhook.url)
+    assert client.post({"content": "x"}) is False
+    assert len(webhook.payloads) == 1
+    client.close()
+
+
+@pytest.mark.asyncio
+async def test_async_api_does_not_block_event_loop(webhook):
+    dispatcher = AlertDispatcher(webhook.url, window=0.2)
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    assert await dispatcher.asend("from async")
+    task.cancel()
+    dispatcher.close()
+
+    assert ticks >= 5
+    assert webhook.payloads[0]["embeds"][0]["description"] == "from async"
+
+
+def test_send_discord_alert_compat(webhook, monkeypatch, tmp_path):
+    monkeypatch.setattr(alerts, "DEFAULT_OUTBOX_PATH", tmp_path / "outbox.jsonl")
+    monkeypatch.setattr(alerts, "_default", None)
+    monkeypatch.delenv("DISCORD_WEBHOOK_URL", raising=False)
+    assert alerts.send_discord_alert("skipped") is True
+
+    monkeypatch.setenv("DISCORD_WEBHOOK_URL", webhook.url)
+    assert alerts.send_discord_alert("hello") is True
+    assert webhook.payloads[-1]["embeds"][0]["description"] == "hello"
+    alerts.get_dispatcher().close()
+
+
+def test_long_bursts_are_truncated_to_embed_limit():
+    payload = build_payload([alerts.Alert(message="x" * 3000) for _ in range(3)])
+    assert len(payload["embeds"][0]["description"]) == alerts.MAX_DESCRIPTION
+
+
+class TestOutbox:
+    """Durable outbox: replay, dedup, TTL and backoff"""
+
+    def test_enqueue_is_cheap(self, tmp_path):
+        outbox = Outbox(tmp_path / "outbox.jsonl")
+        start = time.perf_counter()
+        for i in range(2000):
+            outbox.add(f"alert {i}")
+        per_call = (time.perf_counter() - start) / 2000
+        outbox.close()
+
+        assert per_call < 200e-6
+
+    def test_duplicates_of_pending_alerts_are_dropped(self, tmp_path):
+        outbox = Outbox(tmp_path / "outbox.jsonl")
+        first, created = outbox.add("disk full", level="error")
+        again, created_again = outbox.add("disk full", level="error")
+        keyed, _ = outbox.add("disk full on /var", level="error", key=first.key)
+
+        assert created and not created_again
+        assert again is first and keyed is first
+        assert len(outbox.pending) == 1
+
+        outbox.mark_done([first.id])
+        _, created_after = outbox.add("disk full", level="error")
+        assert created_after
+
+    def test_pending_alerts_survive_restart(self, tmp_path):
+        path = tmp_path / "outbox.jsonl"
+        outbox = Outbox(path)
+        delivered, _ = outbox.add("one")
+        failed, _ = outbox.add("two")
+        outbox.mark_done([delivered.id])
+        outbox.mark_failed([failed.id], "HTTP 502")
+        outbox.close()
+        with open(path, "a") as f:
+            f.write('{"op": "add", "mess')  # torn write from a crash
+
+        reloaded = Outbox(path)
+        assert list(reloaded.pending) == [failed.id]
+        alert = reloaded.pending[failed.id]
+        assert alert.attempts == 1 and alert.error == "HTTP 502"
+        assert alert.next_at > time.time()
+        assert reloaded.due() == []
+        assert reloaded.due(ignore_backoff=True) == [alert]
+
+    def test_expired_alerts_are_dropped(self, tmp_path):
+        outbox = Outbox(tmp_path / "outbox.jsonl", ttl=0.0)
+        outbox.add("stale")
+        assert [a.message for a in outbox.expire()] == ["stale"]
+        assert outbox.pending == {}
+
+    def test_compaction_keeps_only_pending(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(alerts, "COMPACT_AFTER", 10)
+        path = tmp_path / "outbox.jsonl"
+        outbox = Outbox(path)
+        keep, _ = outbox.add("keep me")
+        for i in range(6):
+            done, _ = outbox.add(f"done {i}")
+            outbox.mark_done([done.id])
+        outbox.close()
+
+        lines = path.read_text().splitlines()
+        assert len(lines) < 8
+        assert list(Outbox(path).pending) == [keep.id]
+
+
+class TestSharedOutbox:
+    """Several processes (here: two Outbox instances) on one outbox file"""
+
+    def test_appends_from_other_processes_are_seen_and_deduped(self, tmp_path):
+        path = tmp_path / "outbox.jsonl"
+        a, b = Outbox(path), Outbox(path)
+        first, _ = a.add("disk full", level="error")
+        again, created = b.add("disk full", level="error")
+
+        assert not created and again.id == first.id
+        b.add("from b")
+        assert [x.message for x in a.due()] == ["disk full", "from b"]
+        a.close()
+        b.close()
+
+    def test_only_one_process_drains(self, tmp_path):
+        path = tmp_path / "outbox.jsonl"
+        a, b = Outbox(path), Outbox(path)
+        assert a.claim_drain() and not b.claim_drain()
+        a.close()
+        assert b.claim_drain()
+        b.close()
+
+    def test_compaction_does_not_lose_other_writers_records(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(alerts, "COMPACT_AFTER", 4)
+        path = tmp_path / "outbox.jsonl"
+        drainer, writer = Outbox(path), Outbox(path)
+        writer.add("before")  # opens its append handle on the original file
+        for i in range(3):
+            done, _ = drainer.add(f"done {i}")
+            drainer.mark_done([done.id])  # compacts into a new file
+        writer.add("after")
+
+        messages = sorted(a.message for a in Outbox(path).pending.values())
+        assert messages == ["after", "before"]
+        drainer.close()
+        writer.close()
+
+    def test_each_alert_is_delivered_once(self, webhook, tmp_path, monkeypatch):
+        monkeypatch.setattr(alerts, "SHARED_POLL", 0.05)
+        path = tmp_path / "outbox.jsonl"
+        first = AlertDispatcher(webhook.url, window=0, outbox=Outbox(path))
+        second = AlertDispatcher(webhook.url, window=0, outbox=Outbox(path))
+
+        futures = [first.send("from first"), second.send("from second")]
+        assert all(f.result(timeout=5) for f in futures)
+        first.close()
+        second.close()
+
+        sent = [p["embeds"][0]["description"] for p in webhook.payloads]
+        lines = [line.removeprefix("• ") for text in sent for line in text.splitlines()]
+        assert sorted(lines) == ["from first", "from second"]
+
+
+def test_failed_delivery_stays_queued_and_backs_off(webhook, tmp_path):
+    webhook.responses = [(400, {}, b"bad")]
+    outbox = Outbox(tmp_path / "outbox.jsonl")
+    dispatcher = AlertDispatcher(webhook.url, window=0, outbox=outbox)
+    outbox.add("important")
+
+    assert dispatcher.drain_once() == 0
+    pending = list(outbox.pending.values())
+    assert pending[0].attempts == 1 and pending[0].error == "HTTP 400"
+
+    # Still inside the backoff window
+    assert dispatcher.drain_once() == 0
+    assert len(webhook.payloads) == 1
+
+    assert dispatcher.drain_once(ignore_backoff=True) == 1
+    assert outbox.pending == {}
+    dispatcher.close()
+
+
+def test_alerts_cli_status_and_flush(webhook, tmp_path, monkeypatch):
+    from click.testing import CliRunner
+
+    from scaffold.cli import cli
+
+    path = tmp_path / "outbox.jsonl"
+    outbox = Outbox(path)
+    outbox.add("left over from last run", level="warning")
+    outbox.close()
+    runner = CliRunner()
+
+    status = runner.invoke(cli, ["alerts", "status", "--outbox", str(path)])
+    assert status.exit_code == 0
+    assert "1 pending" in status.output
+
+    monkeypatch.setenv("DISCORD_WEBHOOK_URL", webhook.url)
+    flushed = runner.invoke(cli, ["alerts", "flush", "--outbox", str(path)])
+    assert flushed.exit_code == 0
+    assert "Delivered 1 alert(s), 0 pending" in flushed.output
+    assert webhook.payloads[0]["embeds"][0]["description"] == "left over from last run"
+    assert Outbox(path).pending == {}
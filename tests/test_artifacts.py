@@ -0,0 +1,161 @@
+"""Tests for the staged, all-at-once round artifact writer."""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+import send2trash
+
+from scaffold import artifacts
+from scaffold.artifacts import RoundWriter
+
+
+@pytest.fixture
+def trashed(monkeypatch):
+    paths = []
+    monkeypatch.setattr(send2trash, "send2trash", lambda path: paths.append(Path(path)))
+    return paths
+
+
+def test_round_is_invisible_until_commit(tmp_path):
+    round_dir = tmp_path / "reviews" / "round_1"
+    writer = RoundWriter(round_dir)
+    for i in range(200):
+        assert writer.add(f"CODE_REVIEW_{i}.md", f"review {i}") == round_dir / f"CODE_REVIEW_{i}.md"
+
+    assert not round_dir.exists()
+    writer.commit()
+
+    assert len(list(round_dir.iterdir())) == 200
+    assert (round_dir / "CODE_REVIEW_7.md").read_text() == "review 7"
+    # Only the published round is left behind
+    assert [p.name for p in round_dir.parent.iterdir()] == ["round_1"]
+
+
+def test_directory_is_fsynced_not_once_per_file(tmp_path, monkeypatch):
+    synced = []
+    real = artifacts._fsync_dir
+    monkeypatch.setattr(artifacts, "_fsync_dir", lambda path: synced.append(path) or real(path))
+
+    with RoundWriter(tmp_path / "round_1") as writer:
+        for i in range(50):
+            writer.add(f"f{i}.md", "x")
+
+    assert len(synced) == 2  # the staged round, then its parent after the rename
+
+
+def test_rerun_replaces_round_and_keeps_untouched_files(tmp_path, trashed):
+    round_dir = tmp_path / "round_1"
+    with RoundWriter(round_dir) as writer:
+        writer.add("CODE_REVIEW_A.md", "old a")
+        writer.add("CODE_REVIEW_B.md", "old b")
+
+    with RoundWriter(round_dir) as writer:
+        writer.add("CODE_REVIEW_A.md", "new a")
+
+    assert (round_dir / "CODE_REVIEW_A.md").read_text() == "new a"
+    assert (round_dir / "CODE_REVIEW_B.md").read_text() == "old b"
+    assert len(trashed) == 1 and trashed[0].name.startswith(".round_1.previous-")
+
+
+def test_failure_leaves_published_round_untouched(tmp_path, trashed):
+    round_dir = tmp_path / "round_1"
+    with RoundWriter(round_dir) as writer:
+        writer.add("COST_SUMMARY.json", "{}")
+
+    with pytest.raises(RuntimeError):
+        with RoundWriter(round_dir) as writer:
+            writer.add("COST_SUMMARY.json", '{"half": true}')
+            raise RuntimeError("reviewer crashed")
+
+    assert (round_dir / "COST_SUMMARY.json").read_text() == "{}"
+    assert len(trashed) == 1 and ".staging-" in trashed[0].name
+
+
+def test_names_must_stay_inside_the_round(tmp_path):
+    writer = RoundWriter(tmp_path / "round_1")
+    for name in ["../escape.md", "a/b.md", "..", ""]:
+        with pytest.raises(ValueError, match="Path Traversal"):
+            writer.add(name, "x")
+    writer.commit()
+    assert list((tmp_path / "round_1").iterdir()) == []
+
+
+def test_writes_run_on_a_thread_pool(tmp_path, monkeypatch):
+    threads = set()
+    real = artifacts._write_file
+
+    def record(path: Path, content: str) -> None:
+        threads.add(threading.current_thread().name)
+        real(path, content)
+
+    monkeypatch.setattr(artifacts, "_write_file", record)
+    with RoundWriter(tmp_path / "round_1", max_workers=4) as writer:
+        for i in range(40):
+            writer.add(f"f{i}.md", "x" * 10000)
+
+    assert all(name.startswith("round-writer") for name in threads)
+
+
+@pytest.mark.skipif(not artifacts._exchange_call(), reason="no atomic exchange on this platform")
+def test_republish_never_leaves_the_round_missing(tmp_path, trashed, monkeypatch):
+    round_dir = tmp_path / "round_1"
+    with RoundWriter(round_dir) as writer:
+        writer.add("CODE_REVIEW_A.md", "old a")
+
+    present = []
+    real = artifacts.os.replace
+    monkeypatch.setattr(artifacts.os, "replace", lambda a, b: present.append(round_dir.exists()) or real(a, b))
+    with RoundWriter(round_dir) as writer:
+        writer.add("CODE_REVIEW_A.md", "new a")
+
+    assert present and all(present)
+    assert (round_dir / "CODE_REVIEW_A.md").read_text() == "new a"
+    assert len(trashed) == 1 and trashed[0].name.startswith(".round_1.previous-")
+
+
+def test_two_rename_fallback_publishes_the_round(tmp_path, trashed, monkeypatch):
+    monkeypatch.setattr(artifacts, "_exchange", lambda a, b: False)
+    round_dir = tmp_path / "round_1"
+    for content in ("old", "new"):
+        with RoundWriter(round_dir) as writer:
+            writer.add("CODE_REVIEW_A.md", content)
+
+    assert (round_dir / "CODE_REVIEW_A.md").read_text() == "new"
+    assert len(trashed) == 1 and trashed[0].name.startswith(".round_1.previous-")
+
+
+def test_interrupted_publish_is_recovered_on_next_commit(tmp_path, trashed):
+    round_dir = tmp_path / "round_1"
+    with RoundWriter(round_dir) as writer:
+        writer.add("CODE_REVIEW_A.md", "a")
+    # A crash between the fallback's two renames
+    round_dir.rename(tmp_path / ".round_1.previous-0badc0de")
+
+    with RoundWriter(round_dir) as writer:
+        writer.add("CODE_REVIEW_B.md", "b")
+
+    assert sorted(p.name for p in round_dir.iterdir()) == ["CODE_REVIEW_A.md", "CODE_REVIEW_B.md"]
+
+
+def test_leftovers_are_removed_when_the_trash_fails(tmp_path, monkeypatch):
+    def broken(path):
+        raise OSError("no trash on this mount")
+
+    monkeypatch.setattr(send2trash, "send2trash", broken)
+    round_dir = tmp_path / "round_1"
+    round_dir.mkdir()
+    (tmp_path / ".round_1.previous-deadbeef").mkdir()  # left by an earlier crash
+    stale = tmp_path / ".round_1.staging-cafef00d"
+    stale.mkdir()
+    old = time.time() - artifacts.STALE_STAGING_SECONDS - 1
+    os.utime(stale, (old, old))
+
+    for i in range(3):
+        with RoundWriter(round_dir) as writer:
+            writer.add("CODE_REVIEW_A.md", f"run {i}")
+
+    assert [p.name for p in tmp_path.iterdir()] == ["round_1"]
+    assert (round_dir / "CODE_REVIEW_A.md").read_text() == "run 2"
@@ -0,0 +1,190 @@
+"""Tests for the AST-based deletion/credential scanner and its content-hash cache."""
+
+import subprocess
+from pathlib import Path
+
+from scaffold.ast_scan import AstCache, content_hash, is_recursive_force_rm, scan_file_cached, scan_source
+from scaffold.audit import SkipRules, run_audit
+from scaffold.hook_scan import refine_python_findings, scan_diff
+from scaffold.safety import SafetyMatcher
+
+# Built by concatenation so this file doesn't trip the scanners it tests
+RMTREE = "rm" + "tree"
+RM_RF = "rm " + "-rf"
+
+ALIASED = f"""
+import os
+import shutil as sh
+from os import unlink as drop
+from shutil import {RMTREE} as nuke
+
+sh.{RMTREE}(path)
+nuke(path)
+drop(path)
+os.path.exists(path)
+"""
+
+PATTERN_DEFINITIONS = f'''
+"""Never call shutil.{RMTREE}(path) or run {RM_RF} by hand."""
+# shutil.{RMTREE}(path) would be unsafe here
+DANGEROUS = ["shutil.{RMTREE}(", "{RM_RF}"]
+assert "{RM_RF}" in content
+'''
+
+SUBPROCESS = f"""
+import subprocess as sp
+import os
+
+sp.run(["rm", "-r", "-f", target])
+os.system(f"cd {{d}} && {RM_RF} build")
+cmd = "{RM_RF} dist"
+sp.call(cmd, shell=True)
+sp.run(["rm", "-r", target])
+sp.run(["echo", "{RM_RF}"])
+"""
+
+
+def test_aliased_imports_are_resolved() -> None:
+    assert scan_source(ALIASED) == [("unsafe-delete", 7), ("unsafe-delete", 8), ("unsafe-delete", 9)]
+
+
+def test_strings_comments_and_docstrings_do_not_match() -> None:
+    assert scan_source(PATTERN_DEFINITIONS) == []
+
+
+def test_subprocess_recursive_force_rm() -> None:
+    assert scan_source(SUBPROCESS) == [("rm-rf", 5), ("rm-rf", 6), ("rm-rf", 8)]
+
+
+BUILT_COMMANDS = f"""
+import os
+import subprocess
+from shutil import *
+
+os.system("{RM_RF} " + d)
+subprocess.run("{RM_RF} {{}}".format(d), shell=True)
+subprocess.run("{RM_RF} %s" % d, shell=True)
+subprocess.run(["rm"] + ["-rf", d])
+{RMTREE}(p)
+os.system("ls " + d)
+subprocess.run("echo {{}}".format(d), shell=True)
+"""
+
+OPAQUE_COMMANDS = f"""
+import os
+
+os.system(quote("{RM_RF}", d))
+cmd = build("{RM_RF}", d)
+os.system(cmd)
+os.system(build("ls"))
+"""
+
+
+def test_built_commands_and_star_imports_are_resolved() -> None:
+    assert scan_source(BUILT_COMMANDS) == [
+        ("rm-rf", 6), ("rm-rf", 7), ("rm-rf", 8), ("rm-rf", 9), ("unsafe-delete", 10),
+    ]
+
+
+def test_unresolvable_commands_fall_back_to_the_regex() -> None:
+    assert scan_source(OPAQUE_COMMANDS) == [("rm-rf", 4), ("rm-rf", 5)]
+
+
+def test_hook_scan_and_audit_keep_built_commands_blocked(tmp_path: Path, monkeypatch) -> None:
+    (tmp_path / "clean.py").write_text(BUILT_COMMANDS)
+    report = run_audit([tmp_path], skip=SkipRules(), workers=1, ast_cache=AstCache())
+    assert sorted(f.line for f in report.findings if f.rule_id == "rm-rf") == [6, 7, 8, 9]
+
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    subprocess.run(["git", "add", "clean.py"], cwd=tmp_path, check=True)
+    monkeypatch.chdir(tmp_path)
+    diff = subprocess.run(
+        ["git", "diff", "--cached", "--unified=0"], capture_output=True, text=True, check=True,
+    ).stdout
+    matcher = SafetyMatcher()
+    added: dict[str, set[int]] = {}
+    refined = refine_python_findings(list(scan_diff(diff.splitlines(), matcher, added)), added, matcher, cache=AstCache())
+
+    assert sorted(f.line for f in refined if f.rule_id == "rm-rf") == [6, 7, 8, 9]
+
+
+def test_rm_flag_parsing() -> None:
+    assert is_recursive_force_rm(["rm", "-fR", "x"])
+    assert is_recursive_force_rm(["/bin/rm", "--recursive", "--force", "x"])
+    assert not is_recursive_force_rm(["rm", "-r", "x"])
+    assert not is_recursive_force_rm(["rm", "--", "-rf"])
+
+
+def test_hardcoded_credentials() -> None:
+    source = (
+        'api_key = "' + "abcdefgh1234" + '"\n'
+        'client(password="' + "hunter22hunter" + '")\n'
+        'api_key_env = "OPENAI_API_KEY"\n'
+        'secret = "SHORT"\n'
+        'password_prompt = "Enter your password"\n'
+    )
+    assert scan_source(source) == [("hardcoded-credential", 1), ("hardcoded-credential", 2)]
+
+
+def test_syntax_errors_return_none() -> None:
+    assert scan_source("def broken(:\n") is None
+
+
+def test_cache_skips_unchanged_files(tmp_path: Path, monkeypatch) -> None:
+    data = ALIASED.encode()
+    new_entries: dict = {}
+    findings = scan_file_cached(data, "a.py", {}, new_entries)
+    assert [f.line for f in findings] == [7, 8, 9]
+    assert list(new_entries) == [content_hash(data)]
+
+    cache = AstCache(path=tmp_path / "cache.json")
+    cache.update(new_entries)
+    cache.save()
+    reloaded = AstCache.load(tmp_path / "cache.json")
+
+    def fail(source: str) -> None:
+        raise AssertionError("cached file was re-parsed")
+
+    monkeypatch.setattr("scaffold.ast_scan.scan_source", fail)
+    again: dict = {}
+    findings = scan_file_cached(data, "b.py", reloaded.entries, again)
+    assert again == {}
+    assert [(f.path, f.line) for f in findings] == [("b.py", 7), ("b.py", 8), ("b.py", 9)]
+    assert findings[0].text == f"sh.{RMTREE}(path)"
+
+
+def test_audit_uses_ast_for_python_files(tmp_path: Path) -> None:
+    (tmp_path / "aliased.py").write_text(ALIASED)
+    (tmp_path / "patterns.py").write_text(PATTERN_DEFINITIONS)
+    (tmp_path / "broken.py").write_text(f"def broken(:\n    shutil.{RMTREE}(x)\n")
+    (tmp_path / "clean.sh").write_text(f"{RM_RF} build\n")
+    cache = AstCache()
+
+    report = run_audit([tmp_path], skip=SkipRules(), families=("deletion",), workers=1, ast_cache=cache)
+    hits = sorted((Path(f.path).name, f.line) for f in report.findings)
+
+    assert hits == [("aliased.py", 7), ("aliased.py", 8), ("aliased.py", 9), ("broken.py", 2), ("clean.sh", 1)]
+    # broken.py is cached as unparseable; the two parseable files are cached too
+    assert len(cache.entries) == 3
+
+    regex_only = run_audit([tmp_path], skip=SkipRules(), families=("deletion",), workers=1, use_ast=False)
+    assert "patterns.py" in {Path(f.path).name for f in regex_only.findings}
+
+
+def test_hook_scan_refines_staged_python_files(tmp_path: Path, monkeypatch) -> None:
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    (tmp_path / "tool.py").write_text(ALIASED + PATTERN_DEFINITIONS)
+    subprocess.run(["git", "add", "tool.py"], cwd=tmp_path, check=True)
+    monkeypatch.chdir(tmp_path)
+
+    diff = subprocess.run(
+        ["git", "diff", "--cached", "--unified=0"], capture_output=True, text=True, check=True,
+    ).stdout
+    matcher = SafetyMatcher()
+    added: dict[str, set[int]] = {}
+    regex_findings = list(scan_diff(diff.splitlines(), matcher, added))
+
+    refined = refine_python_findings(regex_findings, added, matcher)
+
+    assert sorted(f.line for f in refined) == [7, 8, 9]
+    assert all(f.blocking for f in refined)
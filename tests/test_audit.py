@@ -0,0 +1,135 @@
+"""Tests for the single-walk, parallel repository safety audit."""
+
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from scaffold.audit import SkipRules, iter_files, rules_for, run_audit
+from scaffold.cli import cli
+
+# Built by concatenation so this file doesn't trip the audit it tests
+RMTREE_CALL = "shutil." + "rmtree(path)\n"
+RM_RF = "rm " + "-rf build/\n"
+OPENAI_KEY = 'KEY = "sk-' + "a" * 40 + '"\n'
+BARE_EXCEPT = "try:\n    run()\n" + "except" + ":\n    raise\n"
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "clean.py").write_text("import shutil\n" + RMTREE_CALL)
+    (tmp_path / "src" / "keys.py").write_text(OPENAI_KEY)
+    (tmp_path / "src" / "loose.py").write_text(BARE_EXCEPT)
+    (tmp_path / "scripts").mkdir()
+    (tmp_path / "scripts" / "build.sh").write_text("echo hi\n" + RM_RF)
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "vendored.py").write_text(RMTREE_CALL)
+    (tmp_path / "README.md").write_text(RM_RF)
+    return tmp_path
+
+
+def locations(report) -> list[tuple[str, str, int, bool]]:
+    return sorted((f.rule_id, Path(f.path).name, f.line, f.blocking) for f in report.findings)
+
+
+def test_audit_reports_all_families(tree: Path) -> None:
+    report = run_audit([tree], skip=SkipRules(dirs=frozenset({"node_modules"})), workers=1)
+
+    assert locations(report) == [
+        ("bare-except", "loose.py", 3, False),
+        ("openai-key", "keys.py", 1, True),
+        ("rm-rf", "build.sh", 2, True),
+        ("unsafe-delete", "clean.py", 2, True),
+    ]
+    assert report.files_scanned == 4
+    assert report.blocking
+
+
+def test_family_selection_limits_rules(tree: Path) -> None:
+    skip = SkipRules(dirs=frozenset({"node_modules"}))
+    report = run_audit([tree], skip=skip, families=("exceptions",), workers=1)
+
+    assert [f.rule_id for f in report.findings] == ["bare-except"]
+    assert not report.blocking
+
+    with pytest.raises(ValueError, match="Unknown rule families"):
+        rules_for(("nope",))
+
+
+def test_skip_rules_prune_dirs_files_and_excludes(tree: Path) -> None:
+    skip = SkipRules(
+        dirs=frozenset({"node_modules"}),
+        files=frozenset({"keys.py"}),
+        patterns=("*.sh",),
+        excludes=("src/loose.py",),
+    )
+    found = [p.relative_to(tree).as_posix() for p in iter_files(tree, skip, (".py", ".sh"))]
+
+    assert found == ["src/clean.py"]
+
+
+def test_skip_rules_from_config() -> None:
+    skip = SkipRules.from_config(
+        {"skip_dirs": ["venv"], "skip_files": ["setup.py"], "skip_patterns": ["*.min.js"]},
+        excludes=("tests/*",),
+    )
+
+    assert skip.skip_file("setup.py", "setup.py")
+    assert skip.skip_file("app.min.js", "web/app.min.js")
+    assert skip.skip_file("test_x.py", "tests/test_x.py")
+    assert not skip.skip_file("app.py", "app.py")
+    assert "venv" in skip.dirs
+
+
+def test_inline_suppression_exempts_only_the_named_rules(tmp_path: Path) -> None:
+    (tmp_path / "fixture.py").write_text(
+        "import shutil\n"
+        + RMTREE_CALL.rstrip("\n") + "  # audit: allow[unsafe-delete]\n"
+        + RMTREE_CALL.rstrip("\n") + "  # audit: allow[rm-rf]\n"
+        + 'CMD = "' + RM_RF.rstrip("\n") + '"  # audit: allow[rm-rf, unsafe-delete]\n'
+    )
+
+    for use_ast in (True, False):
+        report = run_audit([tmp_path], workers=1, use_ast=use_ast)
+        assert locations(report) == [("unsafe-delete", "fixture.py", 3, True)]
+
+
+def test_worker_pool_matches_serial_scan(tree: Path, monkeypatch) -> None:
+    monkeypatch.setattr("scaffold.audit.CHUNK_SIZE", 1)
+    skip = SkipRules(dirs=frozenset({"node_modules"}))
+
+    serial = run_audit([tree], skip=skip, workers=1)
+    parallel = run_audit([tree], skip=skip, workers=2)
+
+    assert locations(parallel) == locations(serial)
+
+
+def test_sarif_and_json_output(tree: Path) -> None:
+    report = run_audit([tree], skip=SkipRules(dirs=frozenset({"node_modules"})), workers=1)
+
+    sarif = json.loads(report.to_sarif())
+    run = sarif["runs"][0]
+    assert sarif["version"] == "2.1.0"
+    assert {r["id"] for r in run["tool"]["driver"]["rules"]} >= {"rm-rf", "openai-key", "bare-except"}
+    levels = {r["ruleId"]: r["level"] for r in run["results"]}
+    assert levels["rm-rf"] == "error"
+    assert levels["bare-except"] == "warning"
+    assert run["results"][0]["locations"][0]["physicalLocation"]["region"]["startLine"] > 0
+
+    data = json.loads(report.to_json())
+    assert data["files_scanned"] == 4
+    assert len(data["findings"]) == 4
+
+
+def test_cli_exit_codes(tree: Path) -> None:
+    runner = CliRunner()
+
+    blocked = runner.invoke(cli, ["audit", str(tree), "--workers", "1"])
+    assert blocked.exit_code == 1
+    assert "[rm-rf]" in blocked.output
+
+    warned = runner.invoke(cli, ["audit", str(tree / "src"), "--family", "exceptions", "--workers", "1"])
+    assert warned.exit_code == 0
+    assert "WARN" in warned.output
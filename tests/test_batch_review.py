@@ -0,0 +1,272 @@
+"""Tests for batch-API reviews against a local stand-in for the OpenAI and Anthropic batch endpoints."""
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import send2trash
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
+
+from scaffold import batch_review
+from scaffold.batch_review import BatchReview
+from scaffold.providers import Provider
+from scaffold.review import ReviewConfig, create_orchestrator
+
+
+class FakeBatchAPI(BaseHTTPRequestHandler):
+    """Just enough of /v1/files, /v1/batches and /v1/messages/batches."""
+
+    def _json(self, data: dict, status: int = 200) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _text(self, text: str) -> None:
+        body = text.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/binary")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_POST(self) -> None:
+        server = self.server
+        if self.path == "/v1/files":
+            lines = [json.loads(l) for l in re.findall(rb'^\{"custom_id".*$', self._body(), re.M)]
+            server.files["file-in"] = lines
+            self._json({"id": "file-in", "object": "file", "bytes": 1, "created_at": 0,
+                        "filename": "reviews.jsonl", "purpose": "batch", "status": "processed"})
+        elif self.path == "/v1/batches":
+            server.created.append("openai")
+            self._json(self._openai_batch("validating"))
+        elif self.path == "/v1/messages/batches":
+            server.created.append("anthropic")
+            server.anthropic_requests = json.loads(self._body())["requests"]
+            self._json(self._anthropic_batch("in_progress"))
+        else:
+            self._json({"error": {"message": "not found"}}, 404)
+
+    def do_GET(self) -> None:
+        server = self.server
+        if self.path == "/v1/batches/batch_oa":
+            server.polls["openai"] += 1
+            done = server.polls["openai"] >= server.polls_needed
+            self._json(self._openai_batch("completed" if done else "in_progress"))
+        elif self.path == "/v1/files/file-out/content":
+            lines = []
+            for request in server.files["file-in"]:
+                custom_id = request["custom_id"]
+                if custom_id in server.fail:
+                    lines.append({"custom_id": custom_id, "response": {"status_code": 400, "body": {
+                        "error": {"message": "context length exceeded"}}}})
+                else:
+                    lines.append({"custom_id": custom_id, "response": {"status_code": 200, "body": {
+                        "choices": [{"message": {"role": "assistant", "content": f"openai review {custom_id}"}}],
+                        "usage": {"total_tokens": 100},
+                    }}})
+            self._text("\n".join(json.dumps(l) for l in lines) + "\n")
+        elif self.path == "/v1/messages/batches/msgbatch_1":
+            server.polls["anthropic"] += 1
+            done = server.polls["anthropic"] >= server.polls_needed
+            self._json(self._anthropic_batch("ended" if done else "in_progress"))
+        elif self.path == "/v1/messages/batches/msgbatch_1/results":
+            lines = []
+            for request in server.anthropic_requests:
+                custom_id = request["custom_id"]
+                if custom_id in server.fail:
+                    result = {"type": "errored", "error": {"type": "error", "error": {
+                        "type": "invalid_request_error", "message": "too long"}}}
+                else:
+                    result = {"type": "succeeded", "message": {
+                        "id": "msg", "type": "message", "role": "assistant", "model": "m",
+                        "content": [{"type": "text", "text": f"anthropic review {custom_id}"}],
+                        "stop_reason": "end_turn", "stop_sequence": None,
+                        "usage": {"input_tokens": 30, "output_tokens": 12},
+                    }}
+                lines.append({"custom_id": custom_id, "result": result})
+            self._text("\n".join(json.dumps(l) for l in lines) + "\n")
+        else:
+            self._json({"error": {"message": "not found"}}, 404)
+
+    def _openai_batch(self, status: str) -> dict:
+        return {"id": "batch_oa", "object": "batch", "endpoint": "/v1/chat/completions",
+                "input_file_id": "file-in", "completion_window": "24h", "created_at": 0,
+                "status": status, "output_file_id": "file-out" if status == "completed" else None}
+
+    def _anthropic_batch(self, status: str) -> dict:
+        return {"id": "msgbatch_1", "type": "message_batch", "processing_status": status,
+                "created_at": "2026-01-01T00:00:00Z", "expires_at": "2026-01-02T00:00:00Z",
+                "request_counts": {"processing": 0, "succeeded": 0, "errored": 0, "canceled": 0, "expired": 0},
+                "results_url": f"{self.server.url}/v1/messages/batches/msgbatch_1/results" if status == "ended" else None}
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def batch_api():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBatchAPI)
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    server.files = {}
+    server.anthropic_requests = []
+    server.created = []
+    server.polls = {"openai": 0, "anthropic": 0}
+    server.polls_needed = 2
+    server.fail = set()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def setup(tmp_path, batch_api, monkeypatch):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "PRD.md").write_text("# PRD\nShip the thing.")
+    (docs / "ARCH.md").write_text("# Architecture\nOne box.")
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("Review this")
+    configs = [
+        ReviewConfig(name="Security Reviewer", api="openai", model="gpt-4o", prompt_path=prompt),
+        ReviewConfig(name="Style Reviewer", api="anthropic", model="claude", prompt_path=prompt),
+        ReviewConfig(name="Local Reviewer", api="ollama", model="llama", prompt_path=prompt),
+    ]
+    trashed = []
+    monkeypatch.setattr(send2trash, "send2trash", lambda path: trashed.append(Path(path)))
+    alerts = []
+    monkeypatch.setattr(batch_review, "alert", lambda message, level="info": alerts.append(message))
+    return {
+        "documents": sorted(docs.iterdir()),
+        "configs": configs,
+        "output": tmp_path / "reviews",
+        "trashed": trashed,
+        "alerts": alerts,
+    }
+
+
+def make_orchestrator(batch_api):
+    orchestrator = create_orchestrator()
+    orchestrator.openai_client = AsyncOpenAI(api_key="test", base_url=f"{batch_api.url}/v1", max_retries=0)
+    orchestrator.anthropic_client = AsyncAnthropic(api_key="test", base_url=batch_api.url, max_retries=0)
+    local_calls = []
+
+    class FakeOllama(Provider):
+        async def complete(self, model: str, prompt: str) -> dict:
+            local_calls.append(prompt)
+            return {"content": "local review", "cost": 0.0, "tokens": 0}
+
+    orchestrator.providers.register("ollama", FakeOllama)
+    orchestrator.local_calls = local_calls
+    return orchestrator
+
+
+async def test_every_job_goes_out_in_one_batch_per_provider(setup, batch_api):
+    orchestrator = make_orchestrator(batch_api)
+    summaries = await orchestrator.run_batch_review(
+        setup["documents"], setup["configs"], 1, setup["output"], poll_interval=0.01
+    )
+
+    assert sorted(batch_api.created) == ["anthropic", "openai"]
+    assert len(batch_api.files["file-in"]) == 2 and len(batch_api.anthropic_requests) == 2
+    prompts = [r["body"]["messages"][1]["content"] for r in batch_api.files["file-in"]]
+    assert any("Ship the thing." in p for p in prompts) and any("One box." in p for p in prompts)
+    assert len(orchestrator.local_calls) == 2
+
+    assert [s.document_path.name for s in summaries] == ["ARCH.md", "PRD.md"]
+    round_dir = setup["output"] / "prd_md" / "round_1"
+    files = sorted(p.name for p in round_dir.iterdir())
+    assert files == ["CODE_REVIEW_LOCAL_REVIEWER.md", "CODE_REVIEW_SECURITY_REVIEWER.md",
+                     "CODE_REVIEW_STYLE_REVIEWER.md", "COST_SUMMARY.json"]
+    assert (round_dir / "CODE_REVIEW_STYLE_REVIEWER.md").read_text().startswith("anthropic review r1-")
+
+    cost = json.loads((round_dir / "COST_SUMMARY.json").read_text())
+    assert [r["tokens"] for r in cost["results"]] == [100, 42, 0]
+    assert all(r["error"] is None for r in cost["results"])
+    assert all(r["prompt_version"] for r in cost["results"])
+    assert [p.name for p in setup["trashed"]] == [".batch_round_1.json"]
+
+
+async def test_resume_after_exit_does_not_resubmit(setup, batch_api):
+    batch_api.polls_needed = 3
+    first = BatchReview(make_orchestrator(batch_api), setup["documents"], setup["configs"], 1, setup["output"])
+    await first.submit()
+    assert await first.poll_once() is False
+    # The process exits here; a new one starts from the saved state
+    assert (setup["output"] / ".batch_round_1.json").exists()
+
+    orchestrator = make_orchestrator(batch_api)
+    second = BatchReview(orchestrator, setup["documents"], setup["configs"], 1, setup["output"], poll_interval=0.01)
+    summaries = await second.run()
+
+    assert sorted(batch_api.created) == ["anthropic", "openai"]
+    assert len(summaries) == 2
+    assert all(r.error is None for s in summaries for r in s.results)
+
+
+async def test_failed_requests_become_review_errors(setup, batch_api):
+    orchestrator = make_orchestrator(batch_api)
+    prd = setup["documents"][1]
+    batch_api.fail = {
+        batch_review.job_id(1, prd, "Security Reviewer"),
+        batch_review.job_id(1, prd, "Style Reviewer"),
+    }
+
+    summaries = await orchestrator.run_batch_review(
+        setup["documents"], setup["configs"], 1, setup["output"], poll_interval=0.01
+    )
+
+    prd_results = {r.reviewer_name: r for r in summaries[1].results}
+    assert "context length exceeded" in prd_results["Security Reviewer"].error
+    assert prd_results["Style Reviewer"].error.startswith("errored")
+    assert prd_results["Local Reviewer"].error is None
+    assert len(setup["alerts"]) == 2
+    assert not (setup["output"] / "prd_md" / "round_1" / "CODE_REVIEW_SECURITY_REVIEWER.md").exists()
+
+
+async def test_failed_submissions_are_retried_on_the_next_run(setup, batch_api):
+    orchestrator = make_orchestrator(batch_api)
+    orchestrator.anthropic_client = None
+    summaries = await orchestrator.run_batch_review(
+        setup["documents"], setup["configs"], 1, setup["output"], poll_interval=0.01
+    )
+    errors = {r.reviewer_name: r.error for s in summaries for r in s.results}
+    assert errors["Style Reviewer"].startswith("batch submission failed")
+    assert setup["trashed"] == []
+    state = json.loads((setup["output"] / ".batch_round_1.json").read_text())
+    assert {j["reviewer"] for j in state["jobs"] if j["status"] == "pending"} == {"Style Reviewer"}
+
+    orchestrator = make_orchestrator(batch_api)
+    summaries = await orchestrator.run_batch_review(
+        setup["documents"], setup["configs"], 1, setup["output"], poll_interval=0.01
+    )
+    assert sorted(batch_api.created) == ["anthropic", "openai"]
+    assert len(orchestrator.local_calls) == 0
+    assert all(r.error is None for s in summaries for r in s.results)
+    # The first run's rounds are replaced, and the state is done with
+    assert setup["output"] / ".batch_round_1.json" in setup["trashed"]
+
+
+async def test_state_that_cannot_be_trashed_is_not_resumed(setup, batch_api, monkeypatch):
+    def refuse(path: str) -> None:
+        raise OSError("no trash here")
+
+    monkeypatch.setattr(send2trash, "send2trash", refuse)
+    await make_orchestrator(batch_api).run_batch_review(
+        setup["documents"], setup["configs"], 1, setup["output"], poll_interval=0.01
+    )
+
+    again = BatchReview(make_orchestrator(batch_api), setup["documents"], setup["configs"], 1, setup["output"])
+    assert all(j.status == "pending" for j in again.jobs.values())
+    assert again.batches == {}
@@ -0,0 +1,185 @@
+"""Tests for cross-project review campaigns: discovery, sharding, shared rate limit, checkpoints."""
+
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from scaffold import campaign
+from scaffold.campaign import (
+    SharedRateLimit,
+    check_zero_footprint,
+    find_targets,
+    load_checkpoint,
+    output_dir_for,
+    run_campaign,
+)
+from scaffold.providers import Provider, RetryPolicy
+from scaffold.review import ReviewConfig
+
+CONFIG = {
+    "ignore_projects": ["writing"],
+    "protected_projects": ["ai-journal"],
+    "skip_dirs": ["node_modules", ".git"],
+    "skip_files": ["CLAUDE.md"],
+    "scan_extensions": {".md": "markdown", ".py": "python", ".json": "config"},
+}
+
+
+class Echo(Provider):
+    async def complete(self, model: str, prompt: str) -> dict:
+        return {"content": "reviewed", "cost": 0.01, "tokens": 5}
+
+
+@pytest.fixture
+def projects(tmp_path):
+    root = tmp_path / "projects"
+    files = {
+        "app/README.md": "# App",
+        "app/docs/PRD.md": "# PRD",
+        "app/CLAUDE.md": "boilerplate",
+        "app/node_modules/pkg/README.md": "vendored",
+        "app/src/main.py": "print('hi')",
+        "ai-journal/entry.md": "# Dear diary",
+        "writing/novel.md": "# Chapter 1",
+    }
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("Review this")
+    return root, [ReviewConfig(name="Echo", api="echo", model="m", prompt_path=prompt)]
+
+
+def snapshot(root):
+    return {p: p.read_bytes() for p in root.rglob("*") if p.is_file()}
+
+
+def test_targets_follow_scan_config(projects):
+    root, _ = projects
+    documents = sorted(t.key for t in find_targets(root, CONFIG, "document"))
+    assert documents == ["ai-journal/entry.md", "app/README.md", "app/docs/PRD.md"]
+    assert [t.key for t in find_targets(root, CONFIG, "code")] == ["app/src/main.py"]
+    assert [t.key for t in find_targets(root, CONFIG, "document", only=("app",))] == [
+        "app/README.md", "app/docs/PRD.md"
+    ]
+
+
+def test_results_may_not_live_in_a_project(projects):
+    root, _ = projects
+    with pytest.raises(ValueError, match="zero push footprint"):
+        check_zero_footprint(root / "ai-journal" / "reviews", root)
+    check_zero_footprint(root.parent / "results", root)
+
+
+def test_campaign_shards_across_processes_and_resumes(projects, tmp_path, monkeypatch):
+    root, configs = projects
+    monkeypatch.setattr(campaign, "CHUNK_SIZE", 1)
+    before = snapshot(root)
+    kwargs = dict(
+        projects_root=root, results_root=tmp_path / "results", config=CONFIG,
+        workers=2, rate_limit=0, providers={"echo": f"{__name__}:Echo"},
+    )
+
+    summary = run_campaign("nightly", configs, **kwargs)
+    assert (summary.documents, summary.reviewed, summary.failed, summary.skipped) == (3, 3, 0, 0)
+    assert summary.projects == 2
+    assert snapshot(root) == before  # zero push footprint
+
+    results = tmp_path / "results" / "nightly"
+    entry = next(t for t in find_targets(root, CONFIG) if t.project == "ai-journal")
+    review = output_dir_for(results, entry) / "round_1" / "CODE_REVIEW_ECHO.md"
+    assert review.read_text() == "reviewed"
+    assert json.loads((results / "campaign_summary.json").read_text())["reviewed"] == 3
+    assert sorted(load_checkpoint(results)) == ["ai-journal/entry.md", "app/README.md", "app/docs/PRD.md"]
+
+    # Unchanged documents are skipped on the next run; edited ones are reviewed again
+    (root / "app" / "README.md").write_text("# App v2")
+    again = run_campaign("nightly", configs, **kwargs)
+    assert (again.reviewed, again.skipped) == (1, 2)
+
+
+def test_documents_whose_slugs_collide_get_their_own_results(tmp_path):
+    root = tmp_path / "projects"
+    for rel in ("app/a/b.md", "app/a_b.md", "app/a-b.md"):
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_text(f"# {rel}")
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("Review this")
+    configs = [ReviewConfig(name="Echo", api="echo", model="m", prompt_path=prompt)]
+
+    summary = run_campaign(
+        "n", configs, projects_root=root, results_root=tmp_path / "results", config=CONFIG,
+        workers=1, rate_limit=0, providers={"echo": f"{__name__}:Echo"},
+    )
+
+    assert summary.reviewed == 3
+    targets = list(find_targets(root, CONFIG))
+    assert len({output_dir_for(summary.results_dir, t) for t in targets}) == 3
+    assert all((output_dir_for(summary.results_dir, t) / "round_1").is_dir() for t in targets)
+
+
+class FlakyOnce(Provider):
+    retry = RetryPolicy(attempts=2, min_wait=0, max_wait=0)
+    calls = 0
+
+    async def complete(self, model: str, prompt: str) -> dict:
+        FlakyOnce.calls += 1
+        if FlakyOnce.calls == 1:
+            raise ConnectionResetError("reset by peer")
+        return {"content": "ok", "cost": 0.0, "tokens": 1}
+
+
+class CountingLimit:
+    acquired = 0
+
+    async def acquire(self) -> None:
+        self.acquired += 1
+
+
+async def test_retries_draw_from_the_rate_limit(tmp_path):
+    from scaffold.review import create_orchestrator
+
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("Review this")
+    orchestrator = create_orchestrator()
+    orchestrator.providers.register("flaky", FlakyOnce)
+    orchestrator.rate_limiter = limit = CountingLimit()
+
+    config = ReviewConfig(name="Flaky", api="flaky", model="m", prompt_path=prompt)
+    assert (await orchestrator._call_api(config, "p"))["content"] == "ok"
+    assert limit.acquired == 2
+
+
+def test_failed_documents_are_retried_on_resume(projects, tmp_path):
+    root, configs = projects
+    kwargs = dict(projects_root=root, results_root=tmp_path / "results", config=CONFIG,
+                  only=("app",), workers=1, rate_limit=0)
+
+    first = run_campaign("n", configs, **kwargs)  # no "echo" provider registered
+    assert first.failed == 2
+    second = run_campaign("n", configs, providers={"echo": f"{__name__}:Echo"}, **kwargs)
+    assert (second.reviewed, second.skipped) == (2, 0)
+
+
+_limit = None
+
+
+def _set_limit(limit: SharedRateLimit) -> None:
+    global _limit
+    _limit = limit
+
+
+def _reserve(_: int) -> float:
+    # The slot this request was given
+    return time.time() + _limit.reserve()
+
+
+def test_rate_limit_is_shared_by_worker_processes():
+    limit = SharedRateLimit(per_minute=600)  # one request per 0.1s
+    with ProcessPoolExecutor(max_workers=3, initializer=_set_limit, initargs=(limit,)) as pool:
+        slots = sorted(pool.map(_reserve, range(6)))
+    gaps = [b - a for a, b in zip(slots, slots[1:])]
+    assert all(gap >= 0.09 for gap in gaps)
@@ -0,0 +1,80 @@
+"""Tests for the NDJSON review event stream (`scaffold review --format ndjson`)."""
+
+import io
+import json
+
+from scaffold import events
+from scaffold.events import NDJSONSink
+from scaffold.providers import Provider, RetryPolicy
+from scaffold.review import ReviewConfig, create_orchestrator
+
+
+class Flaky(Provider):
+    """Fails once with a retryable error, then answers"""
+    retry = RetryPolicy(attempts=2, min_wait=0, max_wait=0)
+
+    def __init__(self, settings: object) -> None:
+        super().__init__(settings)
+        self.calls = 0
+
+    async def complete(self, model: str, prompt: str) -> dict:
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionResetError("reset by peer")
+        return {"content": "looks fine", "cost": 0.0, "tokens": 7}
+
+
+class Broken(Provider):
+    async def complete(self, model: str, prompt: str) -> dict:
+        raise ValueError("client not initialized")
+
+
+async def run_round(tmp_path, sink: NDJSONSink):
+    doc = tmp_path / "doc.md"
+    doc.write_text("# Doc")
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("Review this")
+    orchestrator = create_orchestrator()
+    orchestrator.providers.register("flaky", Flaky)
+    orchestrator.providers.register("broken", Broken)
+    orchestrator.events = sink
+    configs = [
+        ReviewConfig(name="Flaky", api="flaky", model="m1", prompt_path=prompt),
+        ReviewConfig(name="Broken", api="broken", model="m2", prompt_path=prompt),
+    ]
+    return await orchestrator.run_review(doc, configs, 3, tmp_path / "reviews")
+
+
+async def test_round_emits_job_lifecycle_events(tmp_path):
+    stream = io.StringIO()
+    await run_round(tmp_path, NDJSONSink(stream))
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    assert lines[0]["event"] == "round_started" and lines[-1]["event"] == "round_completed"
+    assert lines[-1]["failed"] == 1 and lines[-1]["output"].endswith("round_3")
+    by_reviewer = {}
+    for line in lines[1:-1]:
+        by_reviewer.setdefault(line["reviewer"], []).append(line["event"])
+    assert by_reviewer["Flaky"] == ["job_queued", "retry", "first_token", "chunk", "completed"]
+    assert by_reviewer["Broken"] == ["job_queued", "failed"]
+
+    flaky = {line["event"]: line for line in lines if line.get("reviewer") == "Flaky"}
+    assert flaky["retry"]["kind"] == "retryable" and "reset by peer" in flaky["retry"]["error"]
+    assert flaky["chunk"]["content"] == "looks fine"
+    assert flaky["completed"]["tokens"] == 7 and flaky["completed"]["round"] == 3
+    assert "client not initialized" in next(l for l in lines if l["event"] == "failed")["error"]
+
+
+async def test_headless_round_writes_nothing_but_events(tmp_path, capsys):
+    await run_round(tmp_path, NDJSONSink())
+    out = capsys.readouterr().out
+    assert out and all(json.loads(line)["event"] for line in out.splitlines())
+
+
+def test_emit_without_a_bound_sink_is_a_no_op():
+    events.emit("chunk", content="nobody listening")
+    stream = io.StringIO()
+    with events.bound(NDJSONSink(stream), reviewer="R"):
+        events.emit("chunk", content="x")
+    events.emit("chunk", content="after")
+    assert [json.loads(l)["content"] for l in stream.getvalue().splitlines()] == ["x"]
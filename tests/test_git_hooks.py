@@ -14,7 +14,7 @@ def test_pre_push_blocks_dangerous_patterns_without_warden() -> None:
     assert "warden_audit.py" not in content
     assert "validate_project.py" not in content
     assert "PUSH BLOCKED" in content
-    assert "rm -rf" in content
+    assert "rm -rf" in content  # audit: allow[rm-rf]
     assert "rmtree" in content
 
 
@@ -35,3 +35,26 @@ def test_git_hook_templates_have_valid_bash_syntax() -> None:
     )
 
     assert result.returncode == 0, result.stderr
+
+
+def test_pre_push_fails_closed_when_the_scan_cannot_run(tmp_path: Path) -> None:
+    """An unreadable diff (hook-scan exit 2) must block the push, not skip the ref."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake = bin_dir / "scaffold"
+    fake.write_text("#!/usr/bin/env bash\necho 'fatal: bad revision' >&2\nexit 2\n")
+    fake.chmod(0o755)
+    refs = f"refs/heads/main {'a' * 40} refs/heads/main {'b' * 40}\n"
+
+    result = subprocess.run(
+        ["bash", str(HOOKS_DIR / "pre-push")],
+        input=refs,
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=10,
+        env={"PATH": f"{bin_dir}:/usr/bin:/bin"},
+    )
+
+    assert result.returncode == 1
+    assert "PUSH BLOCKED" in result.stdout
@@ -0,0 +1,243 @@
+"""Tests for the cached, batched grepai search wrapper (uses a fake grepai on PATH)."""
+
+import asyncio
+import json
+import os
+import stat
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from scaffold import grepai
+from scaffold.utils import grepai_search
+
+FAKE_GREPAI = """#!{python}
+import json, os, sys, time
+args = sys.argv[1:]
+
+def record(entry):
+    with open(os.environ["FAKE_GREPAI_CALLS"], "a") as f:
+        f.write(json.dumps(entry) + "\\n")
+
+def results(query):
+    return [] if query == "nothing" else [{{"file": f"src/{{query}}.py", "score": 0.9}}]
+
+record(args)
+# Stands in for loading the index
+time.sleep(float(os.environ.get("FAKE_GREPAI_DELAY", "0")))
+if args[0] == "mcp-serve":
+    if os.environ.get("FAKE_GREPAI_NO_SERVER"):
+        sys.exit(1)
+    for line in sys.stdin:
+        request = json.loads(line)
+        if "id" not in request:
+            continue
+        if request["method"] == "initialize":
+            result = {{"protocolVersion": request["params"]["protocolVersion"], "capabilities": {{}}}}
+        else:
+            query = request["params"]["arguments"]["query"]
+            record(["query", query])
+            if query == "crash":
+                sys.exit(1)
+            text = json.dumps({{"results": results(query)}})
+            result = {{"content": [{{"type": "text", "text": text}}]}}
+        print(json.dumps({{"jsonrpc": "2.0", "id": request["id"], "result": result}}), flush=True)
+else:
+    print(json.dumps({{"results": results(args[1])}}))
+"""
+
+
+@pytest.fixture
+def fake_grepai(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "grepai"
+    script.write_text(FAKE_GREPAI.format(python=sys.executable))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    calls = tmp_path / "calls.jsonl"
+    calls.touch()
+
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_GREPAI_CALLS", str(calls))
+    monkeypatch.setenv("PROJECTS_ROOT", str(tmp_path / "projects"))
+    monkeypatch.setattr(grepai, "_cache", grepai.ResultCache())
+    monkeypatch.setattr(grepai, "_log", grepai.SearchLog(batch_size=3, flush_interval=60))
+    monkeypatch.setattr(grepai, "_workers", {})
+    monkeypatch.setattr(grepai, "_worker_disabled", set())
+    # Subprocess path by default; worker tests switch it back on
+    monkeypatch.setenv(grepai.WORKER_ENV, "off")
+    yield calls
+    grepai.close_workers()
+
+
+def call_count(calls: Path) -> int:
+    return len(calls.read_text().splitlines())
+
+
+def recorded(calls: Path) -> list[list[str]]:
+    return [json.loads(line) for line in calls.read_text().splitlines()]
+
+
+def log_lines() -> list[dict]:
+    path = grepai.log_dir() / "ai_search_log.jsonl"
+    return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+
+
+def test_repeat_queries_hit_the_cache(fake_grepai, tmp_path):
+    (tmp_path / "projects" / "other").mkdir(parents=True)
+    first = grepai_search("parser", project="demo")
+    assert first == [{"file": "src/parser.py", "score": 0.9}]
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        again = grepai_search("parser", project="demo")
+    per_hit = (time.perf_counter() - start) / 1000
+
+    assert again == first
+    assert call_count(fake_grepai) == 1
+    assert per_hit < 100e-6
+
+    grepai_search("parser", project="demo", limit=5)
+    grepai_search("parser", project="other")
+    assert call_count(fake_grepai) == 3
+
+
+def test_cache_and_worker_follow_the_project_root(fake_grepai, tmp_path, monkeypatch):
+    monkeypatch.setenv(grepai.WORKER_ENV, "mcp")
+    demo = tmp_path / "projects" / "demo"
+    demo.mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+
+    grepai_search("a", project="demo")
+    grepai_search("a", project=str(demo))  # same root, same cache entry
+    grepai_search("a")  # the current directory is another root
+
+    assert set(grepai._workers) == {str(demo.resolve()), str(tmp_path.resolve())}
+    assert grepai._workers[str(demo.resolve())].cwd == str(demo.resolve())
+    assert [c for c in recorded(fake_grepai) if c[0] == "query"] == [["query", "a"], ["query", "a"]]
+    grepai.flush_log()
+    assert [e["project"] for e in log_lines()] == ["demo", "demo", tmp_path.name]
+
+
+@pytest.mark.asyncio
+async def test_search_many_starts_the_worker_off_the_event_loop(fake_grepai, monkeypatch):
+    monkeypatch.setenv(grepai.WORKER_ENV, "mcp")
+    monkeypatch.setenv("FAKE_GREPAI_DELAY", "0.3")
+    ticks = 0
+
+    async def tick() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.ensure_future(tick())
+    await grepai.search_many(["a"], project="demo")
+    ticker.cancel()
+
+    assert ticks > 10  # the loop kept running while the index loaded
+
+
+def test_cache_entries_expire():
+    cache = grepai.ResultCache(maxsize=2, ttl=0.05)
+    cache.put(("p", "a", 10), [])
+    assert cache.get(("p", "a", 10)) == []
+    time.sleep(0.06)
+    assert cache.get(("p", "a", 10)) is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = grepai.ResultCache(maxsize=2, ttl=60)
+    cache.put(("p", "a", 10), [{"file": "a"}])
+    cache.put(("p", "b", 10), [{"file": "b"}])
+    cache.get(("p", "a", 10))
+    cache.put(("p", "c", 10), [{"file": "c"}])
+
+    assert cache.get(("p", "b", 10)) is None
+    assert cache.get(("p", "a", 10)) is not None
+
+
+def test_log_is_written_in_batches(fake_grepai):
+    grepai_search("one", project="demo")
+    grepai_search("two", project="demo")
+    assert log_lines() == []
+
+    grepai_search("one", project="demo")
+    entries = log_lines()
+    assert [e["query"] for e in entries] == ["one", "two", "one"]
+    assert entries[0]["results"] == ["src/one.py"]
+    assert entries[2]["cached"] is True
+
+    grepai_search("nothing", project="demo")
+    grepai.flush_log()
+    assert log_lines()[-1]["results"] == []
+
+
+@pytest.mark.asyncio
+async def test_search_many_runs_concurrently(fake_grepai, monkeypatch):
+    monkeypatch.setenv("FAKE_GREPAI_DELAY", "0.3")
+    queries = ["a", "b", "c", "d", "a"]
+
+    start = time.perf_counter()
+    results = await grepai.search_many(queries, project="demo", concurrency=4)
+    elapsed = time.perf_counter() - start
+
+    assert [r[0]["file"] for r in results] == [f"src/{q}.py" for q in queries]
+    # Four distinct queries, four at a time: roughly one delay, not four
+    assert elapsed < 1.0
+    assert call_count(fake_grepai) == 4
+
+    assert await grepai.search_async("a", project="demo") == results[0]
+    assert call_count(fake_grepai) == 4
+
+
+def test_worker_answers_many_queries_from_one_process(fake_grepai, monkeypatch):
+    monkeypatch.setenv(grepai.WORKER_ENV, "mcp")
+    monkeypatch.setenv("FAKE_GREPAI_DELAY", "0.2")
+
+    start = time.perf_counter()
+    for query in ["a", "b", "c", "d", "e"]:
+        assert grepai_search(query, project="demo") == [{"file": f"src/{query}.py", "score": 0.9}]
+    assert grepai.search_batch(["f", "a", "nothing"], project="demo") == [
+        [{"file": "src/f.py", "score": 0.9}], [{"file": "src/a.py", "score": 0.9}], [],
+    ]
+    elapsed = time.perf_counter() - start
+
+    # One index load instead of six
+    assert elapsed < 0.2 * 3
+    assert recorded(fake_grepai) == [["mcp-serve"]] + [["query", q] for q in "abcde"] + [
+        ["query", "f"], ["query", "nothing"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_search_many_pipelines_through_worker(fake_grepai, monkeypatch):
+    monkeypatch.setenv(grepai.WORKER_ENV, "mcp")
+    results = await grepai.search_many(["a", "b", "a"], project="demo")
+
+    assert [r[0]["file"] for r in results] == ["src/a.py", "src/b.py", "src/a.py"]
+    assert recorded(fake_grepai) == [["mcp-serve"], ["query", "a"], ["query", "b"]]
+
+
+def test_falls_back_when_worker_cannot_start(fake_grepai, monkeypatch):
+    monkeypatch.setenv(grepai.WORKER_ENV, "mcp")
+    monkeypatch.setenv("FAKE_GREPAI_NO_SERVER", "1")
+
+    assert grepai_search("a", project="demo") == [{"file": "src/a.py", "score": 0.9}]
+    assert grepai_search("b", project="demo") == [{"file": "src/b.py", "score": 0.9}]
+
+    # The worker is only tried once per directory
+    assert [c[0] for c in recorded(fake_grepai)] == ["mcp-serve", "search", "search"]
+
+
+def test_falls_back_when_worker_dies_mid_batch(fake_grepai, monkeypatch):
+    monkeypatch.setenv(grepai.WORKER_ENV, "mcp")
+
+    assert grepai.search_batch(["a", "crash", "b"], project="demo") == [
+        [{"file": "src/a.py", "score": 0.9}], [{"file": "src/crash.py", "score": 0.9}],
+        [{"file": "src/b.py", "score": 0.9}],
+    ]
+    assert [c[0] for c in recorded(fake_grepai)][-3:] == ["search", "search", "search"]
+    assert grepai._workers == {}
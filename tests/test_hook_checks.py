@@ -0,0 +1,150 @@
+"""Tests for the concurrent, cached Ruff/Pyright hook runner."""
+
+import asyncio
+import dataclasses
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from scaffold.hook_checks import CheckCache, HookTool, dependency_keys, run_checks
+
+
+def python_tool(name: str, script: str) -> HookTool:
+    """A stand-in tool that runs `script` with the checked files in sys.argv."""
+    return HookTool(
+        name=name,
+        executable=sys.executable,
+        build_command=lambda exe, files: [exe, "-c", script, *files],
+        evaluate=lambda rc, out, err: (rc == 0, (out + err).strip()),
+    )
+
+
+PASS = python_tool("pass", "import sys; print('ok', len(sys.argv) - 1)")
+FAIL = python_tool("fail", "import sys; print('bad'); sys.exit(1)")
+SLOW = python_tool("slow", "import time; time.sleep(10)")
+CROSS = dataclasses.replace(python_tool("cross", "import sys"), cross_file=True)
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for name in ("a.py", "b.py"):
+        path = tmp_path / name
+        path.write_text(f"# {name}\n")
+        paths.append(str(path))
+    return paths
+
+
+@pytest.mark.asyncio
+async def test_first_failure_cancels_other_checks(files, tmp_path):
+    cache = CheckCache(tmp_path / "cache.json", "fp")
+
+    start = time.perf_counter()
+    results = await run_checks(files, cache, tools=(SLOW, FAIL))
+    elapsed = time.perf_counter() - start
+
+    assert [r.tool for r in results] == ["fail"]
+    assert not results[0].passed
+    assert elapsed < 5
+
+
+@pytest.mark.asyncio
+async def test_passing_files_are_cached_by_content(files, tmp_path):
+    cache_path = tmp_path / "cache.json"
+    cache = CheckCache(cache_path, "fp")
+    results = await run_checks(files, cache, tools=(PASS,))
+    assert results[0].files_checked == files
+    cache.save()
+
+    reloaded = CheckCache(cache_path, "fp")
+    results = await run_checks(files, reloaded, tools=(PASS,))
+    assert results[0].passed and results[0].files_checked == []
+
+    Path(files[1]).write_text("# changed\n")
+    results = await run_checks(files, reloaded, tools=(PASS,))
+    assert results[0].files_checked == [files[1]]
+
+
+@pytest.mark.asyncio
+async def test_cross_file_results_are_keyed_on_imported_modules(tmp_path):
+    (tmp_path / "app.py").write_text("from lib import f\n")
+    (tmp_path / "lib.py").write_text("def f() -> int: ...\n")
+    (tmp_path / "other.py").write_text("x = 1\n")
+    files = [str(tmp_path / "app.py")]
+    cache = CheckCache(tmp_path / "cache.json", "fp")
+    await run_checks(files, cache, tools=(CROSS, PASS), root=tmp_path)
+
+    # Unrelated modules don't invalidate anything
+    (tmp_path / "other.py").write_text("x = 2\n")
+    results = await run_checks(files, cache, tools=(CROSS, PASS), root=tmp_path)
+    assert all(r.files_checked == [] for r in results)
+
+    # An imported module changed: the per-file tool still trusts its cache, the cross-file one doesn't
+    (tmp_path / "lib.py").write_text("def f() -> str: ...\n")
+    results = {r.tool: r for r in await run_checks(files, cache, tools=(CROSS, PASS), root=tmp_path)}
+    assert results["cross"].files_checked == files
+    assert results["pass"].files_checked == []
+
+
+def test_dependency_keys_follow_transitive_and_relative_imports(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "a.py").write_text("from .b import g\n")
+    (tmp_path / "pkg" / "b.py").write_text("import util\n\ndef g() -> None: ...\n")
+    (tmp_path / "util.py").write_text("import os\n")
+    (tmp_path / "main.py").write_text("from pkg import a\n")
+    (tmp_path / "other.py").write_text("")
+    files = ["main.py", "pkg/a.py"]
+    keys = [dependency_keys(files, tmp_path)]
+
+    (tmp_path / "other.py").write_text("# unrelated\n")
+    keys.append(dependency_keys(files, tmp_path))
+    (tmp_path / "util.py").write_text("import sys\n")  # reached through pkg.a -> pkg.b
+    keys.append(dependency_keys(files, tmp_path))
+    (tmp_path / "pkg" / "__init__.py").write_text("VERSION = 2\n")  # loaded by `from pkg import a`
+    keys.append(dependency_keys(files, tmp_path))
+
+    assert keys[0] == keys[1]
+    assert all(keys[1][f] != keys[2][f] for f in files)
+    assert keys[2]["main.py"] != keys[3]["main.py"] and keys[2]["pkg/a.py"] == keys[3]["pkg/a.py"]
+
+
+@pytest.mark.asyncio
+async def test_fingerprint_change_invalidates_cache(files, tmp_path):
+    cache_path = tmp_path / "cache.json"
+    cache = CheckCache(cache_path, "fp-1")
+    await run_checks(files, cache, tools=(PASS,))
+    cache.save()
+
+    assert CheckCache(cache_path, "fp-2").passed == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_files_are_not_cached(files, tmp_path):
+    cache = CheckCache(tmp_path / "cache.json", "fp")
+    await run_checks(files, cache, tools=(FAIL,))
+    assert cache.passed == {}
+
+
+@pytest.mark.asyncio
+async def test_missing_tool_is_skipped(files, tmp_path):
+    missing = HookTool("missing", "definitely-not-installed-tool", PASS.build_command, PASS.evaluate)
+    results = await run_checks(files, CheckCache(tmp_path / "c.json", "fp"), tools=(missing,))
+    assert results[0].skipped and results[0].passed
+
+
+def test_pyright_output_only_blocks_on_errors():
+    from scaffold.hook_checks import _pyright_evaluate
+
+    warning_only = '{"generalDiagnostics": [{"severity": "warning", "message": "w"}]}'
+    assert _pyright_evaluate(0, warning_only, "") == (True, "")
+
+    error = (
+        '{"generalDiagnostics": [{"file": "a.py", "severity": "error", "message": "bad type",'
+        ' "range": {"start": {"line": 2, "character": 4}}}]}'
+    )
+    passed, report = _pyright_evaluate(1, error, "")
+    assert not passed
+    assert report == "a.py:3:5 - error: bad type"
@@ -0,0 +1,127 @@
+"""Tests for the single-pass staged diff safety scanner."""
+
+import io
+import subprocess
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from scaffold.cli import cli
+from scaffold.hook_scan import EXIT_BLOCKED, EXIT_CLEAN, exit_code, scan_diff
+from scaffold.safety import SafetyMatcher, SafetyRule
+
+# Built by concatenation so this file doesn't trip the hooks it tests
+RMTREE_CALL = "shutil." + "rmtree(path)"
+RM_RF = "rm " + "-rf build/"
+CREDENTIAL = "api_key = " + '"abcdefgh12345"'
+
+SAMPLE_DIFF = f"""diff --git a/tools/clean.py b/tools/clean.py
+index 1111111..2222222 100644
+--- a/tools/clean.py
++++ b/tools/clean.py
+@@ -10,0 +11,3 @@ def clean():
++    {RMTREE_CALL}
++    # never call {RMTREE_CALL}
++    {CREDENTIAL}
+diff --git a/scripts/build.sh b/scripts/build.sh
+--- a/scripts/build.sh
++++ b/scripts/build.sh
+@@ -1 +1,2 @@
+-echo old
++echo new
++{RM_RF}
+"""
+
+
+def test_scan_diff_reports_locations_for_all_rules() -> None:
+    findings = list(scan_diff(io.StringIO(SAMPLE_DIFF), SafetyMatcher()))
+
+    assert [(f.rule_id, f.path, f.line) for f in findings] == [
+        ("unsafe-delete", "tools/clean.py", 11),
+        ("hardcoded-credential", "tools/clean.py", 13),
+        ("rm-rf", "scripts/build.sh", 2),
+    ]
+    assert exit_code(findings) == EXIT_BLOCKED
+
+
+def test_warn_only_rules_do_not_block() -> None:
+    diff = f"+++ b/run.sh\n@@ -0,0 +1 @@\n+{RM_RF}\n"
+    findings = list(scan_diff(io.StringIO(diff), SafetyMatcher(warn_only=frozenset({"rm-rf"}))))
+
+    assert len(findings) == 1
+    assert not findings[0].blocking
+    assert exit_code(findings) == EXIT_CLEAN
+
+
+def test_inline_suppression_names_the_rules_it_allows() -> None:
+    diff = (
+        f"+++ b/run.sh\n@@ -0,0 +1,2 @@\n"
+        f"+{RM_RF}  # audit: allow[rm-rf]\n"
+        f"+{RM_RF}  # audit: allow[unsafe-delete]\n"
+    )
+    findings = list(scan_diff(io.StringIO(diff), SafetyMatcher()))
+
+    assert [(f.rule_id, f.line) for f in findings] == [("rm-rf", 2)]
+
+
+def test_rule_filtered_by_extension_does_not_hide_a_later_rule() -> None:
+    shell_only = SafetyRule(rule_id="shell", pattern=r"\bwipe\b", message="m", extensions=(".sh",))
+    anywhere = SafetyRule(rule_id="any", pattern=r"wipe", message="m")
+    matcher = SafetyMatcher(rules=(shell_only, anywhere))
+
+    assert [f.rule_id for f in matcher.scan_line("wipe()", "a.py", 1)] == ["any"]
+    assert [f.rule_id for f in matcher.scan_line("wipe()", "a.sh", 1)] == ["shell", "any"]
+
+
+def test_removed_and_context_lines_are_ignored() -> None:
+    diff = f"+++ b/a.py\n@@ -1,2 +1,2 @@\n-{RMTREE_CALL}\n {RMTREE_CALL}\n+ok = True\n"
+    assert list(scan_diff(io.StringIO(diff), SafetyMatcher())) == []
+
+
+def test_cli_scans_staged_changes(tmp_path, monkeypatch) -> None:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    subprocess.run(["git", "init", "-q", str(repo)], check=True, timeout=10)
+    (repo / "clean.py").write_text(f"import shutil\n{RMTREE_CALL}\n")
+    subprocess.run(["git", "-C", str(repo), "add", "clean.py"], check=True, timeout=10)
+    monkeypatch.chdir(repo)
+
+    result = CliRunner().invoke(cli, ["hook-scan"])
+    assert result.exit_code == EXIT_BLOCKED
+    assert "clean.py:2" in result.output
+
+    (repo / "clean.py").write_text("from send2trash import send2trash\n")
+    subprocess.run(["git", "-C", str(repo), "add", "clean.py"], check=True, timeout=10)
+    result = CliRunner().invoke(cli, ["hook-scan"])
+    assert result.exit_code == EXIT_CLEAN
+
+
+def test_cli_honors_suppressions_on_ast_findings(tmp_path, monkeypatch) -> None:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    subprocess.run(["git", "init", "-q", str(repo)], check=True, timeout=10)
+    source = "from shutil import rm" + "tree as wipe\nwipe(path)"
+    (repo / "clean.py").write_text(source + "\n")
+    subprocess.run(["git", "-C", str(repo), "add", "clean.py"], check=True, timeout=10)
+    monkeypatch.chdir(repo)
+
+    result = CliRunner().invoke(cli, ["hook-scan"])
+    assert result.exit_code == EXIT_BLOCKED
+    assert "clean.py:2" in result.output
+
+    (repo / "clean.py").write_text(source + "  # audit: allow[unsafe-delete]\n")
+    subprocess.run(["git", "-C", str(repo), "add", "clean.py"], check=True, timeout=10)
+    result = CliRunner().invoke(cli, ["hook-scan"])
+    assert result.exit_code == EXIT_CLEAN
+
+
+def test_cli_reads_diff_from_stdin() -> None:
+    result = CliRunner().invoke(cli, ["hook-scan", "--diff-file", "-", "--json"], input=SAMPLE_DIFF)
+    assert result.exit_code == EXIT_BLOCKED
+    assert '"rule_id": "rm-rf"' in result.output
+
+
+def test_hook_templates_call_hook_scan() -> None:
+    hooks = Path("templates") / "git-hooks"
+    assert "scaffold hook-scan" in (hooks / "pre-commit").read_text()
+    assert "scaffold hook-scan --range" in (hooks / "pre-push").read_text()
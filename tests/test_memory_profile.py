@@ -0,0 +1,62 @@
+"""Tests for `scaffold review --profile-memory`: phase snapshots, reviewer peaks, the profile file."""
+
+import asyncio
+import json
+import tracemalloc
+
+from scaffold.memory_profile import MemoryProfiler, package_of, site_name
+from scaffold.providers import Provider
+from scaffold.review import ReviewConfig, create_orchestrator
+
+BUFFER = 4 * 1024 * 1024
+
+
+class Hoarder(Provider):
+    """Buffers a large response before answering, like an SDK reading a body"""
+
+    async def complete(self, model: str, prompt: str) -> dict:
+        body = bytearray(BUFFER)
+        await asyncio.sleep(0.01)
+        return {"content": f"done ({len(body)} bytes)", "cost": 0.0, "tokens": 1}
+
+
+class Light(Provider):
+    async def complete(self, model: str, prompt: str) -> dict:
+        return {"content": "ok", "cost": 0.0, "tokens": 1}
+
+
+async def test_round_profile_has_phases_reviewer_peaks_and_sites(tmp_path):
+    doc = tmp_path / "doc.md"
+    doc.write_text("# Doc")
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("Review this")
+    orchestrator = create_orchestrator()
+    orchestrator.providers.register("hoarder", Hoarder)
+    orchestrator.providers.register("light", Light)
+    orchestrator.memory_profiler = MemoryProfiler()
+    configs = [
+        ReviewConfig(name="Hoarder", api="hoarder", model="m", prompt_path=prompt),
+        ReviewConfig(name="Light", api="light", model="m", prompt_path=prompt),
+    ]
+
+    await orchestrator.run_review(doc, configs, 1, tmp_path / "reviews")
+
+    assert not tracemalloc.is_tracing()
+    profile = json.loads((tmp_path / "reviews" / "memory_profile_round_1.json").read_text())
+    assert [p["phase"] for p in profile["phases"]] == ["start", "load", "dispatch", "gather", "save"]
+    assert [(d["from"], d["to"]) for d in profile["diffs"]][-1] == ("gather", "save")
+    assert profile["reviewers"]["Hoarder"]["peak"] >= BUFFER
+    assert profile["peak"] >= BUFFER
+    gather = profile["phases"][3]
+    assert gather["peak"] >= BUFFER > gather["current"]  # the buffer was freed before gather ended
+    assert (tmp_path / "reviews" / "round_1" / "CODE_REVIEW_HOARDER.md").exists()
+
+
+def test_sites_drop_machine_specific_prefixes():
+    import rich.console
+    import scaffold.review
+
+    rich_site = site_name(rich.console.__file__)
+    assert rich_site == "site-packages/rich/console.py" and package_of(rich_site) == "rich"
+    assert site_name(scaffold.review.__file__) == "scaffold/review.py"
+    assert package_of(site_name(json.__file__)) == "stdlib"
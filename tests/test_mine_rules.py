@@ -0,0 +1,189 @@
+"""
+Tests for the git history rule miner
+
+Run with: pytest tests/test_mine_rules.py -v
+"""
+
+import io
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from scaffold.mine_rules import (
+    MiningState,
+    parse_log_stream,
+    tokenize,
+    tokens_to_pattern,
+    update_state,
+    candidate_rules,
+    mine_repository,
+    mine_repositories,
+)
+
+
+def git(repo: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-C", str(repo), *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=30,
+    )
+    return result.stdout.strip()
+
+
+def commit_file(repo: Path, name: str, content: str, message: str) -> None:
+    (repo / name).write_text(content)
+    git(repo, "add", name)
+    git(repo, "commit", "-q", "-m", message)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """A repo where three separate fix commits remove the same bad call"""
+    path = tmp_path / "sample-project"
+    path.mkdir()
+    git(path, "init", "-q")
+    git(path, "config", "user.email", "test@example.com")
+    git(path, "config", "user.name", "Test")
+
+    for i in range(3):
+        name = f"module_{i}.py"
+        commit_file(path, name, f"def f():\n    return eval(data['{i}'])\n", f"Add module {i}")
+        commit_file(path, name, "def f():\n    return parse(data)\n", f"Fix unsafe eval in module {i}")
+    return path
+
+
+class TestLogParsing:
+    """Test the streaming log parser"""
+
+    def test_parse_log_stream_yields_commits_with_hunks(self):
+        log = (
+            "\x1eabc123\x1fFix off-by-one\n"
+            "\n"
+            "diff --git a/app.py b/app.py\n"
+            "--- a/app.py\n"
+            "+++ b/app.py\n"
+            "@@ -10 +10 @@ def handler():\n"
+            "-    for i in range(len(items) + 1):\n"
+            "+    for i in range(len(items)):\n"
+            "\x1edef456\x1fAdd docs\n"
+        )
+        commits = list(parse_log_stream(io.StringIO(log)))
+
+        assert [c.sha for c in commits] == ["abc123", "def456"]
+        assert commits[0].is_fix
+        assert not commits[1].is_fix
+        hunk = commits[0].hunks[0]
+        assert hunk.path == "app.py"
+        assert hunk.context == "def handler():"
+        assert hunk.removed == ["    for i in range(len(items) + 1):"]
+
+    def test_hunk_lines_that_look_like_file_headers(self):
+        log = (
+            "\x1eabc123\x1fFix SQL comment\n"
+            "diff --git a/schema.sql b/schema.sql\n"
+            "--- a/schema.sql\n"
+            "+++ b/schema.sql\n"
+            "@@ -3,2 +3 @@ CREATE TABLE t\n"
+            "--- a/old comment\n"
+            "-DROP TABLE t;\n"
+            "+++ b/new counter\n"
+            "\\ No newline at end of file\n"
+            "@@ -9 +8,0 @@\n"
+            "-x\n"
+        )
+        hunks = next(parse_log_stream(io.StringIO(log))).hunks
+
+        assert [h.path for h in hunks] == ["schema.sql", "schema.sql"]
+        assert hunks[0].removed == ["-- a/old comment", "DROP TABLE t;"]
+        assert hunks[0].added == ["++ b/new counter"]
+        assert hunks[1].removed == ["x"]
+
+    def test_tokenize_collapses_literals(self):
+        assert tokenize("x = eval('1' + 2)") == ["x", "=", "eval", "(", "STR", "+", "NUM", ")"]
+
+    def test_tokens_to_pattern_matches_variants(self):
+        import re
+        pattern = re.compile(tokens_to_pattern(tokenize("eval(data['a'])")))
+        assert pattern.search('eval( data["zzz"] )')
+        assert not pattern.search("evaluate(data)")
+
+    def test_revert_commits_count_files(self):
+        state = MiningState()
+        log = (
+            '\x1eaaa\x1fRevert "Add cache"\n'
+            "diff --git a/cache.py b/cache.py\n"
+            "--- a/cache.py\n"
+            "+++ /dev/null\n"
+            "@@ -1 +0,0 @@\n"
+            "-CACHE = {}\n"
+        )
+        for commit in parse_log_stream(io.StringIO(log)):
+            update_state(state, commit)
+        assert state.reverted_files["cache.py"] == 1
+        assert not state.fix_patterns
+
+
+class TestMining:
+    """Test end-to-end mining against a real git repository"""
+
+    def test_mine_repository_writes_candidate_rules(self, repo, tmp_path):
+        output = tmp_path / "mined"
+        summary = mine_repository(repo, output, min_support=3)
+
+        assert summary["commits_seen"] == 6
+        assert summary["rules"] >= 1
+        rules_text = Path(summary["rules_file"]).read_text()
+        assert "### mined-fix-" in rules_text
+        assert "- **glob:** `*.py`" in rules_text
+
+    def test_mining_is_incremental(self, repo, tmp_path):
+        output = tmp_path / "mined"
+        mine_repository(repo, output, min_support=3)
+
+        commit_file(repo, "extra.py", "x = 1\n", "Add extra")
+        summary = mine_repository(repo, output, min_support=3)
+
+        assert summary["new_commits"] == 1
+        assert summary["commits_seen"] == 7
+        (checkpoint_path,) = output.glob("sample_project_*.checkpoint.json")
+        checkpoint = json.loads(checkpoint_path.read_text())
+        assert checkpoint["last_commit"] == git(repo, "rev-parse", "HEAD")
+
+    def test_min_support_filters_rare_patterns(self):
+        state = MiningState()
+        state.fix_patterns["a . b"] = 2
+        assert candidate_rules(state, min_support=3) == []
+
+    def test_mine_repositories_reports_failures(self, repo, tmp_path):
+        not_a_repo = tmp_path / "plain"
+        not_a_repo.mkdir()
+        summaries = mine_repositories([repo, not_a_repo], tmp_path / "mined", workers=2)
+
+        assert "error" not in summaries[0]
+        assert "error" in summaries[1]
+
+    def test_serial_mining_reports_failures_too(self, tmp_path):
+        not_a_repo = tmp_path / "plain"
+        not_a_repo.mkdir()
+        (summary,) = mine_repositories([not_a_repo], tmp_path / "mined", workers=1)
+        assert "git log failed" in summary["error"]
+
+    def test_repos_with_the_same_name_keep_separate_files(self, repo, tmp_path):
+        twin = tmp_path / "other" / repo.name
+        twin.parent.mkdir()
+        git(tmp_path, "clone", "-q", str(repo), str(twin))
+        git(twin, "config", "user.email", "test@example.com")
+        git(twin, "config", "user.name", "Test")
+        commit_file(twin, "extra.py", "x = 1\n", "Add extra")
+        output = tmp_path / "mined"
+
+        first = mine_repository(repo, output)
+        second = mine_repository(twin, output)
+
+        assert first["rules_file"] != second["rules_file"]
+        assert (first["commits_seen"], second["commits_seen"]) == (6, 7)
+        assert len(list(output.glob("*.checkpoint.json"))) == 2
@@ -0,0 +1,190 @@
+"""Tests for prompt templates and shared prompt construction: compiled and cached templates,
+mapped documents, multi-part prompts, prompt versions on results."""
+
+import json
+from types import SimpleNamespace
+
+from scaffold.prompt_registry import PromptRegistry, PromptTemplate, prompt_version
+from scaffold.providers import OpenAIProvider, PromptParts, Provider, ProviderSettings
+from scaffold.review import (
+    ReviewConfig,
+    build_prompt,
+    build_prompt_parts,
+    create_orchestrator,
+    prompt_variables,
+    read_document,
+)
+from scaffold.utils import read_text_mapped
+
+
+def test_prompts_are_read_once_until_they_change(tmp_path, monkeypatch):
+    prompt = tmp_path / "security.md"
+    prompt.write_text("v1")
+    registry = PromptRegistry()
+    reads = []
+    real = type(prompt).read_text
+    monkeypatch.setattr(type(prompt), "read_text", lambda self, *a, **kw: reads.append(self) or real(self, *a, **kw))
+
+    assert [registry.get(prompt) for _ in range(5)] == ["v1"] * 5
+    assert len(reads) == 1
+
+    prompt.write_text("v2 longer")
+    assert registry.get(prompt) == "v2 longer"
+    assert len(reads) == 2
+
+
+def test_preload_skips_missing_prompts(tmp_path):
+    registry = PromptRegistry()
+    registry.preload([tmp_path / "missing.md"])  # the reviewer reports it, not the round
+
+
+def test_mapped_read_matches_read_text(tmp_path):
+    big = tmp_path / "big.md"
+    big.write_bytes(("# Title\r\nnaïve line\r\n" * 10000).encode())
+    small = tmp_path / "small.md"
+    small.write_text("tiny")
+    empty = tmp_path / "empty.md"
+    empty.write_text("")
+
+    for path in (big, small, empty):
+        assert read_text_mapped(path, threshold=1024) == path.read_text()
+
+
+def test_reviewers_share_one_document(tmp_path):
+    doc = tmp_path / "doc.md"
+    doc.write_text("x" * 200_000)
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("Review this")
+    document = read_document(doc)
+    configs = [ReviewConfig(name=f"R{i}", api="openai", model="m", prompt_path=prompt) for i in range(4)]
+
+    parts = [build_prompt_parts(document, config, "rules") for config in configs]
+    assert all(p[-1] is document for p in parts)
+    assert str(parts[0]) == build_prompt(document, configs[0], "rules")
+
+
+async def test_openai_sends_parts_as_text_blocks():
+    sent = []
+
+    async def create(**kwargs: object) -> SimpleNamespace:
+        sent.append(kwargs)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))],
+            usage=SimpleNamespace(total_tokens=3),
+        )
+
+    provider = OpenAIProvider(ProviderSettings())
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    document = "the document"
+    await provider.call("gpt", PromptParts(("instructions\n\n", document)))
+
+    blocks = sent[0]["messages"][1]["content"]
+    assert [b["text"] for b in blocks] == ["instructions\n\n", "the document"]
+    assert blocks[1]["text"] is document
+
+
+async def test_plain_providers_get_the_joined_prompt(tmp_path):
+    seen = []
+
+    class Plain(Provider):
+        async def complete(self, model: str, prompt: str) -> dict:
+            seen.append(prompt)
+            return {"content": "ok", "cost": 0.0, "tokens": 0}
+
+    doc = tmp_path / "doc.md"
+    doc.write_text("# Doc")
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("Review this")
+    orchestrator = create_orchestrator()
+    orchestrator.providers.register("plain", Plain)
+    config = ReviewConfig(name="Plain", api="plain", model="m", prompt_path=prompt)
+
+    await orchestrator.run_review(doc, [config], 1, tmp_path / "reviews")
+    assert seen == ["Review this\n\n---\n\nDocument to review:\n\n# Doc"]
+
+
+def test_templates_fill_variables_and_keep_unknown_slots():
+    template = PromptTemplate.compile("Review {{PROJECT_NAME}} ({{LANGUAGE}}).\n{{RULES}}\nKeep {{OTHER}}.")
+    assert template.names == ("PROJECT_NAME", "LANGUAGE", "RULES", "OTHER")
+    assert template.render({"PROJECT_NAME": "scaffold", "LANGUAGE": "Python"}) == (
+        "Review scaffold (Python).\n\nKeep {{OTHER}}."
+    )
+    assert PromptTemplate.compile("plain").render({"RULES": "x"}) == "plain"
+
+
+def test_rules_go_in_their_slot_or_at_the_end(tmp_path):
+    slotted = tmp_path / "slotted.md"
+    slotted.write_text("Rules:\n{{RULES}}\nReview {{PROJECT_NAME}} as {{LANGUAGE}}.")
+    plain = tmp_path / "plain.md"
+    plain.write_text("Review this")
+    doc = tmp_path / "app.py"
+    variables = prompt_variables(doc)
+    assert variables["LANGUAGE"] == "Python"
+
+    rendered = build_prompt("code", ReviewConfig("S", "openai", "m", slotted), "RULE A", variables)
+    assert rendered.startswith(f"Rules:\nRULE A\nReview {variables['PROJECT_NAME']} as Python.")
+    assert rendered.count("RULE A") == 1
+    assert build_prompt("code", ReviewConfig("P", "openai", "m", plain), "RULE A").startswith("Review this\n\nRULE A")
+
+
+def test_templates_are_shared_by_content_hash(tmp_path):
+    registry = PromptRegistry()
+    a, b = tmp_path / "a.md", tmp_path / "b.md"
+    a.write_text("same prompt")
+    b.write_text("same prompt")
+    assert registry.template(a) is registry.template(b)
+    assert registry.version(a) == prompt_version("same prompt")
+
+
+def test_refresh_reports_changed_prompts(tmp_path):
+    registry = PromptRegistry()
+    a, b = tmp_path / "a.md", tmp_path / "b.md"
+    a.write_text("a1")
+    b.write_text("b1")
+    registry.preload([a, b])
+    assert registry.refresh() == []
+
+    a.write_text("a2 edited")
+    assert registry.refresh() == [a]
+    assert registry.get(a) == "a2 edited"
+
+
+def test_prompt_files_are_listed_once_per_directory_change(tmp_path, monkeypatch):
+    registry = PromptRegistry()
+    (tmp_path / "security.md").write_text("s")
+    globs = []
+    real = type(tmp_path).glob
+    monkeypatch.setattr(type(tmp_path), "glob", lambda self, pattern: globs.append(pattern) or real(self, pattern))
+
+    assert registry.prompt_files(tmp_path) == registry.prompt_files(tmp_path) == [tmp_path / "security.md"]
+    assert len(globs) == 1
+
+    (tmp_path / "quality.md").write_text("q")
+    assert [p.name for p in registry.prompt_files(tmp_path)] == ["quality.md", "security.md"]
+
+
+async def test_results_record_the_prompt_version(tmp_path):
+    class Echo(Provider):
+        async def complete(self, model: str, prompt: str) -> dict:
+            return {"content": "ok", "cost": 0.0, "tokens": 0}
+
+    doc = tmp_path / "doc.md"
+    doc.write_text("# Doc")
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("Review v1")
+    orchestrator = create_orchestrator()
+    orchestrator.providers.register("echo", Echo)
+    configs = [
+        ReviewConfig(name="Echo", api="echo", model="m", prompt_path=prompt),
+        ReviewConfig(name="Missing", api="echo", model="m", prompt_path=tmp_path / "missing.md"),
+    ]
+
+    first = await orchestrator.run_review(doc, configs, 1, tmp_path / "reviews")
+    assert first.results[0].prompt_version == prompt_version("Review v1")
+    assert first.results[1].error and first.results[1].prompt_version == ""
+    cost = json.loads((tmp_path / "reviews" / "round_1" / "COST_SUMMARY.json").read_text())
+    assert cost["results"][0]["prompt_version"] == prompt_version("Review v1")
+
+    prompt.write_text("Review v2, edited")
+    second = await orchestrator.run_review(doc, configs[:1], 2, tmp_path / "reviews")
+    assert second.results[0].prompt_version == prompt_version("Review v2, edited")
@@ -0,0 +1,229 @@
+"""Tests for the lazily loaded review provider registry."""
+
+import asyncio
+import subprocess
+import sys
+import time
+from importlib.metadata import EntryPoint
+
+import pytest
+
+from scaffold import providers
+from scaffold.providers import ENTRY_POINT_GROUP, Provider, ProviderRegistry, RetryPolicy
+from scaffold.review import ReviewConfig, create_orchestrator
+
+
+class EchoProvider(Provider):
+    concurrency = 2
+    running = 0
+    peak = 0
+
+    async def complete(self, model: str, prompt: str) -> dict:
+        EchoProvider.running += 1
+        EchoProvider.peak = max(EchoProvider.peak, EchoProvider.running)
+        await asyncio.sleep(0.02)
+        EchoProvider.running -= 1
+        return {"content": f"{model}: {prompt}", "cost": 0.0, "tokens": len(prompt)}
+
+
+def test_importing_review_does_not_load_provider_sdks():
+    code = "import sys, scaffold.review; print('openai' in sys.modules, 'anthropic' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ["False", "False"]
+
+
+def test_clients_are_created_on_first_use():
+    orchestrator = create_orchestrator(deepseek_key="test-key")
+    assert orchestrator.providers.loaded() == []
+
+    assert orchestrator.deepseek_client is not None
+    assert orchestrator.openai_client is None  # no key
+    assert orchestrator.providers.loaded() == ["deepseek", "openai"]
+
+
+async def test_entry_point_providers_are_loaded_on_first_use(monkeypatch, tmp_path):
+    entry_point = EntryPoint(name="echo", value=f"{__name__}:EchoProvider", group=ENTRY_POINT_GROUP)
+    monkeypatch.setattr(providers, "_entry_points", lambda: {"echo": entry_point})
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("Review this")
+    orchestrator = create_orchestrator()
+
+    config = ReviewConfig(name="Echo", api="echo", model="m1", prompt_path=prompt)
+    result = await orchestrator._call_api(config, "hello")
+
+    assert result["content"] == "m1: hello"
+    assert isinstance(orchestrator.providers.get("echo"), EchoProvider)
+
+
+async def test_provider_concurrency_limit():
+    EchoProvider.peak = 0
+    provider = EchoProvider(providers.ProviderSettings())
+    await asyncio.gather(*(provider.call("m", str(i)) for i in range(6)))
+    assert EchoProvider.peak == 2
+
+
+async def test_provider_timeout_and_retry_policy():
+    calls = []
+
+    class Slow(Provider):
+        timeout = 0.05
+        retry = RetryPolicy(attempts=2, min_wait=0, max_wait=0)
+
+        async def complete(self, model: str, prompt: str) -> dict:
+            calls.append(time.perf_counter())
+            await asyncio.sleep(1)
+            return {}
+
+    with pytest.raises(TimeoutError):
+        await Slow(providers.ProviderSettings()).call("m", "p")
+    assert len(calls) == 2
+
+
+async def test_unknown_and_stub_providers():
+    registry = ProviderRegistry()
+    with pytest.raises(ValueError, match="Unknown API: nope"):
+        registry.get("nope")
+
+    start = time.perf_counter()
+    with pytest.raises(NotImplementedError):
+        await registry.get("google").call("gemini", "p")
+    assert time.perf_counter() - start < 1  # no retries for the stub
+
+
+class FakeStatusError(Exception):
+    """Shaped like the SDKs' APIStatusError"""
+
+    def __init__(self, status_code: int, headers: dict | None = None) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"status_code": status_code, "headers": headers or {}})()
+
+
+def test_errors_are_classified():
+    classify = providers.classify_error
+    assert classify(ValueError("OpenAI client not initialized")) == providers.FATAL
+    assert classify(FakeStatusError(400)) == providers.FATAL
+    assert classify(FakeStatusError(401)) == providers.FATAL
+    assert classify(FakeStatusError(429)) == providers.RATE_LIMITED
+    assert classify(FakeStatusError(503)) == providers.RETRYABLE
+    assert classify(FakeStatusError(529)) == providers.RETRYABLE
+    assert classify(asyncio.TimeoutError()) == providers.RETRYABLE
+    assert classify(ConnectionResetError()) == providers.RETRYABLE
+    assert classify(providers.CircuitOpenError("open")) == providers.FATAL
+
+
+class Scripted(Provider):
+    """Raises the scripted errors in order, then succeeds"""
+
+    name = "scripted"
+    retry = RetryPolicy(attempts=3, min_wait=0, max_wait=0)
+    failure_threshold = 2
+    reset_timeout = 0.1
+
+    def __init__(self, errors: list) -> None:
+        super().__init__(providers.ProviderSettings())
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def complete(self, model: str, prompt: str) -> dict:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"content": "ok", "cost": 0.0, "tokens": 1}
+
+
+async def test_fatal_errors_are_not_retried():
+    provider = Scripted([ValueError("client not initialized")])
+    start = time.perf_counter()
+    with pytest.raises(ValueError):
+        await provider.call("m", "p")
+    assert provider.calls == 1
+    assert time.perf_counter() - start < 0.1
+
+
+async def test_rate_limits_honour_retry_after():
+    provider = Scripted([FakeStatusError(429, {"retry-after": "0.2"})])
+    start = time.perf_counter()
+    assert (await provider.call("m", "p"))["content"] == "ok"
+    assert time.perf_counter() - start >= 0.2
+    assert provider.breaker.state == "closed"
+
+
+async def test_breaker_fails_fast_then_probes():
+    provider = Scripted([FakeStatusError(503), FakeStatusError(503)])
+    with pytest.raises(FakeStatusError):
+        await provider.call("m", "p")  # two retryable failures trip the breaker mid-call
+    assert provider.breaker.state == "open"
+    assert "circuit open" in provider.breaker.describe()
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(provider.call("m", "p") for _ in range(5)), return_exceptions=True)
+    assert all(isinstance(r, providers.CircuitOpenError) for r in results)
+    assert provider.calls == 2 and time.perf_counter() - start < 0.05
+
+    await asyncio.sleep(0.1)
+    assert provider.breaker.state == "half-open"
+    assert (await provider.call("m", "p"))["content"] == "ok"
+    assert provider.breaker.state == "closed"
+
+
+async def test_failed_probe_reopens():
+    provider = Scripted([FakeStatusError(503), FakeStatusError(503), ConnectionResetError()])
+    with pytest.raises(FakeStatusError):
+        await provider.call("m", "p")
+    await asyncio.sleep(0.1)
+
+    with pytest.raises(ConnectionResetError):
+        await provider.call("m", "p")  # the probe fails, reopening before any retry
+    assert provider.breaker.state == "open"
+    assert provider.calls == 3
+
+
+async def test_cancelled_probe_frees_the_half_open_slot():
+    class Hangs(Scripted):
+        hang = False
+
+        async def complete(self, model: str, prompt: str) -> dict:
+            if self.hang:
+                await asyncio.sleep(10)
+            return await super().complete(model, prompt)
+
+    provider = Hangs([FakeStatusError(503), FakeStatusError(503)])
+    with pytest.raises(FakeStatusError):
+        await provider.call("m", "p")
+    await asyncio.sleep(0.1)
+
+    provider.hang = True
+    probe = asyncio.create_task(provider.call("m", "p"))
+    await asyncio.sleep(0.01)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    provider.hang = False
+    assert provider.breaker.state == "half-open"
+    assert (await provider.call("m", "p"))["content"] == "ok"  # not stuck failing fast
+    assert provider.breaker.state == "closed"
+
+
+async def test_open_breaker_fails_the_rest_of_the_round_fast(tmp_path):
+    doc = tmp_path / "doc.md"
+    doc.write_text("# Doc")
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("Review this")
+
+    class Down(Scripted):
+        concurrency = 1
+        retry = RetryPolicy(attempts=1)
+
+    down = Down([FakeStatusError(503)] * 10)
+    orchestrator = create_orchestrator()
+    orchestrator.providers.register("down", down)
+    configs = [ReviewConfig(name=f"Reviewer {i}", api="down", model="m", prompt_path=prompt) for i in range(6)]
+
+    summary = await orchestrator.run_review(doc, configs, 1, tmp_path / "reviews")
+
+    errors = [r.error for r in summary.results]
+    assert errors[:2] == ["HTTP 503", "HTTP 503"]
+    assert all("circuit open" in e for e in errors[2:])
+    assert down.calls == 2
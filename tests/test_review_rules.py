@@ -0,0 +1,186 @@
+"""
+Tests for the REVIEW.md rule engine
+
+Run with: pytest tests/test_review_rules.py -v
+"""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from scaffold.review_rules import (
+    ReviewRule,
+    RuleEngine,
+    find_review_md,
+    format_rules_prompt,
+    parse_review_md,
+    required_literal,
+)
+
+REVIEW_MD_TEXT = """# Review Rules
+
+Intro text that is not a rule.
+
+### no-eval
+- **pattern:** `\\beval\\(`
+- **glob:** `*.py`
+- **severity:** error
+- **reviewers:** security
+
+Never eval untrusted input.
+
+### no-todo
+- **literal:** `TODO(`
+
+Track work in the issue tracker instead.
+
+### docs-tone
+- **glob:** `*.md`
+
+Keep documentation terse.
+"""
+
+
+class TestParsing:
+    """Test REVIEW.md parsing"""
+
+    def test_parse_review_md(self):
+        rules = parse_review_md(REVIEW_MD_TEXT)
+
+        assert [r.rule_id for r in rules] == ["no-eval", "no-todo", "docs-tone"]
+        assert rules[0].pattern == r"\beval\("
+        assert rules[0].severity == "error"
+        assert rules[0].reviewers == ("security",)
+        assert rules[0].description == "Never eval untrusted input."
+        assert rules[1].literal == "TODO("
+        assert rules[2].is_guidance
+
+    def test_required_literal(self):
+        assert required_literal(r"\beval\(") == "eval("
+        assert required_literal(r"os\.(remove|unlink)\(") == "os."
+        assert required_literal(r"(?i)secret") is None
+        assert required_literal(r"a|b") is None
+
+
+class TestScanning:
+    """Test single-pass scanning"""
+
+    def test_scan_reports_lines_and_respects_globs(self):
+        engine = RuleEngine(parse_review_md(REVIEW_MD_TEXT))
+        text = "x = 1\ny = eval(data)\n# TODO(me): fix\n"
+
+        py_findings = engine.scan(text, Path("app.py"))
+        assert [(f.rule_id, f.line) for f in py_findings] == [("no-eval", 2), ("no-todo", 3)]
+
+        md_findings = engine.scan(text, Path("notes.md"))
+        assert [f.rule_id for f in md_findings] == ["no-todo"]
+
+    def test_verification_rejects_literal_only_hits(self):
+        engine = RuleEngine([ReviewRule(rule_id="r", pattern=r"\beval\(")])
+        assert engine.scan("retrieval(x)\n") == []
+
+    def test_overlapping_literals_all_fire(self):
+        engine = RuleEngine([
+            ReviewRule(rule_id="short", literal="foo"),
+            ReviewRule(rule_id="long", literal="foobar"),
+            ReviewRule(rule_id="inner", literal="oba"),
+        ])
+        assert sorted(f.rule_id for f in engine.scan("x = foobar\n")) == ["inner", "long", "short"]
+
+    def test_literals_with_whitespace(self):
+        engine = RuleEngine([ReviewRule(rule_id="rm", literal="rm -rf"), ReviewRule(rule_id="eq", literal=" = ")])  # audit: allow[rm-rf]
+        findings = engine.scan("a = 1\nrm -rf /tmp/x\nrm  -rf\n")
+        assert [(f.rule_id, f.line) for f in findings] == [("eq", 1), ("rm", 2)]
+
+    def test_rules_without_literal_use_fallback(self):
+        engine = RuleEngine([ReviewRule(rule_id="digits", pattern=r"^\d+$")])
+        assert [f.line for f in engine.scan("abc\n123\n")] == [2]
+
+    def test_invalid_pattern_is_skipped(self):
+        engine = RuleEngine([ReviewRule(rule_id="bad", pattern="(unclosed")])
+        assert engine.scan("(unclosed\n") == []
+
+    def test_scan_is_fast_with_thousands_of_rules(self):
+        rules = [ReviewRule(rule_id=f"r{i}", pattern=rf"\bcall_{i:05d}\(") for i in range(3000)]
+        engine = RuleEngine(rules)
+        text = "\n".join(f"value = compute(item_{i}) + other_{i}" for i in range(60000))
+        text += "\nresult = call_02999(x)\n"
+
+        start = time.perf_counter()
+        findings = engine.scan(text)
+        elapsed = time.perf_counter() - start
+
+        assert [f.rule_id for f in findings] == ["r2999"]
+        assert elapsed < 1.0
+
+
+class TestPromptInjection:
+    """Test per-reviewer rule selection"""
+
+    def test_relevant_rules_filter_by_reviewer_and_findings(self):
+        engine = RuleEngine(parse_review_md(REVIEW_MD_TEXT))
+        findings = engine.scan("eval(x)\n", Path("app.py"))
+
+        security = engine.relevant_rules(findings, Path("app.py"), "Security Reviewer")
+        performance = engine.relevant_rules(findings, Path("app.py"), "Performance Reviewer")
+
+        assert [r.rule_id for r in security] == ["no-eval"]
+        assert performance == []
+
+    def test_format_rules_prompt_lists_findings(self):
+        engine = RuleEngine(parse_review_md(REVIEW_MD_TEXT))
+        findings = engine.scan("eval(x)\n", Path("app.py"))
+        prompt = format_rules_prompt(engine.relevant_rules(findings, Path("app.py")), findings)
+
+        assert "**no-eval** (error)" in prompt
+        assert "line 1: [no-eval]" in prompt
+        assert format_rules_prompt([], findings) == ""
+
+    def test_find_review_md_stops_at_git_root(self, tmp_path):
+        project = tmp_path / "project"
+        (project / ".git").mkdir(parents=True)
+        (project / "src").mkdir()
+        doc = project / "src" / "doc.md"
+        doc.write_text("x")
+        (tmp_path / "REVIEW.md").write_text("outside the repo")
+
+        assert find_review_md(doc) is None
+        (project / "REVIEW.md").write_text(REVIEW_MD_TEXT)
+        assert find_review_md(doc) == (project / "REVIEW.md").resolve()
+
+
+@pytest.mark.asyncio
+async def test_review_writes_rule_findings_and_injects_rules(tmp_path):
+    """Rules fire before the reviewer and only relevant ones reach its prompt"""
+    from scaffold.providers import Provider
+    from scaffold.review import ReviewConfig, create_orchestrator
+
+    doc = tmp_path / "app.py"
+    doc.write_text("result = eval(data)\n")
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("Review this")
+
+    orchestrator = create_orchestrator()
+    captured = {}
+
+    class FakeOllama(Provider):
+        async def complete(self, model: str, full_prompt: str) -> dict:
+            captured["prompt"] = full_prompt
+            return {"content": "looks fine", "cost": 0.0, "tokens": 0}
+
+    orchestrator.providers.register("ollama", FakeOllama)
+    config = ReviewConfig(name="Security Reviewer", api="ollama", model="m", prompt_path=prompt)
+
+    summary = await orchestrator.run_review(
+        document_path=doc,
+        configs=[config],
+        round_number=1,
+        output_dir=tmp_path / "reviews",
+        rules=RuleEngine(parse_review_md(REVIEW_MD_TEXT)),
+    )
+
+    assert summary.rule_findings == 1
+    assert "[no-eval]" in (tmp_path / "reviews" / "round_1" / "RULE_FINDINGS.md").read_text()
+    assert "**no-eval**" in captured["prompt"]
+    assert "docs-tone" not in captured["prompt"]
@@ -0,0 +1,116 @@
+"""Tests for grepai search log rotation, SQLite compaction and search-stats."""
+
+import json
+from pathlib import Path
+
+import pytest
+import send2trash
+from click.testing import CliRunner
+
+from scaffold import search_log
+from scaffold.cli import cli
+from scaffold.search_log import LOG_NAME, STORE_NAME, SearchStats, compact, iter_records, rotate_if_needed
+
+
+def write_log(path: Path, entries: list[tuple[str, str, str, list[str]]]) -> None:
+    with open(path, "a") as f:
+        for ts, project, query, results in entries:
+            f.write(json.dumps({"ts": ts, "project": project, "query": query, "results": results}) + "\n")
+
+
+@pytest.fixture
+def trashed(monkeypatch):
+    paths = []
+    monkeypatch.setattr(send2trash, "send2trash", lambda path: paths.append(Path(path).name) or Path(path).unlink())
+    return paths
+
+
+def test_rotation_moves_large_logs_aside(tmp_path):
+    log = tmp_path / LOG_NAME
+    write_log(log, [("2026-01-01T00:00:00Z", "demo", "q", [])])
+    assert rotate_if_needed(log, max_bytes=10_000) is None
+
+    rotated = rotate_if_needed(log, max_bytes=10)
+    assert rotated is not None and rotated.exists() and not log.exists()
+    assert rotated.name.startswith("ai_search_log.") and rotated.suffix == ".jsonl"
+
+
+def test_compaction_imports_once_and_trashes(tmp_path, trashed):
+    old = tmp_path / "ai_search_log.20260101T000000000000Z.jsonl"
+    write_log(old, [
+        ("2026-01-01T00:00:00Z", "demo", "parser", ["src/parser.py"]),
+        ("2026-01-03T00:00:00Z", "demo", "missing thing", []),
+    ])
+    with open(old, "a") as f:
+        f.write('{"ts": "2026-01-0')  # torn line
+    write_log(tmp_path / LOG_NAME, [("2026-01-05T00:00:00Z", "other", "parser", ["a.py"])])
+
+    assert compact(tmp_path) == 2
+    assert trashed == [old.name]
+    assert (tmp_path / STORE_NAME).exists()
+    assert compact(tmp_path) == 0
+
+    stats = SearchStats.from_records(iter_records(tmp_path))
+    assert stats.total == 3
+    assert stats.queries.most_common(1) == [("parser", 2)]
+    assert dict(stats.zero_results) == {"missing thing": 1}
+    # Two queries over two days
+    assert stats.projects["demo"].per_day() == pytest.approx(1.0)
+
+
+def test_untrashable_file_is_not_imported_twice(tmp_path, monkeypatch):
+    def refuse(path: str) -> None:
+        raise OSError("no trash here")
+
+    monkeypatch.setattr(send2trash, "send2trash", refuse)
+    write_log(tmp_path / "ai_search_log.1.jsonl", [("2026-01-01T00:00:00Z", "demo", "q", [])])
+
+    assert compact(tmp_path) == 1
+    assert compact(tmp_path) == 0
+    assert SearchStats.from_records(iter_records(tmp_path)).total == 1
+
+
+def test_stats_stream_without_reading_whole_file(tmp_path, monkeypatch):
+    write_log(tmp_path / LOG_NAME, [("2026-01-01T00:00:00Z", "demo", f"q{i % 3}", []) for i in range(30)])
+    monkeypatch.setattr(Path, "read_text", lambda self, *a, **k: pytest.fail("whole file read"))
+
+    stats = SearchStats.from_records(iter_records(tmp_path))
+    assert stats.total == 30
+    assert len(stats.queries) == 3
+
+
+def test_search_stats_cli(tmp_path, trashed):
+    write_log(tmp_path / "ai_search_log.1.jsonl", [("2026-01-01T00:00:00Z", "demo", "parser", ["p.py"])])
+    write_log(tmp_path / LOG_NAME, [
+        ("2026-01-02T00:00:00Z", "demo", "parser", ["p.py"]),
+        ("2026-01-02T00:00:00Z", "demo", "[bold]nope", []),
+    ])
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["search-stats", "--log-dir", str(tmp_path), "--json"])
+    assert result.exit_code == 0, result.output
+    data = json.loads(result.output)
+    assert data["top_queries"][0] == ["parser", 2]
+    assert data["zero_result_queries"] == [["[bold]nope", 1]]
+    assert data["projects"]["demo"]["queries"] == 3
+    assert trashed == ["ai_search_log.1.jsonl"]
+
+    table = runner.invoke(cli, ["search-stats", "--log-dir", str(tmp_path)])
+    assert table.exit_code == 0
+    assert "3 searches, 2 distinct queries" in table.output
+    assert "[bold]nope" in table.output
+
+
+def test_grepai_log_rotates_on_flush(tmp_path, monkeypatch):
+    from scaffold import grepai
+
+    monkeypatch.setenv("PROJECTS_ROOT", str(tmp_path))
+    monkeypatch.setattr(grepai, "rotate_if_needed", lambda path: search_log.rotate_if_needed(path, 50))
+    log = grepai.SearchLog(batch_size=1)
+
+    log.record("demo", "first", [])
+    log.record("demo", "second", [])
+
+    directory = grepai.log_dir()
+    assert len(search_log.rotated_files(directory)) == 1
+    assert [r.query for r in iter_records(directory)] == ["first", "second"]
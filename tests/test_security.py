@@ -62,6 +62,49 @@ class TestPathTraversal:
         result = safe_slug(malicious)
         assert "\x00" not in result
 
+    def test_safe_slugs_matches_safe_slug(self):
+        """Test that the batch API gives the same slugs as safe_slug"""
+        from scaffold.utils import safe_slug, safe_slugs
+
+        inputs = [
+            "../../etc/passwd",
+            "..\\..\\Windows\\System32",
+            "....//....//etc/passwd",
+            "normal\x00../../etc/passwd",
+            "~/.ssh/id_rsa",
+            "Claude Sonnet 4",
+            "a" * 10000,
+            "",
+        ]
+        expected = [safe_slug(text, base_path=Path("/tmp")) for text in inputs]
+
+        assert safe_slugs(inputs, base_path=Path("/tmp")) == expected
+        assert safe_slugs(iter(inputs)) == expected
+
+    def test_symlinks_out_of_base_path_are_rejected(self, tmp_path):
+        """A name that is a symlink leading outside the base is traversal too"""
+        from scaffold.utils import safe_slug, safe_slugs
+
+        base = tmp_path / "reviews"
+        base.mkdir()
+        (base / "escape").symlink_to(tmp_path)
+
+        with pytest.raises(ValueError, match="Path Traversal"):
+            safe_slug("escape", base_path=base)
+        with pytest.raises(ValueError, match="Path Traversal"):
+            safe_slugs(["fine", "escape"], base_path=base)
+        assert safe_slugs(["fine"], base_path=base) == ["fine"]
+
+    def test_containment_rejects_escaping_slugs(self, tmp_path):
+        """Test the containment check itself, independent of sanitization"""
+        from scaffold.utils import _check_contained
+
+        base = tmp_path.resolve()
+        for slug in ["..", "../x", "/etc"]:
+            with pytest.raises(ValueError, match="Path Traversal"):
+                _check_contained(base, slug)
+        _check_contained(base, "etc_passwd")
+
 
 class TestFileSizeLimits:
     """Test file size bomb protection"""
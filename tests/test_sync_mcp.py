@@ -0,0 +1,207 @@
+"""Tests for agentsync/sync_mcp.py (single-load, manifest-gated, parallel sync)."""
+
+import importlib.util
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parent.parent / "agentsync" / "sync_mcp.py"
+
+
+@pytest.fixture
+def sync_mcp(tmp_path, monkeypatch):
+    spec = importlib.util.spec_from_file_location("sync_mcp", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    configs = tmp_path / "_configs"
+    (configs / "mcp" / "tools").mkdir(parents=True)
+    (configs / "mcp" / "servers.json").write_text(json.dumps({
+        "servers": {
+            "search": {"command": "${TOOLS_ROOT}/search", "env": {"MODE": "fast"}, "description": "x"},
+            "notes": {"command": "notes", "args": ["${PROJECTS_ROOT}"]},
+        }
+    }))
+    (configs / "mcp" / "tools" / "claude.json").write_text(json.dumps({
+        "enabled": ["search", "notes"],
+        "overrides": {"search": {"env": {"MODE": "slow"}}},
+    }))
+    (configs / "mcp" / "tools" / "antigravity.json").write_text(json.dumps({
+        "enabled": ["search"],
+        "nameMapping": {"search": "grep"},
+    }))
+
+    monkeypatch.setattr(module, "CONFIGS_ROOT", configs)
+    monkeypatch.setattr(module, "TOOL_OUTPUTS", {
+        "claude": tmp_path / "out" / "claude.json",
+        "antigravity": tmp_path / "out" / "antigravity" / "mcp.json",
+    })
+    return module
+
+
+def test_sync_writes_every_target_from_one_load(sync_mcp, monkeypatch):
+    calls = []
+    original = sync_mcp.load_servers_config
+    monkeypatch.setattr(sync_mcp, "load_servers_config", lambda: calls.append(1) or original())
+
+    assert sync_mcp.sync_tools(["claude", "antigravity"])
+    assert len(calls) == 1
+
+    claude = json.loads(sync_mcp.TOOL_OUTPUTS["claude"].read_text())
+    antigravity = json.loads(sync_mcp.TOOL_OUTPUTS["antigravity"].read_text())
+    assert claude["mcpServers"]["search"]["env"] == {"MODE": "slow"}
+    assert "description" not in claude["mcpServers"]["search"]
+    # Overrides for one tool must not leak into the shared servers.json data
+    assert antigravity["mcpServers"]["grep"]["env"] == {"MODE": "fast"}
+
+
+def test_unchanged_targets_are_skipped_via_manifest(sync_mcp, monkeypatch, capsys):
+    assert sync_mcp.sync_tools(["claude", "antigravity"])
+    manifest = json.loads((sync_mcp.CONFIGS_ROOT / "mcp" / sync_mcp.MANIFEST_NAME).read_text())
+    assert set(manifest["targets"]) == {str(p) for p in sync_mcp.TOOL_OUTPUTS.values()}
+
+    writes = []
+    monkeypatch.setattr(sync_mcp, "write_atomic", lambda path, content: writes.append(path))
+    monkeypatch.setattr(Path, "read_text", lambda self, *a, **k: pytest.fail(f"read {self}"))
+    capsys.readouterr()
+
+    assert sync_mcp.sync_tools(["claude", "antigravity"])
+    assert writes == []
+    assert capsys.readouterr().out.count("already up to date") == 2
+
+
+def test_external_edit_is_overwritten(sync_mcp):
+    sync_mcp.sync_tools(["claude"])
+    output = sync_mcp.TOOL_OUTPUTS["claude"]
+    expected = output.read_text()
+
+    output.write_text("{}\n")
+    sync_mcp.sync_tools(["claude"])
+
+    assert output.read_text() == expected
+
+
+def test_missing_servers_json_raises(sync_mcp):
+    (sync_mcp.CONFIGS_ROOT / "mcp" / "servers.json").unlink()
+    with pytest.raises(sync_mcp.SyncError, match="not found"):
+        sync_mcp.sync_tools(["claude"])
+
+
+def test_watch_resyncs_on_source_change(sync_mcp, monkeypatch):
+    synced = threading.Event()
+    monkeypatch.setattr(sync_mcp, "sync_tools", lambda tools, **kwargs: synced.set())
+    stop = threading.Event()
+    real_sleep = time.sleep
+
+    def sleep(seconds: float) -> None:
+        if stop.is_set():
+            raise KeyboardInterrupt
+        real_sleep(seconds)
+
+    monkeypatch.setattr(sync_mcp.time, "sleep", sleep)
+    thread = threading.Thread(target=sync_mcp.watch, args=(["claude"], 0.01))
+    thread.start()
+    try:
+        real_sleep(0.05)
+        tool_file = sync_mcp.CONFIGS_ROOT / "mcp" / "tools" / "claude.json"
+        tool_file.write_text(tool_file.read_text() + " ")
+        assert synced.wait(2)
+    finally:
+        stop.set()
+        thread.join(2)
+
+
+def test_watch_keeps_running_when_the_first_sync_fails(sync_mcp, monkeypatch, capsys):
+    (sync_mcp.CONFIGS_ROOT / "mcp" / "servers.json").unlink()
+    watched = []
+    monkeypatch.setattr(sync_mcp, "watch", lambda tools, catalog=None: watched.append(tools))
+    monkeypatch.setattr(sync_mcp.sys, "argv", ["sync_mcp.py", "claude", "--watch"])
+
+    sync_mcp.main()
+
+    assert watched == [["claude"]]
+    assert "not found" in capsys.readouterr().err
+
+    monkeypatch.setattr(sync_mcp.sys, "argv", ["sync_mcp.py", "claude"])
+    with pytest.raises(SystemExit):
+        sync_mcp.main()
+
+
+def write_servers(sync_mcp, servers: dict, variables: dict | None = None) -> None:
+    config = {"servers": servers}
+    if variables is not None:
+        config["variables"] = variables
+    (sync_mcp.CONFIGS_ROOT / "mcp" / "servers.json").write_text(json.dumps(config))
+
+
+def test_chained_variables_defaults_and_environment(sync_mcp, monkeypatch):
+    monkeypatch.setenv("API_HOST", "example.test")
+    write_servers(sync_mcp, {
+        "search": {
+            "command": "${BIN}/search",
+            "args": ["--host=${API_HOST}", "--port=${PORT:-8080}"],
+            "env": {"DATA": "${DATA}"},
+        },
+        "notes": {"command": "notes"},
+    }, variables={
+        "BIN": "${TOOLS_ROOT}/bin",
+        "DATA": "${BIN}/../data",
+    })
+
+    sync_mcp.sync_tools(["claude"])
+    search = json.loads(sync_mcp.TOOL_OUTPUTS["claude"].read_text())["mcpServers"]["search"]
+
+    tools_root = str(sync_mcp.TOOLS_ROOT)
+    assert search["command"] == f"{tools_root}/bin/search"
+    assert search["args"] == ["--host=example.test", "--port=8080"]
+    # The claude override replaces DATA
+    assert search["env"] == {"DATA": f"{tools_root}/bin/../data", "MODE": "slow"}
+
+
+def test_unresolved_variables_are_reported_together(sync_mcp, monkeypatch):
+    monkeypatch.delenv("NOPE_ONE", raising=False)
+    monkeypatch.delenv("NOPE_TWO", raising=False)
+    write_servers(sync_mcp, {
+        "search": {"command": "${NOPE_ONE}"},
+        "notes": {"command": "${NOPE_TWO}", "args": ["${NOPE_ONE}"]},
+    })
+
+    with pytest.raises(sync_mcp.SyncError) as excinfo:
+        sync_mcp.sync_tools(["claude"])
+
+    message = str(excinfo.value)
+    assert "${NOPE_ONE} (used by notes, search)" in message
+    assert "${NOPE_TWO} (used by notes)" in message
+    assert not sync_mcp.TOOL_OUTPUTS["claude"].exists()
+
+
+def test_variable_change_only_rebuilds_dependent_servers(sync_mcp):
+    servers = {
+        "search": {"command": "${SEARCH_BIN}"},
+        "notes": {"command": "${NOTES_BIN}"},
+    }
+    write_servers(sync_mcp, servers, variables={"SEARCH_BIN": "s1", "NOTES_BIN": "n1"})
+    catalog = sync_mcp.ServerCatalog()
+
+    sync_mcp.sync_tools(["claude"], catalog=catalog)
+    assert catalog.rebuilt == {"search", "notes"}
+    assert catalog.dependents("SEARCH_BIN") == ["search"]
+
+    write_servers(sync_mcp, servers, variables={"SEARCH_BIN": "s2", "NOTES_BIN": "n1"})
+    sync_mcp.sync_tools(["claude"], catalog=catalog)
+
+    assert catalog.rebuilt == {"search"}
+    output = json.loads(sync_mcp.TOOL_OUTPUTS["claude"].read_text())["mcpServers"]
+    assert output["search"]["command"] == "s2"
+    assert output["notes"]["command"] == "n1"
+
+
+def test_variable_cycles_are_unresolved(sync_mcp):
+    write_servers(sync_mcp, {"search": {"command": "${A}"}, "notes": {"command": "x"}},
+                  variables={"A": "${B}", "B": "${A}"})
+
+    with pytest.raises(sync_mcp.SyncError, match="Unresolved"):
+        sync_mcp.sync_tools(["claude"])
@@ -0,0 +1,162 @@
+"""Tests for `scaffold review --watch`: debounced, cancellable rounds, full then section-level."""
+
+import asyncio
+
+import pytest
+
+from scaffold.providers import Provider
+from scaffold.review import ReviewConfig, create_orchestrator
+from scaffold.review_rules import RuleEngine, parse_review_md
+from scaffold.watch import ReviewWatcher, SectionCache, split_sections
+
+PRD = "# PRD\n\nIntro.\n\n## Goals\n\nShip it.\n\n## Risks\n\nNone yet.\n"
+
+
+class Recorder(Provider):
+    delay = 0.0
+    prompts: list = []
+    cancelled = 0
+
+    async def complete(self, model: str, prompt: str) -> dict:
+        Recorder.prompts.append(prompt)
+        try:
+            await asyncio.sleep(Recorder.delay)
+        except asyncio.CancelledError:
+            Recorder.cancelled += 1
+            raise
+        section = prompt.split("Document to review:\n\n", 1)[1].splitlines()[0]
+        return {"content": f"review of {section}", "cost": 0.0, "tokens": 1}
+
+
+@pytest.fixture
+def setup(tmp_path):
+    Recorder.delay = 0.0
+    Recorder.prompts = []
+    Recorder.cancelled = 0
+    doc = tmp_path / "PRD.md"
+    doc.write_text(PRD)
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("Review this")
+    orchestrator = create_orchestrator()
+    orchestrator.providers.register("rec", Recorder)
+    configs = [ReviewConfig(name="Reviewer", api="rec", model="m", prompt_path=prompt)]
+    watcher = ReviewWatcher(
+        orchestrator, doc, configs, tmp_path / "reviews",
+        cache=SectionCache(), debounce=0.1, poll_interval=0.01
+    )
+    return watcher, doc
+
+
+async def wait_for(path, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not path.exists():
+        assert asyncio.get_running_loop().time() < deadline, f"{path} never appeared"
+        await asyncio.sleep(0.01)
+
+
+def test_markdown_is_split_at_headings_outside_fences():
+    text = "Preface\n# A\n```\n# not a heading\n```\n## B\nbody\n"
+    assert [s.title for s in split_sections(text)] == ["(preamble)", "A", "B"]
+    assert "".join(s.text for s in split_sections(text)) == text
+    assert [s.title for s in split_sections("# x\n", ".py")] == ["(document)"]
+
+
+async def test_first_round_reviews_the_whole_document(setup):
+    watcher, _ = setup
+    await asyncio.wait_for(watcher.run(max_rounds=1), 5)
+
+    assert len(Recorder.prompts) == 1 and "## Risks" in Recorder.prompts[0]
+    review = (watcher.output_dir / "round_1" / "CODE_REVIEW_REVIEWER.md").read_text()
+    assert review.strip() == "review of # PRD"
+    assert watcher.last_stats == {"sections": 3, "cached": 0, "sent": 1, "full": 1}
+
+
+async def test_only_edited_sections_are_sent_after_the_full_review(setup):
+    watcher, doc = setup
+    task = asyncio.create_task(watcher.run(max_rounds=3))
+    await wait_for(watcher.output_dir / "round_1")
+
+    doc.write_text(PRD.replace("Ship it.", "Ship it twice."))
+    await wait_for(watcher.output_dir / "round_2")
+    assert len(Recorder.prompts) == 2 and Recorder.prompts[-1].endswith("## Goals\n\nShip it twice.\n\n")
+    assert watcher.last_stats == {"sections": 3, "cached": 0, "sent": 1, "full": 0}
+
+    doc.write_text(PRD.replace("Ship it.", "Ship it twice.").replace("None yet.", "Scope."))
+    summaries = await asyncio.wait_for(task, 5)
+
+    assert [s.round_number for s in summaries] == [1, 2, 3]
+    # Goals is still edited relative to the full review, but comes from the cache
+    assert len(Recorder.prompts) == 3
+    assert watcher.last_stats == {"sections": 3, "cached": 1, "sent": 1, "full": 0}
+    review = (watcher.output_dir / "round_3" / "CODE_REVIEW_REVIEWER.md").read_text()
+    assert "## Full document (round 1)" in review
+    assert "## Section: Goals (edited)" in review and "## Section: Risks (edited)" in review
+
+
+async def test_heading_changes_trigger_a_full_review(setup):
+    watcher, doc = setup
+    task = asyncio.create_task(watcher.run(max_rounds=2))
+    await wait_for(watcher.output_dir / "round_1")
+
+    doc.write_text(PRD + "\n## Timeline\n\nQ3.\n")
+    await asyncio.wait_for(task, 5)
+
+    assert len(Recorder.prompts) == 2 and "## Timeline" in Recorder.prompts[-1]
+    assert watcher.last_stats["full"] == 1
+    review = (watcher.output_dir / "round_2" / "CODE_REVIEW_REVIEWER.md").read_text()
+    assert "## Section:" not in review
+
+
+async def test_bursts_of_saves_start_one_round(setup):
+    watcher, doc = setup
+    task = asyncio.create_task(watcher.run(max_rounds=2))
+    await wait_for(watcher.output_dir / "round_1")
+
+    for i in range(5):
+        doc.write_text(PRD.replace("None yet.", f"Draft {i}."))
+        await asyncio.sleep(0.03)
+    await asyncio.wait_for(task, 5)
+
+    sent = Recorder.prompts[1:]
+    assert len(sent) == 1 and "Draft 4." in sent[0]
+
+
+async def test_edit_mid_round_cancels_it(setup):
+    watcher, doc = setup
+    Recorder.delay = 0.5
+    task = asyncio.create_task(watcher.run(max_rounds=1))
+    while not Recorder.prompts:
+        await asyncio.sleep(0.01)
+
+    Recorder.delay = 0.0
+    doc.write_text(PRD.replace("Intro.", "New intro."))
+    summaries = await asyncio.wait_for(task, 5)
+
+    assert Recorder.cancelled == 1
+    assert summaries[0].round_number == 1  # the stale round was never published
+    # Nothing was published, so the next round is still a full review
+    assert len(Recorder.prompts) == 2 and "New intro." in Recorder.prompts[-1]
+    assert watcher.last_stats["full"] == 1
+
+
+async def test_cache_misses_when_the_rendered_prompt_changes(setup):
+    watcher, _ = setup
+    await watcher.review_once()
+    watcher.full_reviews.clear()  # force another full review of the same text
+    await watcher.review_once()
+    assert watcher.last_stats["cached"] == 1 and len(Recorder.prompts) == 1
+
+    watcher.full_reviews.clear()
+    watcher.rules = RuleEngine(parse_review_md("### no-todo\nliteral: TODO\n\nResolve TODOs.\n"))
+    await watcher.review_once()
+
+    assert watcher.last_stats["cached"] == 0 and len(Recorder.prompts) == 2
+    assert "no-todo" in Recorder.prompts[-1]
+
+
+def test_section_cache_persists(tmp_path):
+    path = tmp_path / "sections.json"
+    cache = SectionCache.load(path)
+    cache.put("k", {"content": "c", "cost": 0.0, "tokens": 2})
+    cache.save()
+    assert SectionCache.load(path).get("k") == {"content": "c", "cost": 0.0, "tokens": 2}
@@ -0,0 +1,189 @@
+"""Tests for the distributed review work queue: leases, heartbeats, workers on several processes."""
+
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from scaffold.campaign import find_targets, load_checkpoint, output_dir_for, run_campaign
+from scaffold.providers import Provider
+from scaffold.review import ReviewConfig
+from scaffold.work_queue import QueueJob, SQLiteQueue, open_queue, queue_job_id, run_worker
+
+JOB_SECONDS = 0.15
+
+
+class Sleepy(Provider):
+    async def complete(self, model: str, prompt: str) -> dict:
+        await asyncio.sleep(JOB_SECONDS)
+        return {"content": f"reviewed: {prompt.splitlines()[-1]}", "cost": 0.01, "tokens": 3}
+
+
+PROVIDERS = {"sleepy": f"{__name__}:Sleepy"}
+
+
+def make_jobs(count: int, campaign: str = "c") -> list:
+    return [
+        QueueJob(
+            id=queue_job_id(campaign, 1, f"doc{i}.md", "R", f"prompt {i}"), campaign=campaign,
+            document=f"doc{i}.md", reviewer="R", api="sleepy", model="m", round=1, prompt=f"prompt {i}"
+        )
+        for i in range(count)
+    ]
+
+
+def work(url: str, worker: str) -> None:
+    asyncio.run(run_worker(
+        open_queue(url), worker, providers=PROVIDERS, poll_interval=0.02, exit_when_idle=0.5
+    ))
+
+
+def drain(url: str, workers: int) -> float:
+    start = time.monotonic()
+    procs = [multiprocessing.Process(target=work, args=(url, f"w{i}")) for i in range(workers)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(60)
+        assert proc.exitcode == 0
+    return time.monotonic() - start
+
+
+@pytest.fixture
+def url(tmp_path):
+    return f"sqlite:///{tmp_path / 'shared' / 'queue.db'}"
+
+
+def test_enqueue_is_idempotent_and_requeues_failures(url):
+    queue = open_queue(url)
+    assert isinstance(queue, SQLiteQueue)
+    jobs = make_jobs(2)
+    assert queue.enqueue(jobs) == 2
+    assert queue.enqueue(jobs) == 0
+
+    job = queue.lease("a")
+    assert queue.fail(job.id, "a", "bad request", retry=False)
+    assert queue.counts() == {"failed": 1, "queued": 1}
+    queue.enqueue(jobs)
+    assert queue.counts() == {"queued": 2}
+
+
+def test_expired_lease_goes_to_another_worker(url):
+    queue = open_queue(url)
+    queue.enqueue(make_jobs(1))
+    lost = queue.lease("crashed", lease_seconds=0.05)
+    assert queue.lease("b") is None
+
+    time.sleep(0.1)
+    job = queue.lease("b")
+    assert job.id == lost.id and job.attempts == 2
+    assert not queue.heartbeat(job.id, "crashed")
+    assert not queue.complete(job.id, "crashed", {"content": "late"})
+    assert queue.complete(job.id, "b", {"content": "ok"})
+    assert queue.jobs([job.id])[0].result == {"content": "ok"}
+
+
+def test_heartbeat_keeps_a_long_job(url):
+    queue = open_queue(url)
+    queue.enqueue(make_jobs(1))
+    job = queue.lease("a", lease_seconds=0.1)
+    for _ in range(3):
+        time.sleep(0.05)
+        assert queue.heartbeat(job.id, "a", lease_seconds=0.1)
+    assert queue.lease("b") is None
+
+
+class FlakyBeats(SQLiteQueue):
+    """Heartbeats raise at first, as on a briefly locked shared disk"""
+
+    beats = 0
+
+    def heartbeat(self, job_id: str, worker: str, lease_seconds: float = 60) -> bool:
+        self.beats += 1
+        if self.beats <= 2:
+            raise OSError("database is locked")
+        return super().heartbeat(job_id, worker, lease_seconds)
+
+
+class Stolen(SQLiteQueue):
+    """Another worker posted the job first"""
+
+    def complete(self, job_id: str, worker: str, result: dict) -> bool:
+        return False
+
+
+async def test_failed_heartbeats_are_retried(tmp_path):
+    queue = FlakyBeats(tmp_path / "queue.db")
+    queue.enqueue(make_jobs(1))
+
+    done = await run_worker(
+        queue, "a", providers=PROVIDERS, lease_seconds=0.03, poll_interval=0.01, exit_when_idle=0.05
+    )
+
+    assert done == 1
+    assert queue.beats > 2  # kept beating after the errors
+
+
+async def test_job_lost_before_posting_is_not_counted(tmp_path, caplog):
+    queue = Stolen(tmp_path / "queue.db")
+    queue.enqueue(make_jobs(1))
+
+    done = await run_worker(queue, "a", providers=PROVIDERS, poll_interval=0.01, exit_when_idle=0.05)
+
+    assert done == 0
+    assert "to another worker" in caplog.text
+
+
+def test_retryable_failures_stop_at_max_attempts(url):
+    queue = open_queue(url)
+    queue.enqueue(make_jobs(1))
+    for _ in range(queue.max_attempts):
+        job = queue.lease("a")
+        queue.fail(job.id, "a", "timeout")
+    assert queue.lease("a") is None
+    assert queue.jobs([job.id])[0].status == "failed"
+
+
+def test_workers_on_several_processes_share_the_queue(url):
+    queue = open_queue(url)
+    serial_jobs, parallel_jobs = make_jobs(12, "serial"), make_jobs(12, "parallel")
+
+    queue.enqueue(serial_jobs)
+    serial = drain(url, 1)
+    queue.enqueue(parallel_jobs)
+    parallel = drain(url, 4)
+
+    finished = queue.jobs(j.id for j in serial_jobs + parallel_jobs)
+    assert {j.status for j in finished} == {"done"}
+    assert all(j.attempts == 1 for j in finished)  # nothing was reviewed twice
+    assert len({j.worker for j in finished if j.campaign == "parallel"}) > 1
+    assert parallel < serial / 2, (serial, parallel)
+
+
+def test_campaign_publishes_rounds_reviewed_by_workers(tmp_path, url):
+    root = tmp_path / "projects"
+    for rel in ("app/README.md", "app/docs/PRD.md", "lib/NOTES.md"):
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_text(f"# {rel}")
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("Review {{PROJECT_NAME}}")
+    configs = [ReviewConfig(name=n, api="sleepy", model="m", prompt_path=prompt) for n in ("One", "Two")]
+
+    procs = [multiprocessing.Process(target=work, args=(url, f"w{i}")) for i in range(2)]
+    for proc in procs:
+        proc.start()
+    summary = run_campaign(
+        "nightly", configs, projects_root=root, results_root=tmp_path / "results",
+        config={"scan_extensions": {".md": "markdown"}}, queue_url=url, poll_interval=0.05,
+    )
+    for proc in procs:
+        proc.join(60)
+
+    assert (summary.documents, summary.reviewed, summary.failed) == (3, 3, 0)
+    config = {"scan_extensions": {".md": "markdown"}}
+    prd = next(t for t in find_targets(root, config) if t.rel_path == "docs/PRD.md")
+    round_dir = output_dir_for(summary.results_dir, prd) / "round_1"
+    assert {p.name for p in round_dir.iterdir()} == {"CODE_REVIEW_ONE.md", "CODE_REVIEW_TWO.md", "COST_SUMMARY.json"}
+    assert "reviewed: # app/docs/PRD.md" in (round_dir / "CODE_REVIEW_ONE.md").read_text()
+    assert all(record["workers"] for record in load_checkpoint(summary.results_dir).values())